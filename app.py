@@ -28,6 +28,8 @@ from io import BytesIO
 from PIL import Image
 
 from vectorcraft import HybridVectorizer, OptimizedVectorizer
+from vectorcraft.core.request import VectorizationRequest
+from vectorcraft.core.engine import get_engine
 from database import db
 from services.email_service import email_service
 from services.paypal_service import paypal_service
@@ -36,6 +38,10 @@ from services.security_service import security_service
 from services.redis_service import redis_service
 from services.task_queue_manager import task_queue_manager
 from services.api_service import api_service
+from services.progressive_stream import progressive_response
+from services.request_tracing import traced_request
+from services.svg_delivery import save_svg_result, send_svg
+from vectorcraft.utils.tracing import tracer
 from collections import defaultdict
 from datetime import datetime, timedelta
 
@@ -146,6 +152,9 @@ os.makedirs('static/images', exist_ok=True)
 standard_vectorizer = HybridVectorizer()
 optimized_vectorizer = OptimizedVectorizer()
 
+# Uploads are vectorized in a pool of warm worker processes, off the request thread's GIL
+vectorization_engine = get_engine()
+
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
 
 # Form validation classes
@@ -510,6 +519,7 @@ def generate_palette_preview():
 @app.route('/api/vectorize', methods=['POST'])
 @login_required
 @limiter.limit("30 per hour")
+@traced_request('api.vectorize')
 def vectorize_image():
     try:
         # Validate file upload
@@ -524,12 +534,13 @@ def vectorize_image():
         
         # Save uploaded file temporarily for security validation
         temp_upload_path = os.path.join(app.config['UPLOAD_FOLDER'], f"temp_{uuid.uuid4().hex}_{secure_filename(file.filename)}")
-        file.save(temp_upload_path)
-        
-        # Comprehensive security validation and sanitization
-        is_valid, sanitized_path, error_message = security_service.validate_and_sanitize_upload(
-            temp_upload_path, file.filename
-        )
+        with tracer.span('upload'):
+            file.save(temp_upload_path)
+            
+            # Comprehensive security validation and sanitization
+            is_valid, sanitized_path, error_message = security_service.validate_and_sanitize_upload(
+                temp_upload_path, file.filename
+            )
         
         if not is_valid:
             # Remove temporary file
@@ -582,24 +593,16 @@ def vectorize_image():
         # Get file size for database recording
         file_size = os.path.getsize(input_path)
         
-        # Use OptimizedVectorizer with advanced algorithms
-        vectorizer = optimized_vectorizer
-        
-        # Set custom VTracer parameters 
-        if hasattr(vectorizer, 'real_vtracer') and vectorizer.real_vtracer.available:
-            vectorizer.real_vtracer.set_custom_parameters(vectorization_params)
-            logger.debug(f"Set VTracer parameters: {vectorization_params}")
-        
-        # Use high-fidelity strategy for best quality
-        if hasattr(vectorizer, 'adaptive_optimizer'):
-            # Override strategy selection for high quality results
-            original_optimize = vectorizer.adaptive_optimizer.optimize_strategy_selection
-            vectorizer.adaptive_optimizer.optimize_strategy_selection = lambda metadata, elapsed: strategy
+        # Per-request options, shipped to the engine worker with the job
+        vectorization_request = VectorizationRequest.from_params(
+            strategy, target_time, vectorization_params
+        )
         
         logger.info(f"Using {strategy} strategy for {filename} (User: {current_user.username})")
         
         # Check if palette-based vectorization is requested
         use_palette = request.form.get('use_palette', 'false').lower() == 'true'
+        progressive = request.form.get('progressive', 'false').lower() == 'true'
         selected_palette = None
         
         if use_palette and request.form.get('selected_palette'):
@@ -613,6 +616,102 @@ def vectorize_image():
                 logger.warning(f"Failed to parse selected palette: {e}, using standard vectorization")
                 use_palette = False
         
+        def finish(result):
+            """Save the final result and build the JSON response (direct and streamed paths)"""
+            processing_time = time.time() - start_time
+            
+            # Save SVG result with version info
+            version_suffix = "_v1.0.0-experimental" if strategy == 'experimental' else ""
+            palette_suffix = f"_palette_{len(selected_palette)}colors" if use_palette and selected_palette else ""
+            svg_filename = f"{unique_id}_result{version_suffix}{palette_suffix}.svg"
+            svg_path = os.path.join(app.config['RESULTS_FOLDER'], svg_filename)
+            
+            # Also save to output folder with timestamp for tracking improvements
+            timestamp = int(time.time())
+            output_filename = f"{timestamp}_{strategy}_result.svg"
+            output_path = os.path.join("output", output_filename)
+            os.makedirs("output", exist_ok=True)
+            
+            # Save with precompressed siblings, plus a plain copy in the output folder
+            svg_content = save_svg_result(result, svg_path, copies=[output_path])
+            logger.debug(f"SVG content length: {len(svg_content)} characters")
+            logger.debug(f"SVG preview: {svg_content[:200]}...")
+            
+            # Record upload in database
+            try:
+                db.record_upload(
+                    user_id=int(current_user.id),
+                    filename=f"{unique_id}_{filename}",
+                    original_filename=filename,
+                    file_size=file_size,
+                    svg_filename=svg_filename,
+                    processing_time=processing_time,
+                    strategy_used=result.strategy_used
+                )
+                logger.info(f"Recorded upload for user {current_user.username}")
+            
+                # Log successful vectorization completion
+                system_logger.info('vectorization', f'Vectorization completed successfully',
+                                  user_email=current_user.email,
+                                  details={
+                                      'filename': filename,
+                                      'processing_time': processing_time,
+                                      'strategy_used': result.strategy_used,
+                                      'quality_score': result.quality_score,
+                                      'svg_filename': svg_filename,
+                                      'file_size': file_size
+                                  })
+            except Exception as e:
+                logger.error(f"Failed to record upload: {e}")
+                # Log database error
+                system_logger.error('vectorization', f'Failed to record upload in database: {str(e)}',
+                                  user_email=current_user.email,
+                                  details={'filename': filename})
+            
+            # Convert SVG to base64 for embedding
+            svg_b64 = base64.b64encode(svg_content.encode()).decode()
+            
+            # Get original image as base64 for comparison
+            with open(input_path, 'rb') as img_file:
+                img_b64 = base64.b64encode(img_file.read()).decode()
+                img_ext = filename.rsplit('.', 1)[1].lower()
+            
+            # Clean up uploaded file
+            os.remove(input_path)
+            
+            download_url = url_for('download_result', filename=svg_filename)
+            logger.info(f"Download URL: {download_url} (filename: {svg_filename})")
+            
+            return jsonify({
+                'success': True,
+                'processing_time': result.processing_time,
+                'total_time': processing_time,
+                'strategy_used': result.strategy_used,
+                'quality_score': result.quality_score,
+                'num_elements': result.metadata['num_elements'],
+                'content_type': result.metadata['content_type'],
+                'svg_content': svg_content,
+                'svg_b64': svg_b64,
+                'original_b64': img_b64,
+                'original_ext': img_ext,
+                'download_url': download_url,
+                'metadata': {
+                    'image_size': f"{result.metadata['image_metadata'].width}x{result.metadata['image_metadata'].height}",
+                    'edge_density': result.metadata['image_metadata'].edge_density,
+                    'text_probability': result.metadata['image_metadata'].text_probability,
+                    'geometric_probability': result.metadata['image_metadata'].geometric_probability,
+                    'gradient_probability': result.metadata['image_metadata'].gradient_probability,
+                    'performance_stats': result.metadata.get('performance_stats', {}) if hasattr(result.metadata, 'get') else {}
+                }
+            })
+        
+        def abort(error):
+            if os.path.exists(input_path):
+                os.remove(input_path)
+            system_logger.error('vectorization', f'Vectorization failed: {str(error)}',
+                              user_email=current_user.email,
+                              details={'filename': filename, 'error_message': str(error)})
+        
         # Vectorize image
         start_time = time.time()
         
@@ -663,116 +762,19 @@ def vectorize_image():
                     }
             
             result = PaletteResult(palette_result, time.time() - start_time, image)
+        elif progressive:
+            # Coarse preview first, refined result last, as server-sent events
+            results = vectorization_engine.stream(input_path, request=vectorization_request,
+                                                  target_time=target_time)
+            return progressive_response(results, finish, on_error=abort, trace_name='api.vectorize')
         else:
             # Standard vectorization
-            result = vectorizer.vectorize(input_path, target_time=target_time)
-        
-        processing_time = time.time() - start_time
-        
-        # Restore original strategy selection
-        if hasattr(vectorizer, 'adaptive_optimizer'):
-            vectorizer.adaptive_optimizer.optimize_strategy_selection = original_optimize
-        
-        # Clear custom VTracer parameters for next request
-        if hasattr(vectorizer, 'real_vtracer') and vectorizer.real_vtracer.available:
-            vectorizer.real_vtracer.custom_params = None
-        
-        # Save SVG result with version info
-        version_suffix = "_v1.0.0-experimental" if strategy == 'experimental' else ""
-        palette_suffix = f"_palette_{len(selected_palette)}colors" if use_palette and selected_palette else ""
-        svg_filename = f"{unique_id}_result{version_suffix}{palette_suffix}.svg"
-        svg_path = os.path.join(app.config['RESULTS_FOLDER'], svg_filename)
-        
-        # Also save to output folder with timestamp for tracking improvements
-        timestamp = int(time.time())
-        output_filename = f"{timestamp}_{strategy}_result.svg"
-        output_path = os.path.join("output", output_filename)
-        os.makedirs("output", exist_ok=True)
-        
-        # Handle different result types from vectorization
-        if hasattr(result, 'svg_builder') and result.svg_builder:
-            logger.debug(f"Using svg_builder, elements: {len(result.svg_builder.elements) if hasattr(result.svg_builder, 'elements') else 'No elements'}")
-            result.svg_builder.save(svg_path)
-            result.svg_builder.save(output_path)  # Save to output folder too
-            svg_content = result.svg_builder.get_svg_string()
-            logger.debug(f"SVG content length: {len(svg_content)} characters")
-            logger.debug(f"SVG preview: {svg_content[:200]}...")
-        else:
-            logger.debug(f"Using direct SVG result")
-            # Handle direct SVG result
-            with open(svg_path, 'w') as f:
-                f.write(result.get_svg_string())
-            with open(output_path, 'w') as f:  # Save to output folder too
-                f.write(result.get_svg_string())
-            svg_content = result.get_svg_string()
-        
-        # Record upload in database
-        try:
-            db.record_upload(
-                user_id=int(current_user.id),
-                filename=f"{unique_id}_{filename}",
-                original_filename=filename,
-                file_size=file_size,
-                svg_filename=svg_filename,
-                processing_time=processing_time,
-                strategy_used=result.strategy_used
-            )
-            logger.info(f"Recorded upload for user {current_user.username}")
-            
-            # Log successful vectorization completion
-            system_logger.info('vectorization', f'Vectorization completed successfully',
-                              user_email=current_user.email,
-                              details={
-                                  'filename': filename,
-                                  'processing_time': processing_time,
-                                  'strategy_used': result.strategy_used,
-                                  'quality_score': result.quality_score,
-                                  'svg_filename': svg_filename,
-                                  'file_size': file_size
-                              })
-        except Exception as e:
-            logger.error(f"Failed to record upload: {e}")
-            # Log database error
-            system_logger.error('vectorization', f'Failed to record upload in database: {str(e)}',
-                              user_email=current_user.email,
-                              details={'filename': filename})
-        
-        # Convert SVG to base64 for embedding
-        svg_b64 = base64.b64encode(svg_content.encode()).decode()
-        
-        # Get original image as base64 for comparison
-        with open(input_path, 'rb') as img_file:
-            img_b64 = base64.b64encode(img_file.read()).decode()
-            img_ext = filename.rsplit('.', 1)[1].lower()
-        
-        # Clean up uploaded file
-        os.remove(input_path)
+            with tracer.span('vectorize'):
+                result = vectorization_engine.vectorize(input_path, request=vectorization_request,
+                                                        target_time=target_time)
         
-        download_url = url_for('download_result', filename=svg_filename)
-        logger.info(f"Download URL: {download_url} (filename: {svg_filename})")
-        
-        return jsonify({
-            'success': True,
-            'processing_time': result.processing_time,
-            'total_time': processing_time,
-            'strategy_used': result.strategy_used,
-            'quality_score': result.quality_score,
-            'num_elements': result.metadata['num_elements'],
-            'content_type': result.metadata['content_type'],
-            'svg_content': svg_content,
-            'svg_b64': svg_b64,
-            'original_b64': img_b64,
-            'original_ext': img_ext,
-            'download_url': download_url,
-            'metadata': {
-                'image_size': f"{result.metadata['image_metadata'].width}x{result.metadata['image_metadata'].height}",
-                'edge_density': result.metadata['image_metadata'].edge_density,
-                'text_probability': result.metadata['image_metadata'].text_probability,
-                'geometric_probability': result.metadata['image_metadata'].geometric_probability,
-                'gradient_probability': result.metadata['image_metadata'].gradient_probability,
-                'performance_stats': result.metadata.get('performance_stats', {}) if hasattr(result.metadata, 'get') else {}
-            }
-        })
+        with tracer.span('save'):
+            return finish(result)
         
     except Exception as e:
         # Clean up files on error
@@ -849,7 +851,7 @@ def download_result(filename):
     try:
         file_path = os.path.join(app.config['RESULTS_FOLDER'], filename)
         if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True)
+            return send_svg(file_path, as_attachment=True)
         else:
             return "File not found", 404
     except Exception as e:
@@ -862,7 +864,7 @@ def view_result(filename):
     try:
         file_path = os.path.join(app.config['RESULTS_FOLDER'], filename)
         if os.path.exists(file_path):
-            return send_file(file_path, mimetype='image/svg+xml')
+            return send_svg(file_path)
         else:
             return "File not found", 404
     except Exception as e:
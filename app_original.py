@@ -15,6 +15,7 @@ from io import BytesIO
 from PIL import Image
 
 from vectorcraft import HybridVectorizer, OptimizedVectorizer
+from vectorcraft.core.request import VectorizationRequest
 from database import db
 
 app = Flask(__name__)
@@ -292,16 +293,10 @@ def vectorize_image():
         # Use OptimizedVectorizer with advanced algorithms
         vectorizer = optimized_vectorizer
         
-        # Set custom VTracer parameters 
-        if hasattr(vectorizer, 'real_vtracer') and vectorizer.real_vtracer.available:
-            vectorizer.real_vtracer.set_custom_parameters(vectorization_params)
-            print(f"🎛️ Set VTracer parameters: {vectorization_params}")
-        
-        # Use high-fidelity strategy for best quality
-        if hasattr(vectorizer, 'adaptive_optimizer'):
-            # Override strategy selection for high quality results
-            original_optimize = vectorizer.adaptive_optimizer.optimize_strategy_selection
-            vectorizer.adaptive_optimizer.optimize_strategy_selection = lambda metadata, elapsed: strategy
+        # Per-request options; the shared vectorizer is never mutated
+        vectorization_request = VectorizationRequest.from_params(
+            strategy, target_time, vectorization_params
+        )
         
         print(f"🎯 WEB INTERFACE: Using {strategy} strategy for {filename} (User: {current_user.username})")
         
@@ -372,18 +367,10 @@ def vectorize_image():
             result = PaletteResult(palette_result, time.time() - start_time, image)
         else:
             # Standard vectorization
-            result = vectorizer.vectorize(input_path, target_time=target_time)
+            result = vectorizer.vectorize(input_path, target_time=target_time, request=vectorization_request)
         
         processing_time = time.time() - start_time
         
-        # Restore original strategy selection
-        if hasattr(vectorizer, 'adaptive_optimizer'):
-            vectorizer.adaptive_optimizer.optimize_strategy_selection = original_optimize
-        
-        # Clear custom VTracer parameters for next request
-        if hasattr(vectorizer, 'real_vtracer') and vectorizer.real_vtracer.available:
-            vectorizer.real_vtracer.custom_params = None
-        
         # Save SVG result with version info
         version_suffix = "_v1.0.0-experimental" if strategy == 'experimental' else ""
         palette_suffix = f"_palette_{len(selected_palette)}colors" if use_palette and selected_palette else ""
@@ -44,6 +44,7 @@ def async_vectorize():
         strategy = request.form.get('strategy', 'vtracer_high_fidelity')
         target_time = float(request.form.get('target_time', 60.0))
         use_palette = request.form.get('use_palette', 'false').lower() == 'true'
+        progressive = request.form.get('progressive', 'false').lower() == 'true'
         selected_palette = None
         
         if use_palette and request.form.get('selected_palette'):
@@ -89,7 +90,8 @@ def async_vectorize():
             target_time=target_time,
             vectorization_params=vectorization_params,
             use_palette=use_palette,
-            selected_palette=selected_palette
+            selected_palette=selected_palette,
+            progressive=progressive
         )
         
         if result['success']:
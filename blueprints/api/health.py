@@ -3,7 +3,7 @@ Health check and monitoring API endpoints
 """
 
 import logging
-from flask import jsonify
+from flask import jsonify, request
 from flask_login import current_user
 
 from . import api_bp
@@ -113,4 +113,23 @@ def performance_metrics():
         
     except Exception as e:
         logger.error(f"Performance metrics error: {e}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/traces', methods=['GET'])
+@admin_required
+def export_traces():
+    """Export recent request traces and per-stage latency percentiles as JSON"""
+    try:
+        from vectorcraft.utils.tracing import tracer
+        
+        limit = request.args.get('limit', 50, type=int)
+        trace_id = request.args.get('trace_id')
+        
+        return jsonify({
+            'success': True,
+            **tracer.export(limit=limit, trace_id=trace_id)
+        })
+        
+    except Exception as e:
+        logger.error(f"Trace export error: {e}")
+        return jsonify({'error': str(e)}), 500
@@ -22,13 +22,17 @@ from blueprints.auth.utils import login_required_api, rate_limit_decorator
 from database import db
 from services.monitoring import system_logger
 from services.security_service import security_service
-from vectorcraft import HybridVectorizer, OptimizedVectorizer
+from services.progressive_stream import progressive_response
+from services.request_tracing import traced_request
+from services.svg_delivery import save_svg_result
+from vectorcraft.core.request import VectorizationRequest
+from vectorcraft.core.engine import get_engine
+from vectorcraft.utils.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
-# Initialize vectorizers
-standard_vectorizer = HybridVectorizer()
-optimized_vectorizer = OptimizedVectorizer()
+# Vectorization runs in the shared pool of warm worker processes
+vectorization_engine = get_engine()
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
 
@@ -41,6 +45,7 @@ def allowed_file(filename):
 @api_bp.route('/vectorize', methods=['POST'])
 @login_required_api
 @rate_limit_decorator(max_attempts=30, cooldown_minutes=60)
+@traced_request('api.vectorize')
 def vectorize_image():
     """Main vectorization endpoint"""
     try:
@@ -63,12 +68,13 @@ def vectorize_image():
             current_app.config['UPLOAD_FOLDER'], 
             f"temp_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
         )
-        file.save(temp_upload_path)
-        
-        # Comprehensive security validation and sanitization
-        is_valid, sanitized_path, error_message = security_service.validate_and_sanitize_upload(
-            temp_upload_path, file.filename
-        )
+        with tracer.span('upload'):
+            file.save(temp_upload_path)
+            
+            # Comprehensive security validation and sanitization
+            is_valid, sanitized_path, error_message = security_service.validate_and_sanitize_upload(
+                temp_upload_path, file.filename
+            )
         
         if not is_valid:
             # Remove temporary file
@@ -98,40 +104,43 @@ def vectorize_image():
         vectorization_params = _extract_vectorization_params(request.form)
         
         # Process the image
-        result = _process_vectorization(
-            upload_path, 
-            filename, 
-            strategy, 
-            vectorization_params,
-            request.form
-        )
-        
-        # Save result and update database
-        svg_filename, download_url = _save_vectorization_result(
-            result, 
-            filename, 
-            strategy, 
-            file_size,
-            request.form
-        )
-        
-        # Clean up uploaded file
-        if os.path.exists(upload_path):
-            os.remove(upload_path)
-        
-        # Log successful completion
-        system_logger.info('vectorization', f'Vectorization completed successfully',
-                          user_email=current_user.email,
-                          details={
-                              'filename': filename,
-                              'processing_time': result.processing_time,
-                              'strategy_used': result.strategy_used,
-                              'quality_score': result.quality_score,
-                              'svg_filename': svg_filename,
-                              'file_size': file_size
-                          })
-        
-        return _format_vectorization_response(result, filename, download_url)
+        progressive = request.form.get('progressive', 'false').lower() == 'true'
+        if progressive:
+            # Returns a generator; progressive_response times the stages as they stream
+            result = _process_vectorization(
+                upload_path, 
+                filename, 
+                strategy, 
+                vectorization_params,
+                request.form,
+                progressive=True
+            )
+        else:
+            with tracer.span('vectorize'):
+                result = _process_vectorization(
+                    upload_path, 
+                    filename, 
+                    strategy, 
+                    vectorization_params,
+                    request.form
+                )
+        
+        def finish(result):
+            return _complete_vectorization(result, filename, strategy, file_size, upload_path, request.form)
+        
+        if progressive:
+            # Preview SVGs as server-sent events, then the usual JSON as the last event
+            def abort(error):
+                if os.path.exists(upload_path):
+                    os.remove(upload_path)
+                system_logger.error('vectorization', f'Vectorization failed: {str(error)}',
+                                  user_email=current_user.email,
+                                  details={'filename': filename, 'error_message': str(error)})
+            
+            return progressive_response(result, finish, on_error=abort, trace_name='api.vectorize')
+        
+        with tracer.span('save'):
+            return finish(result)
         
     except Exception as e:
         # Clean up files on error
@@ -274,21 +283,19 @@ def _extract_vectorization_params(form_data):
     }
 
 
-def _process_vectorization(upload_path, filename, strategy, vectorization_params, form_data):
-    """Process vectorization with given parameters"""
-    # Use optimized vectorization approach
-    vectorizer = optimized_vectorizer
-    target_time = float(form_data.get('target_time', 60))
+def _process_vectorization(upload_path, filename, strategy, vectorization_params, form_data,
+                           progressive=False):
+    """Process vectorization with given parameters
     
-    # Set custom VTracer parameters 
-    if hasattr(vectorizer, 'real_vtracer') and vectorizer.real_vtracer.available:
-        vectorizer.real_vtracer.set_custom_parameters(vectorization_params)
-        logger.debug(f"Set VTracer parameters: {vectorization_params}")
+    With ``progressive`` an iterator of results is returned instead: a coarse
+    preview first, the final result last.
+    """
+    target_time = float(form_data.get('target_time', 60))
     
-    # Override strategy selection for high quality results
-    if hasattr(vectorizer, 'adaptive_optimizer'):
-        original_optimize = vectorizer.adaptive_optimizer.optimize_strategy_selection
-        vectorizer.adaptive_optimizer.optimize_strategy_selection = lambda metadata, elapsed: strategy
+    # Per-request options, shipped to the worker with the job
+    vectorization_request = VectorizationRequest.from_params(
+        strategy, target_time, vectorization_params
+    )
     
     logger.info(f"Using {strategy} strategy for {filename} (User: {current_user.username})")
     
@@ -309,18 +316,13 @@ def _process_vectorization(upload_path, filename, strategy, vectorization_params
     
     if use_palette and selected_palette and strategy == 'experimental':
         result = _process_palette_vectorization(upload_path, selected_palette)
-    else:
-        result = vectorizer.vectorize(upload_path, target_time=target_time)
-    
-    # Restore original strategy selection
-    if hasattr(vectorizer, 'adaptive_optimizer'):
-        vectorizer.adaptive_optimizer.optimize_strategy_selection = original_optimize
+        return iter([result]) if progressive else result
     
-    # Clear custom VTracer parameters for next request
-    if hasattr(vectorizer, 'real_vtracer') and vectorizer.real_vtracer.available:
-        vectorizer.real_vtracer.custom_params = None
-    
-    return result
+    if progressive:
+        return vectorization_engine.stream(upload_path, request=vectorization_request,
+                                           target_time=target_time)
+    return vectorization_engine.vectorize(upload_path, request=vectorization_request,
+                                          target_time=target_time)
 
 
 def _process_palette_vectorization(upload_path, selected_palette):
@@ -366,6 +368,36 @@ def _process_palette_vectorization(upload_path, selected_palette):
     return PaletteResult(palette_result, time.time() - start_time, image)
 
 
+def _complete_vectorization(result, filename, strategy, file_size, upload_path, form_data):
+    """Save the final result, clean up the upload and build the JSON response"""
+    # Save result and update database
+    svg_filename, download_url = _save_vectorization_result(
+        result, 
+        filename, 
+        strategy, 
+        file_size,
+        form_data
+    )
+    
+    # Clean up uploaded file
+    if os.path.exists(upload_path):
+        os.remove(upload_path)
+    
+    # Log successful completion
+    system_logger.info('vectorization', f'Vectorization completed successfully',
+                      user_email=current_user.email,
+                      details={
+                          'filename': filename,
+                          'processing_time': result.processing_time,
+                          'strategy_used': result.strategy_used,
+                          'quality_score': result.quality_score,
+                          'svg_filename': svg_filename,
+                          'file_size': file_size
+                      })
+    
+    return _format_vectorization_response(result, filename, download_url)
+
+
 def _save_vectorization_result(result, filename, strategy, file_size, form_data):
     """Save vectorization result and update database"""
     unique_id = str(uuid.uuid4())
@@ -391,15 +423,8 @@ def _save_vectorization_result(result, filename, strategy, file_size, form_data)
     output_path = os.path.join("output", output_filename)
     os.makedirs("output", exist_ok=True)
     
-    # Save the SVG result
-    if hasattr(result, 'svg_builder') and result.svg_builder:
-        result.svg_builder.save(svg_path)
-        result.svg_builder.save(output_path)
-    else:
-        with open(svg_path, 'w') as f:
-            f.write(result.get_svg_string())
-        with open(output_path, 'w') as f:
-            f.write(result.get_svg_string())
+    # Save the SVG result with precompressed siblings for delivery
+    save_svg_result(result, svg_path, copies=[output_path])
     
     # Record upload in database
     try:
@@ -4,11 +4,12 @@ Main application routes for VectorCraft
 
 import os
 import logging
-from flask import render_template, request, redirect, url_for, send_file, current_app
+from flask import render_template, request, redirect, url_for, current_app
 from flask_login import current_user, login_required
 
 from . import main_bp
 from database import db
+from services.svg_delivery import send_svg
 
 logger = logging.getLogger(__name__)
 
@@ -79,7 +80,7 @@ def download_result(filename):
         
         file_path = os.path.join(current_app.config['RESULTS_FOLDER'], filename)
         if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True)
+            return send_svg(file_path, as_attachment=True)
         else:
             logger.warning(f"File not found: {filename}")
             return "File not found", 404
@@ -104,7 +105,7 @@ def view_result(filename):
         
         file_path = os.path.join(current_app.config['RESULTS_FOLDER'], filename)
         if os.path.exists(file_path):
-            return send_file(file_path, mimetype='image/svg+xml')
+            return send_svg(file_path)
         else:
             logger.warning(f"File not found: {filename}")
             return "File not found", 404
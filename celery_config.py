@@ -23,6 +23,8 @@ CELERY_ENABLE_UTC = True
 CELERY_ROUTES = {
     'vectorization_tasks.vectorize_image': {'queue': 'vectorization'},
     'vectorization_tasks.batch_vectorize': {'queue': 'batch_processing'},
+    'vectorization_tasks.vectorize_batch_file': {'queue': 'batch_processing'},
+    'vectorization_tasks.collect_batch_results': {'queue': 'batch_processing'},
     'vectorization_tasks.extract_palettes': {'queue': 'image_analysis'},
     'vectorization_tasks.cleanup_old_files': {'queue': 'maintenance'},
 }
@@ -78,6 +80,12 @@ CELERY_TASK_ANNOTATIONS = {
         'rate_limit': '1/m',
         'time_limit': 3600,  # 1 hour
         'soft_time_limit': 2400,  # 40 minutes
+    },
+    # Per-file subtasks of a batch; concurrency is capped per user instead of rate-limited
+    'vectorization_tasks.vectorize_batch_file': {
+        'rate_limit': None,
+        'time_limit': 1800,  # 30 minutes
+        'soft_time_limit': 1200,  # 20 minutes
     }
 }
 
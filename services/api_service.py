@@ -935,7 +935,8 @@ class APIService:
                        target_time: float = 60.0,
                        vectorization_params: Dict[str, Any] = None,
                        use_palette: bool = False,
-                       selected_palette: List[List[int]] = None) -> Dict[str, Any]:
+                       selected_palette: List[List[int]] = None,
+                       progressive: bool = False) -> Dict[str, Any]:
         """
         Submit vectorization task asynchronously
         
@@ -948,6 +949,7 @@ class APIService:
             vectorization_params: Custom vectorization parameters
             use_palette: Whether to use custom palette
             selected_palette: Custom color palette
+            progressive: Publish a preview SVG in the task progress before the final result
             
         Returns:
             Dict containing task information
@@ -962,7 +964,8 @@ class APIService:
                     'target_time': target_time,
                     'vectorization_params': vectorization_params,
                     'use_palette': use_palette,
-                    'selected_palette': selected_palette
+                    'selected_palette': selected_palette,
+                    'progressive': progressive
                 },
                 queue='vectorization',
                 user_id=user_id
@@ -0,0 +1,167 @@
+"""
+Batch vectorization planning for VectorCraft
+Deduplicates a batch by pixel hash, caps how many of a user's batch files run at once
+and counts finished files across the workers of a fanned-out batch
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    """One distinct image of a batch and the uploads that decode to the same pixels"""
+    file_path: str
+    filename: str
+    image_hash: Optional[str] = None
+    duplicates: List[Tuple[str, str]] = field(default_factory=list)  # (file_path, filename)
+
+
+def plan_batch(file_paths: List[str], filenames: List[str]) -> List[BatchItem]:
+    """Group the batch by pixel hash so each distinct image is vectorized once.
+
+    Files that cannot be hashed (unreadable, not an image) are kept as their
+    own item; vectorizing them reports the error for that file.
+    """
+    if len(file_paths) != len(filenames):
+        raise ValueError("file_paths and filenames must have the same length")
+
+    items: List[BatchItem] = []
+    by_hash: Dict[str, BatchItem] = {}
+    for file_path, filename in zip(file_paths, filenames):
+        try:
+            image_hash = ResultCache.hash_image_file(file_path)
+        except Exception as e:
+            logger.warning(f"Could not hash batch file {filename}: {e}")
+            items.append(BatchItem(file_path, filename))
+            continue
+
+        if image_hash in by_hash:
+            by_hash[image_hash].duplicates.append((file_path, filename))
+            continue
+
+        item = BatchItem(file_path, filename, image_hash)
+        by_hash[image_hash] = item
+        items.append(item)
+
+    return items
+
+
+class UserConcurrencyLimiter:
+    """Per-user cap on concurrently running batch files.
+
+    Each running file holds a named slot (its Celery task ID) stamped with its
+    start time. Slots live in a Redis sorted set so the cap holds across Celery
+    workers; when Redis is unavailable they are kept per process. A slot older
+    than ``slot_ttl``, which must exceed the batch task's hard time limit,
+    belongs to a worker that died holding it and is reaped on the next acquire.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, redis=None, slot_ttl: int = 2100):
+        self.max_concurrent = max_concurrent or int(os.getenv('BATCH_MAX_CONCURRENT_PER_USER', 2))
+        self.redis = redis
+        self.slot_ttl = slot_ttl
+        self._local: Dict[int, Dict[str, float]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def acquire(self, user_id: int, slot_id: str) -> bool:
+        """Take the named slot for the user; False when the user is at the cap.
+
+        Acquiring a slot the user already holds (a redelivered task) succeeds.
+        """
+        key = self._key(user_id)
+        now = time.time()
+        if self.redis is not None and self.redis.is_connected():
+            self.redis.sorted_set_remove_by_score(key, now - self.slot_ttl, prefix='task_result')
+            if self.redis.sorted_set_add(key, slot_id, now, prefix='task_result') is not None:
+                self.redis.expire(key, self.slot_ttl, prefix='task_result')
+                # The oldest slots win, so racing acquirers cannot both slip under the cap
+                rank = self.redis.sorted_set_rank(key, slot_id, prefix='task_result')
+                if rank is not None and rank < self.max_concurrent:
+                    return True
+                self.redis.sorted_set_remove(key, slot_id, prefix='task_result')
+                return False
+
+        with self._lock:
+            slots = self._local[user_id]
+            for stale in [slot for slot, started in slots.items() if started <= now - self.slot_ttl]:
+                del slots[stale]
+            if slot_id not in slots and len(slots) >= self.max_concurrent:
+                return False
+            slots.setdefault(slot_id, now)
+            return True
+
+    def release(self, user_id: int, slot_id: str):
+        """Give back a slot taken by ``acquire``"""
+        if self.redis is not None and self.redis.is_connected():
+            if self.redis.sorted_set_remove(self._key(user_id), slot_id, prefix='task_result'):
+                return
+
+        with self._lock:
+            self._local[user_id].pop(slot_id, None)
+
+    def running(self, user_id: int) -> int:
+        """Slots the user holds that are not stale"""
+        cutoff = time.time() - self.slot_ttl
+        if self.redis is not None and self.redis.is_connected():
+            count = self.redis.sorted_set_count(self._key(user_id), cutoff, prefix='task_result')
+            if count is not None:
+                return count
+        with self._lock:
+            return sum(1 for started in self._local[user_id].values() if started > cutoff)
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"batch_running:{user_id}"
+
+
+class BatchProgressCounter:
+    """Files finished per batch, counted where every worker of the batch can see it"""
+
+    def __init__(self, redis=None, ttl: int = 86400):
+        self.redis = redis
+        self.ttl = ttl
+        self._local: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def increment(self, batch_id: str) -> int:
+        key = f"batch_progress:{batch_id}"
+        if self.redis is not None and self.redis.is_connected():
+            done = self.redis.increment(key, prefix='task_result')
+            if done is not None:
+                self.redis.expire(key, self.ttl, prefix='task_result')
+                return done
+
+        with self._lock:
+            self._local[batch_id] += 1
+            return self._local[batch_id]
+
+    def clear(self, batch_id: str):
+        if self.redis is not None and self.redis.is_connected():
+            self.redis.delete(f"batch_progress:{batch_id}", prefix='task_result')
+        with self._lock:
+            self._local.pop(batch_id, None)
+
+
+def _redis():
+    try:
+        from .redis_service import redis_service
+        return redis_service
+    except Exception as e:
+        logger.warning(f"Redis unavailable for batch bookkeeping, counting per process: {e}")
+        return None
+
+
+# Global instances shared by the batch tasks
+_shared_redis = _redis()
+batch_concurrency = UserConcurrencyLimiter(redis=_shared_redis)
+batch_progress = BatchProgressCounter(redis=_shared_redis)
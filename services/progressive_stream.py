@@ -0,0 +1,74 @@
+"""
+Progressive vectorization over server-sent events for VectorCraft
+Streams preview SVGs as the engine produces them, then the final JSON response
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from flask import Response, stream_with_context
+
+from vectorcraft.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def preview_payload(result) -> Dict[str, Any]:
+    """Event data for an intermediate result"""
+    return {
+        'stage': result.metadata['progressive']['stage'],
+        'processing_time': result.processing_time,
+        'num_elements': result.metadata.get('num_elements', 0),
+        'svg_content': result.svg_builder.get_svg_string()
+    }
+
+
+def progressive_response(results: Iterable, finalize: Callable[[Any], Any],
+                         on_error: Optional[Callable[[Exception], None]] = None,
+                         trace_name: Optional[str] = None) -> Response:
+    """Stream ``results`` as ``preview`` events and finish with a ``result`` event.
+
+    ``finalize`` turns the final result into the route's usual JSON response
+    (saving it, recording the upload); its body becomes the ``result`` event.
+    Failures after the stream has started are reported as an ``error`` event.
+    The view's trace has closed by the time the body streams, so the stream is
+    traced as ``<trace_name>.stream`` under the same trace ID, with a
+    ``vectorize`` span per stage and a ``save`` span around ``finalize``.
+    """
+    trace_id = tracer.current_trace_id()
+    trace_name = f"{trace_name or 'progressive'}.stream"
+
+    def events():
+        with tracer.trace(trace_name, trace_id=trace_id):
+            try:
+                results_iter = iter(results)
+                while True:
+                    with tracer.span('vectorize') as span:
+                        result = next(results_iter, None)
+                        if result is not None:
+                            span.set(stage=result.metadata.get('progressive', {}).get('stage', 'final'))
+                    if result is None:
+                        break
+                    if not result.metadata.get('progressive', {}).get('final', True):
+                        yield sse_event('preview', preview_payload(result))
+                        continue
+
+                    with tracer.span('save'):
+                        response = finalize(result)
+                    if isinstance(response, tuple):
+                        response = response[0]
+                    yield sse_event('result', response.get_json())
+            except Exception as e:
+                logger.error(f"Progressive vectorization failed: {e}")
+                if on_error:
+                    on_error(e)
+                yield sse_event('error', {'error': f'Processing failed: {str(e)}'})
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -381,6 +381,71 @@ class RedisService:
             logger.error(f"Failed to get list length for key {key}: {e}")
             return 0
     
+    def sorted_set_add(self, key: str, member: str, score: float, prefix: str = 'api_cache') -> Optional[int]:
+        """Add a member to a sorted set, keeping the score of one already present"""
+        if not self.is_connected():
+            return None
+        
+        try:
+            full_key = self._get_key(prefix, key)
+            return self.redis_client.zadd(full_key, {member: score}, nx=True)
+            
+        except Exception as e:
+            logger.error(f"Failed to add to sorted set key {key}: {e}")
+            return None
+    
+    def sorted_set_remove(self, key: str, member: str, prefix: str = 'api_cache') -> bool:
+        """Remove a member from a sorted set"""
+        if not self.is_connected():
+            return False
+        
+        try:
+            full_key = self._get_key(prefix, key)
+            return bool(self.redis_client.zrem(full_key, member))
+            
+        except Exception as e:
+            logger.error(f"Failed to remove from sorted set key {key}: {e}")
+            return False
+    
+    def sorted_set_remove_by_score(self, key: str, max_score: float, prefix: str = 'api_cache') -> int:
+        """Remove the members of a sorted set scored at most ``max_score``"""
+        if not self.is_connected():
+            return 0
+        
+        try:
+            full_key = self._get_key(prefix, key)
+            return self.redis_client.zremrangebyscore(full_key, '-inf', max_score)
+            
+        except Exception as e:
+            logger.error(f"Failed to trim sorted set key {key}: {e}")
+            return 0
+    
+    def sorted_set_rank(self, key: str, member: str, prefix: str = 'api_cache') -> Optional[int]:
+        """Position of a member in a sorted set, lowest score first"""
+        if not self.is_connected():
+            return None
+        
+        try:
+            full_key = self._get_key(prefix, key)
+            return self.redis_client.zrank(full_key, member)
+            
+        except Exception as e:
+            logger.error(f"Failed to get rank in sorted set key {key}: {e}")
+            return None
+    
+    def sorted_set_count(self, key: str, min_score: float = float('-inf'), prefix: str = 'api_cache') -> Optional[int]:
+        """Number of members of a sorted set scored above ``min_score``"""
+        if not self.is_connected():
+            return None
+        
+        try:
+            full_key = self._get_key(prefix, key)
+            return self.redis_client.zcount(full_key, f"({min_score}", '+inf')
+            
+        except Exception as e:
+            logger.error(f"Failed to count sorted set key {key}: {e}")
+            return None
+    
     def get_info(self) -> Dict[str, Any]:
         """Get Redis server info"""
         if not self.is_connected():
@@ -0,0 +1,49 @@
+"""
+Request tracing for VectorCraft
+Opens the root span of a vectorization request so the engine and pipeline spans nest under it
+"""
+
+import re
+import functools
+import logging
+
+from flask import make_response, request
+
+from vectorcraft.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = 'X-Trace-Id'
+
+# Client-supplied trace IDs are echoed back in headers and stored, so only accept plain tokens
+_TRACE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def incoming_trace_id():
+    """Trace ID sent by the client, if it is well-formed"""
+    trace_id = request.headers.get(TRACE_HEADER)
+    if trace_id and _TRACE_ID_RE.match(trace_id):
+        return trace_id
+    return None
+
+
+def traced_request(name):
+    """Decorator: run the view inside a new trace and return its ID in the ``X-Trace-Id`` header
+
+    Server-sent event responses are streamed after the view returns, so
+    ``progressive_response`` traces the stream itself under the same trace ID.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return view(*args, **kwargs)
+
+            with tracer.trace(name, trace_id=incoming_trace_id(), method=request.method,
+                              path=request.path) as span:
+                response = make_response(view(*args, **kwargs))
+                span.set(status_code=response.status_code)
+            response.headers[TRACE_HEADER] = span.trace_id
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,260 @@
+"""
+Vectorization result cache for VectorCraft
+Content-addressed, SQLite-backed store of finished SVGs keyed by pixel hash + parameters
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+
+# Image metadata attributes persisted alongside the SVG
+IMAGE_METADATA_FIELDS = (
+    'width', 'height', 'edge_density', 'text_probability',
+    'geometric_probability', 'gradient_probability'
+)
+
+
+class CachedVectorizationResult:
+    """Result object rebuilt from a cache entry, shaped like VectorizationResult"""
+
+    def __init__(self, svg_content: str, strategy_used: str, quality_score: float,
+                 metadata: Dict[str, Any], processing_time: float = 0.0):
+        self.svg_content = svg_content
+        self.svg_builder = None
+        self.processing_time = processing_time
+        self.strategy_used = strategy_used
+        self.quality_score = quality_score
+        self.metadata = metadata
+
+    def get_svg_string(self) -> str:
+        return self.svg_content
+
+
+class ResultCache:
+    """Persistent LRU cache of vectorization results bounded by entry count and bytes"""
+
+    def __init__(self, db_path: str = None, max_entries: int = 1000,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.db_path = db_path or os.getenv('VECTORCRAFT_RESULT_CACHE', 'cache/result_cache.db')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.RLock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'stores': 0
+        }
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success, rolls back on error, and always closes"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create the cache table if needed"""
+        with self.lock, self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS vectorization_results (
+                    cache_key TEXT PRIMARY KEY,
+                    svg_content TEXT NOT NULL,
+                    result_metadata TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hit_count INTEGER DEFAULT 0
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_results_last_access
+                ON vectorization_results (last_access)
+            ''')
+
+    @staticmethod
+    def hash_image_file(file_path: str) -> str:
+        """SHA-256 of the decoded pixels, so re-encoded copies of one image share a key"""
+        from PIL import Image
+
+        with Image.open(file_path) as image:
+            if image.mode != 'RGBA':
+                image = image.convert('RGBA')
+            digest = hashlib.sha256()
+            digest.update(f"{image.width}x{image.height}:{image.mode}".encode())
+            digest.update(image.tobytes())
+            return digest.hexdigest()
+
+    @staticmethod
+    def normalize_params(strategy: str, params: Optional[Dict[str, Any]] = None,
+                         selected_palette: Optional[List[List[int]]] = None) -> str:
+        """Canonical JSON for the strategy and parameter set"""
+        normalized = {}
+        for key, value in (params or {}).items():
+            if value is None:
+                continue
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            normalized[str(key)] = value
+
+        payload = {'strategy': strategy, 'params': normalized}
+        if selected_palette:
+            payload['palette'] = [[int(c) for c in color] for color in selected_palette]
+
+        return json.dumps(payload, sort_keys=True, separators=(',', ':'))
+
+    def make_key(self, image_hash: str, strategy: str, params: Optional[Dict[str, Any]] = None,
+                 selected_palette: Optional[List[List[int]]] = None) -> str:
+        """Cache key from image hash plus normalized strategy/params"""
+        normalized = self.normalize_params(strategy, params, selected_palette)
+        return hashlib.sha256(f"{image_hash}|{normalized}".encode()).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[CachedVectorizationResult]:
+        """Look up a result and refresh its LRU position"""
+        try:
+            with self.lock, self._connect() as conn:
+                row = conn.execute(
+                    'SELECT svg_content, result_metadata FROM vectorization_results WHERE cache_key = ?',
+                    (cache_key,)
+                ).fetchone()
+
+                if row is None:
+                    self.stats['misses'] += 1
+                    return None
+
+                conn.execute(
+                    'UPDATE vectorization_results SET last_access = ?, hit_count = hit_count + 1 '
+                    'WHERE cache_key = ?',
+                    (time.time(), cache_key)
+                )
+                self.stats['hits'] += 1
+
+            svg_content, result_metadata = row
+            stored = json.loads(result_metadata)
+
+            metadata = dict(stored.get('metadata', {}))
+            metadata['image_metadata'] = SimpleNamespace(**stored.get('image_metadata', {}))
+            metadata['cache_hit'] = True
+
+            return CachedVectorizationResult(
+                svg_content=svg_content,
+                strategy_used=stored.get('strategy_used', 'unknown'),
+                quality_score=stored.get('quality_score', 0.0),
+                metadata=metadata
+            )
+        except Exception as e:
+            logger.error(f"Result cache lookup failed: {e}")
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, cache_key: str, svg_content: str, result) -> bool:
+        """Store a finished result and evict least recently used entries over budget"""
+        try:
+            image_metadata = result.metadata.get('image_metadata')
+            stored = {
+                'strategy_used': result.strategy_used,
+                'quality_score': float(result.quality_score),
+                'image_metadata': {
+                    field: self._to_json_value(getattr(image_metadata, field, 0))
+                    for field in IMAGE_METADATA_FIELDS
+                },
+                'metadata': {
+                    'num_elements': int(result.metadata.get('num_elements', 0)),
+                    'content_type': str(result.metadata.get('content_type', 'standard'))
+                }
+            }
+            size_bytes = len(svg_content.encode())
+            now = time.time()
+
+            with self.lock, self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO vectorization_results '
+                    '(cache_key, svg_content, result_metadata, size_bytes, created_at, last_access) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (cache_key, svg_content, json.dumps(stored), size_bytes, now, now)
+                )
+                self.stats['stores'] += 1
+                self._evict(conn)
+
+            return True
+        except Exception as e:
+            logger.error(f"Result cache store failed: {e}")
+            return False
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until both bounds are met"""
+        count, total_bytes = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM vectorization_results'
+        ).fetchone()
+
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        rows = conn.execute(
+            'SELECT cache_key, size_bytes FROM vectorization_results ORDER BY last_access ASC'
+        ).fetchall()
+
+        victims = []
+        for cache_key, size_bytes in rows:
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            victims.append((cache_key,))
+            count -= 1
+            total_bytes -= size_bytes
+
+        conn.executemany('DELETE FROM vectorization_results WHERE cache_key = ?', victims)
+        self.stats['evictions'] += len(victims)
+
+    def clear(self):
+        """Remove every cached result"""
+        with self.lock, self._connect() as conn:
+            conn.execute('DELETE FROM vectorization_results')
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus current occupancy"""
+        try:
+            with self.lock, self._connect() as conn:
+                entries, total_bytes = conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM vectorization_results'
+                ).fetchone()
+        except Exception as e:
+            logger.error(f"Result cache stats failed: {e}")
+            entries, total_bytes = 0, 0
+
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+            'evictions': self.stats['evictions'],
+            'stores': self.stats['stores'],
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': total_bytes
+        }
+
+    @staticmethod
+    def _to_json_value(value):
+        try:
+            return value.item()  # numpy scalar
+        except AttributeError:
+            return value
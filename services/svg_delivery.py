@@ -0,0 +1,38 @@
+"""
+SVG result storage and delivery for VectorCraft
+Saves results next to precompressed .svgz/brotli siblings and serves the smallest copy the client accepts
+"""
+
+import os
+import logging
+from typing import Iterable
+
+from flask import request, send_file
+
+from vectorcraft.utils.svg_optimizer import precompressed_sibling, write_svg
+
+logger = logging.getLogger(__name__)
+
+
+def save_svg_result(result, svg_path: str, copies: Iterable[str] = ()) -> str:
+    """Write a result's SVG with its compressed siblings, plus plain ``copies``; returns the SVG text"""
+    source = result.svg_builder if getattr(result, 'svg_builder', None) else result
+    svg_content = source.get_svg_string()
+    write_svg(svg_path, svg_content)
+    for copy_path in copies:
+        write_svg(copy_path, svg_content, precompress=False)
+    return svg_content
+
+
+def send_svg(file_path: str, as_attachment: bool = False):
+    """Send an SVG result, using a precompressed sibling with ``Content-Encoding`` when accepted"""
+    sibling = precompressed_sibling(file_path, request.headers.get('Accept-Encoding', ''))
+    if sibling is None:
+        response = send_file(file_path, mimetype='image/svg+xml', as_attachment=as_attachment)
+    else:
+        compressed_path, encoding = sibling
+        response = send_file(compressed_path, mimetype='image/svg+xml', as_attachment=as_attachment,
+                             download_name=os.path.basename(file_path))
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
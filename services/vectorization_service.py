@@ -10,13 +10,15 @@ import json
 import logging
 import statistics
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from pathlib import Path
 from collections import defaultdict
 
 from database_optimized import db_optimized
 from .monitoring import system_logger
 from .file_service import file_service
+from .result_cache import ResultCache
+from .svg_delivery import save_svg_result
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +35,11 @@ class VectorizationService:
         self._standard_vectorizer = None
         self._optimized_vectorizer = None
         
+        # Content-addressed cache of finished results
+        self._result_cache = None
+        self._result_cache_retry_at = 0.0
+        self.result_cache_retry_interval = 60.0
+        
         # Vectorization settings
         self.supported_strategies = [
             'vtracer_high_fidelity',
@@ -87,6 +94,24 @@ class VectorizationService:
                 raise
         return self._optimized_vectorizer
     
+    @property
+    def engine(self):
+        """Process-wide pool of warm vectorization workers"""
+        from vectorcraft.core.engine import get_engine
+        return get_engine()
+    
+    @property
+    def result_cache(self):
+        """Lazy initialization of the result cache, retried at most once per interval after a failure"""
+        if self._result_cache is None and time.time() >= self._result_cache_retry_at:
+            try:
+                self._result_cache = ResultCache()
+            except Exception as e:
+                self._result_cache_retry_at = time.time() + self.result_cache_retry_interval
+                self.logger.error(f"Failed to initialize result cache, retrying in "
+                                  f"{self.result_cache_retry_interval:.0f}s: {e}")
+        return self._result_cache
+    
     def vectorize_image(self, 
                        user_id: int,
                        file_path: str,
@@ -95,10 +120,16 @@ class VectorizationService:
                        target_time: float = None,
                        vectorization_params: Dict[str, Any] = None,
                        use_palette: bool = False,
-                       selected_palette: List[List[int]] = None) -> Tuple[bool, Dict[str, Any]]:
+                       selected_palette: List[List[int]] = None,
+                       progressive: bool = False,
+                       on_progress: Callable[[Any], None] = None) -> Tuple[bool, Dict[str, Any]]:
         """
         Vectorize an image file
         
+        With ``progressive`` the engine streams a coarse preview before the
+        final result; ``on_progress`` is called with each intermediate
+        VectorizationResult.
+        
         Returns:
             Tuple[bool, Dict[str, Any]]: (success, result_data)
         """
@@ -125,38 +156,54 @@ class VectorizationService:
                                   'user_id': user_id
                               })
             
-            # Prepare vectorizer
-            vectorizer = self.optimized_vectorizer
-            
-            # Set custom parameters if provided
-            if vectorization_params and hasattr(vectorizer, 'real_vtracer'):
-                if vectorizer.real_vtracer.available:
-                    vectorizer.real_vtracer.set_custom_parameters(vectorization_params)
-            
-            # Override strategy selection if needed
-            if hasattr(vectorizer, 'adaptive_optimizer'):
-                original_optimize = vectorizer.adaptive_optimizer.optimize_strategy_selection
-                vectorizer.adaptive_optimizer.optimize_strategy_selection = lambda metadata, elapsed: strategy
+            # Serve re-submissions of the same pixels + parameters from the cache
+            cache_key = None
+            result_cache = self.result_cache
+            if result_cache:
+                try:
+                    image_hash = result_cache.hash_image_file(file_path)
+                    cache_key = result_cache.make_key(
+                        image_hash, strategy, vectorization_params,
+                        selected_palette if use_palette else None
+                    )
+                except Exception as e:
+                    self.logger.warning(f"Could not compute result cache key: {e}")
+            
+            if cache_key:
+                lookup_start = time.time()
+                cached_result = result_cache.get(cache_key)
+                if cached_result is not None:
+                    processing_time = time.time() - lookup_start
+                    cached_result.processing_time = processing_time
+                    self.logger.info(f"Result cache hit for {filename}")
+                    return self._save_vectorization_result(
+                        user_id, cached_result, filename, strategy, file_size,
+                        use_palette, selected_palette, processing_time
+                    )
+            
+            # Per-request options, shipped to the engine worker with the job
+            from vectorcraft.core.request import VectorizationRequest
+            vectorization_request = VectorizationRequest.from_params(
+                strategy, target_time, vectorization_params
+            )
             
             # Perform vectorization
             start_time = time.time()
             
             if use_palette and selected_palette and strategy == 'experimental':
                 result = self._vectorize_with_palette(file_path, selected_palette)
+            elif progressive:
+                result = None
+                for result in self.engine.stream(file_path, request=vectorization_request,
+                                                 target_time=target_time):
+                    if on_progress and not result.metadata['progressive']['final']:
+                        on_progress(result)
             else:
-                result = vectorizer.vectorize(file_path, target_time=target_time)
+                result = self.engine.vectorize(file_path, request=vectorization_request,
+                                               target_time=target_time)
             
             processing_time = time.time() - start_time
             
-            # Restore original strategy selection
-            if hasattr(vectorizer, 'adaptive_optimizer'):
-                vectorizer.adaptive_optimizer.optimize_strategy_selection = original_optimize
-            
-            # Clear custom parameters
-            if vectorization_params and hasattr(vectorizer, 'real_vtracer'):
-                if vectorizer.real_vtracer.available:
-                    vectorizer.real_vtracer.custom_params = None
-            
             # Save result
             success, result_data = self._save_vectorization_result(
                 user_id, result, filename, strategy, file_size, 
@@ -164,6 +211,9 @@ class VectorizationService:
             )
             
             if success:
+                if cache_key and self._is_cacheable(result):
+                    result_cache.put(cache_key, result_data['svg_content'], result)
+                
                 # Log successful completion
                 system_logger.info('vectorization', f'Vectorization completed successfully',
                                   user_email=self._get_user_email(user_id),
@@ -194,6 +244,19 @@ class VectorizationService:
             
             return False, {'error': error_msg}
     
+    def _is_cacheable(self, result) -> bool:
+        """Only full-quality results are cached: the key does not include the time budget.
+        
+        A run the scheduler degraded (preview trace, skipped or cheaper
+        stages) or that missed its deadline would otherwise be served to
+        later requests with generous budgets.
+        """
+        schedule = result.metadata.get('schedule') if getattr(result, 'metadata', None) else None
+        if schedule and (schedule.get('degraded') or not schedule.get('deadline_met', True)):
+            self.logger.info("Not caching a degraded vectorization result")
+            return False
+        return True
+    
     def extract_color_palettes(self, file_path: str) -> Tuple[bool, Dict[str, Any]]:
         """Extract color palettes from an image"""
         try:
@@ -384,17 +447,8 @@ class VectorizationService:
             os.makedirs('results', exist_ok=True)
             os.makedirs('output', exist_ok=True)
             
-            # Get SVG content
-            if hasattr(result, 'svg_builder') and result.svg_builder:
-                svg_content = result.svg_builder.get_svg_string()
-                result.svg_builder.save(svg_path)
-                result.svg_builder.save(output_path)
-            else:
-                svg_content = result.get_svg_string()
-                with open(svg_path, 'w') as f:
-                    f.write(svg_content)
-                with open(output_path, 'w') as f:
-                    f.write(svg_content)
+            # Save with precompressed siblings for delivery
+            svg_content = save_svg_result(result, svg_path, copies=[output_path])
             
             # Record in database
             self.db.record_upload(
@@ -498,7 +552,9 @@ class VectorizationService:
                 'throughput_per_hour': recent_metrics.get('throughput', 0),
                 'system_load': self._get_system_load(),
                 'memory_usage': self._get_memory_usage(),
-                'disk_usage': self._get_disk_usage()
+                'disk_usage': self._get_disk_usage(),
+                'result_cache': self._get_result_cache_stats(),
+                'engine': self.engine.get_stats()
             }
             
             return metrics
@@ -793,6 +849,16 @@ class VectorizationService:
         except:
             return {'total': 0, 'free': 0, 'used': 0, 'percent': 0}
     
+    def _get_result_cache_stats(self) -> Dict[str, Any]:
+        """Get result cache hit/miss/eviction counters"""
+        try:
+            if self.result_cache:
+                return self.result_cache.get_stats()
+        except Exception as e:
+            self.logger.error(f"Error getting result cache stats: {e}")
+        return {'hits': 0, 'misses': 0, 'evictions': 0, 'stores': 0,
+                'hit_rate': 0.0, 'entries': 0, 'size_bytes': 0}
+    
     def _get_directory_size(self, directory: str) -> int:
         """Get size of directory in bytes"""
         try:
@@ -839,7 +905,11 @@ class VectorizationService:
             'throughput_per_hour': 0,
             'system_load': 0.0,
             'memory_usage': {'total': 0, 'available': 0, 'percent': 0, 'used': 0},
-            'disk_usage': {'total': 0, 'free': 0, 'used': 0, 'percent': 0}
+            'disk_usage': {'total': 0, 'free': 0, 'used': 0, 'percent': 0},
+            'result_cache': {'hits': 0, 'misses': 0, 'evictions': 0, 'stores': 0,
+                             'hit_rate': 0.0, 'entries': 0, 'size_bytes': 0},
+            'engine': {'submitted': 0, 'completed': 0, 'failed': 0, 'timeouts': 0,
+                       'inline': 0, 'workers': 0, 'running': False}
         }
     
     def _get_default_quality_metrics(self) -> Dict[str, Any]:
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Geometry kernel micro-benchmark for VectorCraft
+Times the NumPy path kernels against the per-point Python implementations
+they replaced, on contour sets extracted from a real image
+"""
+
+import os
+import sys
+import math
+import time
+import argparse
+import statistics
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from vectorcraft.geometry import kernels
+
+
+# --- reference implementations (as they were in the strategies) -----------
+
+def legacy_perpendicular_distance(point, line_start, line_end):
+    x0, y0 = point
+    x1, y1 = line_start
+    x2, y2 = line_end
+    num = abs((y2 - y1) * x0 - (x2 - x1) * y0 + x2 * y1 - y2 * x1)
+    den = np.sqrt((y2 - y1)**2 + (x2 - x1)**2)
+    if den == 0:
+        return 0
+    return num / den
+
+
+def legacy_douglas_peucker(points, epsilon):
+    if len(points) <= 2:
+        return points
+    dmax = 0
+    index = 0
+    end = len(points) - 1
+    for i in range(1, end):
+        d = legacy_perpendicular_distance(points[i], points[0], points[end])
+        if d > dmax:
+            index = i
+            dmax = d
+    if dmax > epsilon:
+        rec_results1 = legacy_douglas_peucker(points[:index + 1], epsilon)
+        rec_results2 = legacy_douglas_peucker(points[index:], epsilon)
+        return rec_results1[:-1] + rec_results2
+    return [points[0], points[end]]
+
+
+def legacy_signed_angle_difference(v1, v2):
+    v1_norm = v1 / (np.linalg.norm(v1) + 1e-8)
+    v2_norm = v2 / (np.linalg.norm(v2) + 1e-8)
+    diff = math.atan2(v2_norm[1], v2_norm[0]) - math.atan2(v1_norm[1], v1_norm[0])
+    while diff > math.pi:
+        diff -= 2 * math.pi
+    while diff < -math.pi:
+        diff += 2 * math.pi
+    return diff
+
+
+def legacy_find_splice_points(points, corner_threshold=30):
+    if len(points) < 5:
+        return []
+    splice_points = []
+    for i in range(2, len(points) - 2):
+        v1 = np.array(points[i]) - np.array(points[i - 1])
+        v2 = np.array(points[i + 1]) - np.array(points[i])
+        if abs(legacy_signed_angle_difference(v1, v2)) > math.radians(corner_threshold):
+            splice_points.append(i)
+    return splice_points
+
+
+def legacy_smooth_path(points):
+    if len(points) < 3:
+        return points
+    smoothed = [points[0]]
+    for i in range(1, len(points) - 1):
+        smoothed.append(((points[i - 1][0] + 2 * points[i][0] + points[i + 1][0]) / 4,
+                         (points[i - 1][1] + 2 * points[i][1] + points[i + 1][1]) / 4))
+    smoothed.append(points[-1])
+    return smoothed
+
+
+def legacy_path_length(points):
+    total_length = 0
+    for i in range(len(points) - 1):
+        dx = points[i + 1][0] - points[i][0]
+        dy = points[i + 1][1] - points[i][1]
+        total_length += math.sqrt(dx * dx + dy * dy)
+    return total_length
+
+
+# --- benchmark -------------------------------------------------------------
+
+def load_contours(image_path, n_colors=8):
+    """Dense (CHAIN_APPROX_NONE) contours of each quantized colour region"""
+    rgb = np.array(Image.open(image_path).convert('RGB'))
+    pixels = rgb.reshape(-1, 3).astype(np.float32)
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1.0)
+    _, labels, _ = cv2.kmeans(pixels, n_colors, None, criteria, 3, cv2.KMEANS_PP_CENTERS)
+    labels = labels.reshape(rgb.shape[:2])
+
+    contours = []
+    for label in range(n_colors):
+        mask = (labels == label).astype(np.uint8) * 255
+        found, _ = cv2.findContours(mask, cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
+        contours.extend(c for c in found if len(c) >= 5)
+    return contours
+
+
+def time_call(func, inputs, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in inputs:
+            func(item)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vectorcraft.geometry kernels')
+    parser.add_argument('image', nargs='?',
+                        default=os.path.join(os.path.dirname(__file__), '..', '..', 'test_redcrest_logo.png'))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--epsilon', type=float, default=2.0)
+    args = parser.parse_args()
+
+    contours = load_contours(args.image)
+    as_tuples = [[(float(p[0][0]), float(p[0][1])) for p in c] for c in contours]
+    as_arrays = [kernels.as_points(c) for c in contours]
+    total_points = sum(len(c) for c in contours)
+    print(f"📐 {len(contours)} contours, {total_points} points from {os.path.basename(args.image)}")
+
+    # Outputs must agree before timings mean anything
+    for points, array in zip(as_tuples, as_arrays):
+        assert kernels.to_tuples(kernels.douglas_peucker(array, args.epsilon)) == \
+            legacy_douglas_peucker(points, args.epsilon)
+        assert kernels.find_splice_points(array, 30).tolist() == legacy_find_splice_points(points)
+
+    cases = [
+        ('douglas_peucker',
+         lambda p: legacy_douglas_peucker(p, args.epsilon), as_tuples,
+         lambda a: kernels.douglas_peucker(a, args.epsilon), as_arrays),
+        ('find_splice_points',
+         legacy_find_splice_points, as_tuples,
+         lambda a: kernels.find_splice_points(a, 30), as_arrays),
+        ('smooth_open', legacy_smooth_path, as_tuples, kernels.smooth_open, as_arrays),
+        ('arc_length', legacy_path_length, as_tuples, kernels.arc_length, as_arrays),
+    ]
+
+    print(f"{'kernel':<22}{'legacy ms':>12}{'numpy ms':>12}{'speedup':>10}")
+    for name, legacy, legacy_inputs, kernel, kernel_inputs in cases:
+        legacy_time = time_call(legacy, legacy_inputs, args.repeat)
+        kernel_time = time_call(kernel, kernel_inputs, args.repeat)
+        print(f"{name:<22}{legacy_time * 1000:>12.2f}{kernel_time * 1000:>12.2f}"
+              f"{legacy_time / max(kernel_time, 1e-9):>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
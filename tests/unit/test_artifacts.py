@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Unit tests for lazy preprocessing artifacts
+Tests that artifacts are computed on demand, once, and reported in the trace
+"""
+
+import numpy as np
+import pytest
+
+from vectorcraft.core.artifacts import PreprocessingArtifacts
+from vectorcraft.core.hybrid_vectorizer import HybridVectorizer
+from vectorcraft.core.request import VectorizationRequest
+from vectorcraft.core.scheduler import StageCostModel, StageScheduler
+from vectorcraft.utils.image_context import ImageContext
+from vectorcraft.utils.image_processor import ImageProcessor
+
+
+@pytest.fixture
+def context():
+    image = np.full((60, 80, 3), 255, dtype=np.uint8)
+    image[10:50, 20:60] = (200, 30, 30)
+    return ImageContext(image)
+
+
+class TestPreprocessingArtifacts:
+    """Test lazy evaluation and memoization"""
+
+    def test_nothing_computed_up_front(self, context):
+        """Test that building the artifacts computes nothing"""
+        artifacts = PreprocessingArtifacts.standard(context, ImageProcessor())
+
+        assert artifacts.summary() == {'computed': [], 'unused': ['metadata', 'edge_map', 'quantized_image']}
+
+    def test_computed_once_on_request(self, context):
+        """Test that an artifact is computed on first access and then reused"""
+        calls = []
+        artifacts = PreprocessingArtifacts(context)
+        artifacts.register('double', lambda: calls.append(1) or context.uint8 * 2)
+
+        first = artifacts['double']
+        second = artifacts.get('double')
+
+        assert first is second
+        assert len(calls) == 1
+        assert artifacts.summary() == {'computed': ['double'], 'unused': []}
+
+    def test_register_replaces_factory(self, context):
+        """Test that a vectorizer can swap in its own way of computing an artifact"""
+        artifacts = PreprocessingArtifacts.standard(context, ImageProcessor())
+        artifacts.register('quantized_image', lambda: 'fast')
+
+        assert artifacts.quantized_image == 'fast'
+
+    def test_degraded_when_over_budget(self, context):
+        """Test that an artifact with a cheaper variant degrades under a tight budget"""
+        scheduler = StageScheduler(0.0, 10_000_000, StageCostModel({'quantize': (0.0, 100.0)}))
+        artifacts = PreprocessingArtifacts.standard(context, ImageProcessor(), scheduler)
+
+        quantized = artifacts.quantized_image
+
+        assert quantized.shape == context.float32.shape
+        assert scheduler.trace[-1].status == 'degraded'
+
+
+class TestVectorizerArtifacts:
+    """Test that strategies only pay for what they read"""
+
+    def test_vtracer_path_skips_edges_and_quantization(self, context):
+        """Test that real VTracer computes neither the edge map nor the quantized image"""
+        vectorizer = HybridVectorizer()
+        if not vectorizer.real_vtracer.available:
+            pytest.skip("VTracer not installed")
+
+        result = vectorizer.vectorize(context.uint8, request=VectorizationRequest(strategy='vtracer_high_fidelity'))
+
+        assert result.metadata['artifacts']['computed'] == ['metadata']
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batch vectorization planning
+Tests deduplication by pixel hash, the per-user concurrency cap and progress counting
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from services import batch_service
+from services.batch_service import BatchProgressCounter, UserConcurrencyLimiter, plan_batch
+
+
+@pytest.fixture
+def images(tmp_path):
+    pixels = np.zeros((20, 30, 3), dtype=np.uint8)
+    pixels[5:15, 5:25] = (200, 40, 40)
+    other = pixels.copy()
+    other[0, 0] = (1, 2, 3)
+
+    paths = {
+        'logo.png': tmp_path / 'logo.png',
+        'logo_copy.bmp': tmp_path / 'logo_copy.bmp',
+        'other.png': tmp_path / 'other.png',
+    }
+    Image.fromarray(pixels).save(paths['logo.png'])
+    Image.fromarray(pixels).save(paths['logo_copy.bmp'])  # Same pixels, different encoding
+    Image.fromarray(other).save(paths['other.png'])
+    return {name: str(path) for name, path in paths.items()}
+
+
+class TestPlanBatch:
+    """Test batch deduplication"""
+
+    def test_identical_pixels_vectorized_once(self, images):
+        """Test that re-encoded copies collapse into one item"""
+        names = ['logo.png', 'other.png', 'logo_copy.bmp']
+        items = plan_batch([images[n] for n in names], names)
+
+        assert [item.filename for item in items] == ['logo.png', 'other.png']
+        assert items[0].duplicates == [(images['logo_copy.bmp'], 'logo_copy.bmp')]
+        assert items[1].duplicates == []
+
+    def test_unreadable_file_kept(self, images, tmp_path):
+        """Test that a file that cannot be hashed stays in the batch to report its error"""
+        broken = tmp_path / 'broken.png'
+        broken.write_bytes(b'not an image')
+
+        items = plan_batch([images['logo.png'], str(broken)], ['logo.png', 'broken.png'])
+
+        assert [item.filename for item in items] == ['logo.png', 'broken.png']
+        assert items[1].image_hash is None
+
+    def test_length_mismatch(self, images):
+        """Test that paths and names must line up"""
+        with pytest.raises(ValueError):
+            plan_batch([images['logo.png']], [])
+
+
+class TestUserConcurrencyLimiter:
+    """Test the per-user batch slot cap"""
+
+    def test_cap_per_user(self):
+        """Test that a user is refused past the cap while others are not affected"""
+        limiter = UserConcurrencyLimiter(max_concurrent=2)
+
+        assert limiter.acquire(1, 'a') and limiter.acquire(1, 'b')
+        assert not limiter.acquire(1, 'c')
+        assert limiter.acquire(2, 'd')
+        assert limiter.running(1) == 2
+
+    def test_release_frees_slot(self):
+        """Test that a released slot can be taken again"""
+        limiter = UserConcurrencyLimiter(max_concurrent=1)
+        limiter.acquire(1, 'a')
+        limiter.release(1, 'a')
+
+        assert limiter.acquire(1, 'b')
+
+    def test_held_slot_can_be_reacquired(self):
+        """Test that a redelivered task gets its own slot back at the cap"""
+        limiter = UserConcurrencyLimiter(max_concurrent=1)
+        limiter.acquire(1, 'a')
+
+        assert limiter.acquire(1, 'a')
+        assert limiter.running(1) == 1
+
+    def test_stale_slots_are_reaped(self, monkeypatch):
+        """Test that a slot leaked by a dead worker stops counting after the TTL"""
+        now = [1000.0]
+        monkeypatch.setattr(batch_service.time, 'time', lambda: now[0])
+        limiter = UserConcurrencyLimiter(max_concurrent=1, slot_ttl=60)
+        limiter.acquire(1, 'leaked')
+
+        # Failed attempts do not extend the leaked slot's life
+        now[0] += 30
+        assert not limiter.acquire(1, 'waiting')
+        now[0] += 31
+        assert limiter.running(1) == 0
+        assert limiter.acquire(1, 'waiting')
+
+
+class TestBatchProgressCounter:
+    """Test progress counting across a batch"""
+
+    def test_counts_and_clears(self):
+        """Test that finished files are counted per batch"""
+        counter = BatchProgressCounter()
+
+        assert [counter.increment('a'), counter.increment('a'), counter.increment('b')] == [1, 2, 1]
+        counter.clear('a')
+        assert counter.increment('a') == 1
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the vectorization benchmark
+Tests the corpus, per-case measurements and the baseline comparison
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from vectorcraft.__main__ import main
+from vectorcraft.bench.corpus import CorpusImage, load_corpus
+from vectorcraft.bench.runner import compare, measure_case, run_case
+
+
+def _case(**overrides):
+    case = {
+        'status': 'ok', 'total_seconds': 1.0, 'stages': {'vtracer': 0.5},
+        'rss_growth_mb': 50.0, 'svg_bytes': 10000, 'num_elements': 20, 'similarity': 0.9
+    }
+    case.update(overrides)
+    return case
+
+
+class TestCorpus:
+    """Test the checked-in corpus"""
+
+    def test_manifest_loads(self):
+        """Test that every manifest entry resolves to a file or a known generator"""
+        images = load_corpus()
+
+        assert {'logo', 'text', 'gradient', 'photo', 'scan'} <= {image.kind for image in images}
+        assert any('huge' in image.tags for image in images)
+
+    def test_synthetic_images_are_deterministic(self):
+        """Test that a seeded generator reproduces the same pixels"""
+        image = CorpusImage('t', 'text', synthetic={'generator': 'text', 'width': 200, 'height': 80, 'seed': 7})
+
+        first, second = image.load(), image.load()
+
+        assert first.shape == (80, 200, 4)
+        assert np.array_equal(first, second)
+
+
+class TestMeasurement:
+    """Test the per-case metrics"""
+
+    @pytest.fixture
+    def pixels(self):
+        return CorpusImage('logo', 'logo', synthetic={'generator': 'logo', 'width': 96, 'height': 96, 'seed': 1}).load()
+
+    def test_metrics_recorded(self, pixels):
+        """Test that a case records time, stages, memory, size and similarity"""
+        case = measure_case(pixels, 'classical_refined', 30.0)
+
+        assert case['status'] == 'ok'
+        assert case['total_seconds'] > 0
+        assert 'quantize' in case['stages']
+        assert case['svg_bytes'] > 0 and case['num_elements'] > 0
+        assert 0.0 <= case['similarity'] <= 1.0
+
+    def test_failure_recorded_not_raised(self, pixels):
+        """Test that a failing strategy becomes an error case"""
+        case = run_case(pixels[..., :1], 'classical_refined', 30.0, 60.0, isolate=False)
+
+        assert case['status'] == 'error'
+
+
+class TestCompare:
+    """Test regression detection against a baseline"""
+
+    def test_within_thresholds(self):
+        """Test that small changes and timing noise are not regressions"""
+        baseline = {'cases': {'a/auto': _case()}}
+        results = {'cases': {'a/auto': _case(total_seconds=1.1, svg_bytes=11000, similarity=0.89)}}
+
+        assert compare(results, baseline) == []
+
+    def test_regressions_reported(self):
+        """Test that slower stages, larger output and lower similarity are flagged"""
+        baseline = {'cases': {'a/auto': _case()}}
+        results = {'cases': {'a/auto': _case(total_seconds=2.0, stages={'vtracer': 1.5}, svg_bytes=20000,
+                                             similarity=0.8)}}
+
+        metrics = {regression.metric for regression in compare(results, baseline)}
+
+        assert metrics == {'total_seconds', 'stage:vtracer', 'svg_bytes', 'similarity'}
+
+    def test_thresholds_configurable(self):
+        """Test that a looser threshold accepts the same change"""
+        baseline = {'cases': {'a/auto': _case()}}
+        results = {'cases': {'a/auto': _case(total_seconds=2.0)}}
+
+        assert compare(results, baseline, {'total_seconds': 1.5}) == []
+
+    def test_new_failure_and_new_case(self):
+        """Test that a case that starts failing is flagged and a new case is not"""
+        baseline = {'cases': {'a/auto': _case()}}
+        results = {'cases': {'a/auto': _case(status='error'), 'b/auto': _case()}}
+
+        assert [(r.case, r.metric) for r in compare(results, baseline)] == [('a/auto', 'status')]
+
+
+class TestCommandLine:
+    """Test ``python -m vectorcraft bench``"""
+
+    def test_exit_code_on_regression(self, tmp_path):
+        """Test that a run is diffed against the baseline and fails on regression"""
+        manifest = tmp_path / 'manifest.json'
+        manifest.write_text(json.dumps({'images': [
+            {'name': 'tiny', 'kind': 'logo', 'synthetic': {'generator': 'logo', 'width': 64, 'height': 64, 'seed': 1}}
+        ]}))
+        baseline = tmp_path / 'baseline.json'
+        output = tmp_path / 'results.json'
+        argv = ['bench', '--corpus', str(manifest), '--strategies', 'classical_refined', '--no-isolate',
+                '--output', str(output), '--baseline', str(baseline)]
+
+        assert main(argv + ['--update-baseline']) == 0
+        stored = json.loads(baseline.read_text())
+        stored['cases']['tiny/classical_refined']['similarity'] = 1.0
+        baseline.write_text(json.dumps(stored))
+
+        assert main(argv) == 1
+        assert 'tiny/classical_refined' in json.loads(output.read_text())['cases']
+
+    def test_manifest_restricts_strategies(self, tmp_path):
+        """Test that an image listing its strategies skips the others"""
+        manifest = tmp_path / 'manifest.json'
+        manifest.write_text(json.dumps({'images': [
+            {'name': 'tiny', 'kind': 'logo', 'strategies': ['classical_refined'],
+             'synthetic': {'generator': 'logo', 'width': 64, 'height': 64, 'seed': 1}}
+        ]}))
+        output = tmp_path / 'results.json'
+
+        main(['bench', '--corpus', str(manifest), '--strategies', 'classical_refined,hybrid_fast', '--no-isolate',
+              '--output', str(output), '--baseline', str(tmp_path / 'missing.json')])
+
+        assert list(json.loads(output.read_text())['cases']) == ['tiny/classical_refined']
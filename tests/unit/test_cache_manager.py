@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the vectorcraft CacheManager
+Tests byte-budgeted LRU eviction, content hashing and the image load cache
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from vectorcraft.utils.image_context import ImageContext
+from vectorcraft.utils.image_processor import ImageProcessor
+from vectorcraft.utils.performance import CacheManager, content_hash
+
+
+def block(fill, nbytes=1000):
+    return np.full(nbytes, fill, dtype=np.uint8)
+
+
+class TestEviction:
+    """Test LRU eviction against the entry and byte budgets"""
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry goes first"""
+        cache = CacheManager(max_bytes=3000)
+        for key in 'abc':
+            cache.put(key, block(1))
+        cache.get('a')
+
+        cache.put('d', block(2))
+
+        assert 'b' not in cache
+        assert all(key in cache for key in 'acd')
+        assert cache.get_stats()['bytes'] == 3000
+
+    def test_entry_limit(self):
+        """Test that max_size still caps the number of entries"""
+        cache = CacheManager(max_size=2, max_bytes=10 ** 6)
+        for key in 'abc':
+            cache.put(key, block(0, 10))
+
+        assert len(cache) == 2
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_oversized_value_is_not_cached(self):
+        """Test that a value larger than the budget leaves the cache intact"""
+        cache = CacheManager(max_bytes=1500)
+        cache.put('small', block(0))
+
+        cache.put('huge', block(0, 2000))
+
+        assert 'huge' not in cache
+        assert 'small' in cache
+
+    def test_replacing_a_key_updates_accounting(self):
+        """Test that overwriting an entry does not double-count its bytes"""
+        cache = CacheManager(max_bytes=10 ** 6)
+        cache.put('a', block(0, 500))
+        cache.put('a', block(0, 200))
+
+        stats = cache.get_stats()
+        assert (stats['entries'], stats['bytes']) == (1, 200)
+
+    def test_hit_and_miss_counters(self):
+        """Test the hit rate in the stats"""
+        cache = CacheManager()
+        cache.put('a', block(0))
+        cache.get('a')
+        cache.get('missing')
+
+        assert cache.get_stats()['hit_rate'] == pytest.approx(0.5)
+
+
+class TestCacheKeys:
+    """Test content-hashed cache keys"""
+
+    def test_equal_sums_do_not_collide(self):
+        """Test that permuted pixels get different keys"""
+        image = np.arange(16, dtype=np.uint8).reshape(4, 4)
+        cache = CacheManager()
+
+        assert cache.get_cache_key(image, 'edges') != cache.get_cache_key(image[::-1].copy(), 'edges')
+
+    def test_dtype_and_shape_are_part_of_the_hash(self):
+        """Test that the same bytes in a different layout hash differently"""
+        data = np.zeros(16, dtype=np.uint8)
+
+        assert content_hash(data) != content_hash(data.reshape(4, 4))
+        assert content_hash(data) != content_hash(data.view(np.int8))
+
+    def test_context_key_matches_and_is_memoized(self):
+        """Test that a context hashes its pixels once"""
+        pixels = np.random.default_rng(0).integers(0, 255, (8, 8, 4), dtype=np.uint8)
+        context = ImageContext(pixels)
+        cache = CacheManager()
+
+        key = cache.get_cache_key(context, 'edges', {'low': 50})
+
+        assert key == cache.get_cache_key(pixels, 'edges', {'low': 50})
+        assert context.memoize('content_hash', lambda: pytest.fail('hashed twice'))
+
+
+class TestImageLoadCache:
+    """Test the ImageProcessor load cache"""
+
+    def test_reload_hits_cache_until_file_changes(self, tmp_path):
+        """Test that a rewritten file is decoded again"""
+        path = tmp_path / 'image.png'
+        Image.new('RGB', (4, 4), 'red').save(path)
+        processor = ImageProcessor(cache=CacheManager())
+
+        first = processor.load_image(str(path))
+        assert processor.load_image(str(path)) is first
+
+        Image.new('RGB', (5, 4), 'blue').save(path)
+
+        assert processor.load_image(str(path)).shape == (4, 5, 4)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the thumbnail content classifier
+Tests agreement with full-resolution analysis on the labelled evaluation set and its use in the pipeline
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+from vectorcraft.bench.corpus import GENERATORS, load_corpus
+from vectorcraft.core.optimized_vectorizer import OptimizedVectorizer
+from vectorcraft.core.request import VectorizationRequest
+from vectorcraft.strategies.real_vtracer import RealVTracerStrategy
+from vectorcraft.utils.content_classifier import IMAGE_TYPES, ContentClassifier
+from vectorcraft.utils.image_context import ImageContext
+
+EVAL_SET = os.path.join(os.path.dirname(__file__), '..', 'performance', 'corpus', 'classifier_eval.json')
+
+
+def synthetic(kind, width=640, height=480, seed=0):
+    rgb = GENERATORS[kind](width, height, np.random.default_rng(seed))
+    return np.dstack([rgb, np.full(rgb.shape[:2], 255, dtype=np.uint8)])
+
+
+@pytest.fixture(scope='module')
+def evaluation():
+    with open(EVAL_SET) as f:
+        labels = json.load(f)['labels']
+    classifier = ContentClassifier()
+    return [(labels[image.name], classifier.classify(image.load())) for image in load_corpus(EVAL_SET)]
+
+
+class TestAgreement:
+    """Test the thumbnail classifier against labels from the full-resolution analysis"""
+
+    def test_content_type(self, evaluation):
+        """Test that the content type matches analyze_content on most images"""
+        agreement = np.mean([label['content_type'] == c.content_type for label, c in evaluation])
+
+        assert agreement >= 0.85
+
+    def test_geometric_flag(self, evaluation):
+        """Test the geometric_probability > 0.6 decision optimize_strategy_selection makes"""
+        agreement = np.mean([label['geometric'] == (c.geometric_probability > 0.6) for label, c in evaluation])
+
+        assert agreement >= 0.8
+
+    def test_image_type(self, evaluation):
+        """Test the VTracer preset against the hand labels"""
+        agreement = np.mean([label['image_type'] == c.image_type for label, c in evaluation])
+
+        assert agreement >= 0.9
+        assert all(c.image_type in IMAGE_TYPES for _, c in evaluation)
+
+
+class TestClassifier:
+    """Test caching, cost and features"""
+
+    def test_cached_by_content(self):
+        """Test that equal pixels hit the cache and different pixels do not"""
+        classifier = ContentClassifier()
+        image = synthetic('logo')
+
+        first = classifier.classify(image)
+
+        assert classifier.classify(ImageContext(image.copy())) is first
+        assert classifier.classify(synthetic('logo', seed=1)) is not first
+
+    def test_cost_independent_of_size(self):
+        """Test that a large image costs about as much as the thumbnail itself"""
+        classifier = ContentClassifier()
+        image = synthetic('scan', 2400, 1700, seed=3)
+
+        start = time.perf_counter()
+        classifier.features(image)
+
+        assert time.perf_counter() - start < 0.5
+
+    def test_feature_vector(self):
+        """Test the compact feature vector on flat and continuous-tone images"""
+        classifier = ContentClassifier()
+        flat = classifier.features(np.full((300, 300, 3), 200, dtype=np.uint8))
+        photo = classifier.features(synthetic('photo'))
+
+        assert flat.to_vector().shape == photo.to_vector().shape == (7,)
+        assert flat.color_count == 1 and flat.edge_density == 0.0 and flat.gradient_entropy == 0.0
+        assert photo.color_count > 1024 and photo.gradient_entropy > 0.5
+
+    def test_metadata(self):
+        """Test that the metadata estimate keeps the image's full size"""
+        classification = ContentClassifier().classify(synthetic('text', 1600, 900))
+
+        assert (classification.metadata.width, classification.metadata.height) == (1600, 900)
+        assert classification.to_dict()['content_type'] == classification.content_type
+
+
+@pytest.mark.skipif(not RealVTracerStrategy().available, reason="VTracer not installed")
+class TestPipeline:
+    """Test the classifier's use in strategy selection"""
+
+    def test_classification_replaces_full_analysis(self):
+        """Test that VTracer requests no longer run full-resolution content analysis"""
+        vectorizer = OptimizedVectorizer()
+        request = VectorizationRequest(strategy='vtracer_high_fidelity')
+
+        result = vectorizer.vectorize(synthetic('logo', 320, 240), target_time=30.0, request=request)
+
+        assert 'metadata' in result.metadata['artifacts']['unused']
+        assert result.metadata['classification']['image_type'] == 'logo'
+        assert result.metadata['image_metadata'].width == 320
+        assert any(stage['stage'] == 'classify' for stage in result.metadata['schedule']['stages'])
+
+    def test_image_type_selects_tuned_preset(self, tmp_path, monkeypatch):
+        """Test that VTracer is traced with the tuned preset of the classified image type"""
+        presets = tmp_path / 'presets.json'
+        presets.write_text(json.dumps({'presets': {'logo': {'filter_speckle': 16}, 'photo': {'filter_speckle': 2}}}))
+        monkeypatch.setenv('VECTORCRAFT_VTRACER_PRESETS', str(presets))
+        vectorizer = OptimizedVectorizer()
+        adaptive = vectorizer.real_vtracer._get_adaptive_parameters
+        chosen = []
+        monkeypatch.setattr(vectorizer.real_vtracer, '_get_adaptive_parameters',
+                            lambda *args: chosen.append(adaptive(*args)) or chosen[-1])
+
+        vectorizer.vectorize(synthetic('logo', 320, 240), target_time=30.0,
+                             request=VectorizationRequest(strategy='vtracer_high_fidelity'))
+
+        assert chosen[-1]['filter_speckle'] == 16
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the process-pool vectorization engine
+Tests inline and pooled execution and per-job timeouts
+"""
+
+import time
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from vectorcraft.core import engine as engine_module
+from vectorcraft.core.engine import VectorizationEngine, VectorizationTimeout
+from vectorcraft.core.request import VectorizationRequest
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    image = np.full((48, 64, 4), 255, dtype=np.uint8)
+    image[8:40, 8:56, :3] = (30, 90, 200)
+    path = tmp_path / 'shape.png'
+    Image.fromarray(image).save(path)
+    return str(path)
+
+
+class TestInlineEngine:
+    """Test execution in the calling process"""
+
+    def test_zero_workers_runs_inline(self, image_path):
+        """Test that max_workers=0 vectorizes without a pool"""
+        engine = VectorizationEngine(max_workers=0)
+
+        result = engine.vectorize(image_path, request=VectorizationRequest(strategy='vtracer_high_fidelity'))
+
+        assert result.processing_time >= 0
+        assert engine.inline
+        assert engine.get_stats()['inline'] == 1
+        assert engine.get_stats()['running'] is False
+
+
+class TestPooledEngine:
+    """Test execution in warm worker processes"""
+
+    @pytest.fixture
+    def engine(self):
+        engine = VectorizationEngine(max_workers=1)
+        yield engine
+        engine.shutdown()
+
+    def test_submit_and_await(self, engine, image_path):
+        """Test that several queued jobs all complete"""
+        request = VectorizationRequest(strategy='vtracer_high_fidelity')
+
+        jobs = [engine.submit(image_path, request=request) for _ in range(2)]
+        results = [job.result() for job in jobs]
+
+        assert all(result.svg_builder is not None for result in results)
+        assert len({job.job_id for job in jobs}) == 2
+
+    def test_timeout_is_reported(self, engine, image_path):
+        """Test that a job past its deadline raises VectorizationTimeout"""
+        engine.start()
+
+        with pytest.raises(VectorizationTimeout):
+            engine.vectorize(image_path, timeout=0.001)
+
+
+class _StallingVectorizer:
+    """Stands in for a native call that ignores the worker alarm when target_time is 99"""
+
+    def vectorize(self, image, target_time=None, request=None):
+        if target_time == 99:
+            time.sleep(60)
+        return SimpleNamespace(metadata={}, svg_builder='<svg/>')
+
+
+_worker_main = engine_module._worker_main
+
+
+def _stalling_worker_main(conn):
+    """Worker entry point with the fakes installed; workers start fresh, so they patch themselves"""
+    engine_module._warm_worker = lambda: None
+    engine_module._job_vectorizer = lambda optimized: _StallingVectorizer()
+    engine_module._job_alarm = lambda timeout: nullcontext()
+    _worker_main(conn)
+
+
+class TestStuckJobs:
+    """Test that jobs the worker alarm cannot interrupt free their worker"""
+
+    @pytest.fixture
+    def engine(self, monkeypatch):
+        monkeypatch.setattr(engine_module, '_worker_main', _stalling_worker_main)
+        engine = VectorizationEngine(max_workers=1, kill_grace=0.1)
+        yield engine
+        engine.shutdown()
+
+    def test_stuck_worker_is_replaced(self, engine, image_path):
+        """Test that a job past timeout + grace is failed and its worker restarted"""
+        engine.start()
+        pid = engine._workers[0].pid
+
+        with pytest.raises(VectorizationTimeout):
+            engine.vectorize(image_path, target_time=99, timeout=0.2)
+
+        # The replacement worker serves the next job
+        result = engine.vectorize(image_path, timeout=10)
+        assert result.svg_builder == '<svg/>'
+        assert engine._workers[0].pid != pid
+        assert engine.get_stats()['restarts'] == 1
+        assert engine.get_stats()['timeouts'] == 1
+
+
+class TestSharedMemory:
+    """Test that pixel segments are released"""
+
+    def test_segment_unlinked_when_submit_fails(self, image_path, monkeypatch):
+        """Test that a job that never reaches a worker does not leak its segment"""
+        engine = VectorizationEngine(max_workers=1)
+        created = []
+        shared_memory = engine_module.shared_memory.SharedMemory
+
+        def tracking(*args, **kwargs):
+            created.append(shared_memory(*args, **kwargs))
+            return created[-1]
+
+        def refuse(args, timeout):
+            raise RuntimeError("queue closed")
+
+        monkeypatch.setattr(engine_module.shared_memory, 'SharedMemory', tracking)
+        monkeypatch.setattr(engine, '_submit', refuse)
+
+        with pytest.raises(RuntimeError):
+            engine.submit(image_path)
+
+        with pytest.raises(FileNotFoundError):
+            shared_memory(name=created[0].name)
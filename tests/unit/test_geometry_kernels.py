@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared NumPy geometry kernels
+Tests equivalence with the per-point implementations they replaced
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from vectorcraft.geometry import kernels
+from vectorcraft.strategies.classical_tracer import ClassicalTracer
+
+
+def reference_douglas_peucker(points, epsilon):
+    """The recursive list-of-tuples version the strategies used to carry"""
+    if len(points) <= 2:
+        return points
+    (x1, y1), (x2, y2) = points[0], points[-1]
+    den = math.hypot(x2 - x1, y2 - y1)
+    dmax, index = 0, 0
+    for i in range(1, len(points) - 1):
+        x0, y0 = points[i]
+        d = abs((y2 - y1) * x0 - (x2 - x1) * y0 + x2 * y1 - y2 * x1) / den if den else 0
+        if d > dmax:
+            index, dmax = i, d
+    if dmax > epsilon:
+        return reference_douglas_peucker(points[:index + 1], epsilon)[:-1] + \
+            reference_douglas_peucker(points[index:], epsilon)
+    return [points[0], points[-1]]
+
+
+@pytest.fixture
+def wobbly_path():
+    rng = np.random.default_rng(7)
+    t = np.linspace(0, 4 * np.pi, 300)
+    xy = np.stack([t * 10, np.sin(t) * 20 + rng.normal(0, 0.8, t.size)], axis=1)
+    return [(float(x), float(y)) for x, y in np.round(xy, 1)]
+
+
+class TestDouglasPeucker:
+    """Test array-based path simplification"""
+
+    @pytest.mark.parametrize('epsilon', [0.5, 2.0, 8.0])
+    def test_matches_recursive_reference(self, wobbly_path, epsilon):
+        """Test that the iterative kernel keeps exactly the same points"""
+        simplified = kernels.to_tuples(kernels.douglas_peucker(wobbly_path, epsilon))
+        expected = reference_douglas_peucker(kernels.to_tuples(kernels.as_points(wobbly_path)), epsilon)
+
+        assert simplified == expected
+
+    def test_degenerate_baseline_collapses(self):
+        """Test that a path whose ends coincide keeps only its endpoints"""
+        loop = [(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)]
+
+        assert kernels.douglas_peucker(loop, 1.0).tolist() == [[0, 0], [0, 0]]
+
+    def test_returns_float64_array(self, wobbly_path):
+        """Test the N x 2 float64 contract"""
+        result = kernels.douglas_peucker(wobbly_path, 2.0)
+
+        assert result.dtype == np.float64
+        assert result.shape[1] == 2
+
+
+class TestSpliceAndLength:
+    """Test corner detection and arc length"""
+
+    def test_square_corners_are_splice_points(self):
+        """Test that right-angle turns are detected and straight runs are not"""
+        square = [(x, 0) for x in range(5)] + [(4, y) for y in range(1, 5)] + [(x, 4) for x in range(3, -1, -1)]
+
+        assert kernels.find_splice_points(square, 30).tolist() == [4, 8]
+
+    def test_segments_share_splice_points(self):
+        """Test that segments overlap on their splice point"""
+        points = kernels.as_points([(i, 0) for i in range(10)])
+
+        segments = kernels.split_at(points, [3, 6])
+
+        assert [len(s) for s in segments] == [4, 4, 4]
+        assert segments[0][-1].tolist() == segments[1][0].tolist()
+
+    def test_arc_length(self):
+        """Test open and closed polyline lengths"""
+        square = [(0, 0), (3, 0), (3, 4)]
+
+        assert kernels.arc_length(kernels.as_points(square)) == pytest.approx(7.0)
+        assert kernels.arc_length(kernels.as_points(square), closed=True) == pytest.approx(12.0)
+
+
+class TestSmoothing:
+    """Test smoothing and curve kernels"""
+
+    def test_classical_smoothing_weights(self):
+        """Test the [1, 2, 1] / 4 smoothing used by ClassicalTracer"""
+        smoothed = ClassicalTracer().smooth_path([(0, 0), (4, 4), (8, 0)])
+
+        assert smoothed == [(0.0, 0.0), (4.0, 2.0), (8.0, 0.0)]
+
+    def test_closed_smoothing_preserves_centroid(self):
+        """Test that wrap-around averaging does not drift the shape"""
+        square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+
+        smoothed = kernels.smooth_closed(square, self_weight=0.4, neighbour_weight=0.3, passes=5)
+
+        np.testing.assert_allclose(smoothed.mean(axis=0), [5, 5], atol=1e-5)
+
+    def test_smoothed_coordinates_have_no_float32_artifacts(self):
+        """Test that smoothing and interpolation hand back the floats the per-point code produced"""
+        points = [(12.3, 0.1), (12.3, 4.7), (12.3, 0.1), (24.6, 4.7)]
+
+        assert kernels.to_tuples(kernels.smooth_open(points))[1] == (12.3, (0.1 + 2 * 4.7 + 0.1) / 4)
+        assert kernels.to_tuples(kernels.catmull_rom(points))[:2] == [(12.3, 0.1), (12.3, 0.1)]
+        assert kernels.to_tuples(kernels.smooth_closed(points, 1.0, 0.0, passes=1)) == points
+
+    def test_catmull_rom_passes_through_points(self):
+        """Test that the spline interpolates every input point"""
+        points = [(0, 0), (10, 5), (20, 0), (30, 5)]
+
+        curve = kernels.catmull_rom(points)
+
+        assert len(curve) == 2 + 2 * (len(points) - 1)
+        for point in points:
+            assert np.any(np.all(np.isclose(curve, point), axis=1))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared per-request ImageContext
+Tests lazy conversion, memoization, and stage interoperability
+"""
+
+import numpy as np
+import cv2
+import pytest
+
+from vectorcraft.utils.image_context import ImageContext
+from vectorcraft.utils.image_processor import ImageProcessor
+
+
+@pytest.fixture
+def rgba_uint8():
+    image = np.zeros((40, 60, 4), dtype=np.uint8)
+    image[..., 3] = 255
+    image[10:30, 15:45, :3] = (220, 40, 40)
+    return image
+
+
+class TestImageContext:
+    """Test lazy, memoized derived arrays"""
+
+    def test_float_view_is_lazy_and_memoized(self, rgba_uint8):
+        """Test that the float view is computed once on demand"""
+        context = ImageContext(rgba_uint8)
+
+        assert context._float is None
+        first = context.float32
+        assert first.dtype == np.float32
+        assert first is context.float32
+        np.testing.assert_allclose(first * 255, rgba_uint8, atol=1e-3)
+
+    def test_rgb_uint8_is_a_view(self, rgba_uint8):
+        """Test that dropping alpha does not copy pixels"""
+        context = ImageContext(rgba_uint8)
+
+        assert np.shares_memory(context.rgb_uint8, rgba_uint8)
+
+    def test_gray_and_canny_match_opencv(self, rgba_uint8):
+        """Test derived arrays against direct OpenCV calls"""
+        context = ImageContext(rgba_uint8)
+        expected_gray = cv2.cvtColor(rgba_uint8[:, :, :3].copy(), cv2.COLOR_RGB2GRAY)
+
+        np.testing.assert_array_equal(context.gray, expected_gray)
+        np.testing.assert_array_equal(context.canny, cv2.Canny(expected_gray, 50, 150))
+        assert context.canny is context.canny
+
+    def test_ensure_passes_contexts_through(self, rgba_uint8):
+        """Test that ensure wraps arrays but returns contexts unchanged"""
+        context = ImageContext(rgba_uint8)
+
+        assert ImageContext.ensure(context) is context
+        assert isinstance(ImageContext.ensure(rgba_uint8), ImageContext)
+
+    def test_memoize_calls_factory_once(self, rgba_uint8):
+        """Test generic artifact memoization"""
+        context = ImageContext(rgba_uint8)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return 42
+
+        assert context.memoize('answer', factory) == 42
+        assert context.memoize('answer', factory) == 42
+        assert len(calls) == 1
+
+
+class TestStagesShareContext:
+    """Test that processing stages reuse context artifacts"""
+
+    def test_enhanced_edges_are_shared(self, rgba_uint8):
+        """Test that repeated edge-map requests reuse the first result"""
+        processor = ImageProcessor()
+        context = ImageContext(rgba_uint8)
+
+        first = processor.create_edge_map(context)
+        second = processor.enhanced_edge_detection(context)
+
+        assert first is second
+
+    def test_array_and_context_inputs_agree(self, rgba_uint8):
+        """Test that stages give the same answer for arrays and contexts"""
+        processor = ImageProcessor()
+        context = ImageContext(rgba_uint8)
+
+        from_context = processor.analyze_content(context)
+        from_array = processor.analyze_content(rgba_uint8.astype(np.float32) / 255.0)
+
+        assert from_context.edge_density == pytest.approx(from_array.edge_density, abs=1e-3)
+        assert from_context.has_transparency == from_array.has_transparency
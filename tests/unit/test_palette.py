@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Unit tests for histogram palette extraction
+Tests median-cut palettes, dominant colors, LUT palette mapping and the V3 palette API
+"""
+
+import numpy as np
+import pytest
+
+from vectorcraft.strategies.experimental_vtracer_v3 import ExperimentalVTracerV3Strategy
+from vectorcraft.utils import palette
+
+
+@pytest.fixture
+def flat_image():
+    """Four flat color blocks covering 40%, 30%, 20% and 10% of the image"""
+    image = np.zeros((10, 100, 3), dtype=np.uint8)
+    image[:, :40] = (250, 250, 250)
+    image[:, 40:70] = (200, 30, 20)
+    image[:, 70:90] = (20, 40, 200)
+    image[:, 90:] = (10, 10, 10)
+    return image
+
+
+class TestHistogram:
+    """Test the quantized color histogram"""
+
+    def test_bins_keep_exact_mean_colors(self, flat_image):
+        """Test that bins report their pixels' mean color rather than the bin center"""
+        histogram = palette.build_histogram(palette.as_rgb_pixels(flat_image))
+
+        assert len(histogram.counts) == 4
+        assert sorted(histogram.counts.tolist()) == [100, 200, 300, 400]
+        assert palette.dominant_colors(histogram, 2) == [(250, 250, 250), (200, 30, 20)]
+
+    def test_grayscale_and_float_inputs(self):
+        """Test that grayscale and [0, 1] float images are normalized to RGB uint8"""
+        gray = np.full((4, 4), 128, dtype=np.uint8)
+        as_float = np.full((4, 4, 3), 0.5, dtype=np.float32)
+
+        assert palette.as_rgb_pixels(gray)[0].tolist() == [128, 128, 128]
+        assert palette.as_rgb_pixels(as_float)[0].tolist() == [128, 128, 128]
+
+
+class TestMedianCut:
+    """Test hierarchical palettes"""
+
+    def test_exact_colors_recovered(self, flat_image):
+        """Test that k equal to the number of flat colors recovers them in frequency order"""
+        histogram = palette.build_histogram(palette.as_rgb_pixels(flat_image))
+
+        palettes = palette.median_cut_palettes(histogram, [4])
+
+        assert palettes[4] == [(250, 250, 250), (200, 30, 20), (20, 40, 200), (10, 10, 10)]
+
+    def test_all_sizes_from_one_pass(self):
+        """Test that every requested size is produced and never exceeded"""
+        rng = np.random.default_rng(0)
+        image = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+
+        palettes, dominant = palette.extract_palettes(image, [2, 3, 5, 8, 12])
+
+        assert {k: len(v) for k, v in palettes.items()} == {2: 2, 3: 3, 5: 5, 8: 8, 12: 12}
+        assert len(dominant) == 8
+
+    def test_short_palette_for_few_colors(self, flat_image):
+        """Test that asking for more colors than exist does not invent duplicates"""
+        palettes, _ = palette.extract_palettes(flat_image, [12])
+
+        assert len(palettes[12]) == 4
+
+
+class TestPaletteMapper:
+    """Test lookup-table nearest-color assignment"""
+
+    def test_matches_full_argmin(self):
+        """Test that chunked LUT labels equal a brute-force nearest-color search"""
+        rng = np.random.default_rng(1)
+        colors = rng.integers(0, 256, (9, 3))
+        image = rng.integers(0, 256, (60, 80, 3), dtype=np.uint8)
+        distances = ((image.reshape(-1, 1, 3).astype(float) - colors[None]) ** 2).sum(axis=2)
+
+        labels = palette.PaletteMapper(colors).map(image, chunk_pixels=1000)
+
+        assert labels.dtype == np.uint8
+        assert labels.shape == (60, 80)
+        assert (labels.ravel() == distances.argmin(axis=1)).all()
+
+    def test_ties_go_to_first_color(self):
+        """Test argmin tie-breaking for pixels equidistant from two colors"""
+        image = np.array([[[1, 0, 0]]], dtype=np.uint8)
+
+        assert palette.PaletteMapper([(0, 0, 0), (2, 0, 0)]).map(image)[0, 0] == 0
+
+    def test_max_distance(self):
+        """Test that pixels far from every color are labelled NO_MATCH"""
+        image = np.array([[[0, 0, 0], [128, 128, 128]]], dtype=np.uint8)
+
+        labels = palette.PaletteMapper([(5, 5, 5)]).map(image, max_distance=40)
+
+        assert labels.tolist() == [[0, palette.PaletteMapper.NO_MATCH]]
+
+    def test_layers_share_labels(self, flat_image):
+        """Test that color layers reference one label map instead of copying the image"""
+        colors = [(250, 250, 250), (200, 30, 20), (20, 40, 200), (10, 10, 10)]
+        labels = palette.PaletteMapper(colors).map(flat_image)
+
+        layers = palette.color_layers(labels, colors)
+
+        assert all(layer.labels is labels for layer in layers)
+        assert [layer['pixel_count'] for layer in layers] == [400, 300, 200, 100]
+        assert (layers[1]['layer'][layers[1]['mask']] == (200, 30, 20)).all()
+        assert set(layers[0]) == {'layer', 'mask', 'color', 'pixel_count'}
+
+
+class TestPaletteAPI:
+    """Test the V3 strategy palette output format"""
+
+    def test_palette_keys_and_types(self, flat_image):
+        """Test the keys and plain-int color tuples the palette endpoint serializes"""
+        strategy = ExperimentalVTracerV3Strategy()
+
+        palettes = strategy.extract_color_palettes(flat_image)
+
+        assert list(palettes) == [f"{n}_colors" for n in strategy.suggested_palette_counts] + ['dominant']
+        assert all(type(channel) is int for color in palettes['2_colors'] for channel in color)
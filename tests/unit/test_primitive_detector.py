@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the primitive detector
+Tests the array-based confidence scoring against the per-point loops it replaced
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from vectorcraft.primitives.detector import Circle, PrimitiveDetector, Rectangle
+
+
+def reference_enhanced_confidence(edge_map, center, radius):
+    """The per-angle, per-offset loop detect_circles used to run for every circle"""
+    x, y = center
+    angles = np.linspace(0, 2*np.pi, 32)
+    edge_hits = 0
+    for angle in angles:
+        for r_offset in [-2, -1, 0, 1, 2]:
+            px = int(x + (radius + r_offset) * np.cos(angle))
+            py = int(y + (radius + r_offset) * np.sin(angle))
+            if 0 <= px < edge_map.shape[1] and 0 <= py < edge_map.shape[0]:
+                if edge_map[py, px] > 0:
+                    edge_hits += 1
+                    break
+    return edge_hits / len(angles)
+
+
+def reference_edge_nearby(edge_map, x, y, radius=3):
+    for dx in range(-radius, radius + 1):
+        for dy in range(-radius, radius + 1):
+            px, py = x + dx, y + dy
+            if 0 <= px < edge_map.shape[1] and 0 <= py < edge_map.shape[0]:
+                if edge_map[py, px] > 0:
+                    return True
+    return False
+
+
+def reference_confidence(edge_map, center, radius):
+    x, y = center
+    angles = np.linspace(0, 2*np.pi, 32)
+    edge_hits = 0
+    for angle in angles:
+        px = int(x + radius * np.cos(angle))
+        py = int(y + radius * np.sin(angle))
+        if 0 <= px < edge_map.shape[1] and 0 <= py < edge_map.shape[0]:
+            if reference_edge_nearby(edge_map, px, py, radius=3):
+                edge_hits += 1
+    return edge_hits / len(angles)
+
+
+@pytest.fixture
+def edge_map():
+    rng = np.random.default_rng(9)
+    edges = np.zeros((160, 200), dtype=np.uint8)
+    for _ in range(12):
+        x, y, r = int(rng.integers(0, 200)), int(rng.integers(0, 160)), int(rng.integers(5, 40))
+        cv2.circle(edges, (x, y), r, 255, 1)
+    edges[rng.random(edges.shape) < 0.01] = 255
+    return edges
+
+
+@pytest.fixture
+def candidates():
+    rng = np.random.default_rng(10)
+    # Includes circles crossing the border, so clipping matches too
+    return [((int(x), int(y)), int(r)) for x, y, r in zip(rng.integers(-20, 220, 150),
+                                                          rng.integers(-20, 180, 150),
+                                                          rng.integers(3, 60, 150))]
+
+
+class TestConfidenceScoring:
+    """Test that batched scoring matches the per-point loops"""
+
+    def test_batched_enhanced_confidence(self, edge_map, candidates):
+        """Test that one gather scores every circle as the loop did"""
+        detector = PrimitiveDetector()
+        centers = np.array([center for center, _ in candidates])
+        radii = np.array([radius for _, radius in candidates])
+
+        confidences = detector._circle_confidences(edge_map, centers, radii)
+
+        expected = [reference_enhanced_confidence(edge_map, c, r) for c, r in candidates]
+        assert np.allclose(confidences, expected)
+        assert detector._circle_confidences(edge_map, np.zeros((0, 2)), np.zeros(0)).shape == (0,)
+
+    def test_distance_transform_confidence(self, edge_map, candidates):
+        """Test that proximity from the distance transform matches the window scan"""
+        detector = PrimitiveDetector()
+        distance = detector.edge_distance_map(edge_map)
+
+        for center, radius in candidates:
+            assert detector._calculate_circle_confidence(edge_map, center, radius, distance) == \
+                reference_confidence(edge_map, center, radius)
+
+    def test_edge_nearby(self, edge_map):
+        """Test the window check, including points outside the image"""
+        detector = PrimitiveDetector()
+
+        for x in range(-6, 206, 5):
+            for y in range(-6, 166, 5):
+                assert detector._has_edge_nearby(edge_map, x, y) == reference_edge_nearby(edge_map, x, y)
+
+
+class TestDetection:
+    """Test detection end to end"""
+
+    @pytest.fixture
+    def image(self):
+        image = np.full((200, 300, 3), 255, dtype=np.uint8)
+        cv2.circle(image, (80, 100), 40, (200, 30, 30), -1)
+        cv2.rectangle(image, (160, 40), (270, 160), (30, 30, 200), -1)
+        return image
+
+    def test_detects_primitives(self, image):
+        """Test that circles, rectangles and lines are found on a simple drawing"""
+        edges = cv2.Canny(cv2.cvtColor(image, cv2.COLOR_RGB2GRAY), 50, 150)
+
+        primitives = PrimitiveDetector().detect_all_primitives(image, edges)
+
+        assert any(abs(c.center[0] - 80) < 5 and abs(c.center[1] - 100) < 5 for c in primitives['circles'])
+        assert primitives['rectangles'] and primitives['lines']
+        assert all(isinstance(r, Rectangle) for r in primitives['rectangles'])
+
+    def test_duplicate_filters(self):
+        """Test that near-duplicates are dropped in favour of the more confident one"""
+        detector = PrimitiveDetector()
+        circles = [Circle((10.0, 10.0), 10.0, 0.5), Circle((12.0, 10.0), 10.0, 0.9), Circle((60.0, 10.0), 10.0, 0.4)]
+        rectangles = [Rectangle(0, 0, 20, 20, 0, 0.5), Rectangle(2, 1, 20, 20, 0, 0.8), Rectangle(50, 50, 20, 20, 0, 0.3)]
+
+        assert [c.confidence for c in detector._filter_duplicate_circles(circles)] == [0.9, 0.4]
+        assert [r.confidence for r in detector._filter_duplicate_rectangles(rectangles)] == [0.8, 0.3]
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Unit tests for progressive vectorization
+Tests the preview-then-final result order, engine streaming, the SSE response and its tracing
+"""
+
+import numpy as np
+import pytest
+from flask import Flask, jsonify
+from PIL import Image
+
+from vectorcraft.core.engine import VectorizationEngine
+from vectorcraft.core.optimized_vectorizer import OptimizedVectorizer
+from vectorcraft.core.request import VectorizationRequest
+from vectorcraft.strategies.real_vtracer import RealVTracerStrategy
+from vectorcraft.utils.tracing import Tracer
+from services.progressive_stream import progressive_response
+
+pytestmark = pytest.mark.skipif(not RealVTracerStrategy().available, reason="VTracer not installed")
+
+
+@pytest.fixture
+def image():
+    image = np.full((300, 400, 3), 255, dtype=np.uint8)
+    image[50:250, 100:300] = (30, 60, 200)
+    image[120:180, 150:250] = (240, 200, 20)
+    return image
+
+
+@pytest.fixture
+def image_path(image, tmp_path):
+    path = tmp_path / 'logo.png'
+    Image.fromarray(image).save(path)
+    return str(path)
+
+
+class TestProgressiveVectorizer:
+    """Test the progressive pipeline of the vectorizer"""
+
+    def test_preview_then_final(self, image):
+        """Test that a coarse preview is yielded before the final result"""
+        request = VectorizationRequest(strategy='vtracer_high_fidelity')
+        results = list(OptimizedVectorizer().vectorize_progressive(image, target_time=30.0, request=request))
+
+        assert [r.metadata['progressive'] for r in results] == [
+            {'stage': 'preview', 'final': False},
+            {'stage': 'final', 'final': True}
+        ]
+        assert results[0].strategy_used == 'vtracer_preview'
+        assert results[-1].strategy_used == 'vtracer_high_fidelity'
+
+    def test_preview_presented_at_full_size(self, image):
+        """Test that the downsampled preview is scaled back to the image size"""
+        preview = RealVTracerStrategy().vectorize_preview(image)
+
+        assert 'width="400" height="300" viewBox="0 0 256 192"' in preview.svg_content
+
+    def test_plain_vectorize_unchanged(self, image):
+        """Test that the non-progressive call returns only the final result"""
+        result = OptimizedVectorizer().vectorize(image, target_time=30.0)
+
+        assert 'progressive' not in result.metadata
+
+
+class TestEngineStream:
+    """Test streaming through the engine"""
+
+    def test_inline_stream(self, image_path):
+        """Test that inline mode yields the preview and the final result in order"""
+        engine = VectorizationEngine(max_workers=0)
+
+        stages = [r.metadata['progressive']['stage'] for r in engine.stream(image_path, target_time=30.0)]
+
+        assert stages == ['preview', 'final']
+        assert engine.get_stats()['completed'] == 1
+
+
+class TestProgressiveResponse:
+    """Test the server-sent event stream"""
+
+    def test_events(self, image):
+        """Test that previews become preview events and the final JSON the result event"""
+        app = Flask(__name__)
+        results = OptimizedVectorizer().vectorize_progressive(image, target_time=30.0)
+
+        with app.test_request_context():
+            response = progressive_response(results, lambda result: jsonify({'strategy_used': result.strategy_used}))
+            body = response.get_data(as_text=True)
+
+        assert response.mimetype == 'text/event-stream'
+        assert body.index('event: preview') < body.index('event: result')
+
+    def test_error_event(self):
+        """Test that a failure mid-stream is reported and cleaned up"""
+        app = Flask(__name__)
+        errors = []
+
+        def failing():
+            raise RuntimeError("boom")
+            yield
+
+        with app.test_request_context():
+            response = progressive_response(failing(), jsonify, on_error=errors.append)
+            body = response.get_data(as_text=True)
+
+        assert 'event: error' in body and 'boom' in body
+        assert len(errors) == 1
+
+    def test_stream_is_traced(self, image, monkeypatch):
+        """Test that the stream is timed under the request's trace ID after the view has returned"""
+        tracer = Tracer(enabled=True)
+        monkeypatch.setattr('services.progressive_stream.tracer', tracer)
+        app = Flask(__name__)
+        results = OptimizedVectorizer().vectorize_progressive(image, target_time=30.0)
+
+        with app.test_request_context():
+            with tracer.trace('api.vectorize', trace_id='req-1'):
+                response = progressive_response(results, lambda result: jsonify({}), trace_name='api.vectorize')
+            response.get_data()
+
+        [stream] = tracer.traces(trace_id='req-1', limit=1)
+        assert stream['name'] == 'api.vectorize.stream'
+        spans = [child['name'] for child in stream['children']]
+        assert spans.count('vectorize') >= 2 and spans[-1] == 'vectorize' and 'save' in spans
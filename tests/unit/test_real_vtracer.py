@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the real VTracer strategy
+Tests the in-memory conversion path against the temp-file fallback
+"""
+
+import numpy as np
+import pytest
+
+from vectorcraft.strategies.real_vtracer import RealVTracerStrategy, RawSVGResult
+
+
+@pytest.fixture
+def strategy():
+    strategy = RealVTracerStrategy()
+    if not strategy.available:
+        pytest.skip("vtracer not installed")
+    return strategy
+
+
+@pytest.fixture
+def rgba_image():
+    """Two overlapping shapes, one semi-transparent, as float RGBA"""
+    image = np.zeros((60, 80, 4), dtype=np.float32)
+    image[10:40, 10:50] = (0.8, 0.1, 0.1, 1.0)
+    image[20:50, 30:70] = (0.1, 0.1, 0.8, 0.5)
+    return image
+
+
+class TestInMemoryConversion:
+    """Test VTracer invocation without temp files"""
+
+    def test_in_memory_matches_file_path(self, strategy, rgba_image):
+        """Test that both conversion paths produce identical SVG, alpha included"""
+        params = strategy._get_adaptive_parameters(rgba_image)
+        pil_image = strategy._to_pil_image(rgba_image)
+
+        in_memory = strategy._convert_in_memory(pil_image, params)
+        via_files = strategy._convert_via_files(pil_image, params)
+
+        assert in_memory == via_files
+
+    def test_vectorize_does_not_touch_temp_files(self, strategy, rgba_image, monkeypatch):
+        """Test that the hot path never creates temp files"""
+        import tempfile
+
+        def fail(*args, **kwargs):
+            raise AssertionError("temp file created on the in-memory path")
+
+        monkeypatch.setattr(tempfile, 'NamedTemporaryFile', fail)
+
+        result = strategy.vectorize(rgba_image)
+
+        assert isinstance(result, RawSVGResult)
+        assert result.element_count > 0
+
+    def test_falls_back_to_files(self, strategy, rgba_image, monkeypatch):
+        """Test that a failing in-memory call falls back to the file path"""
+        def broken(*args, **kwargs):
+            raise RuntimeError("unsupported")
+
+        monkeypatch.setattr(strategy.vtracer, 'convert_raw_image_to_svg', broken)
+
+        result = strategy.vectorize(rgba_image)
+
+        assert result.element_count > 0
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the vectorization result cache
+Tests content addressing, LRU eviction, and statistics
+"""
+
+import pytest
+from types import SimpleNamespace
+from PIL import Image
+
+from services.result_cache import ResultCache
+
+
+def _make_result(strategy='vtracer_high_fidelity', quality=0.9):
+    """Build a minimal VectorizationResult-shaped object"""
+    image_metadata = SimpleNamespace(
+        width=10, height=10, edge_density=0.1, text_probability=0.2,
+        geometric_probability=0.3, gradient_probability=0.4
+    )
+    return SimpleNamespace(
+        strategy_used=strategy,
+        quality_score=quality,
+        metadata={'num_elements': 3, 'content_type': 'logo', 'image_metadata': image_metadata}
+    )
+
+
+@pytest.fixture
+def result_cache(tmp_path):
+    return ResultCache(db_path=str(tmp_path / 'results.db'), max_entries=2)
+
+
+class TestResultCacheKeys:
+    """Test content-addressed key generation"""
+
+    def test_same_pixels_different_encoding_share_hash(self, tmp_path):
+        """Test that PNG and BMP copies of one image hash identically"""
+        image = Image.new('RGB', (8, 8), (200, 10, 10))
+        png_path = str(tmp_path / 'a.png')
+        bmp_path = str(tmp_path / 'a.bmp')
+        image.save(png_path)
+        image.save(bmp_path)
+
+        assert ResultCache.hash_image_file(png_path) == ResultCache.hash_image_file(bmp_path)
+
+    def test_param_order_and_float_normalization(self, result_cache):
+        """Test that equivalent parameter dicts produce the same key"""
+        key_a = result_cache.make_key('abc', 'vtracer_high_fidelity',
+                                      {'filter_speckle': 4, 'color_precision': 8.0})
+        key_b = result_cache.make_key('abc', 'vtracer_high_fidelity',
+                                      {'color_precision': 8, 'filter_speckle': 4})
+        key_c = result_cache.make_key('abc', 'experimental',
+                                      {'color_precision': 8, 'filter_speckle': 4})
+
+        assert key_a == key_b
+        assert key_a != key_c
+
+
+class TestResultCacheStorage:
+    """Test storing, hitting, and evicting results"""
+
+    def test_hit_returns_svg_and_metadata(self, result_cache):
+        """Test that a stored result round-trips"""
+        result_cache.put('k1', '<svg/>', _make_result())
+
+        cached = result_cache.get('k1')
+
+        assert cached is not None
+        assert cached.get_svg_string() == '<svg/>'
+        assert cached.strategy_used == 'vtracer_high_fidelity'
+        assert cached.metadata['num_elements'] == 3
+        assert cached.metadata['image_metadata'].width == 10
+        assert result_cache.get_stats()['hits'] == 1
+
+    def test_miss_is_counted(self, result_cache):
+        """Test that unknown keys count as misses"""
+        assert result_cache.get('missing') is None
+        assert result_cache.get_stats()['misses'] == 1
+
+    def test_lru_eviction(self, result_cache):
+        """Test that the least recently used entry is evicted first"""
+        result_cache.put('k1', '<svg>1</svg>', _make_result())
+        result_cache.put('k2', '<svg>2</svg>', _make_result())
+        result_cache.get('k1')
+        result_cache.put('k3', '<svg>3</svg>', _make_result())
+
+        stats = result_cache.get_stats()
+        assert stats['evictions'] == 1
+        assert stats['entries'] == 2
+        assert result_cache.get('k2') is None
+        assert result_cache.get('k1') is not None
+
+    def test_byte_budget_eviction(self, tmp_path):
+        """Test that entries are evicted to respect the byte budget"""
+        cache = ResultCache(db_path=str(tmp_path / 'small.db'), max_entries=100, max_bytes=15)
+        cache.put('k1', 'x' * 10, _make_result())
+        cache.put('k2', 'y' * 10, _make_result())
+
+        assert cache.get_stats()['entries'] == 1
+        assert cache.get('k2') is not None
+
+    def test_connections_are_closed(self, result_cache, monkeypatch):
+        """Test that every get/put closes its sqlite connection"""
+        import sqlite3
+        opened = []
+        real_connect = sqlite3.connect
+
+        def tracking_connect(*args, **kwargs):
+            conn = real_connect(*args, **kwargs)
+            opened.append(conn)
+            return conn
+
+        monkeypatch.setattr(sqlite3, 'connect', tracking_connect)
+        result_cache.put('k1', '<svg/>', _make_result())
+        result_cache.get('k1')
+
+        assert opened
+        for conn in opened:
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute('SELECT 1')
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the deadline-aware stage scheduler
+Tests budget decisions, the cancellable subprocess and the VTracer fallback
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from vectorcraft.core import scheduler as scheduler_module
+from vectorcraft.core.scheduler import (
+    Deadline, DeadlineExceeded, StageCostModel, StageScheduler, run_with_deadline
+)
+from vectorcraft.strategies.real_vtracer import RealVTracerStrategy
+
+
+def _sleep_then_return(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def _fail():
+    raise ValueError("boom")
+
+
+@pytest.fixture
+def cost_model():
+    return StageCostModel({'cheap': (0.0, 0.001), 'expensive': (0.0, 100.0)})
+
+
+class TestStageScheduler:
+    """Test budget-driven stage decisions"""
+
+    def test_unbounded_deadline(self):
+        """Test that a missing budget never runs out"""
+        deadline = Deadline(None)
+
+        assert deadline.remaining == float('inf')
+        assert not deadline.expired
+
+    def test_optional_stage_skipped_or_degraded(self, cost_model):
+        """Test that over-budget optional stages are skipped or replaced"""
+        scheduler = StageScheduler(1.0, 1_000_000, cost_model)
+
+        assert scheduler.run('expensive', lambda: 'full', optional=True) is None
+        assert scheduler.run('expensive', lambda: 'full', optional=True, degrade=lambda: 'cheap') == 'cheap'
+        assert scheduler.run('cheap', lambda: 'full', optional=True) == 'full'
+        assert [record.status for record in scheduler.trace] == ['skipped', 'degraded', 'ran']
+        assert scheduler.summary()['degraded'] is True
+
+    def test_required_stage_always_runs(self, cost_model):
+        """Test that required stages run even when the estimate is over budget"""
+        scheduler = StageScheduler(1.0, 1_000_000, cost_model)
+
+        assert scheduler.run('expensive', lambda: 42) == 42
+        assert scheduler.summary()['stages'][0]['status'] == 'ran'
+        assert scheduler.summary()['degraded'] is False
+
+    def test_cost_model_learns(self, cost_model):
+        """Test that observed timings move the estimate towards reality"""
+        before = cost_model.estimate('cheap', 1_000_000)
+        cost_model.observe('cheap', 1_000_000, 1.0)
+
+        assert cost_model.estimate('cheap', 1_000_000) > before
+
+
+class TestRunWithDeadline:
+    """Test the cancellable subprocess"""
+
+    def test_returns_result(self):
+        """Test that a fast call returns its value from the child"""
+        assert run_with_deadline(_sleep_then_return, (0.0, 'done'), 5.0) == 'done'
+
+    def test_kills_at_deadline(self):
+        """Test that a slow call is killed close to its deadline"""
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            run_with_deadline(_sleep_then_return, (10.0, 'late'), 0.2)
+
+        assert time.monotonic() - start < 2.0
+
+    def test_child_errors_propagate(self):
+        """Test that an exception in the child is reported to the caller"""
+        with pytest.raises(RuntimeError, match="ValueError: boom"):
+            run_with_deadline(_fail, (), 5.0)
+
+    def test_cancellable_stage_records_timeout(self, cost_model):
+        """Test that a killed stage is traced and raises DeadlineExceeded"""
+        scheduler = StageScheduler(0.2, 1_000_000, cost_model)
+
+        with pytest.raises(DeadlineExceeded):
+            scheduler.run_cancellable('expensive', _sleep_then_return, 10.0, 'late')
+
+        assert scheduler.trace[-1].status == 'timed_out'
+
+    def test_soft_deadline_when_fork_is_unsafe(self, cost_model, monkeypatch):
+        """Test that a stage that cannot be isolated runs in-process and is traced as an overrun"""
+        monkeypatch.setattr(scheduler_module, '_fork_blocker', lambda: 'not running on the main thread')
+        scheduler = StageScheduler(0.05, 1_000_000, cost_model)
+
+        assert scheduler.run_cancellable('expensive', _sleep_then_return, 0.1, 'late') == 'late'
+
+        record = scheduler.trace[-1]
+        assert record.status == 'timed_out'
+        assert record.note.startswith('soft deadline: not running on the main thread')
+
+
+class TestVTracerDeadline:
+    """Test the best-result-so-far fallback of the VTracer strategy"""
+
+    @pytest.fixture
+    def image(self):
+        rng = np.random.default_rng(0)
+        return rng.integers(0, 256, (300, 400, 3), dtype=np.uint8)
+
+    def test_preview_returned_when_budget_is_gone(self, image):
+        """Test that an exhausted budget still yields a full-size SVG"""
+        strategy = RealVTracerStrategy()
+        if not strategy.available:
+            pytest.skip("VTracer not installed")
+        params = strategy._get_adaptive_parameters(image)
+        scheduler = StageScheduler(0.0, image.shape[0] * image.shape[1])
+
+        svg = strategy.convert_within_deadline(image, params, scheduler)
+
+        assert 'width="400" height="300" viewBox="0 0 256 192"' in svg
+        assert [record.stage for record in scheduler.trace] == ['vtracer_preview', 'vtracer']
+
+    def test_rescale_svg(self):
+        """Test that the preview is presented at the full size through a viewBox"""
+        svg = '<svg version="1.1" xmlns="http://www.w3.org/2000/svg" width="50" height="20"><path d="M0 0"/></svg>'
+
+        rescaled = RealVTracerStrategy._rescale_svg(svg, 50, 20, 500, 200)
+
+        assert 'width="500" height="200" viewBox="0 0 50 20"' in rescaled
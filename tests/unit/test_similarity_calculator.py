@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the fused similarity metrics
+Tests agreement with the separate per-metric implementations and the batch API
+"""
+
+import cv2
+import numpy as np
+import pytest
+from skimage.metrics import structural_similarity
+
+from vectorcraft.core.svg_builder import SVGBuilder
+from vectorcraft.utils.similarity_calculator import SimilarityCalculator, METRIC_WEIGHTS
+
+
+def reference_metrics(target, rendered):
+    """The five metrics as they were computed one by one"""
+    target_gray = cv2.cvtColor(target, cv2.COLOR_BGR2GRAY)
+    rendered_gray = cv2.cvtColor(rendered, cv2.COLOR_BGR2GRAY)
+    target_edges = cv2.Canny((target_gray * 255).astype(np.uint8), 50, 150)
+    rendered_edges = cv2.Canny((rendered_gray * 255).astype(np.uint8), 50, 150)
+    histogram_scores = []
+    for channel in range(3):
+        t = cv2.calcHist([target], [channel], None, [256], [0, 1])
+        r = cv2.calcHist([rendered], [channel], None, [256], [0, 1])
+        t, r = t / (np.sum(t) + 1e-8), r / (np.sum(r) + 1e-8)
+        histogram_scores.append(max(0.0, cv2.compareHist(t, r, cv2.HISTCMP_CORREL)))
+    return {
+        'mse': 1.0 / (1.0 + np.mean((target - rendered) ** 2) * 10.0),
+        'ssim': (structural_similarity(target_gray, rendered_gray, data_range=1.0) + 1.0) / 2.0,
+        'color': 1.0 / (1.0 + np.linalg.norm(target.mean(axis=(0, 1)) - rendered.mean(axis=(0, 1))) * 5.0),
+        'edge': np.logical_and(target_edges, rendered_edges).sum() / np.logical_or(target_edges, rendered_edges).sum(),
+        'histogram': np.mean(histogram_scores),
+    }
+
+
+@pytest.fixture
+def target_path(tmp_path):
+    image = np.full((64, 96, 3), 255, dtype=np.uint8)
+    cv2.rectangle(image, (10, 10), (50, 40), (30, 65, 220), -1)
+    cv2.circle(image, (72, 32), 14, (20, 20, 20), -1)
+    path = tmp_path / 'target.png'
+    cv2.imwrite(str(path), image)
+    return str(path)
+
+
+def candidate(offset=0):
+    builder = SVGBuilder(96, 64)
+    builder.add_rectangle(10 + offset, 10, 41, 31, (220 / 255, 65 / 255, 30 / 255))
+    builder.add_circle((72, 32), 14, (0.08, 0.08, 0.08))
+    return builder.get_svg_string()
+
+
+class TestFusedMetrics:
+    """Test the single-pass metrics kernel"""
+
+    def test_matches_separate_metrics(self, target_path):
+        """Test that every fused metric equals its standalone implementation"""
+        calculator = SimilarityCalculator()
+        target = calculator.prepare_target(target_path)
+        rendered = calculator._render_svg_to_image(candidate(offset=3), (512, 512))
+
+        fused = calculator.compare_images(target, rendered)
+        expected = reference_metrics(target.image, rendered)
+
+        for name in METRIC_WEIGHTS:
+            assert fused[name] == pytest.approx(expected[name], abs=1e-5)
+
+    def test_better_candidate_scores_higher(self, target_path):
+        """Test that the comprehensive score ranks an exact match above a shifted one"""
+        calculator = SimilarityCalculator()
+
+        exact = calculator.calculate_comprehensive_similarity(candidate(), target_path)
+        shifted = calculator.calculate_comprehensive_similarity(candidate(offset=20), target_path)
+
+        assert exact > shifted
+        assert 0.0 <= shifted <= 1.0
+
+
+class TestBatchScoring:
+    """Test scoring many candidates against one target"""
+
+    def test_batch_matches_single_calls(self, target_path):
+        """Test that batched scores equal individual calls, in input order"""
+        calculator = SimilarityCalculator()
+        svgs = [candidate(offset) for offset in (0, 5, 20)]
+
+        batch = calculator.score_candidates(svgs, target_path, tier='full')
+
+        assert [m['comprehensive'] for m in batch] == \
+            [calculator.calculate_comprehensive_similarity(svg, target_path) for svg in svgs]
+
+    def test_preview_tier(self, target_path):
+        """Test that the preview tier compares at its reduced size"""
+        calculator = SimilarityCalculator()
+
+        target = calculator.prepare_target(target_path, tier='preview')
+        scores = calculator.score_candidates([candidate(), candidate(offset=20), '<not svg'], target_path)
+
+        assert target.image.shape[:2] == (128, 128)
+        assert scores[0]['comprehensive'] > scores[1]['comprehensive']
+        assert scores[2]['comprehensive'] == 0.0
+
+    def test_unknown_tier(self, target_path):
+        """Test that a typo in the tier name is reported"""
+        with pytest.raises(ValueError):
+            SimilarityCalculator().prepare_target(target_path, tier='fast')
+
+
+class TestPipelineQuality:
+    """Test the per-job quality score of the optimized pipeline"""
+
+    @pytest.fixture
+    def image(self):
+        image = np.full((120, 160, 3), 255, dtype=np.uint8)
+        image[20:100, 40:120] = (30, 60, 200)
+        return image
+
+    def test_quality_is_measured_similarity(self, image):
+        """Test that the result is scored by rendering it against the input"""
+        from vectorcraft.core.optimized_vectorizer import OptimizedVectorizer
+
+        result = OptimizedVectorizer().vectorize(image, target_time=30.0)
+
+        assert result.metadata['quality_metric'] == 'similarity_preview'
+        assert 0.9 < result.quality_score <= 1.0
+
+    def test_heuristic_when_over_budget(self, image):
+        """Test that scoring falls back to the heuristic when it does not fit the deadline"""
+        from vectorcraft.core.optimized_vectorizer import OptimizedVectorizer
+        from vectorcraft.core.scheduler import StageScheduler
+        from vectorcraft.utils.image_context import ImageContext
+
+        svg = SVGBuilder(160, 120)
+        svg.add_rectangle(40, 20, 80, 80, (30 / 255, 60 / 255, 200 / 255))
+        scheduler = StageScheduler(0.0, 160 * 120)
+
+        score, metric = OptimizedVectorizer()._measure_quality(svg, ImageContext(image), scheduler)
+
+        assert metric == 'heuristic'
+        assert score == 0.9
+        assert scheduler.trace[-1].status == 'degraded'
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the grid spatial index
+Tests its queries against brute force and the overlap filters built on it
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from vectorcraft.core.hybrid_vectorizer import HybridVectorizer
+from vectorcraft.core.svg_builder import SVGBuilder
+from vectorcraft.geometry.spatial_index import GridIndex, boxes_intersect, point_box_distance
+from vectorcraft.primitives.detector import Circle, PrimitiveDetector, Rectangle
+
+
+def random_boxes(count, seed=3, size=40.0, extent=1000.0):
+    rng = np.random.default_rng(seed)
+    origins = rng.uniform(-extent / 2, extent / 2, (count, 2))
+    sizes = rng.exponential(size, (count, 2))
+    return [(float(x), float(y), float(x + w), float(y + h)) for (x, y), (w, h) in zip(origins, sizes)]
+
+
+@pytest.fixture
+def primitives():
+    rng = np.random.default_rng(11)
+    circles = [Circle((float(x), float(y)), float(r), float(c))
+               for x, y, r, c in zip(rng.uniform(0, 500, 300), rng.uniform(0, 500, 300),
+                                     rng.uniform(2, 20, 300), rng.uniform(0, 1, 300))]
+    rectangles = [Rectangle(float(x), float(y), float(w), float(h), 0.0, float(c))
+                  for x, y, w, h, c in zip(rng.uniform(0, 500, 200), rng.uniform(0, 500, 200),
+                                           rng.uniform(2, 60, 200), rng.uniform(2, 60, 200),
+                                           rng.uniform(0, 1, 200))]
+    return {'circles': circles, 'rectangles': rectangles, 'lines': []}
+
+
+class TestGridIndex:
+    """Test queries against brute force"""
+
+    def test_query_matches_brute_force(self):
+        """Test that overlap queries return exactly the intersecting boxes, in insertion order"""
+        boxes = random_boxes(500)
+        index = GridIndex.bulk_load(boxes)
+
+        for query in random_boxes(100, seed=4):
+            expected = [i for i, box in enumerate(boxes) if boxes_intersect(box, query)]
+            assert index.query(query) == expected
+
+    def test_large_boxes(self):
+        """Test that boxes covering many cells are still found"""
+        index = GridIndex(cell_size=1.0)
+        index.insert((0, 0, 1000, 1000), 'background')
+        index.insert((5, 5, 6, 6), 'dot')
+
+        assert index.query_point(5.5, 5.5) == ['background', 'dot']
+        assert index.query_point(500, 500) == ['background']
+
+    def test_nearest_matches_brute_force(self):
+        """Test that the ring search finds the closest box"""
+        boxes = random_boxes(300, size=5.0)
+        index = GridIndex.bulk_load(boxes)
+        rng = np.random.default_rng(5)
+
+        for x, y in rng.uniform(-700, 700, (100, 2)):
+            distances = [point_box_distance(x, y, box) for box in boxes]
+            found = index.nearest(x, y)
+            assert math.isclose(distances[found], min(distances))
+
+    def test_nearest_max_distance(self):
+        """Test that nothing is returned beyond the search radius"""
+        index = GridIndex.bulk_load([(0, 0, 1, 1)], ['box'])
+
+        assert index.nearest(10, 1, max_distance=5) is None
+        assert index.nearest(10, 1, max_distance=10) == 'box'
+        assert GridIndex().nearest(0, 0) is None
+
+
+class TestOverlapFilters:
+    """Test that the indexed overlap filters keep the results of the pairwise loops"""
+
+    @staticmethod
+    def pairwise_filter(shapes, overlaps, threshold):
+        kept = []
+        for shape in sorted(shapes, key=lambda s: s.confidence, reverse=True):
+            if not any(overlaps(shape, existing, threshold) for existing in kept):
+                kept.append(shape)
+        return kept
+
+    @pytest.mark.parametrize('threshold', [0.3, 0.5, 0.7, 1.2])
+    def test_filter_overlapping_primitives(self, primitives, threshold):
+        """Test that the same circles and rectangles survive, in the same order"""
+        detector = PrimitiveDetector()
+
+        filtered = detector.filter_overlapping_primitives(primitives, threshold)
+
+        assert filtered['circles'] == self.pairwise_filter(
+            primitives['circles'], detector._circles_overlap, threshold)
+        assert filtered['rectangles'] == self.pairwise_filter(
+            primitives['rectangles'], detector._rectangles_overlap, threshold)
+
+    def test_point_in_primitives(self, primitives):
+        """Test the indexed point test against a scan of every primitive"""
+        vectorizer = HybridVectorizer()
+        index = vectorizer._index_primitives(primitives)
+
+        for x in range(0, 520, 13):
+            for y in range(0, 520, 13):
+                expected = (any(r.x <= x <= r.x + r.width and r.y <= y <= r.y + r.height
+                                for r in primitives['rectangles']) or
+                            any(math.hypot(x - c.center[0], y - c.center[1]) <= c.radius
+                                for c in primitives['circles']))
+                assert vectorizer._point_in_primitives((x, y), index) == expected
+
+    def test_overlaps_with_existing(self):
+        """Test that only rectangles with a large overlap ratio reject a path"""
+        vectorizer = HybridVectorizer()
+        builder = SVGBuilder(200, 200)
+        builder.add_rectangle(10, 10, 50, 50, (255, 0, 0))
+        builder.add_circle((150, 150), 20, (0, 255, 0))
+        index = vectorizer._index_rectangles(builder.elements)
+
+        assert vectorizer._overlaps_with_existing([(12, 12), (58, 12), (58, 58)], index)
+        assert not vectorizer._overlaps_with_existing([(40, 40), (90, 40), (90, 90)], index)
+        assert not vectorizer._overlaps_with_existing([(135, 135), (165, 135), (165, 165)], index)
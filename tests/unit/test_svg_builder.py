@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the columnar SVGBuilder
+Tests that the streaming writer matches the original builder's output byte for byte
+"""
+
+import io
+import pickle
+
+import numpy as np
+import pytest
+
+from vectorcraft.core.svg_builder import SVGBuilder, PathElement, CircleElement, RectElement
+
+
+@pytest.fixture
+def builder():
+    rng = np.random.default_rng(3)
+    svg = SVGBuilder(100, 50)
+    svg.add_path([(0.0, 0.0), (10.5, 2.0), (3.0, 4.0)], (1.0, 0.5, 0.0))
+    svg.add_path([(1, 2), (3, 4), (5, 6), (7, 8), (9, 10)], (0.2, 0.4, 0.6), False, 2)
+    svg.add_circle((5.5, 6), 3, (0, 0, 1))
+    svg.add_rectangle(1, 2, 3.5, 4, (0.1, 0.1, 0.1), False, 1.5)
+    svg.add_path(rng.random((11, 2)).astype(np.float32), (0.9, 0.1, 0.1), True, 0.5)
+    svg.add_path([(float(x), float(y)) for x, y in rng.random((20, 2)) * 100], (0.9, 0.1, 0.1))
+    svg.add_path([(1.0, 1.0)], (0, 0, 0))
+    return svg
+
+
+# Output of the original svgwrite-based SVGBuilder for the same elements
+_HEADER = ('<svg baseProfile="full" height="10" version="1.1" width="20" xmlns="http://www.w3.org/2000/svg" '
+           'xmlns:ev="http://www.w3.org/2001/xml-events" xmlns:xlink="http://www.w3.org/1999/xlink"><defs />')
+GOLDEN_PATHS = {
+    'int': (
+        [(1, 2), (3, 4), (5, 6), (7, 8), (9, 10)], False, 2,
+        '<path d="M 1,2 C 3,4 5,6 7,8" fill="none" stroke="rgb(51,102,153)" stroke-width="2" />'
+    ),
+    'float64': (
+        [(0.1, 0.2), (10.5, 2.0), (3.3, 4.0)], True, 0.0,
+        '<path d="M 0.1,0.2 L 10.5,2.0 L 3.3,4.0 Z" fill="rgb(51,102,153)" stroke="none" stroke-width="0.0" />'
+    ),
+    'float32': (
+        np.array([(0.1, 0.2), (10.5, 2.0), (3.3, 4.0), (7.7, 1.25)], dtype=np.float32), True, 0.5,
+        '<path d="M 0.10000000149011612,0.20000000298023224 C 10.5,2.0 3.299999952316284,4.0 '
+        '7.699999809265137,1.25 Z" fill="rgb(51,102,153)" stroke="rgb(51,102,153)" stroke-width="0.5" />'
+    ),
+    'float32_scalars': (
+        [(np.float32(0.1), np.float32(2.5)), (np.float32(1.3), np.float32(4))], False, 1,
+        '<path d="M 0.10000000149011612,2.5 L 1.2999999523162842,4.0" fill="none" stroke="rgb(51,102,153)" '
+        'stroke-width="1" />'
+    ),
+    'mixed': (
+        [(1.5, 2.25), (3, np.float32(4.7)), (5, 6)], True, 0.0,
+        '<path d="M 1.5,2.25 L 3,4.699999809265137 L 5,6 Z" fill="rgb(51,102,153)" stroke="none" '
+        'stroke-width="0.0" />'
+    ),
+}
+
+
+class TestSVGOutput:
+    """Test the streaming writer"""
+
+    @pytest.mark.parametrize('kind', sorted(GOLDEN_PATHS))
+    def test_matches_original_path_output(self, kind):
+        """Test byte identity with the original builder for each coordinate type"""
+        points, fill, stroke_width, expected = GOLDEN_PATHS[kind]
+        svg = SVGBuilder(20, 10)
+        svg.add_path(points, (0.2, 0.4, 0.6), fill, stroke_width)
+
+        assert svg.get_svg_string() == _HEADER + expected + '</svg>'
+
+    def test_matches_original_shape_output(self):
+        """Test byte identity with the original builder for circles and rectangles"""
+        svg = SVGBuilder(20, 10)
+        svg.add_circle((5.5, 6), 3, (0, 0, 1))
+        svg.add_rectangle(1, 2, 3.5, 4, (0.1, 0.1, 0.1), False, 1.5)
+
+        assert svg.get_svg_string() == _HEADER + (
+            '<circle cx="5.5" cy="6" fill="rgb(0,0,255)" r="3" stroke="none" stroke-width="0.0" />'
+            '<rect fill="none" height="4" stroke="rgb(25,25,25)" stroke-width="1.5" width="3.5" x="1" y="2" />'
+        ) + '</svg>'
+
+    def test_path_formatting(self):
+        """Test cubic triplets, dropped trailing points and the closing Z"""
+        svg = SVGBuilder(10, 10)
+        svg.add_path([(1, 2), (3, 4), (5, 6), (7, 8), (9, 10)], (0.2, 0.4, 0.6), False, 2)
+
+        assert '<path d="M 1,2 C 3,4 5,6 7,8" fill="none" stroke="rgb(51,102,153)" stroke-width="2" />' \
+            in svg.get_svg_string()
+
+    def test_mixed_int_and_float_coordinates(self):
+        """Test that integer coordinates in a mixed path print as integers"""
+        svg = SVGBuilder(10, 10)
+        svg.add_path([(1.5, 2.25), (3.1, 4.7), (5, 6)], (0.0, 0.0, 0.0))
+
+        assert 'd="M 1.5,2.25 L 3.1,4.7 L 5,6 Z"' in svg.get_svg_string()
+        assert svg.elements[0].points == [(1.5, 2.25), (3.1, 4.7), (5, 6)]
+
+    def test_mixed_paths_match_source_formatting(self):
+        """Test random mixed-type paths against f-string formatting of the source points"""
+        rng = np.random.default_rng(7)
+        for _ in range(50):
+            n = int(rng.integers(2, 12))
+            points = [tuple(int(v) if rng.random() < 0.5 else float(round(v, 3)) for v in pair)
+                      for pair in rng.random((n, 2)) * 100]
+            svg = SVGBuilder(100, 100)
+            svg.add_path(points, (0.5, 0.5, 0.5), fill=False)
+
+            if n >= 4:
+                body = ''.join(f" C {points[i][0]},{points[i][1]} {points[i + 1][0]},{points[i + 1][1]} "
+                               f"{points[i + 2][0]},{points[i + 2][1]}" for i in range(1, n - 2, 3))
+            else:
+                body = ''.join(f" L {x},{y}" for x, y in points[1:])
+            assert f'd="M {points[0][0]},{points[0][1]}{body}"' in svg.get_svg_string()
+
+    def test_small_chunks_join_to_document(self, builder):
+        """Test that chunking does not change the output"""
+        chunks = list(builder.iter_svg(chunk_size=64))
+
+        assert len(chunks) > 1
+        assert ''.join(chunks) == builder.get_svg_string()
+
+    def test_write_targets(self, builder, tmp_path):
+        """Test writing to text, binary and file targets"""
+        text, binary = io.StringIO(), io.BytesIO()
+        builder.write(text)
+        builder.write(binary)
+        builder.save(tmp_path / 'out.svg')
+
+        expected = builder.get_svg_string()
+        assert text.getvalue() == expected
+        assert binary.getvalue().decode('utf-8') == expected
+        assert (tmp_path / 'out.svg').read_text() == '<?xml version="1.0" encoding="utf-8" ?>\n' + expected
+
+
+class TestElementStore:
+    """Test element access and mutation through the columnar store"""
+
+    def test_element_types_in_paint_order(self, builder):
+        """Test that elements come back as views and records in insertion order"""
+        kinds = [type(element) for element in builder.elements]
+
+        assert kinds[:4] == [PathElement, PathElement, CircleElement, RectElement]
+        assert len(builder.elements) == 7
+
+    def test_points_round_trip(self, builder):
+        """Test that integer points read back as integers and assignment replaces them"""
+        path = builder.elements[1]
+        assert path.points[:2] == [(1, 2), (3, 4)]
+
+        path.points = [(0.5, 0.5), (2.5, 2.5)]
+
+        assert path.points == [(0.5, 0.5), (2.5, 2.5)]
+        assert 'd="M 0.5,0.5 L 2.5,2.5"' in builder.get_svg_string()
+
+    def test_reassigning_elements(self, builder):
+        """Test reordering and filtering through the elements setter"""
+        expected = SVGBuilder(100, 50)
+        expected.add_rectangle(1, 2, 3.5, 4, (0.1, 0.1, 0.1), False, 1.5)
+        expected.add_path([(0.0, 0.0), (10.5, 2.0), (3.0, 4.0)], (1.0, 0.5, 0.0))
+
+        builder.elements = [builder.elements[3], builder.elements[0]]
+
+        assert builder.get_svg_string() == expected.get_svg_string()
+
+    def test_pickle(self, builder):
+        """Test that builders survive the trip to and from engine workers"""
+        assert pickle.loads(pickle.dumps(builder)).get_svg_string() == builder.get_svg_string()
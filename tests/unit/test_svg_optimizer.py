@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SVG output optimizer
+Tests path compaction, same-fill merging, precompressed siblings and their delivery
+"""
+
+import gzip
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from vectorcraft.core.optimized_vectorizer import OptimizedVectorizer
+from vectorcraft.core.request import VectorizationRequest
+from vectorcraft.strategies.real_vtracer import RealVTracerStrategy
+from vectorcraft.utils.svg_optimizer import PathEncoder, SVGOptimizer, precompressed_sibling, write_svg
+from services.svg_delivery import send_svg
+
+
+def _svg(body):
+    return ('<?xml version="1.0"?><svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+            f'width="100" height="100"><!-- generated -->{body}</svg>')
+
+
+class TestPathEncoder:
+    """Test number formatting and path data encoding"""
+
+    def test_number_format(self):
+        """Test that fixed-point numbers print without redundant digits"""
+        encoder = PathEncoder(2)
+
+        assert [encoder.number(units) for units in (0, 150, -50, 1234, 100)] == ['0', '1.5', '-.5', '12.34', '1']
+
+    def test_relative_shorthand(self):
+        """Test that coordinates are rounded and axis-aligned lines use h/v"""
+        svg = SVGOptimizer(2).optimize(_svg('<path d="M 10.123 10.456 L 20.789 10.456 L 20.789 30 Z"/>'))
+
+        assert '<path d="m10.12 10.46h10.67V30z"/>' in svg
+
+    def test_straight_cubic_becomes_line(self):
+        """Test that a cubic with control points on its chord is written as a line"""
+        encoder = PathEncoder(2)
+
+        assert encoder.encode([('M', [0, 0]), ('C', [3, 3, 6, 6, 9, 9])]) == 'm0 0 9 9'
+        assert encoder.encode([('M', [0, 0]), ('C', [0, 5, 9, 5, 9, 0])]).startswith('m0 0c')
+
+
+class TestSVGOptimizer:
+    """Test document-level optimization"""
+
+    def test_strips_redundant_markup(self):
+        """Test that comments, the XML declaration and default attributes are removed"""
+        svg = SVGOptimizer().optimize(_svg('<path d="M0 0L5 5Z" fill="rgb(255,0,0)" stroke-width="1"/>'))
+
+        assert svg.startswith('<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">')
+        assert '<!--' not in svg and 'version' not in svg and 'stroke-width' not in svg
+        assert 'fill="#f00"' in svg
+
+    def test_merges_only_disjoint_same_fill_paths(self):
+        """Test that overlapping paths stay separate so paint order is unchanged"""
+        svg, stats = SVGOptimizer().optimize_with_stats(_svg(
+            '<path d="M0 0L10 0L10 10Z" fill="#ff0000"/>'
+            '<path d="M50 50L60 50L60 60Z" fill="#FF0000"/>'
+            '<path d="M55 55L70 55L70 70Z" fill="#f00"/>'
+            '<path d="M80 80L90 80L90 90Z" fill="#00f"/>'
+        ))
+
+        assert (stats.paths_in, stats.paths_out) == (4, 3)
+        assert svg.count('<path') == 3
+        assert stats.optimized_bytes < stats.original_bytes
+
+    def test_arcs_passed_through(self):
+        """Test that paths the optimizer cannot parse are left as written"""
+        path = '<path d="M0 0 A 5 5 0 0 1 10 10" fill="blue"/>'
+        svg, stats = SVGOptimizer().optimize_with_stats(_svg(path))
+
+        assert path in svg
+        assert stats.skipped_paths == 1
+
+    def test_grouped_documents_keep_attributes(self):
+        """Test that children of a group keep attributes that would otherwise be inherited"""
+        svg = SVGOptimizer().optimize(_svg('<g fill="red"><path d="M0 0L5 5Z" fill="#000000"/></g>'))
+
+        assert 'fill="#000"' in svg
+
+
+class TestPrecompression:
+    """Test the precompressed siblings and their selection"""
+
+    def test_siblings_written(self, tmp_path):
+        """Test that a gzip .svgz sibling decompresses to the SVG"""
+        path = str(tmp_path / 'result.svg')
+        written = write_svg(path, _svg(''))
+
+        assert str(tmp_path / 'result.svgz') in written
+        with open(str(tmp_path / 'result.svgz'), 'rb') as f:
+            assert gzip.decompress(f.read()).decode() == _svg('')
+
+    def test_plain_copy(self, tmp_path):
+        """Test that siblings can be skipped"""
+        path = str(tmp_path / 'result.svg')
+
+        assert write_svg(path, _svg(''), precompress=False) == [path]
+
+    def test_sibling_selection(self, tmp_path):
+        """Test Accept-Encoding negotiation, including explicit refusal with q=0"""
+        path = str(tmp_path / 'result.svg')
+        write_svg(path, _svg(''))
+        svgz = str(tmp_path / 'result.svgz')
+
+        assert precompressed_sibling(path, 'gzip, deflate') == (svgz, 'gzip')
+        assert precompressed_sibling(path, 'gzip;q=0, identity') is None
+        assert precompressed_sibling(path, '') is None
+
+    def test_send_svg(self, tmp_path):
+        """Test that the route helper serves the sibling with Content-Encoding"""
+        path = str(tmp_path / 'result.svg')
+        write_svg(path, _svg(''))
+        app = Flask(__name__)
+
+        with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+            response = send_svg(path, as_attachment=True)
+            response.direct_passthrough = False
+
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert response.mimetype == 'image/svg+xml'
+            assert 'result.svg' in response.headers['Content-Disposition']
+            assert 'Accept-Encoding' in response.headers['Vary']
+            assert gzip.decompress(response.get_data()).decode() == _svg('')
+            response.close()
+
+
+@pytest.mark.skipif(not RealVTracerStrategy().available, reason="VTracer not installed")
+class TestPipelineStage:
+    """Test the optimization stage of the vectorizer"""
+
+    @pytest.fixture
+    def image(self):
+        image = np.full((120, 160, 3), 255, dtype=np.uint8)
+        image[20:100, 40:120] = (30, 60, 200)
+        return image
+
+    def test_output_optimized(self, image):
+        """Test that the final SVG is optimized and the savings recorded"""
+        result = OptimizedVectorizer().vectorize(image, target_time=30.0,
+                                                 request=VectorizationRequest(strategy='vtracer_high_fidelity'))
+
+        stats = result.metadata['svg_optimization']
+        assert stats['optimized_bytes'] <= stats['original_bytes']
+        assert len(result.svg_builder.get_svg_string().encode()) == stats['optimized_bytes']
+
+    def test_opt_out(self, image):
+        """Test that a request can keep the raw output"""
+        request = VectorizationRequest(strategy='vtracer_high_fidelity', optimize_svg=False)
+        result = OptimizedVectorizer().vectorize(image, target_time=30.0, request=request)
+
+        assert result.metadata['svg_optimization'] is None
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the built-in SVG rasterizer
+Tests path parsing, fill rules, transforms and the render cache
+"""
+
+import numpy as np
+import pytest
+
+from vectorcraft.core.svg_builder import SVGBuilder
+from vectorcraft.utils.svg_rasterizer import SVGRasterizer
+
+
+def svg(body, width=10, height=10, extra=''):
+    return f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" {extra}>{body}</svg>'
+
+
+@pytest.fixture
+def rasterizer():
+    return SVGRasterizer(cache=None)
+
+
+class TestFill:
+    """Test scanline polygon filling"""
+
+    def test_rect_covers_pixel_centers(self, rasterizer):
+        """Test that exactly the pixels whose centers are inside get filled"""
+        image = rasterizer.render(svg('<rect x="2" y="3" width="4" height="2" fill="#ff0000"/>'), (10, 10))
+
+        red = np.all(image == (1, 0, 0), axis=2)
+        assert red.sum() == 8
+        assert red[3:5, 2:6].all()
+
+    def test_hole_winding(self, rasterizer):
+        """Test nonzero holes from reversed subpaths and even-odd holes from same-direction ones"""
+        nonzero = svg('<path d="M0 0 H10 V10 H0 Z M3 3 V7 H7 V3 Z" fill="#000"/>')
+        evenodd = svg('<path fill-rule="evenodd" d="M0 0 h10 v10 h-10 z m3 3 h4 v4 h-4 z" fill="#000"/>')
+        same_direction = svg('<path d="M0 0 h10 v10 h-10 z m3 3 h4 v4 h-4 z" fill="#000"/>')
+
+        assert rasterizer.render(nonzero, (10, 10))[5, 5].tolist() == [1, 1, 1]
+        assert rasterizer.render(evenodd, (10, 10))[5, 5].tolist() == [1, 1, 1]
+        assert rasterizer.render(same_direction, (10, 10))[5, 5].tolist() == [0, 0, 0]
+
+    def test_curves_are_flattened(self, rasterizer):
+        """Test that a circle drawn with cubics covers about pi r^2 pixels"""
+        k = 0.5523 * 40
+        circle = (f'<path d="M50 10 C{50 + k} 10 90 {50 - k} 90 50 C90 {50 + k} {50 + k} 90 50 90 '
+                  f'C{50 - k} 90 10 {50 + k} 10 50 C10 {50 - k} {50 - k} 10 50 10 Z" fill="#000"/>')
+
+        image = rasterizer.render(svg(circle, 100, 100), (100, 100))
+
+        assert (image[:, :, 0] == 0).sum() == pytest.approx(np.pi * 40 ** 2, rel=0.01)
+
+    def test_fill_opacity_blends(self, rasterizer):
+        """Test translucent fills over the white background"""
+        image = rasterizer.render(svg('<rect width="10" height="10" fill="#000" fill-opacity="0.25"/>'), (10, 10))
+
+        assert image[5, 5] == pytest.approx([0.75, 0.75, 0.75])
+
+
+class TestDocument:
+    """Test viewport scaling, transforms and SVGBuilder output"""
+
+    def test_translate_and_scaling(self, rasterizer):
+        """Test VTracer-style translate transforms in a scaled viewport"""
+        body = '<path d="M0 0 L5 0 L5 5 L0 5 Z" fill="#00FF00" transform="translate(5,5)"/>'
+
+        image = rasterizer.render(svg(body), (20, 20))
+
+        assert np.all(image[10:, 10:] == (0, 1, 0))
+        assert np.all(image[:10] == 1)
+
+    def test_svg_builder_output(self, rasterizer):
+        """Test the rgb() colors, circles and rects SVGBuilder writes"""
+        builder = SVGBuilder(20, 20)
+        builder.add_rectangle(0, 0, 10, 20, (1.0, 0.0, 0.0))
+        builder.add_circle((15, 10), 3, (0.0, 0.0, 1.0))
+
+        image = rasterizer.render(builder.get_svg_string(), (20, 20))
+
+        assert image[10, 5].tolist() == [1, 0, 0]
+        assert image[10, 15].tolist() == [0, 0, 1]
+        assert image[1, 18].tolist() == [1, 1, 1]
+
+
+class TestRenderCache:
+    """Test caching by SVG content"""
+
+    def test_cache_hit_returns_read_only_image(self):
+        """Test that identical SVG at the same size is rendered once"""
+        rasterizer = SVGRasterizer()
+        markup = svg('<rect width="5" height="5" fill="#123456"/>')
+
+        first = rasterizer.render(markup, (10, 10))
+        second = rasterizer.render(markup, (10, 10))
+
+        assert first is second
+        assert not first.flags.writeable
+        assert rasterizer.render(markup, (20, 20)).shape == (20, 20, 3)
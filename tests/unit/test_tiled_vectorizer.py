@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Unit tests for tiled full-resolution vectorization
+Tests tile planning, seam deduplication and an end-to-end tiled run
+"""
+
+import numpy as np
+import pytest
+
+from vectorcraft.core.scheduler import StageScheduler
+from vectorcraft.core.tiled_vectorizer import Tile, TiledVectorizer, plan_tiles, stitch_tile_svgs
+from vectorcraft.strategies.real_vtracer import RealVTracerStrategy
+
+
+class TestPlanTiles:
+    """Test tile layout"""
+
+    def test_cores_partition_the_image(self):
+        """Test that every pixel is owned by exactly one tile core"""
+        width, height = 1100, 700
+        owners = np.zeros((height, width), dtype=np.int32)
+
+        for tile in plan_tiles(width, height, tile_size=512, overlap=32):
+            x0, y0, x1, y1 = tile.core
+            owners[y0:y1, x0:x1] += 1
+
+        assert np.all(owners == 1)
+
+    def test_tiles_extend_cores_by_overlap(self):
+        """Test that tile windows include the overlap band, clipped to the image"""
+        tiles = plan_tiles(1000, 400, tile_size=512, overlap=32)
+
+        assert len(tiles) == 2
+        assert (tiles[0].x, tiles[0].width) == (0, 544)
+        assert (tiles[1].x, tiles[1].width) == (480, 520)
+        assert tiles[1].height == 400
+
+
+class TestStitching:
+    """Test merging of per-tile SVGs"""
+
+    def test_overlap_duplicates_are_emitted_once(self):
+        """Test that a shape traced by both neighbours is kept by its owner only"""
+        left = Tile(0, 0, 120, 100, (0, 0, 100, 100))
+        right = Tile(80, 0, 120, 100, (100, 0, 200, 100))
+        # Same 10x10 square at image x=85..95, seen from each tile
+        left_svg = '<path d="M0 0 L10 0 L10 10 L0 10 Z " fill="#FF0000" transform="translate(85,5)"/>'
+        right_svg = '<path d="M0 0 L10 0 L10 10 L0 10 Z " fill="#FF0000" transform="translate(5,5)"/>'
+
+        svg = stitch_tile_svgs([(left_svg, left), (right_svg, right)], 200, 100)
+
+        assert svg.count('<path') == 1
+        assert 'translate(85,5)' in svg
+
+    def test_paths_are_painted_largest_first(self):
+        """Test stacked ordering across tiles"""
+        left = Tile(0, 0, 100, 100, (0, 0, 100, 100))
+        right = Tile(100, 0, 100, 100, (100, 0, 200, 100))
+        small = '<path d="M0 0 L5 0 L5 5 Z " fill="#000000" transform="translate(10,10)"/>'
+        large = '<path d="M0 0 L50 0 L50 50 Z " fill="#FFFFFF" transform="translate(10,10)"/>'
+
+        svg = stitch_tile_svgs([(small, left), (large, right)], 200, 100)
+
+        assert svg.index('#FFFFFF') < svg.index('#000000')
+
+    def test_preview_tiles_are_scaled_to_tile_coordinates(self):
+        """Test that a tile traced at quarter size lands at full size in the image"""
+        tile = Tile(100, 0, 100, 100, (100, 0, 200, 100))
+        small = '<path d="M0 0 L5 0 L5 2.5 Z " fill="#000000" transform="translate(10,10)"/>'
+
+        svg = stitch_tile_svgs([(small, tile, (4.0, 4.0))], 200, 100)
+
+        assert 'd="M0 0 L20 0 L20 10 Z "' in svg
+        assert 'translate(140,40)' in svg
+
+
+class TestTiledVectorizer:
+    """Test an end-to-end tiled run"""
+
+    def test_pool_shares_cpus_with_engine_workers(self, monkeypatch):
+        """Test that the default tile pool is the CPUs divided among the engine workers"""
+        monkeypatch.setattr('os.cpu_count', lambda: 16)
+        monkeypatch.setenv('VECTORCRAFT_ENGINE_WORKERS', '4')
+        assert TiledVectorizer().max_workers == 4
+
+        monkeypatch.setenv('VECTORCRAFT_ENGINE_WORKERS', '32')
+        assert TiledVectorizer().max_workers == 1
+
+    def test_tiled_run_covers_all_tiles(self):
+        """Test that shapes in every tile survive stitching"""
+        if not RealVTracerStrategy().available:
+            pytest.skip("vtracer not installed")
+
+        image = np.full((120, 200, 4), 255, dtype=np.uint8)
+        image[20:50, 20:60, :3] = (200, 30, 30)
+        image[60:100, 130:180, :3] = (30, 30, 200)
+        params = RealVTracerStrategy()._get_adaptive_parameters(image)
+
+        result = TiledVectorizer(tile_size=100, overlap=8, max_workers=2).vectorize(image, params)
+
+        assert (result.width, result.height) == (200, 120)
+        assert '#C81E1E' in result.svg_content.upper()
+        assert '#1E1EC8' in result.svg_content.upper()
+
+    def test_over_budget_run_traces_preview_tiles(self):
+        """Test that tiles fall back to previews when the full trace cannot fit"""
+        if not RealVTracerStrategy().available:
+            pytest.skip("vtracer not installed")
+
+        image = np.full((120, 200, 4), 255, dtype=np.uint8)
+        image[20:100, 20:180, :3] = (200, 30, 30)
+        params = RealVTracerStrategy()._get_adaptive_parameters(image)
+        scheduler = StageScheduler(0.0, 200 * 120)
+
+        result = TiledVectorizer(tile_size=100, overlap=8, max_workers=2).vectorize(image, params, scheduler)
+
+        assert '#C81E1E' in result.svg_content.upper()
+        assert [(record.stage, record.status) for record in scheduler.trace] == [('vtracer', 'degraded')]
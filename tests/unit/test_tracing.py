@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Unit tests for request tracing
+Tests span nesting, the bounded latency histograms and worker trace adoption
+"""
+
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from vectorcraft.core.engine import VectorizationEngine
+from vectorcraft.core.request import VectorizationRequest
+from vectorcraft.utils.performance import PerformanceProfiler
+from vectorcraft.utils.tracing import LatencyHistogram, Tracer, tracer as global_tracer
+
+
+class TestLatencyHistogram:
+    """Test percentile estimates"""
+
+    def test_percentiles_within_precision(self):
+        """Test that p50/p95/p99 land within the bucket precision of the exact values"""
+        values = np.random.default_rng(0).lognormal(-3, 1, 20000)
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(float(value))
+
+        for p in (50, 95, 99):
+            exact = np.percentile(values, p)
+            assert histogram.percentile(p) == pytest.approx(exact, rel=0.03)
+        assert histogram.count == 20000
+
+    def test_memory_bounded(self):
+        """Test that recording more values does not add buckets past the range"""
+        histogram = LatencyHistogram()
+        for value in np.linspace(0.0, 10000.0, 50000):
+            histogram.record(float(value))
+
+        assert len(histogram.buckets) <= histogram._max_bucket + 1
+
+
+class TestTracer:
+    """Test span trees and export"""
+
+    def test_spans_nest_under_trace(self):
+        """Test that spans opened inside a trace become its children"""
+        tracer = Tracer(enabled=True)
+        with tracer.trace('request', trace_id='abc') as root:
+            with tracer.span('upload'):
+                pass
+            with tracer.span('vectorize'):
+                with tracer.span('stage.vtracer'):
+                    pass
+
+        trace = tracer.traces(trace_id='abc')[0]
+        assert root.trace_id == 'abc'
+        assert [child['name'] for child in trace['children']] == ['upload', 'vectorize']
+        assert trace['children'][1]['children'][0]['name'] == 'stage.vtracer'
+        assert set(tracer.histograms()) == {'request', 'upload', 'vectorize', 'stage.vtracer'}
+
+    def test_error_recorded(self):
+        """Test that a span records the exception that ended it"""
+        tracer = Tracer(enabled=True)
+        with pytest.raises(ValueError):
+            with tracer.trace('request'):
+                raise ValueError('bad pixels')
+
+        assert 'bad pixels' in tracer.traces()[0]['attributes']['error']
+
+    def test_disabled_is_noop(self):
+        """Test that a disabled tracer keeps nothing"""
+        tracer = Tracer(enabled=False)
+        with tracer.trace('request') as root:
+            with tracer.span('upload') as span:
+                span.set(size=1)
+
+        assert root.trace_id is None
+        assert tracer.export() == {'enabled': False, 'histograms': {}, 'traces': []}
+
+    def test_detached_trace_adopted(self):
+        """Test that a span tree recorded elsewhere is grafted under the current span"""
+        worker = Tracer(enabled=True)
+        with worker.trace('engine.job', trace_id='abc', detached=True) as job:
+            with worker.span('stage.vtracer'):
+                pass
+        assert worker.traces() == [] and worker.histograms() == {}
+
+        tracer = Tracer(enabled=True)
+        with tracer.trace('request', trace_id='abc'):
+            tracer.adopt(job.to_dict())
+
+        trace = tracer.traces()[0]
+        assert trace['children'][0]['children'][0]['name'] == 'stage.vtracer'
+        assert tracer.histograms()['stage.vtracer']['count'] == 1
+
+    def test_ring_and_span_caps(self, tmp_path):
+        """Test that kept traces and spans per trace are bounded, and the dump is JSON"""
+        tracer = Tracer(enabled=True, max_traces=3, max_spans_per_trace=5)
+        for i in range(10):
+            with tracer.trace('request', trace_id=str(i)):
+                for _ in range(20):
+                    with tracer.span('step'):
+                        pass
+
+        traces = tracer.traces()
+        assert [trace['trace_id'] for trace in traces] == ['9', '8', '7']
+        assert len(traces[0]['children']) == 5
+        assert tracer.histograms()['step']['count'] == 200
+
+        path = tmp_path / 'traces.json'
+        tracer.dump(str(path))
+        assert len(json.loads(path.read_text())['traces']) == 3
+
+
+class TestProfilerIntegration:
+    """Test the profiler and the engine feeding the tracer"""
+
+    def test_profiler_reports_percentiles(self):
+        """Test that profiled calls report percentiles from a bounded histogram"""
+        profiler = PerformanceProfiler()
+        square = profiler.profile('square')(lambda x: x * x)
+        for i in range(100):
+            square(i)
+
+        stats = profiler.get_stats()['square']
+        assert stats['call_count'] == 100
+        assert stats['p50_time'] <= stats['p95_time'] <= stats['p99_time'] <= stats['max_time']
+
+    def test_engine_job_traced(self, tmp_path):
+        """Test that an engine job's stages land in the caller's trace"""
+        if not global_tracer.enabled:
+            pytest.skip('tracing disabled by VECTORCRAFT_TRACING')
+        path = tmp_path / 'logo.png'
+        pixels = np.full((48, 48, 3), 255, dtype=np.uint8)
+        pixels[10:38, 10:38] = (200, 30, 30)
+        Image.fromarray(pixels).save(path)
+
+        engine = VectorizationEngine(max_workers=0)
+        with global_tracer.trace('test', trace_id='engine-test'):
+            result = engine.vectorize(str(path), request=VectorizationRequest(strategy='vtracer_high_fidelity'),
+                                      target_time=30.0)
+
+        assert 'trace' not in result.metadata
+        names = set()
+        def collect(span):
+            names.add(span['name'])
+            for child in span['children']:
+                collect(child)
+        collect(global_tracer.traces(trace_id='engine-test')[0])
+        assert {'engine.decode', 'engine.job', 'optimized_vectorize', 'stage.vtracer'} <= names
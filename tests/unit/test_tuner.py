@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the VTracer parameter tuner
+Tests the Pareto front, the recommendation rule, successive halving and preset loading
+"""
+
+import argparse
+import json
+
+import pytest
+
+from vectorcraft.__main__ import main
+from vectorcraft.bench.corpus import CorpusImage
+from vectorcraft.bench.tuner import Trial, add_arguments, candidate_grid, pareto_front, recommend, tune
+from vectorcraft.strategies.real_vtracer import DEFAULT_PRESETS_PATH, RealVTracerStrategy
+
+requires_vtracer = pytest.mark.skipif(not RealVTracerStrategy().available, reason="VTracer not installed")
+
+
+def _trial(seconds, svg_bytes, similarity, **params):
+    return Trial(params=params, seconds=seconds, svg_bytes=svg_bytes, similarity=similarity)
+
+
+class TestSelection:
+    """Test the Pareto front and the recommendation rule"""
+
+    def test_pareto_front(self):
+        """Test that dominated and failed settings are left off the front"""
+        fast = _trial(0.1, 900, 0.80, a=1)
+        balanced = _trial(0.2, 500, 0.85, a=2)
+        accurate = _trial(0.5, 800, 0.90, a=3)
+        dominated = _trial(0.3, 900, 0.84, a=4)
+        failed = Trial(params={'a': 5}, seconds=0.01, svg_bytes=1, similarity=1.0, failures=1)
+
+        assert pareto_front([accurate, dominated, fast, failed, balanced]) == [fast, balanced, accurate]
+
+    def test_fastest_meeting_floor(self):
+        """Test that the fastest setting within the tolerance of the baseline wins"""
+        baseline = _trial(1.0, 1000, 0.90)
+        trials = [_trial(0.2, 500, 0.85, a=1), _trial(0.4, 600, 0.895, a=2), _trial(0.6, 400, 0.91, a=3), baseline]
+
+        assert recommend(trials, baseline, tolerance=0.01).params == {'a': 2}
+        assert recommend(trials, baseline, tolerance=0.1).params == {'a': 1}
+        assert recommend(trials, baseline, tolerance=0.1, min_similarity=0.9).params == {'a': 3}
+
+    def test_most_similar_when_nothing_passes(self):
+        """Test the fallback when no setting reaches an absolute floor"""
+        baseline = _trial(1.0, 1000, 0.70)
+        trials = [_trial(0.2, 500, 0.75, a=1), baseline]
+
+        assert recommend(trials, baseline, min_similarity=0.99).params == {'a': 1}
+
+    def test_candidate_grid(self):
+        """Test that the grid expands to every combination"""
+        grid = candidate_grid({'filter_speckle': [2, 4], 'max_iterations': [5, 10, 20]})
+
+        assert len(grid) == 6
+        assert {'filter_speckle': 4, 'max_iterations': 20} in grid
+
+
+class TestPresets:
+    """Test that tuned presets are loaded where the pipeline and get_config_for_image_type read them"""
+
+    def test_loaded_from_file(self, tmp_path, monkeypatch):
+        """Test that file values override the built-in preset and unknown classes fall back"""
+        presets = tmp_path / 'presets.json'
+        presets.write_text(json.dumps({'presets': {'logo': {'filter_speckle': 8, 'max_iterations': 5}}}))
+        monkeypatch.setenv('VECTORCRAFT_VTRACER_PRESETS', str(presets))
+        builtin = RealVTracerStrategy().get_config_for_image_type('photo')
+
+        strategy = RealVTracerStrategy()
+        logo = strategy.get_config_for_image_type('logo')
+
+        assert (logo['filter_speckle'], logo['max_iterations']) == (8, 5)
+        assert logo['color_precision'] == 6
+        assert strategy.get_config_for_image_type('photo') == builtin
+
+    def test_bad_file_ignored(self, tmp_path, monkeypatch):
+        """Test that an unreadable presets file leaves the built-in presets in place"""
+        presets = tmp_path / 'presets.json'
+        presets.write_text('{not json')
+        monkeypatch.setenv('VECTORCRAFT_VTRACER_PRESETS', str(presets))
+
+        assert RealVTracerStrategy().get_config_for_image_type('logo')['filter_speckle'] == 4
+
+    def test_command_line_writes_default_presets(self):
+        """Test that the tuner writes to the file the pipeline loads unless told otherwise"""
+        parser = argparse.ArgumentParser()
+        add_arguments(parser)
+
+        assert parser.parse_args([]).output == DEFAULT_PRESETS_PATH
+
+
+@requires_vtracer
+class TestTuning:
+    """Test the search end to end on small images"""
+
+    @pytest.fixture
+    def images(self):
+        return [CorpusImage('logo_a', 'logo', synthetic={'generator': 'logo', 'width': 96, 'height': 96, 'seed': 1}),
+                CorpusImage('logo_b', 'logo', synthetic={'generator': 'logo', 'width': 128, 'height': 96, 'seed': 2})]
+
+    def test_tune(self, images):
+        """Test that halving narrows the search and a preset is recommended per class"""
+        grid = {'filter_speckle': [2, 8], 'max_iterations': [5, 20], 'color_precision': [4, 8]}
+
+        results = tune(images, grid=grid, rungs=(64, 0), eta=4, workers=1, verbose=False)
+
+        assert set(results['presets']) == set(results['classes']) == {'logo'}
+        logo = results['classes']['logo']
+        assert logo['images'] == ['logo_a', 'logo_b']
+        assert logo['pareto'] and logo['recommended']['similarity'] >= logo['baseline']['similarity'] - 0.01
+        # 8 candidates on the first rung, the best 2 and the baseline on the last
+        assert len(logo['pareto']) <= 3
+        # Presets hold only tuned overrides, applied on top of the adaptive parameters
+        assert set(results['presets']['logo']) <= set(grid)
+
+    def test_command_line(self, images, tmp_path, monkeypatch):
+        """Test that ``python -m vectorcraft tune`` writes presets the VTracer pipeline applies"""
+        manifest = tmp_path / 'manifest.json'
+        manifest.write_text(json.dumps({'images': [
+            {'name': image.name, 'kind': image.kind, 'synthetic': image.synthetic} for image in images
+        ]}))
+        output = tmp_path / 'presets.json'
+
+        assert main(['tune', '--corpus', str(manifest), '--param', 'filter_speckle=2,16', '--rungs', '0',
+                     '--workers', '2', '--output', str(output)]) == 0
+
+        stored = json.loads(output.read_text())
+        monkeypatch.setenv('VECTORCRAFT_VTRACER_PRESETS', str(output))
+        params = RealVTracerStrategy()._get_adaptive_parameters(images[0].load(), image_type='logo')
+        assert stored['presets']['logo'].items() <= params.items()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-request vectorization options
+Tests immutability and that strategies take parameters per call
+"""
+
+import dataclasses
+import numpy as np
+import pytest
+
+from vectorcraft.core.request import VectorizationRequest
+from vectorcraft.strategies.real_vtracer import RealVTracerStrategy
+
+
+CUSTOM_PARAMS = {
+    'filter_speckle': 7,
+    'color_precision': 5,
+    'layer_difference': 12,
+    'corner_threshold': 70,
+    'length_threshold': 3.0,
+    'splice_threshold': 40,
+    'curve_fitting': 'polygon'
+}
+
+
+class TestVectorizationRequest:
+    """Test the immutable request object"""
+
+    def test_fields_are_frozen(self):
+        """Test that request fields cannot be reassigned"""
+        request = VectorizationRequest.from_params('vtracer_high_fidelity', 30.0, CUSTOM_PARAMS)
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            request.strategy = 'experimental'
+
+    def test_params_are_read_only_copy(self):
+        """Test that caller dicts and the stored params are decoupled"""
+        params = dict(CUSTOM_PARAMS)
+        request = VectorizationRequest.from_params('vtracer_high_fidelity', 30.0, params)
+        params['filter_speckle'] = 99
+
+        assert request.vtracer_params['filter_speckle'] == 7
+        with pytest.raises(TypeError):
+            request.vtracer_params['filter_speckle'] = 1
+
+        copy = request.get_vtracer_params()
+        copy['filter_speckle'] = 1
+        assert request.vtracer_params['filter_speckle'] == 7
+
+    def test_empty_params_mean_adaptive(self):
+        """Test that empty params normalize to None"""
+        request = VectorizationRequest.from_params('vtracer_high_fidelity', 30.0, {})
+
+        assert request.vtracer_params is None
+        assert request.get_vtracer_params() is None
+
+
+class TestRealVTracerParameters:
+    """Test that VTracer parameters are resolved per call"""
+
+    def test_custom_params_do_not_leak_between_calls(self):
+        """Test that custom params only apply to the call that passed them"""
+        strategy = RealVTracerStrategy()
+        image = np.zeros((16, 16, 3), dtype=np.float32)
+
+        custom = strategy._get_adaptive_parameters(image, CUSTOM_PARAMS)
+        adaptive = strategy._get_adaptive_parameters(image)
+
+        assert custom['filter_speckle'] == 7
+        assert custom['mode'] == 'polygon'
+        assert adaptive['filter_speckle'] != 7
+        assert not hasattr(strategy, 'custom_params')
+
+
+class TestClassicalTracerParameters:
+    """Test that classical tracing parameters are passed per call"""
+
+    def test_contour_min_area_is_a_call_argument(self):
+        """Test that the minimum contour area filters without touching tracer state"""
+        from vectorcraft.strategies.classical_tracer import ClassicalTracer
+
+        tracer = ClassicalTracer()
+        edge_map = np.zeros((64, 64), dtype=np.uint8)
+        edge_map[10:20, 10:20] = 255   # ~81 px contour
+        edge_map[30:60, 30:60] = 255   # ~841 px contour
+
+        assert len(tracer.trace(None, edge_map)) == 2
+        assert len(tracer.trace(None, edge_map, contour_min_area=200)) == 1
+        assert tracer.contour_threshold == 50
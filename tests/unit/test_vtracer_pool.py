@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the vtracer binary worker pool
+Tests job dispatch, the bounded queue, failures and timeouts against a stand-in executable
+"""
+
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from vectorcraft.utils.vtracer_pool import (
+    VTracerPoolFull, VTracerTimeout, VTracerWorkerError, VTracerWorkerPool, binary_arguments
+)
+
+# Accepts the vtracer command line and writes an SVG describing what it was given.
+# --filter_speckle selects misbehaviour: 97 sleeps briefly, 98 fails, 99 hangs.
+FAKE_VTRACER = f"""#!{sys.executable}
+import sys, time
+from PIL import Image
+args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+speckle = args.get('--filter_speckle')
+if speckle == '97':
+    time.sleep(0.3)
+if speckle == '98':
+    sys.stderr.write('bad image')
+    sys.exit(2)
+if speckle == '99':
+    time.sleep(60)
+image = Image.open(args['--input'])
+with open(args['--output'], 'w') as f:
+    f.write('<svg width="%d" height="%d" data-mode="%s" data-color="%s"/>' % (
+        image.width, image.height, args.get('--colormode'), image.getpixel((0, 0))[0]))
+"""
+
+
+@pytest.fixture
+def binary(tmp_path):
+    path = tmp_path / 'vtracer'
+    path.write_text(FAKE_VTRACER)
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture
+def pool(binary):
+    pool = VTracerWorkerPool(binary, workers=2, queue_size=2, job_timeout=10.0)
+    yield pool
+    pool.shutdown()
+
+
+def pixels(width=30, height=20, value=7):
+    return np.full((height, width, 4), value, dtype=np.uint8)
+
+
+class TestArguments:
+    """Test the translation of VTracer parameters into command-line flags"""
+
+    def test_flags(self):
+        """Test renamed options, the binary color mode and the segment length bounds"""
+        arguments = binary_arguments({'colormode': 'binary', 'layer_difference': 16, 'length_threshold': 2.0,
+                                      'max_iterations': 10, 'filter_speckle': 4})
+
+        assert arguments == ['--colormode', 'bw', '--gradient_step', '16', '--segment_length', '3.5',
+                             '--filter_speckle', '4']
+
+
+class TestWorkerPool:
+    """Test the pool against the stand-in binary"""
+
+    def test_convert(self, pool):
+        """Test that pixels reach the binary and its SVG comes back"""
+        svg = pool.convert(pixels(value=42), {'colormode': 'color'})
+
+        assert svg == '<svg width="30" height="20" data-mode="color" data-color="42"/>'
+
+    def test_concurrent_jobs(self, binary):
+        """Test that queued jobs run at most ``workers`` at a time and all complete"""
+        pool = VTracerWorkerPool(binary, workers=2, queue_size=8)
+        try:
+            start = time.monotonic()
+            futures = [pool.submit(pixels(value=v), {'filter_speckle': 97}) for v in range(6)]
+
+            assert [f.result(timeout=30).count(f'data-color="{v}"') for v, f in enumerate(futures)] == [1] * 6
+            assert time.monotonic() - start >= 0.9  # Three rounds of two 0.3s runs
+            assert pool.stats['completed'] == 6 and pool.health()['pending'] == 0
+        finally:
+            pool.shutdown()
+
+    def test_bounded_queue(self, pool):
+        """Test that submissions beyond the queue are rejected rather than piling up"""
+        futures = []
+        with pytest.raises(VTracerPoolFull):
+            for _ in range(10):
+                futures.append(pool.submit(pixels(), {'filter_speckle': 97}))
+
+        assert pool.stats['rejected'] == 1
+        assert all('<svg' in future.result(timeout=30) for future in futures)
+
+    def test_binary_failure(self, pool):
+        """Test that a failing trace reports the binary's error and later jobs still run"""
+        with pytest.raises(VTracerWorkerError, match='bad image'):
+            pool.convert(pixels(), {'filter_speckle': 98})
+
+        assert pool.stats['failed'] == 1
+        assert '<svg' in pool.convert(pixels(), {})
+
+    def test_job_timeout(self, pool):
+        """Test that a hung binary is killed at its timeout and frees its slot"""
+        start = time.monotonic()
+        with pytest.raises(VTracerTimeout):
+            pool.convert(pixels(), {'filter_speckle': 99}, timeout=0.5)
+
+        assert time.monotonic() - start < 10
+        assert pool.stats['timeouts'] == 1 and pool.health()['pending'] == 0
+        assert '<svg' in pool.convert(pixels(), {})
+
+    def test_shutdown(self, binary):
+        """Test that shutdown waits for running jobs and refuses new ones"""
+        pool = VTracerWorkerPool(binary, workers=1)
+        future = pool.submit(pixels(), {'filter_speckle': 97})
+
+        pool.shutdown()
+
+        assert '<svg' in future.result(timeout=0)
+        with pytest.raises(RuntimeError):
+            pool.submit(pixels(), {})
@@ -0,0 +1,27 @@
+"""
+VectorCraft command line: ``python -m vectorcraft bench|tune ...``
+"""
+
+import sys
+import argparse
+
+from .bench import runner, tuner
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='vectorcraft', description='VectorCraft developer tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    runner.add_arguments(commands.add_parser(
+        'bench', help='benchmark every strategy over the corpus and diff against the baseline'
+    ))
+    tuner.add_arguments(commands.add_parser(
+        'tune', help='search VTracer parameters for the fastest presets that keep similarity'
+    ))
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
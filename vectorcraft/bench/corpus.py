@@ -0,0 +1,132 @@
+import os
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+# Checked-in manifest next to the performance tests
+DEFAULT_MANIFEST = os.path.join(
+    os.path.dirname(__file__), '..', '..', 'tests', 'performance', 'corpus', 'manifest.json'
+)
+
+
+def _palette(rng: np.random.Generator, n: int) -> np.ndarray:
+    return rng.integers(0, 256, (n, 3), dtype=np.uint8)
+
+
+def generate_logo(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """Flat-colored shapes on a white background, a handful of colors"""
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    colors = _palette(rng, 5)
+    for i in range(8):
+        color = tuple(int(c) for c in colors[i % len(colors)])
+        cx, cy = int(rng.integers(0, width)), int(rng.integers(0, height))
+        size = int(rng.integers(min(width, height) // 12, min(width, height) // 4))
+        if i % 3 == 0:
+            cv2.circle(image, (cx, cy), size, color, -1, lineType=cv2.LINE_AA)
+        elif i % 3 == 1:
+            cv2.rectangle(image, (cx - size, cy - size // 2), (cx + size, cy + size // 2), color, -1)
+        else:
+            points = np.array([(cx, cy - size), (cx + size, cy + size), (cx - size, cy + size)], dtype=np.int32)
+            cv2.fillPoly(image, [points], color, lineType=cv2.LINE_AA)
+    return image
+
+
+def generate_text(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """Dark anti-aliased text lines on a light background"""
+    image = np.full((height, width, 3), 250, dtype=np.uint8)
+    letters = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 '))
+    scale = height / 260
+    line_height = int(40 * scale) + 10
+    for y in range(line_height, height - 10, line_height):
+        line = ''.join(rng.choice(letters, size=max(4, width // int(22 * scale + 1))))
+        cv2.putText(image, line, (10, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (20, 20, 20),
+                    max(1, int(2 * scale)), lineType=cv2.LINE_AA)
+    return image
+
+
+def generate_gradient(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """Linear background gradient with a radial highlight"""
+    a, b, c = (_palette(rng, 3).astype(np.float32) / 255.0)
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    t = (xx / max(1, width - 1))[..., None]
+    image = a * (1 - t) + b * t
+    r = np.hypot(xx - width * 0.6, yy - height * 0.4) / (0.5 * max(width, height))
+    glow = np.clip(1.0 - r, 0.0, 1.0)[..., None] ** 2
+    image = image * (1 - glow) + c * glow
+    return (image * 255).astype(np.uint8)
+
+
+def generate_photo(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """Photo-like content: smooth low-frequency structure plus sensor noise"""
+    coarse = rng.random((max(2, height // 32), max(2, width // 32), 3)).astype(np.float32)
+    image = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC)
+    image = cv2.GaussianBlur(image, (0, 0), 3)
+    image += rng.normal(0.0, 0.03, image.shape).astype(np.float32)
+    return (np.clip(image, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+def generate_scan(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """Large document scan: text blocks and rules on textured paper"""
+    image = generate_text(width, height, rng).astype(np.float32)
+    paper = cv2.resize(rng.normal(0.0, 6.0, (height // 8, width // 8)).astype(np.float32), (width, height))
+    image += paper[..., None]
+    for _ in range(6):
+        y = int(rng.integers(0, height))
+        cv2.line(image, (0, y), (width - 1, y), (90, 90, 90), 3)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+GENERATORS: Dict[str, Callable[[int, int, np.random.Generator], np.ndarray]] = {
+    'logo': generate_logo,
+    'text': generate_text,
+    'gradient': generate_gradient,
+    'photo': generate_photo,
+    'scan': generate_scan,
+}
+
+
+@dataclass
+class CorpusImage:
+    """One benchmark image: a checked-in file or a seeded synthetic generator"""
+    name: str
+    kind: str
+    path: Optional[str] = None
+    synthetic: Optional[Dict[str, Any]] = None
+    tags: List[str] = field(default_factory=list)
+    strategies: Optional[List[str]] = None  # Restricts the strategies benchmarked on this image
+
+    def load(self) -> np.ndarray:
+        """RGBA pixels, as the vectorizers receive them from the engine"""
+        if self.path is not None:
+            return np.array(Image.open(self.path).convert('RGBA'))
+
+        spec = self.synthetic
+        rgb = GENERATORS[spec['generator']](spec['width'], spec['height'], np.random.default_rng(spec['seed']))
+        return np.dstack([rgb, np.full(rgb.shape[:2], 255, dtype=np.uint8)])
+
+
+def load_corpus(manifest_path: str = DEFAULT_MANIFEST) -> List[CorpusImage]:
+    """Read the corpus manifest; file paths are relative to the manifest"""
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    images = []
+    for entry in manifest['images']:
+        path = entry.get('path')
+        if path is not None:
+            path = os.path.normpath(os.path.join(base, path))
+        images.append(CorpusImage(
+            name=entry['name'],
+            kind=entry['kind'],
+            path=path,
+            synthetic=entry.get('synthetic'),
+            tags=entry.get('tags', []),
+            strategies=entry.get('strategies')
+        ))
+    return images
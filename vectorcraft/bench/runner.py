@@ -0,0 +1,270 @@
+import os
+import re
+import json
+import time
+import platform
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..core.hybrid_vectorizer import HybridVectorizer
+from ..core.optimized_vectorizer import OptimizedVectorizer
+from ..core.request import VectorizationRequest
+from ..core.scheduler import DeadlineExceeded, _can_fork, run_with_deadline
+from ..utils.similarity_calculator import SimilarityCalculator
+from .corpus import DEFAULT_MANIFEST, CorpusImage, load_corpus
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# 'auto' is the production path: OptimizedVectorizer choosing its own strategy
+STRATEGIES = [
+    'auto', 'vtracer_high_fidelity', 'hybrid_comprehensive', 'hybrid_fast',
+    'primitive_focused', 'classical_refined', 'logo_optimized', 'diff_optimized'
+]
+
+# Relative increase tolerated before a metric counts as regressed (similarity: absolute drop)
+DEFAULT_THRESHOLDS = {
+    'total_seconds': 0.25,
+    'stage_seconds': 0.5,
+    'rss_growth_mb': 0.2,
+    'svg_bytes': 0.25,
+    'num_elements': 0.5,
+    'similarity': 0.02,
+}
+
+# Timing and memory changes smaller than these are noise, whatever their ratio
+MIN_SECONDS = 0.05
+MIN_RSS_MB = 5.0
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(DEFAULT_MANIFEST), 'baseline.json')
+
+_ELEMENT_RE = re.compile(r'<(?:path|rect|circle|ellipse|polygon|polyline|line)\b')
+
+_vectorizers: Dict[str, HybridVectorizer] = {}
+
+
+def _vectorizer(strategy: str) -> HybridVectorizer:
+    """Vectorizers are built once in the parent so forked cases share them"""
+    kind = 'optimized' if strategy == 'auto' else 'standard'
+    if kind not in _vectorizers:
+        # No result or image caching: every case must pay for its own work
+        _vectorizers[kind] = OptimizedVectorizer(enable_caching=False) if kind == 'optimized' else HybridVectorizer()
+    return _vectorizers[kind]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0  # KiB on Linux
+
+
+def measure_case(pixels: np.ndarray, strategy: str, target_time: float) -> Dict[str, Any]:
+    """Vectorize one image with one strategy and collect the benchmark metrics"""
+    request = VectorizationRequest(strategy=None if strategy == 'auto' else strategy, target_time=target_time)
+    vectorizer = _vectorizer(strategy)
+    # A forked child starts its high-water mark at the RSS inherited from the parent
+    rss_start_mb = _peak_rss_mb()
+
+    start = time.perf_counter()
+    result = vectorizer.vectorize(pixels, target_time=target_time, request=request)
+    total_seconds = time.perf_counter() - start
+    peak_rss_mb = _peak_rss_mb()
+
+    # Seconds per scheduled stage, from the pipeline's own schedule trace
+    stages: Dict[str, float] = {}
+    for record in result.metadata.get('schedule', {}).get('stages', []):
+        stages[record['stage']] = round(stages.get(record['stage'], 0.0) + record['seconds'], 4)
+
+    svg = result.svg_builder.get_svg_string()
+
+    start = time.perf_counter()
+    target = np.ascontiguousarray(pixels[..., 2::-1]).astype(np.float32) / 255.0  # RGBA -> BGR
+    similarity = SimilarityCalculator().calculate_comprehensive_similarity(svg, target)
+
+    return {
+        'status': 'ok',
+        'strategy_used': result.strategy_used,
+        'total_seconds': round(total_seconds, 4),
+        'stages': stages,
+        'peak_rss_mb': None if peak_rss_mb is None else round(peak_rss_mb, 1),
+        'rss_growth_mb': None if peak_rss_mb is None else round(peak_rss_mb - rss_start_mb, 1),
+        'svg_bytes': len(svg.encode()),
+        'num_elements': len(_ELEMENT_RE.findall(svg)),
+        'similarity': round(similarity, 4),
+        'similarity_seconds': round(time.perf_counter() - start, 4),
+    }
+
+
+def run_case(pixels: np.ndarray, strategy: str, target_time: float, timeout: float,
+             isolate: bool = True) -> Dict[str, Any]:
+    """Measure one case, in a forked child when possible so peak RSS is per case"""
+    _vectorizer(strategy)
+    try:
+        if isolate and _can_fork():
+            return run_with_deadline(measure_case, (pixels, strategy, target_time), timeout)
+        return measure_case(pixels, strategy, target_time)
+    except DeadlineExceeded:
+        return {'status': 'timeout', 'error': f"exceeded {timeout:.0f}s"}
+    except Exception as e:
+        return {'status': 'error', 'error': str(e)}
+
+
+def run_benchmark(images: List[CorpusImage], strategies: List[str], target_time: float = 30.0,
+                  timeout: float = 300.0, isolate: bool = True, verbose: bool = True) -> Dict[str, Any]:
+    """Run every strategy over every image; cases are keyed ``image/strategy``"""
+    cases: Dict[str, Dict[str, Any]] = {}
+    for image in images:
+        pixels = image.load()
+        for strategy in strategies:
+            if image.strategies is not None and strategy not in image.strategies:
+                continue
+            case = run_case(pixels, strategy, target_time, timeout, isolate)
+            case['image'], case['kind'], case['strategy'] = image.name, image.kind, strategy
+            cases[f"{image.name}/{strategy}"] = case
+            if verbose:
+                print(format_case(f"{image.name}/{strategy}", case))
+
+    return {
+        'version': 1,
+        'created_at': datetime.utcnow().isoformat(),
+        'target_time': target_time,
+        'system': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'cases': cases,
+    }
+
+
+def format_case(key: str, case: Dict[str, Any]) -> str:
+    if case['status'] != 'ok':
+        return f"{key:<45} {case['status'].upper():>8}  {case.get('error', '')}"
+    return (f"{key:<45} {case['total_seconds']:>7.3f}s  +{case['rss_growth_mb'] or 0:>6.1f}MB  "
+            f"{case['svg_bytes']:>8}B  {case['num_elements']:>5} el  sim {case['similarity']:.3f}")
+
+
+@dataclass
+class Regression:
+    """One metric of one case that got worse than the baseline allows"""
+    case: str
+    metric: str
+    baseline: Any
+    current: Any
+    threshold: float
+
+    def describe(self) -> str:
+        return f"{self.case}: {self.metric} {self.baseline} -> {self.current} (threshold {self.threshold})"
+
+
+def _grew(baseline: Optional[float], current: Optional[float], threshold: float, floor: float = 0.0) -> bool:
+    if baseline is None or current is None:
+        return False
+    return current > baseline * (1.0 + threshold) and current - baseline > floor
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any],
+            thresholds: Optional[Dict[str, float]] = None) -> List[Regression]:
+    """Metrics that regressed past their thresholds; cases new since the baseline are ignored"""
+    thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+    regressions = []
+
+    for key, case in results['cases'].items():
+        base = baseline.get('cases', {}).get(key)
+        if base is None or base['status'] != 'ok':
+            continue
+        if case['status'] != 'ok':
+            regressions.append(Regression(key, 'status', 'ok', case['status'], 0.0))
+            continue
+
+        if _grew(base['total_seconds'], case['total_seconds'], thresholds['total_seconds'], MIN_SECONDS):
+            regressions.append(Regression(key, 'total_seconds', base['total_seconds'],
+                                          case['total_seconds'], thresholds['total_seconds']))
+        for stage, seconds in base.get('stages', {}).items():
+            current = case.get('stages', {}).get(stage)
+            if _grew(seconds, current, thresholds['stage_seconds'], MIN_SECONDS):
+                regressions.append(Regression(key, f"stage:{stage}", seconds, current, thresholds['stage_seconds']))
+        for metric, floor in (('rss_growth_mb', MIN_RSS_MB), ('svg_bytes', 0), ('num_elements', 0)):
+            if _grew(base.get(metric), case.get(metric), thresholds[metric], floor):
+                regressions.append(Regression(key, metric, base[metric], case[metric], thresholds[metric]))
+        if base['similarity'] - case['similarity'] > thresholds['similarity']:
+            regressions.append(Regression(key, 'similarity', base['similarity'],
+                                          case['similarity'], thresholds['similarity']))
+
+    return regressions
+
+
+# --- command line -----------------------------------------------------------
+
+def add_arguments(parser):
+    """Options of ``python -m vectorcraft bench``"""
+    parser.add_argument('--corpus', default=DEFAULT_MANIFEST, help='corpus manifest (JSON)')
+    parser.add_argument('--images', help='comma-separated image names (default: whole corpus)')
+    parser.add_argument('--strategies', default=','.join(STRATEGIES), help='comma-separated strategies')
+    parser.add_argument('--quick', action='store_true', help="skip images tagged 'huge'")
+    parser.add_argument('--target-time', type=float, default=30.0, help='target_time passed to the pipeline')
+    parser.add_argument('--timeout', type=float, default=300.0, help='seconds before a case is killed')
+    parser.add_argument('--no-isolate', action='store_true', help='run cases in-process (RSS growth is then cumulative)')
+    parser.add_argument('--output', default='bench_results.json', help='where to write the JSON results')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline results to diff against')
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--threshold', action='append', default=[], metavar='METRIC=VALUE',
+                        help=f"override a regression threshold ({', '.join(DEFAULT_THRESHOLDS)})")
+    parser.set_defaults(func=main)
+
+
+def _parse_thresholds(items: List[str]) -> Dict[str, float]:
+    thresholds = {}
+    for item in items:
+        metric, _, value = item.partition('=')
+        if metric not in DEFAULT_THRESHOLDS or not value:
+            raise SystemExit(f"Unknown threshold '{item}'; expected one of {', '.join(DEFAULT_THRESHOLDS)}")
+        thresholds[metric] = float(value)
+    return thresholds
+
+
+def main(args) -> int:
+    """Run the benchmark, write the results and diff them against the baseline; 1 on regression"""
+    thresholds = _parse_thresholds(args.threshold)
+    images = load_corpus(args.corpus)
+    if args.images:
+        wanted = set(args.images.split(','))
+        images = [image for image in images if image.name in wanted]
+    if args.quick:
+        images = [image for image in images if 'huge' not in image.tags]
+    strategies = [s for s in args.strategies.split(',') if s]
+
+    results = run_benchmark(images, strategies, args.target_time, args.timeout, isolate=not args.no_isolate)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📄 Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📌 Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️  No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, thresholds)
+    if not regressions:
+        print("✅ No regressions against the baseline")
+        return 0
+
+    print(f"❌ {len(regressions)} regression(s) against the baseline:")
+    for regression in regressions:
+        print(f"   {regression.describe()}")
+    return 1
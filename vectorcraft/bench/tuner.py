@@ -0,0 +1,332 @@
+import os
+import json
+import math
+import time
+import itertools
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.scheduler import _can_fork
+from ..strategies.real_vtracer import DEFAULT_PRESETS_PATH, RealVTracerStrategy
+from ..utils.content_classifier import ContentClassifier
+from ..utils.image_context import ImageContext
+from ..utils.similarity_calculator import SimilarityCalculator
+from .corpus import DEFAULT_MANIFEST, CorpusImage, load_corpus
+
+# Values swept for each tuned parameter; every other adaptive parameter is kept
+PARAMETER_GRID: Dict[str, List[Any]] = {
+    'filter_speckle': [2, 4, 8, 16],
+    'color_precision': [4, 6, 8],
+    'layer_difference': [8, 16, 32],
+    'corner_threshold': [30, 60, 90],
+    'max_iterations': [5, 10, 20],
+}
+
+# Longer image side per successive-halving rung; 0 is full size
+DEFAULT_RUNGS = (256, 512, 0)
+
+# Similarity a recommendation may give up against the untuned adaptive parameters
+DEFAULT_TOLERANCE = 0.01
+
+# Per-process state of the trial workers, inherited through fork so each image is decoded once
+_images: Dict[str, ImageContext] = {}
+_resized: Dict[Tuple[str, int], ImageContext] = {}
+_bases: Dict[str, Dict[str, Any]] = {}  # Untuned adaptive VTracer parameters per image
+_tools: Dict[str, Any] = {}
+
+
+@dataclass
+class Trial:
+    """One parameter setting measured over the images of a content class"""
+    params: Dict[str, Any]                 # Tuned parameters only
+    seconds: float = 0.0                   # Mean VTracer wall time per image
+    svg_bytes: float = 0.0                 # Mean SVG size
+    similarity: float = 0.0                # Mean similarity to the source pixels
+    min_similarity: float = 0.0
+    failures: int = 0
+    per_image: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def dominates(self, other: 'Trial') -> bool:
+        """Pareto dominance: no worse on time, size and similarity, and better on one"""
+        no_worse = (self.seconds <= other.seconds and self.svg_bytes <= other.svg_bytes and
+                    self.similarity >= other.similarity)
+        better = (self.seconds < other.seconds or self.svg_bytes < other.svg_bytes or
+                  self.similarity > other.similarity)
+        return no_worse and better
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'params': self.params,
+            'seconds': round(self.seconds, 4),
+            'svg_bytes': int(round(self.svg_bytes)),
+            'similarity': round(self.similarity, 4),
+            'min_similarity': round(self.min_similarity, 4),
+            'failures': self.failures,
+        }
+
+
+def candidate_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def pareto_front(trials: List[Trial]) -> List[Trial]:
+    """Trials no other trial dominates, fastest first"""
+    front = [t for t in trials if t.failures == 0 and
+             not any(other.dominates(t) for other in trials if other.failures == 0)]
+    return sorted(front, key=lambda t: (t.seconds, t.svg_bytes))
+
+
+def recommend(trials: List[Trial], baseline: Trial, tolerance: float = DEFAULT_TOLERANCE,
+              min_similarity: Optional[float] = None) -> Trial:
+    """Fastest trial whose similarity meets the floor; the most similar one if none does.
+
+    The floor is the baseline preset's similarity less ``tolerance``, raised
+    to ``min_similarity`` when one is given.
+    """
+    floor = baseline.similarity - tolerance
+    if min_similarity is not None:
+        floor = max(floor, min_similarity)
+    usable = [t for t in trials if t.failures == 0]
+    passing = [t for t in usable if t.similarity >= floor]
+    if passing:
+        return min(passing, key=lambda t: (t.seconds, t.svg_bytes, -t.similarity))
+    return max(usable or trials, key=lambda t: t.similarity)
+
+
+def adaptive_base(strategy: RealVTracerStrategy, context: ImageContext) -> Dict[str, Any]:
+    """The parameters production derives for an image before any tuned preset is applied.
+
+    The optimized pipeline chooses them on the image downsampled to at most
+    800px (the tiled path's preview, the moderate downsampling tier), so the
+    base is chosen at that size too.
+    """
+    return strategy._get_adaptive_parameters(context.resized(800))
+
+
+def _measure(job: Tuple[str, int, Dict[str, Any]]) -> Dict[str, float]:
+    """Trace one image at one rung size with its adaptive parameters plus one override set, and score it"""
+    name, size, params = job
+    context = _images[name]
+    if size:
+        if (name, size) not in _resized:
+            _resized[(name, size)] = context.resized(size)
+        context = _resized[(name, size)]
+    if not _tools:
+        _tools['strategy'] = RealVTracerStrategy()
+        _tools['similarity'] = SimilarityCalculator()
+
+    try:
+        start = time.perf_counter()
+        svg = _tools['strategy'].convert_pixels(context, dict(_bases[name], **params))
+        seconds = time.perf_counter() - start
+    except Exception as e:
+        return {'error': str(e)}
+
+    target = np.ascontiguousarray(context.uint8[..., 2::-1]).astype(np.float32) / 255.0  # RGBA -> BGR
+    similarity = _tools['similarity'].calculate_comprehensive_similarity(svg, target)
+    return {'seconds': seconds, 'svg_bytes': len(svg.encode()), 'similarity': similarity}
+
+
+def evaluate(candidates: List[Dict[str, Any]], image_names: List[str], size: int,
+             executor: Optional[ProcessPoolExecutor] = None) -> List[Trial]:
+    """Measure every candidate on every image at one rung size"""
+    jobs = [(name, size, params) for params in candidates for name in image_names]
+    if executor is None:
+        measurements = list(map(_measure, jobs))
+    else:
+        # Chunks keep the pipe traffic low without leaving workers idle at the end of a rung
+        measurements = list(executor.map(_measure, jobs, chunksize=max(1, len(jobs) // 64)))
+
+    trials = []
+    for position, params in enumerate(candidates):
+        trial = Trial(params=params)
+        for name, measured in zip(image_names, measurements[position * len(image_names):]):
+            if 'error' in measured:
+                trial.failures += 1
+            trial.per_image[name] = measured
+        scored = [m for m in trial.per_image.values() if 'error' not in m]
+        if scored:
+            trial.seconds = float(np.mean([m['seconds'] for m in scored]))
+            trial.svg_bytes = float(np.mean([m['svg_bytes'] for m in scored]))
+            trial.similarity = float(np.mean([m['similarity'] for m in scored]))
+            trial.min_similarity = float(min(m['similarity'] for m in scored))
+        trials.append(trial)
+    return trials
+
+
+def successive_halving(candidates: List[Dict[str, Any]], image_names: List[str],
+                       rungs: Sequence[int] = DEFAULT_RUNGS, eta: int = 3, tolerance: float = DEFAULT_TOLERANCE,
+                       executor: Optional[ProcessPoolExecutor] = None,
+                       verbose: bool = True) -> Tuple[List[Trial], Trial]:
+    """Screen candidates on downsampled images, keeping the best 1/eta for each larger rung.
+
+    Candidates are ranked as ``recommend`` would pick them: meeting the
+    similarity floor first, then by time. The baseline (the empty parameter
+    set, i.e. the untuned adaptive parameters) runs on every rung. Returns the trials of
+    the last rung and the baseline's trial on it.
+    """
+    survivors = [{}] + [c for c in candidates if c]
+    for position, size in enumerate(rungs):
+        trials = evaluate(survivors, image_names, size, executor)
+        baseline = trials[0]
+        if verbose:
+            print(f"   rung {size or 'full'}: {len(trials)} settings on {len(image_names)} image(s)")
+        if position == len(rungs) - 1:
+            return trials[1:] + [baseline], baseline
+
+        floor = baseline.similarity - tolerance
+        ranked = sorted(trials[1:], key=lambda t: (t.failures > 0, t.similarity < floor, t.seconds, t.svg_bytes))
+        keep = max(1, math.ceil(len(ranked) / eta))
+        survivors = [{}] + [t.params for t in ranked[:keep]]
+
+
+def classify_images(images: List[CorpusImage], pixels: Dict[str, np.ndarray]) -> Dict[str, List[str]]:
+    """Group images by the VTracer preset the content classifier picks for them"""
+    classifier = ContentClassifier()
+    classes: Dict[str, List[str]] = {}
+    for image in images:
+        classes.setdefault(classifier.classify(pixels[image.name]).image_type, []).append(image.name)
+    return classes
+
+
+def tune(images: List[CorpusImage], grid: Optional[Dict[str, Sequence[Any]]] = None,
+         rungs: Sequence[int] = DEFAULT_RUNGS, eta: int = 3, tolerance: float = DEFAULT_TOLERANCE,
+         min_similarity: Optional[float] = None, workers: Optional[int] = None,
+         classes: Optional[List[str]] = None, verbose: bool = True) -> Dict[str, Any]:
+    """Search VTracer parameters per content class and recommend a preset for each.
+
+    Candidates override the adaptive parameters production derives for each
+    image, since tuned presets are applied on top of those. Every image is
+    decoded once; trials run in forked worker processes that inherit the
+    pixels. The result holds each class's Pareto front over (time, SVG size,
+    similarity) and, under ``presets``, the recommended overrides per class
+    in the form ``RealVTracerStrategy`` loads.
+    """
+    grid = grid or PARAMETER_GRID
+    workers = workers if workers is not None else os.cpu_count() or 1
+    candidates = candidate_grid(grid)
+    strategy = RealVTracerStrategy()
+    if not strategy.available:
+        raise RuntimeError("VTracer is not available")
+
+    pixels = {image.name: image.load() for image in images}
+    _images.clear()
+    _resized.clear()
+    _images.update({name: ImageContext(p) for name, p in pixels.items()})
+    _bases.clear()
+    _bases.update({name: adaptive_base(strategy, context) for name, context in _images.items()})
+    groups = classify_images(images, pixels)
+    if classes:
+        groups = {name: members for name, members in groups.items() if name in classes}
+
+    executor = None
+    if workers > 1 and _can_fork():
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('fork'))
+
+    results: Dict[str, Any] = {}
+    presets: Dict[str, Dict[str, Any]] = {}
+    try:
+        for image_type, names in sorted(groups.items()):
+            if verbose:
+                print(f"🎛️  {image_type}: {len(candidates)} settings, images {', '.join(names)}")
+            trials, baseline = successive_halving(candidates, names, rungs, eta, tolerance, executor, verbose)
+            best = recommend(trials, baseline, tolerance, min_similarity)
+            presets[image_type] = dict(best.params)
+            results[image_type] = {
+                'images': names,
+                'baseline': baseline.to_dict(),
+                'recommended': best.to_dict(),
+                'speedup': round(baseline.seconds / best.seconds, 2) if best.seconds > 0 else None,
+                'pareto': [t.to_dict() for t in pareto_front(trials)],
+            }
+            if verbose:
+                print(format_class(image_type, results[image_type]))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        'version': 1,
+        'created_at': datetime.utcnow().isoformat(),
+        'grid': {name: list(values) for name, values in grid.items()},
+        'rungs': list(rungs),
+        'eta': eta,
+        'tolerance': tolerance,
+        'min_similarity': min_similarity,
+        'classes': results,
+        'presets': presets,
+    }
+
+
+def format_class(image_type: str, result: Dict[str, Any]) -> str:
+    base, best = result['baseline'], result['recommended']
+    return (f"   {image_type}: {base['seconds']:.3f}s sim {base['similarity']:.3f} -> "
+            f"{best['seconds']:.3f}s sim {best['similarity']:.3f} ({result['speedup']}x), "
+            f"{len(result['pareto'])} on the Pareto front, {best['params']}")
+
+
+# --- command line -----------------------------------------------------------
+
+def add_arguments(parser):
+    """Options of ``python -m vectorcraft tune``"""
+    parser.add_argument('--corpus', default=DEFAULT_MANIFEST, help='corpus manifest (JSON)')
+    parser.add_argument('--images', help='comma-separated image names (default: whole corpus)')
+    parser.add_argument('--quick', action='store_true', help="skip images tagged 'huge'")
+    parser.add_argument('--classes', help='comma-separated content classes to tune (default: all found)')
+    parser.add_argument('--rungs', default=','.join(str(r) for r in DEFAULT_RUNGS),
+                        help='longer image side per successive-halving rung, 0 for full size')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=V1,V2,...',
+                        help=f"sweep only the given parameters and values (default grid: {', '.join(PARAMETER_GRID)})")
+    parser.add_argument('--eta', type=int, default=3, help='keep the best 1/eta settings after each rung')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="similarity a recommendation may lose against the untuned adaptive parameters")
+    parser.add_argument('--min-similarity', type=float, help='absolute similarity floor')
+    parser.add_argument('--workers', type=int, help='trial processes (default: one per CPU)')
+    parser.add_argument('--output', default=DEFAULT_PRESETS_PATH,
+                        help='where to write the results (default: the presets file the pipeline loads; '
+                             'elsewhere, point VECTORCRAFT_VTRACER_PRESETS at it)')
+    parser.set_defaults(func=main)
+
+
+def _number(value: str) -> Any:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _parse_grid(items: List[str]) -> Optional[Dict[str, List[Any]]]:
+    grid = {}
+    for item in items:
+        name, _, values = item.partition('=')
+        if not name or not values:
+            raise SystemExit(f"Bad --param '{item}'; expected NAME=V1,V2,...")
+        grid[name] = [_number(value) for value in values.split(',') if value]
+    return grid or None
+
+
+def main(args) -> int:
+    """Tune every content class found in the corpus and write the presets file"""
+    grid = _parse_grid(args.param)
+    images = load_corpus(args.corpus)
+    if args.images:
+        wanted = set(args.images.split(','))
+        images = [image for image in images if image.name in wanted]
+    if args.quick:
+        images = [image for image in images if 'huge' not in image.tags]
+    rungs = [int(r) for r in args.rungs.split(',') if r]
+    classes = [c for c in args.classes.split(',') if c] if args.classes else None
+
+    results = tune(images, grid=grid, rungs=rungs, eta=args.eta, tolerance=args.tolerance,
+                   min_similarity=args.min_similarity, workers=args.workers, classes=classes)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📄 Presets written to {args.output}")
+    return 0
@@ -0,0 +1,100 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..utils.image_context import ImageContext
+from ..utils.performance import OptimizedImageProcessor
+from .scheduler import StageScheduler
+
+
+class PreprocessingArtifacts:
+    """Preprocessing products of one request, computed the first time a strategy asks for them.
+
+    Each artifact is registered by name with a factory and the scheduler stage
+    it is timed under. Nothing is computed up front, so a strategy that only
+    reads the pixels (real VTracer) never pays for edge maps or k-means
+    quantization; ``summary()`` lists what was computed and what was not.
+    """
+
+    def __init__(self, context: ImageContext, scheduler: Optional[StageScheduler] = None):
+        self.context = context
+        self.scheduler = scheduler
+        self._factories: Dict[str, Tuple[Callable[[], Any], str, Optional[Callable[[], Any]]]] = {}
+        self._values: Dict[str, Any] = {}
+        self._computed: List[str] = []
+        # Per-request ClassicalTracer arguments (approx_epsilon, contour_min_area)
+        self.trace_params: Dict[str, float] = {}
+        # Content class (ContentClassification.image_type) selecting the tuned VTracer preset
+        self.image_type: Optional[str] = None
+
+    @classmethod
+    def standard(cls, context: ImageContext, image_processor,
+                 scheduler: Optional[StageScheduler] = None) -> 'PreprocessingArtifacts':
+        """The artifacts of the hybrid pipeline: content metadata, edge map and 8-color quantization"""
+        artifacts = cls(context, scheduler)
+
+        def analyze_preview():
+            metadata = image_processor.analyze_content(context.resized(256))
+            metadata.width, metadata.height = context.width, context.height
+            return metadata
+
+        # Content analysis drops to a 256px preview, and k-means to uniform
+        # bit-depth quantization, when the full computation does not fit the budget
+        artifacts.register('metadata', lambda: image_processor.analyze_content(context),
+                           stage='analyze_content', degrade=analyze_preview)
+        artifacts.register('edge_map', lambda: image_processor.create_edge_map(context))
+        artifacts.register('quantized_image',
+                           lambda: image_processor.perceptual_color_quantization(context, n_colors=8),
+                           stage='quantize',
+                           degrade=lambda: OptimizedImageProcessor.fast_color_quantization(context.float32, 8))
+        return artifacts
+
+    def trace_options(self, **overrides) -> Dict[str, float]:
+        """ClassicalTracer keyword arguments: the request's trace params, then the caller's overrides"""
+        options = dict(self.trace_params)
+        options.update(overrides)
+        return options
+
+    def register(self, name: str, factory: Callable[[], Any], stage: Optional[str] = None,
+                 degrade: Optional[Callable[[], Any]] = None):
+        """Declare (or replace) how an artifact is computed; drops any value already computed"""
+        self._factories[name] = (factory, stage or name, degrade)
+        self._values.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """The named artifact, computed and memoized on first access"""
+        if name not in self._values:
+            factory, stage, degrade = self._factories[name]
+            if self.scheduler is None:
+                value = factory()
+            else:
+                value = self.scheduler.run(stage, factory, optional=degrade is not None, degrade=degrade)
+            self._values[name] = value
+            self._computed.append(name)
+        return self._values[name]
+
+    __getitem__ = get
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories
+
+    def is_computed(self, name: str) -> bool:
+        return name in self._values
+
+    @property
+    def metadata(self):
+        return self.get('metadata')
+
+    @property
+    def edge_map(self):
+        return self.get('edge_map')
+
+    @property
+    def quantized_image(self):
+        return self.get('quantized_image')
+
+    def summary(self) -> Dict[str, List[str]]:
+        """Which artifacts the request computed, in order, and which it never needed"""
+        return {
+            'computed': list(self._computed),
+            'unused': [name for name in self._factories if name not in self._values]
+        }
+
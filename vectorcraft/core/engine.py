@@ -0,0 +1,539 @@
+import os
+import time
+import atexit
+import uuid
+import queue
+import signal
+import threading
+import multiprocessing as mp
+from contextlib import contextmanager
+from multiprocessing import shared_memory, resource_tracker
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .request import VectorizationRequest
+from ..utils.tracing import tracer
+
+
+class VectorizationTimeout(TimeoutError):
+    """A job ran past its deadline"""
+
+
+class VectorizationWorkerError(RuntimeError):
+    """A worker process died while running a job"""
+
+
+class _JobInterrupted(BaseException):
+    """Raised by the worker alarm; a BaseException so pipeline ``except Exception`` blocks don't swallow it"""
+
+
+# Per-worker state, populated once by _warm_worker
+_worker_vectorizers: Dict[str, Any] = {}
+
+# Workers are started from Flask request threads and restarted from dispatcher threads; a
+# fork there could hand the child locks held by other threads, so workers come from the
+# single-threaded fork server (or a fresh interpreter) and warm themselves in _init_worker.
+_mp_context = mp.get_context('forkserver' if 'forkserver' in mp.get_all_start_methods() else 'spawn')
+
+
+def _default_workers() -> int:
+    """Engine worker count unless given explicitly: ``VECTORCRAFT_ENGINE_WORKERS``, else up to 4"""
+    return int(os.environ.get('VECTORCRAFT_ENGINE_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+def _warm_worker():
+    """Process initializer: import the heavy libraries and build vectorizers once"""
+    import cv2  # noqa: F401
+    import sklearn.cluster  # noqa: F401
+    try:
+        import vtracer  # noqa: F401
+    except ImportError:
+        pass
+
+    from .hybrid_vectorizer import HybridVectorizer
+    from .optimized_vectorizer import OptimizedVectorizer
+
+    # Results are cached by the service; per-worker image caches would only hold stale pixels
+    _worker_vectorizers['standard'] = HybridVectorizer()
+    _worker_vectorizers['optimized'] = OptimizedVectorizer(enable_caching=False)
+    print(f"🔥 Vectorization worker {os.getpid()} warm")
+
+
+def _init_worker():
+    """Worker initializer: make sure no caller span is current, then warm up"""
+    tracer.forget_current()
+    _warm_worker()
+
+
+def _on_job_timeout(signum, frame):
+    raise _JobInterrupted()
+
+
+def _job_vectorizer(optimized: bool):
+    if not _worker_vectorizers:
+        _warm_worker()  # Inline execution or a pool started without the initializer
+    return _worker_vectorizers['optimized' if optimized else 'standard']
+
+
+@contextmanager
+def _job_alarm(timeout: Optional[float]):
+    """Interrupt the job from inside the worker so the process is free for the next one.
+
+    Native calls (e.g. VTracer) finish before the signal is handled; a job
+    stuck in one is killed with its worker by the engine's dispatcher.
+    """
+    use_alarm = timeout is not None and threading.current_thread() is threading.main_thread()
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_job_timeout)
+        signal.setitimer(signal.ITIMER_REAL, max(timeout, 1e-3))
+    try:
+        yield
+    except _JobInterrupted:
+        raise VectorizationTimeout(f"Vectorization job exceeded its {timeout}s time limit")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def _job_trace(trace_id: Optional[str]):
+    """Span of one job; in a pool worker it is a detached trace shipped back with the result"""
+    if tracer.current() is not None:
+        return tracer.span('engine.job')  # Inline: the caller's trace is live in this process
+    return tracer.trace('engine.job', trace_id=trace_id, detached=True, pid=os.getpid())
+
+
+def _run_job(shm_name: str, shape: Tuple[int, ...], dtype: str, optimized: bool,
+             target_time: Optional[float], request: Optional[VectorizationRequest],
+             timeout: Optional[float], progress=None, trace_id: Optional[str] = None):
+    """Worker entry point: attach to the shared pixels and vectorize them.
+
+    With a ``progress`` queue the job runs progressively: intermediate results
+    are put on the queue as they are produced and the final one is returned.
+    A pool worker's spans travel back in ``metadata['trace']`` (see ``_adopt_trace``).
+    """
+    vectorizer = _job_vectorizer(optimized)
+
+    with _job_trace(trace_id) as span:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            # Copy out so nothing in the pipeline keeps the segment mapped after we return
+            image = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+
+        with _job_alarm(timeout or None):
+            if progress is None:
+                result = vectorizer.vectorize(image, target_time=target_time, request=request)
+            else:
+                result = None
+                for result in vectorizer.vectorize_progressive(image, target_time=target_time, request=request):
+                    if not result.metadata['progressive']['final']:
+                        progress.put(result)
+
+    if getattr(span, 'detached', False) and result is not None:
+        result.metadata['trace'] = span.to_dict()
+    return result
+
+
+def _worker_main(conn):
+    """Engine worker process: run jobs from the pipe until told to stop"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C is the parent's to handle
+    _init_worker()
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        if message[0] == 'ping':
+            conn.send(('pong', os.getpid()))
+            continue
+
+        try:
+            conn.send(('ok', _run_job(*message[1])))
+        except BaseException as e:
+            try:
+                conn.send(('error', e))
+            except Exception:
+                conn.send(('error', VectorizationWorkerError(f"{type(e).__name__}: {e}")))
+
+
+@dataclass
+class _Job:
+    args: Tuple[Any, ...]
+    timeout: Optional[float]
+    future: Future
+
+
+class _Worker:
+    """One warm worker process and the pipe its jobs go through"""
+
+    def __init__(self):
+        self.process = None
+        self.conn = None
+        self.jobs = 0
+        self.restarts = 0
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process is not None else None
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        self.conn, child_conn = mp.Pipe()
+        # Not daemonic, like ProcessPoolExecutor workers: jobs may fork (the scheduler's hard deadline)
+        self.process = _mp_context.Process(target=_worker_main, args=(child_conn,))
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, kill: bool = False):
+        if self.process is None:
+            return
+        if not kill and self.process.is_alive():
+            try:
+                self.conn.send(None)
+                self.process.join(2.0)
+            except (OSError, ValueError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.process = self.conn = None
+
+    def restart(self):
+        self.stop(kill=True)
+        self.restarts += 1
+        self.start()
+
+    def request(self, message, timeout: Optional[float]):
+        """Send a message and wait for the answer; None when ``timeout`` passes first"""
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            return None
+        try:
+            return self.conn.recv()
+        except EOFError:
+            self.process.join(1.0)
+            raise VectorizationWorkerError(f"Vectorization worker exited with code {self.process.exitcode}")
+
+
+def _adopt_trace(result):
+    """Graft the spans a pool worker recorded for ``result`` into the caller's trace"""
+    exported = result.metadata.pop('trace', None) if result is not None else None
+    tracer.adopt(exported)
+    return result
+
+
+@dataclass
+class VectorizationJob:
+    """Handle for a submitted job"""
+    job_id: str
+    future: Future
+    timeout: Optional[float]
+    submitted_at: float = field(default_factory=time.time)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None):
+        """Wait for the VectorizationResult, raising VectorizationTimeout past the deadline"""
+        if timeout is None and self.timeout is not None:
+            # Small grace period so the worker-side alarm reports first
+            timeout = max(0.0, self.timeout - (time.time() - self.submitted_at)) + 5.0
+        try:
+            return self.future.result(timeout=timeout)
+        except VectorizationTimeout:
+            raise  # Reported by the worker's alarm, or the dispatcher killed the worker
+        except FutureTimeoutError:
+            self.future.cancel()  # Still queued: no worker should pick it up now
+            raise VectorizationTimeout(f"Job {self.job_id} did not finish within {self.timeout}s")
+
+
+class VectorizationEngine:
+    """Run vectorization jobs in a pool of warm worker processes.
+
+    Workers import cv2/vtracer/sklearn and build their vectorizers once at
+    start-up, so jobs only pay for the vectorization itself and pure-Python
+    stages run without contending for the caller's GIL. Pixels are decoded
+    in the caller and handed to workers through shared memory rather than
+    pickled through the pipe. Each worker has a dispatcher thread that feeds
+    it jobs from a shared queue; the worker's alarm ends most overruns, and
+    a job still running ``kill_grace`` seconds past its timeout (stuck in
+    native code such as VTracer) is failed and its worker killed and
+    replaced, so pathological images cannot exhaust the pool. Where a pool
+    cannot be used (daemonic Celery prefork children, ``max_workers=0``)
+    jobs run inline.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, default_timeout: Optional[float] = 300.0,
+                 kill_grace: float = 5.0):
+        if max_workers is None:
+            max_workers = _default_workers()
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.kill_grace = kill_grace
+        self._queue: queue.Queue = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._threads: List[threading.Thread] = []
+        self._manager = None  # Serves the progress queues of streamed jobs, started on first use
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._atexit_registered = False
+
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'timeouts': 0, 'inline': 0, 'streamed': 0,
+                      'restarts': 0}
+
+    @property
+    def inline(self) -> bool:
+        """True when jobs run in the calling process"""
+        return self.max_workers <= 0 or mp.current_process().daemon
+
+    def start(self):
+        """Start and warm the workers (otherwise done on first submit)"""
+        if self.inline:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            # Workers must share our tracker, which owns the shared-memory segments we unlink
+            resource_tracker.ensure_running()
+            if not self._atexit_registered:
+                # Runs before multiprocessing joins its non-daemonic children at exit
+                atexit.register(self.shutdown, wait=False)
+                self._atexit_registered = True
+            self._workers = [_Worker() for _ in range(self.max_workers)]
+            for worker in self._workers:
+                worker.start()
+            # A worker answers its first ping once its initializer has run
+            for worker in self._workers:
+                worker.request(('ping',), timeout=None)
+            for index, worker in enumerate(self._workers):
+                thread = threading.Thread(target=self._serve, args=(worker,), daemon=True,
+                                          name=f'vectorization-worker-{index}')
+                self._threads.append(thread)
+                thread.start()
+            print(f"🏭 Vectorization engine started with {self.max_workers} warm workers")
+
+    def shutdown(self, wait: bool = True):
+        """Cancel queued jobs and stop the workers, after running jobs finish when ``wait``"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job.future.cancel()
+            for _ in threads:
+                self._queue.put(None)
+            if wait:
+                for thread in threads:
+                    thread.join()
+            for worker in self._workers:
+                worker.stop(kill=not wait)
+            self._workers = []
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+    def submit(self, image_path: str, request: Optional[VectorizationRequest] = None,
+               target_time: Optional[float] = None, optimized: bool = True,
+               timeout: Optional[float] = None, progress=None) -> VectorizationJob:
+        """Queue a vectorization job and return immediately.
+
+        ``progress`` is a queue that receives intermediate results (see ``stream``).
+        """
+        timeout = timeout if timeout is not None else self.default_timeout
+        with tracer.span('engine.decode'):
+            pixels = np.array(Image.open(image_path).convert('RGBA'))
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, pixels.nbytes))
+        try:
+            np.ndarray(pixels.shape, dtype=pixels.dtype, buffer=shm.buf)[...] = pixels
+            args = (shm.name, pixels.shape, pixels.dtype.str, optimized, target_time, request, timeout, progress,
+                    tracer.current_trace_id())
+            del pixels
+
+            self._count('submitted')
+            future = self._submit(args, timeout)
+        except BaseException:
+            # No job owns the segment yet, so nothing else will unlink it
+            shm.close()
+            shm.unlink()
+            raise
+        future.add_done_callback(lambda f: self._finish(f, shm))
+        return VectorizationJob(job_id=str(uuid.uuid4()), future=future, timeout=timeout)
+
+    def vectorize(self, image_path: str, request: Optional[VectorizationRequest] = None,
+                  target_time: Optional[float] = None, optimized: bool = True,
+                  timeout: Optional[float] = None):
+        """Submit a job and wait for its VectorizationResult"""
+        return _adopt_trace(self.submit(image_path, request, target_time, optimized, timeout).result())
+
+    def stream(self, image_path: str, request: Optional[VectorizationRequest] = None,
+               target_time: Optional[float] = None, optimized: bool = True,
+               timeout: Optional[float] = None) -> Iterator[Any]:
+        """Vectorize progressively: yield a fast preview as soon as it exists, then the final result.
+
+        Pool workers hand intermediate results back through a manager queue
+        while they keep refining; inline, the pipeline generator is driven
+        directly. Each result's ``metadata['progressive']['final']`` tells the
+        caller whether more will follow.
+        """
+        timeout = timeout if timeout is not None else self.default_timeout
+        self._count('streamed')
+        if self.inline:
+            yield from self._stream_inline(image_path, request, target_time, optimized, timeout)
+            return
+
+        progress = self._progress_queue()
+        job = self.submit(image_path, request, target_time, optimized, timeout, progress=progress)
+        give_up = job.submitted_at + timeout + 5.0 if timeout else None
+        while not job.done() and (give_up is None or time.time() < give_up):
+            try:
+                yield progress.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        # The worker puts every intermediate result before it returns the final one
+        while True:
+            try:
+                yield progress.get_nowait()
+            except queue.Empty:
+                break
+        yield _adopt_trace(job.result())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'workers': 0 if self.inline else self.max_workers,
+            'running': bool(self._threads)
+        }
+
+    def _progress_queue(self):
+        with self._lock:
+            if self._manager is None:
+                self._manager = _mp_context.Manager()
+            return self._manager.Queue()
+
+    def _stream_inline(self, image_path: str, request: Optional[VectorizationRequest],
+                       target_time: Optional[float], optimized: bool,
+                       timeout: Optional[float]) -> Iterator[Any]:
+        """Drive the progressive pipeline in this process, timing only the pipeline's own steps"""
+        self._count('submitted')
+        self._count('inline')
+        with tracer.span('engine.decode'):
+            pixels = np.array(Image.open(image_path).convert('RGBA'))
+        results = _job_vectorizer(optimized).vectorize_progressive(pixels, target_time=target_time, request=request)
+        deadline = time.time() + timeout if timeout else None
+
+        try:
+            while True:
+                # The alarm is disarmed while the caller handles a yielded result
+                with _job_alarm(deadline - time.time() if deadline else None):
+                    result = next(results, None)
+                if result is None:
+                    break
+                yield result
+        except VectorizationTimeout:
+            self._count('timeouts')
+            raise
+        except Exception:
+            self._count('failed')
+            raise
+        self._count('completed')
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _submit(self, args, timeout: Optional[float]) -> Future:
+        if self.inline:
+            self._count('inline')
+            return self._run_inline(args)
+
+        self.start()
+        future = Future()
+        self._queue.put(_Job(args, timeout, future))
+        return future
+
+    def _serve(self, worker: _Worker):
+        """Dispatcher thread of one worker: hand it queued jobs one at a time"""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                continue  # The caller gave up while the job was queued
+            try:
+                job.future.set_result(self._run(worker, job))
+            except BaseException as e:
+                job.future.set_exception(e)
+
+    def _run(self, worker: _Worker, job: _Job):
+        if not worker.alive():
+            self._restart(worker, "died while idle")
+        worker.jobs += 1
+        limit = job.timeout + self.kill_grace if job.timeout else None
+        try:
+            answer = worker.request(('job', job.args), limit)
+        except (VectorizationWorkerError, OSError) as e:
+            # Died mid-job, e.g. OOM on a huge image
+            self._restart(worker, str(e))
+            raise VectorizationWorkerError(f"Vectorization worker crashed: {e}")
+        if answer is None:
+            # Past the alarm and the grace period: stuck in native code
+            self._restart(worker, f"exceeded the {job.timeout}s job limit")
+            raise VectorizationTimeout(f"Vectorization job exceeded its {job.timeout}s time limit")
+        status, payload = answer
+        if status == 'error':
+            raise payload
+        return payload
+
+    def _restart(self, worker: _Worker, reason: str):
+        print(f"⚠️  Vectorization worker {worker.pid} {reason}, restarting")
+        worker.restart()
+        self._count('restarts')
+
+    @staticmethod
+    def _run_inline(args) -> Future:
+        future = Future()
+        try:
+            future.set_result(_run_job(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def _finish(self, future: Future, shm: shared_memory.SharedMemory):
+        shm.close()
+        shm.unlink()
+
+        exception = future.exception() if not future.cancelled() else None
+        if isinstance(exception, VectorizationTimeout):
+            self._count('timeouts')
+        elif exception is not None or future.cancelled():
+            self._count('failed')
+        else:
+            self._count('completed')
+
+
+_engine: Optional[VectorizationEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> VectorizationEngine:
+    """Process-wide engine shared by the Flask routes and the Celery tasks"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = VectorizationEngine()
+        return _engine
@@ -1,16 +1,23 @@
 import numpy as np
 import cv2
 import time
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Union, Iterator
 from dataclasses import dataclass
 
 from ..utils.image_processor import ImageProcessor, ImageMetadata
+from ..utils.image_context import ImageContext
 from ..strategies.classical_tracer import ClassicalTracer
 from ..strategies.diff_optimizer import DifferentiableOptimizer
 from ..strategies.vtracer_inspired import VTracerInspiredStrategy
-from ..strategies.real_vtracer import RealVTracerStrategy
-from ..primitives.detector import PrimitiveDetector
+from ..strategies.real_vtracer import RealVTracerStrategy, RawSVGResult
+from ..primitives.detector import PrimitiveDetector, Circle
 from .svg_builder import SVGBuilder
+from ..geometry.kernels import as_points, to_tuples
+from ..geometry.spatial_index import GridIndex, box_around, box_from_xywh
+from ..utils.svg_optimizer import SVGOptimizer, DEFAULT_PRECISION
+from .request import VectorizationRequest
+from .scheduler import StageScheduler
+from .artifacts import PreprocessingArtifacts
 
 @dataclass
 class VectorizationResult:
@@ -37,56 +44,147 @@ class HybridVectorizer:
             'mixed': {'classical': 0.4, 'primitive': 0.3, 'diff': 0.3}
         }
     
-    def vectorize(self, image_path: str, target_time: float = 120.0) -> VectorizationResult:
-        """Main vectorization pipeline"""
+    def vectorize(self, image_path: Union[str, np.ndarray], target_time: float = 120.0,
+                  request: Optional[VectorizationRequest] = None) -> VectorizationResult:
+        """Main vectorization pipeline (``image_path`` may also be decoded RGBA pixels)"""
+        return self._last(self._pipeline(image_path, target_time, request))
+    
+    def vectorize_progressive(self, image_path: Union[str, np.ndarray], target_time: float = 120.0,
+                              request: Optional[VectorizationRequest] = None) -> Iterator[VectorizationResult]:
+        """Progressive pipeline: yields a coarse VTracer preview, then the final result.
+        
+        Both passes share the decoded pixels and the content analysis. Every
+        result carries ``metadata['progressive']`` with its stage and whether it
+        is the final one.
+        """
+        return self._pipeline(image_path, target_time, request, progressive=True)
+    
+    @staticmethod
+    def _last(results: Iterator[VectorizationResult]) -> VectorizationResult:
+        """Drain a pipeline and keep only its final result"""
+        result = None
+        for result in results:
+            pass
+        return result
+    
+    def _preview_result(self, context: ImageContext, request: VectorizationRequest,
+                        start_time: float) -> Optional[VectorizationResult]:
+        """Coarse VTracer trace of the shared context, the first result of a progressive run"""
+        if not self.real_vtracer.available:
+            return None
+        
+        try:
+            preview = self.real_vtracer.vectorize_preview(context, request.get_vtracer_params())
+        except Exception as e:
+            print(f"⚠️  Preview trace failed, continuing with the full pass: {e}")
+            return None
+        
+        return VectorizationResult(
+            svg_builder=preview,
+            processing_time=time.time() - start_time,
+            strategy_used='vtracer_preview',
+            quality_score=self._estimate_quality(preview, context.float32),
+            metadata={
+                'num_elements': preview.element_count,
+                'progressive': {'stage': 'preview', 'final': False}
+            }
+        )
+    
+    def _pipeline(self, image_path: Union[str, np.ndarray], target_time: float,
+                  request: Optional[VectorizationRequest], progressive: bool = False) -> Iterator[VectorizationResult]:
+        """Vectorization pipeline as a generator; yields a preview first when ``progressive``"""
         start_time = time.time()
+        request = request or VectorizationRequest()
+        target_time = request.target_time or target_time
         
-        # Load and analyze image
-        image = self.image_processor.load_image(image_path)
-        metadata = self.image_processor.analyze_content(image)
+        # Load once; every stage reads from the shared context
+        if isinstance(image_path, np.ndarray):
+            context = ImageContext(image_path)
+        else:
+            context = self.image_processor.load_context(image_path)
+        h, w = context.shape[:2]
         
-        # Preprocessing
-        processed_image = self.image_processor.preprocess(image)
-        edge_map = self.image_processor.create_edge_map(processed_image)
-        quantized_image = self.image_processor.perceptual_color_quantization(processed_image, n_colors=8)
+        if progressive:
+            preview = self._preview_result(context, request, start_time)
+            if preview is not None:
+                yield preview
+        scheduler = StageScheduler(target_time - (time.time() - start_time), h * w)
+        
+        # Preprocessing is lazy: each strategy computes only the artifacts it reads
+        artifacts = PreprocessingArtifacts.standard(context, self.image_processor, scheduler)
+        metadata = artifacts.metadata
         
         # Determine content type and strategy
         content_type = self._classify_content(metadata)
-        strategy = self._select_strategy(content_type, metadata, target_time)
+        strategy = request.strategy or self._select_strategy(content_type, metadata, target_time)
+        processed_image = context.float32
         
         # Execute vectorization strategy
         if strategy == 'hybrid_fast':
-            result = self._hybrid_fast_strategy(processed_image, edge_map, quantized_image, metadata)
+            result = self._hybrid_fast_strategy(processed_image, artifacts)
         elif strategy == 'primitive_focused':
-            result = self._primitive_focused_strategy(processed_image, edge_map, quantized_image, metadata)
+            result = self._primitive_focused_strategy(processed_image, artifacts)
         elif strategy == 'classical_refined':
-            result = self._classical_refined_strategy(processed_image, edge_map, quantized_image, metadata)
+            result = self._classical_refined_strategy(processed_image, artifacts)
         elif strategy == 'diff_optimized':
-            result = self._diff_optimized_strategy(processed_image, edge_map, quantized_image, metadata)
+            result = self._diff_optimized_strategy(processed_image, artifacts)
         elif strategy == 'logo_optimized':
-            result = self._logo_optimized_strategy(processed_image, edge_map, quantized_image, metadata, target_time)
+            result = self._logo_optimized_strategy(processed_image, artifacts, target_time)
         elif strategy == 'vtracer_high_fidelity':
-            result = self._vtracer_high_fidelity_strategy(processed_image, edge_map, quantized_image, metadata)
+            result = self._vtracer_high_fidelity_strategy(processed_image, artifacts, request)
         else:
             # Default to hybrid approach
-            result = self._hybrid_comprehensive_strategy(processed_image, edge_map, quantized_image, metadata, target_time)
-        
-        processing_time = time.time() - start_time
+            result = self._hybrid_comprehensive_strategy(processed_image, artifacts, target_time, request)
         
         # Calculate quality score
         quality_score = self._estimate_quality(result, processed_image)
+        result, svg_stats = self._optimize_output(result, request, scheduler)
         
-        return VectorizationResult(
+        final = VectorizationResult(
             svg_builder=result,
-            processing_time=processing_time,
+            processing_time=time.time() - start_time,
             strategy_used=strategy,
             quality_score=quality_score,
             metadata={
                 'content_type': content_type,
                 'image_metadata': metadata,
-                'num_elements': len(result.elements)
+                'num_elements': getattr(result, 'element_count', None) or len(result.elements),
+                'svg_optimization': svg_stats,
+                'schedule': scheduler.summary(),
+                'artifacts': artifacts.summary()
             }
         )
+        if progressive:
+            final.metadata['progressive'] = {'stage': 'final', 'final': True}
+        yield final
+    
+    def _optimize_output(self, result, request: VectorizationRequest,
+                         scheduler: Optional[StageScheduler] = None) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """Compact the final SVG; returns the (possibly replaced) result and the optimizer stats.
+        
+        The stage is optional, so a tight deadline or an optimizer error keeps
+        the raw output rather than failing the request.
+        """
+        if not request.optimize_svg:
+            return result, None
+        
+        svg = result.get_svg_string()
+        precision = request.svg_precision if request.svg_precision is not None else DEFAULT_PRECISION
+        optimizer = SVGOptimizer(precision)
+        try:
+            if scheduler is None:
+                optimized = optimizer.optimize_with_stats(svg)
+            else:
+                optimized = scheduler.run('svg_optimize', optimizer.optimize_with_stats, svg,
+                                          optional=True, pixels=len(svg))
+        except Exception as e:
+            print(f"⚠️  SVG optimization failed, keeping the raw output: {e}")
+            return result, None
+        if optimized is None:
+            return result, None  # Skipped: no budget left
+        
+        svg, stats = optimized
+        return RawSVGResult(svg, result.width, result.height), stats.to_dict()
     
     def _classify_content(self, metadata: ImageMetadata) -> str:
         """Classify image content type"""
@@ -128,16 +226,17 @@ class HybridVectorizer:
         else:
             return 'hybrid_comprehensive'
     
-    def _hybrid_fast_strategy(self, image: np.ndarray, edge_map: np.ndarray, 
-                             quantized_image: np.ndarray, metadata: ImageMetadata) -> SVGBuilder:
+    def _hybrid_fast_strategy(self, image: np.ndarray, artifacts: PreprocessingArtifacts) -> SVGBuilder:
         """Fast hybrid approach - prioritize speed"""
+        quantized_image = artifacts.quantized_image
         
         # Quick classical tracing with reduced precision
-        self.classical_tracer.approx_epsilon = 0.05  # Less precise but faster
-        svg_builder = self.classical_tracer.trace_with_colors(image, quantized_image)
+        svg_builder = self.classical_tracer.trace_with_colors(
+            image, quantized_image, **artifacts.trace_options(approx_epsilon=0.05)  # Less precise but faster
+        )
         
         # Quick primitive detection for obvious shapes
-        primitives = self.primitive_detector.detect_all_primitives(image, edge_map)
+        primitives = self.primitive_detector.detect_all_primitives(artifacts.context, artifacts.edge_map)
         filtered_primitives = self.primitive_detector.filter_overlapping_primitives(primitives, 0.7)
         
         # Add high-confidence primitives
@@ -153,15 +252,15 @@ class HybridVectorizer:
         
         return svg_builder
     
-    def _primitive_focused_strategy(self, image: np.ndarray, edge_map: np.ndarray,
-                                   quantized_image: np.ndarray, metadata: ImageMetadata) -> SVGBuilder:
+    def _primitive_focused_strategy(self, image: np.ndarray, artifacts: PreprocessingArtifacts) -> SVGBuilder:
         """Focus on detecting and using geometric primitives"""
+        edge_map, quantized_image = artifacts.edge_map, artifacts.quantized_image
         
         h, w = image.shape[:2]
         svg_builder = SVGBuilder(w, h)
         
         # Comprehensive primitive detection
-        primitives = self.primitive_detector.detect_all_primitives(image, edge_map)
+        primitives = self.primitive_detector.detect_all_primitives(artifacts.context, edge_map)
         filtered_primitives = self.primitive_detector.filter_overlapping_primitives(primitives, 0.3)
         
         # Add all high-quality primitives first
@@ -181,7 +280,7 @@ class HybridVectorizer:
         uncovered_edge_map = edge_map * (1 - covered_mask)
         
         # Trace uncovered areas
-        remaining_paths = self.classical_tracer.trace(image, uncovered_edge_map)
+        remaining_paths = self.classical_tracer.trace(image, uncovered_edge_map, **artifacts.trace_options())
         for path in remaining_paths:
             if len(path) > 3:
                 center_point = self._get_path_center(path)
@@ -190,13 +289,13 @@ class HybridVectorizer:
         
         return svg_builder
     
-    def _classical_refined_strategy(self, image: np.ndarray, edge_map: np.ndarray,
-                                   quantized_image: np.ndarray, metadata: ImageMetadata) -> SVGBuilder:
+    def _classical_refined_strategy(self, image: np.ndarray, artifacts: PreprocessingArtifacts) -> SVGBuilder:
         """Classical tracing with refinement - good for text and clean graphics"""
         
         # Use higher precision for classical tracing
-        self.classical_tracer.approx_epsilon = 0.005
-        svg_builder = self.classical_tracer.trace_with_colors(image, quantized_image)
+        svg_builder = self.classical_tracer.trace_with_colors(
+            image, artifacts.quantized_image, **artifacts.trace_options(approx_epsilon=0.005)
+        )
         
         # Post-process paths for better quality
         refined_elements = []
@@ -211,12 +310,12 @@ class HybridVectorizer:
         svg_builder.elements = refined_elements
         return svg_builder
     
-    def _diff_optimized_strategy(self, image: np.ndarray, edge_map: np.ndarray,
-                                quantized_image: np.ndarray, metadata: ImageMetadata) -> SVGBuilder:
+    def _diff_optimized_strategy(self, image: np.ndarray, artifacts: PreprocessingArtifacts) -> SVGBuilder:
         """Differentiable optimization - good for gradients and complex shapes"""
         
         # Start with classical tracing as initialization
-        initial_svg = self.classical_tracer.trace_with_colors(image, quantized_image)
+        initial_svg = self.classical_tracer.trace_with_colors(image, artifacts.quantized_image,
+                                                             **artifacts.trace_options())
         
         # Extract paths and colors for optimization
         initial_paths = []
@@ -245,20 +344,36 @@ class HybridVectorizer:
         
         return initial_svg
     
-    def _hybrid_comprehensive_strategy(self, image: np.ndarray, edge_map: np.ndarray,
-                                     quantized_image: np.ndarray, metadata: ImageMetadata,
-                                     target_time: float) -> SVGBuilder:
+    def _hybrid_comprehensive_strategy(self, image: np.ndarray, artifacts: PreprocessingArtifacts,
+                                     target_time: float,
+                                     request: Optional[VectorizationRequest] = None) -> SVGBuilder:
         """Comprehensive hybrid approach using all strategies"""
+        vtracer_params = request.get_vtracer_params() if request else None
+        scheduler = artifacts.scheduler
         
         h, w = image.shape[:2]
         svg_builder = SVGBuilder(w, h)
         
         time_per_strategy = target_time / 3  # Rough time allocation
         
+        # Strategy 2 first: real VTracer's trace of the entire image is returned as is
+        # (better than merging), so the primitives and preprocessing below would be discarded
+        vtracer_failed = False
+        if self.real_vtracer.available:
+            try:
+                return self.real_vtracer.vectorize(artifacts.context, params=vtracer_params, scheduler=scheduler,
+                                                   image_type=artifacts.image_type)
+            except Exception as e:
+                print(f"VTracer processing failed, falling back to classical: {e}")
+                vtracer_failed = True
+        
+        edge_map, quantized_image = artifacts.edge_map, artifacts.quantized_image
+        
         # Strategy 1: Primitive detection (fast)
         start_time = time.time()
-        primitives = self.primitive_detector.detect_all_primitives(image, edge_map)
+        primitives = self.primitive_detector.detect_all_primitives(artifacts.context, edge_map)
         filtered_primitives = self.primitive_detector.filter_overlapping_primitives(primitives)
+        primitive_index = self._index_primitives(filtered_primitives)
         
         # Add primitives
         for circle in filtered_primitives['circles']:
@@ -271,37 +386,42 @@ class HybridVectorizer:
                 color = self._sample_color_at_point(quantized_image, (rect.x + rect.width/2, rect.y + rect.height/2))
                 svg_builder.add_rectangle(rect.x, rect.y, rect.width, rect.height, color)
         
-        # Strategy 2: Real VTracer for perfect quality
-        # Use the actual VTracer library if available
-        try:
-            if self.real_vtracer.available:
-                # Use real VTracer for the entire image (better than merging)
-                return self.real_vtracer.vectorize(image, quantized_image, edge_map)
-            else:
-                # Fallback to VTracer-inspired approach
+        # Strategy 2 without real VTracer: VTracer-inspired approach
+        if not vtracer_failed:
+            try:
                 vtracer_svg = self.vtracer_strategy.vectorize(image, quantized_image, edge_map)
                 
                 # Merge primitive and VTracer results
                 for element in vtracer_svg.elements:
                     if hasattr(element, 'points') and len(element.points) >= 3:
-                        if not self._overlaps_with_primitives(element.points, filtered_primitives):
+                        if not self._overlaps_with_primitives(element.points, primitive_index):
                             svg_builder.add_path(element.points, element.color, element.fill, element.stroke_width)
-        except Exception as e:
-            print(f"VTracer processing failed, falling back to classical: {e}")
+            except Exception as e:
+                print(f"VTracer processing failed, falling back to classical: {e}")
+                vtracer_failed = True
+        
+        if vtracer_failed:
             # Fallback to classical tracing
             covered_mask = self._create_primitive_mask(filtered_primitives, w, h)
             uncovered_edge_map = edge_map * (1 - covered_mask)
             
-            classical_svg = self.classical_tracer.trace_with_colors(image, quantized_image)
+            classical_svg = self.classical_tracer.trace_with_colors(image, quantized_image,
+                                                                    **artifacts.trace_options())
             
             # Add non-overlapping classical paths
             for element in classical_svg.elements:
                 if hasattr(element, 'points'):
-                    if not self._overlaps_with_primitives(element.points, filtered_primitives):
+                    if not self._overlaps_with_primitives(element.points, primitive_index):
                         svg_builder.add_path(element.points, element.color, element.fill, element.stroke_width)
         
         # Strategy 3: Aggressive optimization for similarity improvement
-        if time.time() - start_time < target_time * 0.9:
+        if scheduler is not None:
+            optimize = scheduler.fits('path_optimization')
+            if not optimize:
+                scheduler.skip('path_optimization', 'over budget')
+        else:
+            optimize = time.time() - start_time < target_time * 0.9
+        if optimize:
             # Extract all paths for global optimization
             initial_paths = []
             colors = []
@@ -389,21 +509,27 @@ class HybridVectorizer:
         
         return (sum(x_coords) / len(x_coords), sum(y_coords) / len(y_coords))
     
+    def _index_primitives(self, primitives: Dict) -> GridIndex:
+        """Spatial index of the circles and rectangles, keyed by their bounding boxes"""
+        shapes = list(primitives.get('circles', [])) + list(primitives.get('rectangles', []))
+        boxes = [box_around(s.center[0], s.center[1], s.radius) if isinstance(s, Circle)
+                 else box_from_xywh(s.x, s.y, s.width, s.height) for s in shapes]
+        return GridIndex.bulk_load(boxes, shapes)
+    
     def _overlaps_with_primitives(self, path_points: List[Tuple[float, float]], 
-                                 primitives: Dict) -> bool:
+                                 primitive_index: GridIndex) -> bool:
         """Check if path overlaps significantly with detected primitives"""
         # Simple overlap check - could be more sophisticated
         path_center = self._get_path_center(path_points)
         
-        for circle in primitives['circles']:
-            dist = np.sqrt((path_center[0] - circle.center[0])**2 + 
-                          (path_center[1] - circle.center[1])**2)
-            if dist < circle.radius * 0.8:
-                return True
-        
-        for rect in primitives['rectangles']:
-            if (rect.x <= path_center[0] <= rect.x + rect.width and
-                rect.y <= path_center[1] <= rect.y + rect.height):
+        for shape in primitive_index.query_point(*path_center):
+            if isinstance(shape, Circle):
+                dist = np.sqrt((path_center[0] - shape.center[0])**2 + 
+                              (path_center[1] - shape.center[1])**2)
+                if dist < shape.radius * 0.8:
+                    return True
+            elif (shape.x <= path_center[0] <= shape.x + shape.width and
+                  shape.y <= path_center[1] <= shape.y + shape.height):
                 return True
         
         return False
@@ -443,16 +569,16 @@ class HybridVectorizer:
         
         return image[min_y:max_y, min_x:max_x]
     
-    def _logo_optimized_strategy(self, image: np.ndarray, edge_map: np.ndarray,
-                                quantized_image: np.ndarray, metadata: ImageMetadata,
+    def _logo_optimized_strategy(self, image: np.ndarray, artifacts: PreprocessingArtifacts,
                                 target_time: float) -> SVGBuilder:
         """Specialized strategy for logos with text and geometric elements like Frame 53"""
+        edge_map, quantized_image = artifacts.edge_map, artifacts.quantized_image
         
         h, w = image.shape[:2]
         svg_builder = SVGBuilder(w, h)
         
         # Step 1: Detect and vectorize geometric elements (bars, shapes) first
-        primitives = self.primitive_detector.detect_all_primitives(image, edge_map)
+        primitives = self.primitive_detector.detect_all_primitives(artifacts.context, edge_map)
         filtered_primitives = self.primitive_detector.filter_overlapping_primitives(primitives, 0.3)
         
         # Add high-confidence rectangles (like the red bars in Frame 53)
@@ -476,12 +602,14 @@ class HybridVectorizer:
         uncovered_edge_map = edge_map * (1 - covered_mask)
         
         if np.sum(uncovered_edge_map > 0) > 100:  # Significant uncovered area
-            additional_svg = self.classical_tracer.trace_with_colors(image, quantized_image)
+            additional_svg = self.classical_tracer.trace_with_colors(image, quantized_image,
+                                                                     **artifacts.trace_options())
             
-            # Add only non-overlapping paths
+            # Add only non-overlapping paths; only rectangles are compared, and none are added here
+            rect_index = self._index_rectangles(svg_builder.elements)
             for element in additional_svg.elements:
                 if hasattr(element, 'points') and len(element.points) >= 3:
-                    if not self._overlaps_with_existing(element.points, svg_builder.elements):
+                    if not self._overlaps_with_existing(element.points, rect_index):
                         svg_builder.add_path(element.points, element.color, element.fill, element.stroke_width)
         
         return svg_builder
@@ -511,6 +639,7 @@ class HybridVectorizer:
         
         # Also check for text scattered throughout (company names, etc.)
         contours, _ = cv2.findContours(edge_map, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        primitive_index = self._index_primitives(primitives)
         
         for contour in contours:
             area = cv2.contourArea(contour)
@@ -521,7 +650,7 @@ class HybridVectorizer:
                 if 0.3 < aspect_ratio < 4.0:
                     # Check if it's not overlapping with geometric primitives
                     center = (x + w_box//2, y + h_box//2)
-                    if not self._point_in_primitives(center, primitives):
+                    if not self._point_in_primitives(center, primitive_index):
                         text_regions.append((x, y, w_box, h_box))
         
         return text_regions
@@ -547,7 +676,7 @@ class HybridVectorizer:
                 approx = cv2.approxPolyDP(contour, epsilon, True)
                 
                 # Convert to global coordinates
-                path_points = [(float(point[0][0] + x), float(point[0][1] + y)) for point in approx]
+                path_points = to_tuples(as_points(approx) + (x, y))
                 
                 if len(path_points) >= 3:
                     # Sample color from region
@@ -561,20 +690,17 @@ class HybridVectorizer:
         
         return paths
     
-    def _point_in_primitives(self, point: Tuple[int, int], primitives: Dict) -> bool:
+    def _point_in_primitives(self, point: Tuple[int, int], primitive_index: GridIndex) -> bool:
         """Check if point is inside any primitive"""
         x, y = point
         
-        # Check rectangles
-        for rect in primitives.get('rectangles', []):
-            if (rect.x <= x <= rect.x + rect.width and 
-                rect.y <= y <= rect.y + rect.height):
-                return True
-        
-        # Check circles
-        for circle in primitives.get('circles', []):
-            dist = np.sqrt((x - circle.center[0])**2 + (y - circle.center[1])**2)
-            if dist <= circle.radius:
+        for shape in primitive_index.query_point(x, y):
+            if isinstance(shape, Circle):
+                dist = np.sqrt((x - shape.center[0])**2 + (y - shape.center[1])**2)
+                if dist <= shape.radius:
+                    return True
+            elif (shape.x <= x <= shape.x + shape.width and 
+                  shape.y <= y <= shape.y + shape.height):
                 return True
         
         return False
@@ -598,8 +724,13 @@ class HybridVectorizer:
         
         return mask
     
-    def _overlaps_with_existing(self, path_points: List[Tuple[float, float]], elements: List) -> bool:
-        """Check if path overlaps significantly with existing elements"""
+    def _index_rectangles(self, elements: List) -> GridIndex:
+        """Spatial index of the rectangle elements, keyed by their bounding boxes"""
+        rects = [element for element in elements if hasattr(element, 'x')]
+        return GridIndex.bulk_load([box_from_xywh(r.x, r.y, r.width, r.height) for r in rects], rects)
+    
+    def _overlaps_with_existing(self, path_points: List[Tuple[float, float]], rect_index: GridIndex) -> bool:
+        """Check if path overlaps significantly with existing rectangle elements"""
         # Simple overlap check based on bounding boxes
         if not path_points:
             return False
@@ -608,11 +739,11 @@ class HybridVectorizer:
         path_y = [p[1] for p in path_points]
         path_bbox = (min(path_x), min(path_y), max(path_x) - min(path_x), max(path_y) - min(path_y))
         
-        for element in elements:
-            if hasattr(element, 'x'):  # Rectangle
-                elem_bbox = (element.x, element.y, element.width, element.height)
-                if self._bbox_overlap_ratio(path_bbox, elem_bbox) > 0.5:
-                    return True
+        # A positive overlap ratio needs intersecting boxes
+        for element in rect_index.query(box_from_xywh(*path_bbox)):
+            elem_bbox = (element.x, element.y, element.width, element.height)
+            if self._bbox_overlap_ratio(path_bbox, elem_bbox) > 0.5:
+                return True
         
         return False
     
@@ -636,9 +767,14 @@ class HybridVectorizer:
         
         return intersection / union if union > 0 else 0.0
     
-    def _vtracer_high_fidelity_strategy(self, image: np.ndarray, edge_map: np.ndarray,
-                                       quantized_image: np.ndarray, metadata: ImageMetadata) -> SVGBuilder:
-        """Real VTracer high-fidelity strategy for perfect vectorization"""
+    def _vtracer_high_fidelity_strategy(self, image: np.ndarray, artifacts: PreprocessingArtifacts,
+                                       request: Optional[VectorizationRequest] = None) -> SVGBuilder:
+        """Real VTracer high-fidelity strategy for perfect vectorization
+        
+        Real VTracer reads only the pixels; the edge map and quantized image
+        are computed solely for the VTracer-inspired fallback.
+        """
+        vtracer_params = request.get_vtracer_params() if request else None
         
         print("🎯 _vtracer_high_fidelity_strategy called!")
         print(f"🔍 Real VTracer available: {self.real_vtracer.available}")
@@ -646,13 +782,17 @@ class HybridVectorizer:
         # Use the actual VTracer library for best results
         if self.real_vtracer.available:
             try:
-                result_svg = self.real_vtracer.vectorize(image, quantized_image, edge_map)
+                result_svg = self.real_vtracer.vectorize(artifacts.context, params=vtracer_params,
+                                                         scheduler=artifacts.scheduler,
+                                                         image_type=artifacts.image_type)
                 print("✅ Using real VTracer for vectorization")
                 return result_svg
             except Exception as e:
                 print(f"❌ Real VTracer failed: {e}, falling back to inspired version")
         
         # Fallback to VTracer-inspired implementation
+        edge_map, quantized_image = artifacts.edge_map, artifacts.quantized_image
+        metadata = artifacts.metadata
         result_svg = self.vtracer_strategy.vectorize(image, quantized_image, edge_map)
         
         # Post-process with additional optimizations for Frame 53 type content
@@ -689,7 +829,7 @@ class HybridVectorizer:
                     approx = cv2.approxPolyDP(contour, epsilon, True)
                     
                     if len(approx) >= 3:
-                        path_points = [(float(point[0][0]), float(point[0][1])) for point in approx]
+                        path_points = to_tuples(as_points(approx))
                         # Use dark color for text (black/dark gray)
                         text_color = (0.1, 0.1, 0.1)
                         svg_builder.add_path(path_points, text_color, fill=True)
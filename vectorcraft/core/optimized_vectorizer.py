@@ -1,14 +1,20 @@
 import numpy as np
 import cv2
 import time
-import os
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Union, Iterator
 from dataclasses import dataclass
 
 from .hybrid_vectorizer import HybridVectorizer, VectorizationResult
+from .request import VectorizationRequest
+from .tiled_vectorizer import TiledVectorizer
+from .scheduler import StageScheduler
+from .artifacts import PreprocessingArtifacts
+from ..utils.image_context import ImageContext
+from ..utils.content_classifier import ContentClassifier
+from ..utils.similarity_calculator import SimilarityCalculator
 from ..utils.performance import (
-    PerformanceProfiler, OptimizedImageProcessor, AdaptiveOptimizer,
-    CacheManager, ParallelProcessor, GPUAccelerator
+    OptimizedImageProcessor, AdaptiveOptimizer, CacheManager,
+    ParallelProcessor, GPUAccelerator, default_profiler
 )
 
 class OptimizedVectorizer(HybridVectorizer):
@@ -17,9 +23,10 @@ class OptimizedVectorizer(HybridVectorizer):
     def __init__(self, target_time: float = 120.0, enable_gpu: bool = True, enable_caching: bool = True):
         super().__init__()
         
-        self.profiler = PerformanceProfiler()
+        self.profiler = default_profiler
         self.adaptive_optimizer = AdaptiveOptimizer(target_time)
         self.cache_manager = CacheManager() if enable_caching else None
+        self.image_processor.cache = self.cache_manager  # One budget for loads and edge maps
         self.gpu_accelerator = GPUAccelerator() if enable_gpu else None
         self.parallel_processor = ParallelProcessor()
         
@@ -28,6 +35,17 @@ class OptimizedVectorizer(HybridVectorizer):
         self.enable_parallel = True
         self.enable_hierarchical = True
         
+        # Tiled full-resolution VTracer for images above the downsampling threshold
+        self.enable_tiling = True
+        self.tiling_threshold = 1000000  # pixels, same 1MP threshold as aggressive downsampling
+        self.tiled_vectorizer = TiledVectorizer()
+        
+        # Thumbnail classifier: strategy selection without full-resolution content analysis
+        self.content_classifier = ContentClassifier()
+        
+        # Per-job quality: preview-tier similarity of the rendered output to the input
+        self.similarity_calculator = SimilarityCalculator()
+        
         # Wrap key methods with profiling
         self._wrap_methods_with_profiling()
     
@@ -43,29 +61,75 @@ class OptimizedVectorizer(HybridVectorizer):
             self.primitive_detector.detect_all_primitives
         )
     
-    @PerformanceProfiler().profile("optimized_vectorize")
-    def vectorize(self, image_path: str, target_time: float = None) -> VectorizationResult:
-        """Optimized vectorization with adaptive performance tuning"""
+    @default_profiler.profile("optimized_vectorize")
+    def vectorize(self, image_path: Union[str, np.ndarray], target_time: float = None,
+                  request: Optional[VectorizationRequest] = None) -> VectorizationResult:
+        """Optimized vectorization with adaptive performance tuning (path or decoded RGBA pixels)"""
+        return self._last(self._pipeline(image_path, target_time, request))
+    
+    def vectorize_progressive(self, image_path: Union[str, np.ndarray], target_time: float = None,
+                              request: Optional[VectorizationRequest] = None) -> Iterator[VectorizationResult]:
+        """Progressive counterpart of ``vectorize``: a coarse preview, then the final result"""
+        return self._pipeline(image_path, target_time, request, progressive=True)
+    
+    def _pipeline(self, image_path: Union[str, np.ndarray], target_time: Optional[float],
+                  request: Optional[VectorizationRequest], progressive: bool = False) -> Iterator[VectorizationResult]:
+        """Optimized pipeline as a generator; yields a preview first when ``progressive``"""
         start_time = time.time()
-        target_time = target_time or self.target_time
+        preview_sent = False
+        request = request or VectorizationRequest()
+        target_time = request.target_time or target_time or self.target_time
         
         # Load and preprocess with caching
         image = self._cached_load_image(image_path)
         
+        # Large images go through tiled VTracer at full resolution instead of being downsampled
+        if self._should_tile(image, request):
+            full = ImageContext(image)
+            if progressive:
+                preview = self._preview_result(full, request, start_time)
+                preview_sent = preview is not None
+                if preview_sent:
+                    yield preview
+            try:
+                result = self._tiled_vectorize(full, request, start_time, target_time)
+            except Exception as e:
+                result = None
+                print(f"⚠️  Tiled vectorization failed, falling back to downsampled path: {e}")
+            if result is not None:
+                if progressive:
+                    result.metadata['progressive'] = {'stage': 'final', 'final': True}
+                yield result
+                return
+        
         # Adaptive preprocessing based on image size and target time
-        processed_image, metadata = self._adaptive_preprocessing(image, target_time)
+        context = self._adaptive_downsampling(image, target_time)
+        h, w = context.shape[:2]
+        if progressive and not preview_sent:
+            preview = self._preview_result(context, request, start_time)
+            if preview is not None:
+                yield preview
+        scheduler = StageScheduler(target_time - (time.time() - start_time), h * w)
+        artifacts = PreprocessingArtifacts.standard(context, self.image_processor, scheduler)
+        classification = scheduler.run('classify', self.content_classifier.classify, context)
+        artifacts.image_type = classification.image_type
+        processed_image = context.float32
         
-        # Smart strategy selection
+        # Smart strategy selection, unless the request pins one
         elapsed = time.time() - start_time
-        strategy = self.adaptive_optimizer.optimize_strategy_selection(metadata, elapsed)
+        strategy = request.strategy or self.adaptive_optimizer.optimize_strategy_selection(
+            classification.metadata, elapsed)
         
         # Execute with performance monitoring
         result = self._execute_optimized_strategy(
-            strategy, processed_image, metadata, target_time, start_time
+            strategy, processed_image, artifacts, target_time, start_time, request=request
         )
+        # Full-resolution analysis is reported only when a strategy needed it anyway
+        metadata = artifacts.metadata if artifacts.is_computed('metadata') else classification.metadata
         
+        result, svg_stats = self._optimize_output(result, request, scheduler)
+        quality_score, quality_metric = self._measure_quality(result, context, scheduler)
         processing_time = time.time() - start_time
-        quality_score = self._estimate_quality(result, processed_image)
         
         # Print performance stats if requested
         if processing_time > target_time * 0.8:  # If we're close to time limit
@@ -80,7 +144,7 @@ class OptimizedVectorizer(HybridVectorizer):
             # SVGBuilder
             num_elements = len(result.elements)
         
-        return VectorizationResult(
+        final = VectorizationResult(
             svg_builder=result,
             processing_time=processing_time,
             strategy_used=strategy,
@@ -88,27 +152,98 @@ class OptimizedVectorizer(HybridVectorizer):
             metadata={
                 'content_type': self._classify_content(metadata),
                 'image_metadata': metadata,
+                'classification': classification.to_dict(),
                 'num_elements': num_elements,
-                'performance_stats': self.profiler.get_stats()
+                'performance_stats': self.profiler.get_stats(),
+                'svg_optimization': svg_stats,
+                'quality_metric': quality_metric,
+                'schedule': scheduler.summary(),
+                'artifacts': artifacts.summary()
+            }
+        )
+        if progressive:
+            final.metadata['progressive'] = {'stage': 'final', 'final': True}
+        yield final
+    
+    def _measure_quality(self, result, context: ImageContext,
+                         scheduler: StageScheduler) -> Tuple[float, str]:
+        """Preview-tier similarity of the SVG to the traced pixels, or the heuristic estimate over budget"""
+        def similarity():
+            target = cv2.cvtColor(np.ascontiguousarray(context.rgb_float), cv2.COLOR_RGB2BGR)
+            scores = self.similarity_calculator.score_candidates([result.get_svg_string()], target, tier='preview')
+            return scores[0]['comprehensive'], 'similarity_preview'
+        
+        def heuristic():
+            return self._estimate_quality(result, context.float32), 'heuristic'
+        
+        try:
+            return scheduler.run('quality_score', similarity, optional=True, degrade=heuristic)
+        except Exception as e:
+            print(f"⚠️  Similarity scoring failed, using the heuristic estimate: {e}")
+            return heuristic()
+    
+    def _should_tile(self, image: np.ndarray, request: VectorizationRequest) -> bool:
+        """Decide whether to vectorize at full resolution in tiles"""
+        if request.tiled is not None:
+            return request.tiled and self.real_vtracer.available
+        if not self.enable_tiling or not self.real_vtracer.available:
+            return False
+        if request.strategy not in (None, 'vtracer_high_fidelity'):
+            return False  # Other strategies keep their own preprocessing
+        h, w = image.shape[:2]
+        return h * w > self.tiling_threshold
+    
+    def _tiled_vectorize(self, image: Union[np.ndarray, ImageContext], request: VectorizationRequest,
+                         start_time: float, target_time: float) -> VectorizationResult:
+        """Full-resolution VTracer over overlapping tiles in a process pool, within the request's deadline"""
+        context = ImageContext.ensure(image)
+        h, w = context.shape[:2]
+        scheduler = StageScheduler(target_time - (time.time() - start_time), h * w)
+        
+        # Classification and parameter selection only need a preview
+        classification = scheduler.run('classify', self.content_classifier.classify, context)
+        metadata = classification.metadata
+        preview = context.resized(800)
+        
+        # Resolve parameters once so every tile is traced identically
+        params = self.real_vtracer._get_adaptive_parameters(preview, request.get_vtracer_params(),
+                                                            classification.image_type)
+        result = self.tiled_vectorizer.vectorize(context, params, scheduler)
+        result, svg_stats = self._optimize_output(result, request, scheduler)
+        quality_score, quality_metric = self._measure_quality(result, preview, scheduler)
+        
+        processing_time = time.time() - start_time
+        return VectorizationResult(
+            svg_builder=result,
+            processing_time=processing_time,
+            strategy_used='vtracer_tiled',
+            quality_score=quality_score,
+            metadata={
+                'content_type': self._classify_content(metadata),
+                'image_metadata': metadata,
+                'classification': classification.to_dict(),
+                'num_elements': result.element_count,
+                'performance_stats': self.profiler.get_stats(),
+                'svg_optimization': svg_stats,
+                'quality_metric': quality_metric,
+                'schedule': scheduler.summary()
             }
         )
     
-    def _cached_load_image(self, image_path: str) -> np.ndarray:
+    def _cached_load_image(self, image_path: Union[str, np.ndarray]) -> np.ndarray:
         """Load image with caching"""
-        if self.cache_manager:
-            cache_key = f"load_{image_path}_{os.path.getmtime(image_path)}"
-            cached_result = self.cache_manager.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-            
-            image = self.image_processor.load_image(image_path)
-            self.cache_manager.put(cache_key, image)
-            return image
-        else:
-            return self.image_processor.load_image(image_path)
+        if isinstance(image_path, np.ndarray):
+            return image_path  # Already decoded, e.g. by the engine's shared-memory handoff
+        
+        # The processor's load cache is self.cache_manager (see __init__)
+        return self.image_processor.load_image(image_path)
     
-    def _adaptive_preprocessing(self, image: np.ndarray, target_time: float) -> Tuple[np.ndarray, Any]:
-        """Adaptive preprocessing based on target time and image characteristics"""
+    def _adaptive_downsampling(self, image: np.ndarray, target_time: float) -> ImageContext:
+        """Downsample for large images or tight time constraints and wrap the pixels in a context.
+        
+        Edge maps and quantization are lazy artifacts, computed only for the
+        strategies that read them.
+        """
         
         # Quick size check for preprocessing strategy
         h, w = image.shape[:2]
@@ -130,45 +265,12 @@ class OptimizedVectorizer(HybridVectorizer):
                 new_h, new_w = int(h * scale), int(w * scale)
                 image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
         
-        # Preprocess image
-        processed_image = self.image_processor.preprocess(image)
-        
-        # Parallel content analysis and edge detection
-        if self.enable_parallel:
-            import threading
-            
-            metadata_result = [None]
-            edge_results = {}
-            
-            def analyze_content():
-                metadata_result[0] = self.image_processor.analyze_content(processed_image)
-            
-            def detect_edges():
-                edge_results.update(
-                    OptimizedImageProcessor.parallel_edge_detection(processed_image)
-                )
-            
-            # Run in parallel
-            threads = [
-                threading.Thread(target=analyze_content),
-                threading.Thread(target=detect_edges)
-            ]
-            
-            for thread in threads:
-                thread.start()
-            for thread in threads:
-                thread.join()
-            
-            metadata = metadata_result[0]
-            # Store edge results for later use
-            self._edge_cache = edge_results
-        else:
-            metadata = self.image_processor.analyze_content(processed_image)
-        
-        return processed_image, metadata
+        # One context per request: gray/edges/LAB are derived once and shared by all stages
+        return ImageContext(image)
     
     def _execute_optimized_strategy(self, strategy: str, image: np.ndarray, 
-                                   metadata: Any, target_time: float, start_time: float) -> Any:
+                                   artifacts: PreprocessingArtifacts, target_time: float, start_time: float,
+                                   request: Optional[VectorizationRequest] = None) -> Any:
         """Execute strategy with performance optimizations"""
         
         elapsed = time.time() - start_time
@@ -177,53 +279,51 @@ class OptimizedVectorizer(HybridVectorizer):
         # Get adaptive parameters
         params = self.adaptive_optimizer.adaptive_precision_control(strategy, remaining_time)
         
-        # Update algorithm parameters
-        self.classical_tracer.approx_epsilon = params['approx_epsilon']
-        self.classical_tracer.contour_threshold = params['contour_min_area']
+        # Adaptive contour filtering and simplification for any classical tracing the strategy does
+        artifacts.trace_params = {
+            'approx_epsilon': params['approx_epsilon'],
+            'contour_min_area': params['contour_min_area']
+        }
         
-        # Get or compute edge map with caching
-        edge_map = self._get_cached_edge_map(image, params)
-        
-        # Fast color quantization
+        # Cached edge map and fast color quantization, computed if the strategy asks for them
         n_colors = int(params['color_quantization'])
-        quantized_image = OptimizedImageProcessor.fast_color_quantization(image, n_colors)
+        artifacts.register('edge_map', lambda: self._get_cached_edge_map(image, params, artifacts.context))
+        artifacts.register('quantized_image', lambda: OptimizedImageProcessor.fast_color_quantization(image, n_colors),
+                           stage='fast_quantize')
         
         # Execute strategy with optimizations
         if strategy == 'vtracer_high_fidelity':
             print("🎯 OptimizedVectorizer calling _vtracer_high_fidelity_strategy")
-            return self._vtracer_high_fidelity_strategy(image, edge_map, quantized_image, metadata)
+            return self._vtracer_high_fidelity_strategy(image, artifacts, request)
         elif strategy == 'experimental':
             print("🧪 OptimizedVectorizer calling _experimental_strategy_v2")
-            return self._experimental_strategy_v2(image, edge_map, quantized_image, metadata)
+            return self._experimental_strategy_v2(image, artifacts)
         else:
             # Default to VTracer for any unknown strategy
             print("🎯 Defaulting to VTracer for unknown strategy:", strategy)
-            return self._vtracer_high_fidelity_strategy(image, edge_map, quantized_image, metadata)
+            return self._vtracer_high_fidelity_strategy(image, artifacts, request)
     
-    def _get_cached_edge_map(self, image: np.ndarray, params: Dict) -> np.ndarray:
+    def _get_cached_edge_map(self, image: np.ndarray, params: Dict,
+                             context: Optional[ImageContext] = None) -> np.ndarray:
         """Get edge map with caching"""
         if self.cache_manager:
-            cache_key = self.cache_manager.get_cache_key(image, "edge_detection", params)
+            cache_key = self.cache_manager.get_cache_key(context if context is not None else image,
+                                                         "edge_detection", params)
             cached_edges = self.cache_manager.get(cache_key)
             if cached_edges is not None:
                 return cached_edges
         
-        # Check if we have parallel edge detection results
-        if hasattr(self, '_edge_cache') and 'enhanced' in self._edge_cache:
-            edge_map = self._edge_cache['enhanced']
-        else:
-            edge_map = self.image_processor.create_edge_map(image, method='enhanced')
+        edge_map = self.image_processor.create_edge_map(context or image, method='enhanced')
         
         if self.cache_manager:
             self.cache_manager.put(cache_key, edge_map)
         
         return edge_map
     
-    def _experimental_strategy_v2(self, image: np.ndarray, edge_map: np.ndarray,
-                              quantized_image: np.ndarray, metadata: Any) -> Any:
+    def _experimental_strategy_v2(self, image: np.ndarray, artifacts: PreprocessingArtifacts) -> Any:
         """Experimental strategy V3 focusing on actual VTracer limitations"""
         from ..strategies.experimental_vtracer_v3 import ExperimentalVTracerV3Strategy
         
         experimental_tracer = ExperimentalVTracerV3Strategy()
-        return experimental_tracer.vectorize(image, quantized_image, edge_map)
+        return experimental_tracer.vectorize(image, artifacts.quantized_image, artifacts.edge_map)
     
@@ -0,0 +1,39 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Mapping
+
+
+@dataclass(frozen=True)
+class VectorizationRequest:
+    """Immutable per-call vectorization options.
+
+    Threaded through the vectorizers and strategies instead of mutating the
+    shared instances, so one vectorizer can serve many threads at once.
+    """
+    strategy: Optional[str] = None          # Forced strategy, None = automatic selection
+    target_time: Optional[float] = None
+    vtracer_params: Optional[Mapping[str, Any]] = None
+    tiled: Optional[bool] = None            # Tiled full-resolution mode, None = automatic for large images
+    optimize_svg: bool = True               # Compact the final SVG (see SVGOptimizer)
+    svg_precision: Optional[int] = None     # Coordinate decimals kept, None = VECTORCRAFT_SVG_PRECISION (2)
+
+    def __post_init__(self):
+        if self.vtracer_params is not None:
+            object.__setattr__(self, 'vtracer_params', MappingProxyType(dict(self.vtracer_params)))
+
+    @classmethod
+    def from_params(cls, strategy: Optional[str] = None, target_time: Optional[float] = None,
+                    vectorization_params: Optional[Dict[str, Any]] = None,
+                    tiled: Optional[bool] = None, svg_precision: Optional[int] = None) -> 'VectorizationRequest':
+        """Build a request from the loose arguments the web layer receives"""
+        return cls(
+            strategy=strategy,
+            target_time=target_time,
+            vtracer_params=vectorization_params or None,
+            tiled=tiled,
+            svg_precision=svg_precision
+        )
+
+    def get_vtracer_params(self) -> Optional[Dict[str, Any]]:
+        """Plain-dict copy of the custom VTracer parameters, if any"""
+        return dict(self.vtracer_params) if self.vtracer_params else None
@@ -0,0 +1,298 @@
+import time
+import logging
+import threading
+import multiprocessing
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """A stage could not finish inside the remaining budget"""
+
+
+class Deadline:
+    """Wall-clock budget for one vectorization request (``None`` = unbounded)"""
+
+    def __init__(self, budget: Optional[float]):
+        self.budget = budget
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def remaining(self) -> float:
+        if self.budget is None:
+            return float('inf')
+        return self.budget - self.elapsed
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining <= 0
+
+
+# Seed costs as (fixed seconds, seconds per megapixel), measured on a 1-CPU
+# worker; StageCostModel replaces the per-megapixel rate with observed timings.
+DEFAULT_STAGE_COSTS: Dict[str, Tuple[float, float]] = {
+    'analyze_content': (0.005, 1.3),
+    'classify': (0.005, 0.002),  # Thumbnail-sized, so nearly flat in the image size
+    'edge_map': (0.001, 0.05),
+    'quantize': (0.01, 8.0),
+    'fast_quantize': (0.0, 0.02),
+    'vtracer': (0.005, 0.5),
+    'vtracer_preview': (0.005, 0.5),
+    'path_optimization': (0.5, 20.0),
+    'svg_optimize': (0.005, 0.4),  # Sized by SVG bytes rather than pixels
+    'quality_score': (0.02, 0.02),  # Preview-tier similarity: a 128x128 render plus the target resize
+}
+
+
+class StageCostModel:
+    """Per-stage cost estimates that learn from the timings the scheduler records"""
+
+    def __init__(self, seed: Optional[Dict[str, Tuple[float, float]]] = None, smoothing: float = 0.3):
+        self.costs = dict(DEFAULT_STAGE_COSTS if seed is None else seed)
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+
+    def estimate(self, stage: str, pixels: int) -> float:
+        fixed, per_mp = self.costs.get(stage, (0.0, 0.0))
+        return fixed + per_mp * pixels / 1e6
+
+    def observe(self, stage: str, pixels: int, seconds: float):
+        """Fold one measured run into the stage's per-megapixel rate (EWMA)"""
+        if pixels <= 0:
+            return
+        with self._lock:
+            fixed, per_mp = self.costs.get(stage, (0.0, None))
+            observed = max(0.0, seconds - fixed) * 1e6 / pixels
+            if per_mp is None:
+                per_mp = observed
+            else:
+                per_mp += self.smoothing * (observed - per_mp)
+            self.costs[stage] = (fixed, per_mp)
+
+
+# Shared by every scheduler in the process so estimates improve across requests
+default_cost_model = StageCostModel()
+
+
+@dataclass
+class StageRecord:
+    """One entry of the schedule trace"""
+    stage: str
+    status: str          # ran | degraded | skipped | timed_out | failed
+    seconds: float
+    estimate: float
+    note: str = ''
+
+
+def _deadline_child(conn, func, args):
+    """Subprocess body for run_with_deadline: ship the result or the error back"""
+    try:
+        conn.send(('ok', func(*args)))
+    except BaseException as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _fork_blocker() -> Optional[str]:
+    """Why this process should not fork right now, or None when it safely can.
+
+    Forked children are unavailable on non-POSIX hosts and inside daemonic
+    pool workers (e.g. Celery prefork children). Forking a process that runs
+    other threads (a threaded web server, pool dispatchers) can leave the
+    child holding locks those threads owned, so that is refused as well.
+    """
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return 'fork is not available on this platform'
+    if multiprocessing.current_process().daemon:
+        return 'daemonic processes cannot have children'
+    if threading.current_thread() is not threading.main_thread():
+        return 'not running on the main thread'
+    if threading.active_count() > 1:
+        return 'other threads are running'
+    return None
+
+
+def _can_fork() -> bool:
+    return _fork_blocker() is None
+
+
+def run_with_deadline(func: Callable, args: tuple, timeout: float) -> Any:
+    """Run ``func(*args)`` in a forked subprocess and kill it after ``timeout`` seconds.
+
+    Native extensions such as VTracer cannot be interrupted from Python, so a
+    hard deadline needs a process boundary. The child is forked, so ``func``
+    and ``args`` are never pickled; only the return value crosses the pipe.
+    """
+    ctx = multiprocessing.get_context('fork')
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_deadline_child, args=(sender, func, args), daemon=True)
+    process.start()
+    sender.close()
+
+    try:
+        if not receiver.poll(max(0.0, timeout)):
+            raise DeadlineExceeded(f"Stage did not finish within {timeout:.2f}s")
+        try:
+            status, payload = receiver.recv()
+        except EOFError:
+            raise RuntimeError(f"Deadline subprocess exited with code {process.exitcode}")
+        if status == 'error':
+            raise RuntimeError(payload)
+        return payload
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.terminate()
+            process.join(0.5)
+            if process.is_alive():
+                process.kill()
+        process.join()
+
+
+class StageScheduler:
+    """Runs pipeline stages against a deadline.
+
+    Each stage gets a cost estimate scaled by the image size. Optional stages
+    that do not fit the remaining budget are skipped or replaced by a cheaper
+    variant, and cancellable stages run in a subprocess that is killed when the
+    budget runs out. Every decision lands in ``trace`` for the result metadata.
+
+    Where forking is unsafe or impossible (see ``_fork_blocker``) cancellable
+    stages run in-process under a soft deadline: they cannot be cut off, the
+    fallback is logged, and the stage's trace note says why.
+    """
+
+    # Cancellable stages estimated below remaining / margin run in-process;
+    # the fork costs ~10 ms, which is not worth paying when there is ample slack.
+    inprocess_margin = 4.0
+
+    def __init__(self, target_time: Optional[float], pixels: int,
+                 cost_model: Optional[StageCostModel] = None):
+        self.deadline = Deadline(target_time)
+        self.pixels = pixels
+        self.cost_model = cost_model or default_cost_model
+        self.trace: List[StageRecord] = []
+
+    @property
+    def remaining(self) -> float:
+        return self.deadline.remaining
+
+    def estimate(self, stage: str, pixels: Optional[int] = None) -> float:
+        return self.cost_model.estimate(stage, self.pixels if pixels is None else pixels)
+
+    def fits(self, stage: str, reserve: float = 0.0, pixels: Optional[int] = None) -> bool:
+        """Whether the stage is expected to finish with ``reserve`` seconds to spare"""
+        return self.estimate(stage, pixels) + reserve <= self.remaining
+
+    def skip(self, stage: str, note: str = ''):
+        self._record(stage, 'skipped', 0.0, self.estimate(stage), note)
+
+    def run(self, stage: str, func: Callable, *args, optional: bool = False,
+            degrade: Optional[Callable[[], Any]] = None, pixels: Optional[int] = None, **kwargs) -> Any:
+        """Run a stage, skipping or degrading it first when it is optional and over budget.
+
+        Skipped stages return None; degraded stages return ``degrade()``.
+        """
+        pixels = self.pixels if pixels is None else pixels
+        estimate = self.estimate(stage, pixels)
+        if optional and estimate > self.remaining:
+            if degrade is None:
+                self._record(stage, 'skipped', 0.0, estimate, 'over budget')
+                return None
+            start = time.monotonic()
+            with tracer.span(f"stage.{stage}", status='degraded'):
+                result = degrade()
+            self._record(stage, 'degraded', time.monotonic() - start, estimate, 'over budget')
+            return result
+
+        start = time.monotonic()
+        try:
+            with tracer.span(f"stage.{stage}", status='ran'):
+                result = func(*args, **kwargs)
+        except Exception as e:
+            self._record(stage, 'failed', time.monotonic() - start, estimate, str(e))
+            raise
+        seconds = time.monotonic() - start
+        self.cost_model.observe(stage, pixels, seconds)
+        self._record(stage, 'ran', seconds, estimate)
+        return result
+
+    def run_cancellable(self, stage: str, func: Callable, *args, reserve: float = 0.0,
+                        pixels: Optional[int] = None) -> Any:
+        """Run a stage that must not outlive the deadline; raises DeadlineExceeded.
+
+        Under a soft deadline (no safe fork) the stage cannot be killed: it
+        returns late and is traced as timed_out instead of raising.
+        """
+        pixels = self.pixels if pixels is None else pixels
+        estimate = self.estimate(stage, pixels)
+        timeout = self.remaining - reserve
+        if timeout <= 0:
+            self._record(stage, 'skipped', 0.0, estimate, 'no budget left')
+            raise DeadlineExceeded(f"No budget left for {stage}")
+
+        isolate, note = False, ''
+        if estimate * self.inprocess_margin > timeout:
+            blocker = _fork_blocker()
+            if blocker is None:
+                isolate, note = True, 'subprocess'
+            else:
+                # Runs to completion however long it takes; the trace shows the overrun
+                note = f"soft deadline: {blocker}"
+                logger.warning(f"Stage {stage} runs without a hard deadline ({blocker})")
+        start = time.monotonic()
+        try:
+            with tracer.span(f"stage.{stage}", status='ran', subprocess=isolate):
+                result = run_with_deadline(func, args, timeout) if isolate else func(*args)
+        except DeadlineExceeded:
+            seconds = time.monotonic() - start
+            # A killed run is a lower bound on the true cost
+            if seconds > estimate:
+                self.cost_model.observe(stage, pixels, seconds)
+            self._record(stage, 'timed_out', seconds, estimate, 'killed at deadline')
+            raise
+        except Exception as e:
+            self._record(stage, 'failed', time.monotonic() - start, estimate, str(e))
+            raise
+        seconds = time.monotonic() - start
+        self.cost_model.observe(stage, pixels, seconds)
+        if seconds > timeout:
+            self._record(stage, 'timed_out', seconds, estimate, f"{note}, overran" if note else 'overran')
+        else:
+            self._record(stage, 'ran', seconds, estimate, note)
+        return result
+
+    def record(self, stage: str, status: str, seconds: float, pixels: Optional[int] = None, note: str = ''):
+        """Trace a stage that ran outside ``run``/``run_cancellable``, e.g. fanned out to a pool"""
+        pixels = self.pixels if pixels is None else pixels
+        estimate = self.estimate(stage, pixels)
+        if status == 'ran':
+            self.cost_model.observe(stage, pixels, seconds)
+        self._record(stage, status, seconds, estimate, note)
+
+    def summary(self) -> Dict[str, Any]:
+        """Trace in the JSON-friendly shape stored in the result metadata"""
+        return {
+            'target_time': self.deadline.budget,
+            'elapsed': round(self.deadline.elapsed, 4),
+            'deadline_met': not self.deadline.expired,
+            'degraded': self.degraded,
+            'stages': [asdict(record) for record in self.trace]
+        }
+
+    @property
+    def degraded(self) -> bool:
+        """Whether any stage was skipped, degraded, cut off or failed over to something cheaper"""
+        return any(record.status != 'ran' for record in self.trace)
+
+    def _record(self, stage: str, status: str, seconds: float, estimate: float, note: str = ''):
+        self.trace.append(StageRecord(stage, status, round(seconds, 4), round(estimate, 4), note))
@@ -1,125 +1,451 @@
+import io
 import svgwrite
 import numpy as np
-from typing import List, Tuple, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Tuple, Dict, Any, Iterator, Optional, Union
+
+# Element kinds in the element table
+PATH, CIRCLE, RECT = 0, 1, 2
+
+# How a path's coordinates print, matching how f-strings printed the source values
+# (float32 and other float scalars format as the repr of their float64 value);
+# mixed-type paths keep their original scalars and print each one as given
+_FORMAT_FLOAT, _FORMAT_INT, _FORMAT_MIXED = 0, 1, 2
+
+_XML_DECLARATION = '<?xml version="1.0" encoding="utf-8" ?>\n'
 
-@dataclass
-class PathElement:
-    points: List[Tuple[float, float]]
-    color: Tuple[float, float, float]
-    fill: bool = True
-    stroke_width: float = 0.0
 
-@dataclass
 class CircleElement:
-    center: Tuple[float, float]
-    radius: float
-    color: Tuple[float, float, float]
-    fill: bool = True
-    stroke_width: float = 0.0
+    __slots__ = ('center', 'radius', 'color', 'fill', 'stroke_width')
+
+    def __init__(self, center: Tuple[float, float], radius: float, color: Tuple[float, float, float],
+                 fill: bool = True, stroke_width: float = 0.0):
+        self.center = center
+        self.radius = radius
+        self.color = color
+        self.fill = fill
+        self.stroke_width = stroke_width
+
+    def __repr__(self):
+        return f"CircleElement(center={self.center}, radius={self.radius}, color={self.color})"
+
 
-@dataclass
 class RectElement:
-    x: float
-    y: float
-    width: float
-    height: float
-    color: Tuple[float, float, float]
-    fill: bool = True
-    stroke_width: float = 0.0
+    __slots__ = ('x', 'y', 'width', 'height', 'color', 'fill', 'stroke_width')
+
+    def __init__(self, x: float, y: float, width: float, height: float, color: Tuple[float, float, float],
+                 fill: bool = True, stroke_width: float = 0.0):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.color = color
+        self.fill = fill
+        self.stroke_width = stroke_width
+
+    def __repr__(self):
+        return f"RectElement(x={self.x}, y={self.y}, width={self.width}, height={self.height}, color={self.color})"
+
+
+class PathElement:
+    """View of one path in an SVGBuilder's columnar store.
+
+    Reading ``points`` materializes a list of tuples; assigning it replaces
+    the path's coordinates in the store. ``points_array`` is a zero-copy view.
+    """
+    __slots__ = ('_builder', '_index')
+
+    def __init__(self, builder: 'SVGBuilder', index: int):
+        self._builder = builder
+        self._index = index
+
+    @property
+    def points_array(self) -> np.ndarray:
+        return self._builder._path_coords(self._index)
+
+    @property
+    def points(self) -> List[Tuple[float, float]]:
+        builder = self._builder
+        fmt = builder._path_formats[self._index]
+        if fmt == _FORMAT_MIXED:
+            return list(builder._path_scalars[self._index])
+        coords = builder._path_coords(self._index)
+        if fmt == _FORMAT_INT:
+            return [(x, y) for x, y in coords.astype(np.int64).tolist()]
+        return [(x, y) for x, y in coords.tolist()]
+
+    @points.setter
+    def points(self, points):
+        self._builder._set_path_points(self._index, points)
+
+    @property
+    def color(self):
+        return self._builder._colors[self._builder._path_color_ids[self._index]]
+
+    @color.setter
+    def color(self, color):
+        self._builder._path_color_ids[self._index] = self._builder._intern_color(color)
+
+    @property
+    def fill(self) -> bool:
+        return bool(self._builder._path_fill[self._index])
+
+    @fill.setter
+    def fill(self, fill: bool):
+        self._builder._path_fill[self._index] = fill
+
+    @property
+    def stroke_width(self):
+        return self._builder._strokes[self._builder._path_stroke_ids[self._index]]
+
+    @stroke_width.setter
+    def stroke_width(self, stroke_width):
+        self._builder._path_stroke_ids[self._index] = self._builder._intern_stroke(stroke_width)
+
+    def __len__(self):
+        return int(self._builder._path_lengths[self._index])
+
+    def __repr__(self):
+        return f"PathElement(points={len(self)}, color={self.color}, fill={self.fill})"
+
+
+class _Column:
+    """Append-only NumPy column with amortized growth"""
+    __slots__ = ('_data', '_size')
+
+    def __init__(self, dtype, width: int = 0, capacity: int = 16):
+        shape = (capacity, width) if width else (capacity,)
+        self._data = np.empty(shape, dtype=dtype)
+        self._size = 0
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed > len(self._data):
+            capacity = max(needed, 2 * len(self._data))
+            grown = np.empty((capacity,) + self._data.shape[1:], dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def append(self, value) -> int:
+        self._reserve(1)
+        self._data[self._size] = value
+        self._size += 1
+        return self._size - 1
+
+    def extend(self, values: np.ndarray) -> int:
+        start = self._size
+        self._reserve(len(values))
+        self._data[start:start + len(values)] = values
+        self._size += len(values)
+        return start
+
+    def __getitem__(self, index):
+        return self._data[:self._size][index]
+
+    def __setitem__(self, index, value):
+        self._data[:self._size][index] = value
+
+    def __len__(self):
+        return self._size
+
+
+class _ElementList:
+    """Read-only sequence over an SVGBuilder's elements, in paint order"""
+
+    def __init__(self, builder: 'SVGBuilder'):
+        self._builder = builder
+
+    def __len__(self):
+        return len(self._builder._kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self._builder._element(index if index >= 0 else index + len(self))
+
+    def __iter__(self):
+        element = self._builder._element
+        for index in range(len(self)):
+            yield element(index)
+
+    def __bool__(self):
+        return len(self) > 0
+
 
 class SVGBuilder:
+    """Columnar SVG element store with a streaming writer.
+
+    Path coordinates live in one flat float64 buffer (float32 and integer
+    inputs round-trip exactly), indexed by per-path offset/length columns;
+    paths that mix scalar types (e.g. ints and floats) also keep their
+    original points so each coordinate prints as it did in the source;
+    colors and stroke widths are interned. Circles and rectangles are small
+    ``__slots__`` records. Output is written straight from the columns,
+    byte-identical to the svgwrite document this class used to build.
+    """
+
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
-        self.elements = []
-        
-    def add_path(self, points: List[Tuple[float, float]], color: Tuple[float, float, float], 
+        self._reset()
+
+    def _reset(self):
+        # Element table, in paint order: kind + index into the path columns or the records
+        self._kinds = _Column(np.uint8)
+        self._refs = _Column(np.int64)
+
+        # Path columns
+        self._coords = _Column(np.float64, width=2, capacity=256)
+        self._path_offsets = _Column(np.int64)
+        self._path_lengths = _Column(np.int64)
+        self._path_formats = _Column(np.uint8)
+        self._path_color_ids = _Column(np.int32)
+        self._path_stroke_ids = _Column(np.int32)
+        self._path_fill = _Column(np.bool_)
+        self._path_scalars: Dict[int, List[Tuple[Any, Any]]] = {}  # Mixed-type paths only
+
+        # Primitive records
+        self._records: List[Union[CircleElement, RectElement]] = []
+
+        # Interned attribute values
+        self._colors: List[Any] = []
+        self._color_strings: List[str] = []
+        self._color_ids: Dict[Any, int] = {}
+        self._strokes: List[Any] = []
+        self._stroke_ids: Dict[Any, int] = {}
+
+    # --- building ---------------------------------------------------------
+
+    def add_path(self, points: List[Tuple[float, float]], color: Tuple[float, float, float],
                  fill: bool = True, stroke_width: float = 0.0):
-        self.elements.append(PathElement(points, color, fill, stroke_width))
-    
-    def add_circle(self, center: Tuple[float, float], radius: float, 
+        coords, fmt, scalars = self._to_coords(points)
+        path_index = self._path_offsets.append(self._coords.extend(coords))
+        if scalars is not None:
+            self._path_scalars[path_index] = scalars
+        self._path_lengths.append(len(coords))
+        self._path_formats.append(fmt)
+        self._path_color_ids.append(self._intern_color(color))
+        self._path_stroke_ids.append(self._intern_stroke(stroke_width))
+        self._path_fill.append(fill)
+        self._kinds.append(PATH)
+        self._refs.append(path_index)
+
+    def add_circle(self, center: Tuple[float, float], radius: float,
                    color: Tuple[float, float, float], fill: bool = True, stroke_width: float = 0.0):
-        self.elements.append(CircleElement(center, radius, color, fill, stroke_width))
-    
+        self._add_record(CIRCLE, CircleElement(center, radius, color, fill, stroke_width))
+
     def add_rectangle(self, x: float, y: float, width: float, height: float,
                      color: Tuple[float, float, float], fill: bool = True, stroke_width: float = 0.0):
-        self.elements.append(RectElement(x, y, width, height, color, fill, stroke_width))
-    
+        self._add_record(RECT, RectElement(x, y, width, height, color, fill, stroke_width))
+
+    def _add_record(self, kind: int, record):
+        self._records.append(record)
+        self._kinds.append(kind)
+        self._refs.append(len(self._records) - 1)
+
+    @property
+    def elements(self) -> _ElementList:
+        return _ElementList(self)
+
+    @elements.setter
+    def elements(self, elements):
+        # Snapshot first: the new elements may be views into this very store
+        snapshot = []
+        for element in elements:
+            if isinstance(element, PathElement):
+                fmt = element._builder._path_formats[element._index]
+                coords = element.points if fmt == _FORMAT_MIXED else element.points_array.copy()
+                snapshot.append((PATH, (coords, fmt, element.color, element.fill, element.stroke_width)))
+            elif isinstance(element, (CircleElement, RectElement)):
+                snapshot.append((CIRCLE if isinstance(element, CircleElement) else RECT, element))
+            elif hasattr(element, 'points'):
+                coords, fmt, _ = self._to_coords(element.points)
+                if fmt == _FORMAT_MIXED:
+                    coords = element.points
+                snapshot.append((PATH, (coords, fmt, element.color, element.fill, element.stroke_width)))
+
+        self._reset()
+        for kind, data in snapshot:
+            if kind == PATH:
+                coords, fmt, color, fill, stroke_width = data
+                self.add_path(coords, color, fill, stroke_width)
+                self._path_formats[len(self._path_formats) - 1] = fmt
+            else:
+                self._add_record(kind, data)
+
+    def _element(self, index: int):
+        ref = int(self._refs[index])
+        if self._kinds[index] == PATH:
+            return PathElement(self, ref)
+        return self._records[ref]
+
+    @staticmethod
+    def _to_coords(points) -> Tuple[np.ndarray, int, Optional[List[Tuple[Any, Any]]]]:
+        """Float64 coordinates, their print format, and the original points of a mixed-type path"""
+        coords = np.asarray(points)
+        if coords.size == 0:
+            return np.zeros((0, 2)), _FORMAT_FLOAT, None
+        scalars = None
+        if np.issubdtype(coords.dtype, np.integer):
+            fmt = _FORMAT_INT
+        elif not isinstance(points, np.ndarray) and len({type(v) for point in points for v in point}) > 1:
+            # e.g. [(1.5, 2.25), (5, 6)]: NumPy promotes the ints, which would then print as 5.0
+            fmt = _FORMAT_MIXED
+            scalars = [tuple(point) for point in points]
+        else:
+            fmt = _FORMAT_FLOAT
+        return coords.reshape(-1, 2).astype(np.float64, copy=False), fmt, scalars
+
+    def _path_coords(self, path_index: int) -> np.ndarray:
+        start = int(self._path_offsets[path_index])
+        return self._coords[start:start + int(self._path_lengths[path_index])]
+
+    def _set_path_points(self, path_index: int, points):
+        coords, fmt, scalars = self._to_coords(points)
+        self._path_offsets[path_index] = self._coords.extend(coords)
+        self._path_lengths[path_index] = len(coords)
+        self._path_formats[path_index] = fmt
+        if scalars is not None:
+            self._path_scalars[path_index] = scalars
+        else:
+            self._path_scalars.pop(path_index, None)
+
+    def _intern_color(self, color) -> int:
+        key = tuple(color)
+        color_id = self._color_ids.get(key)
+        if color_id is None:
+            color_id = len(self._colors)
+            self._colors.append(color)
+            self._color_strings.append(self._color_string(color))
+            self._color_ids[key] = color_id
+        return color_id
+
+    def _intern_stroke(self, stroke_width) -> int:
+        key = (type(stroke_width), stroke_width)  # 2 and 2.0 print differently
+        stroke_id = self._stroke_ids.get(key)
+        if stroke_id is None:
+            stroke_id = len(self._strokes)
+            self._strokes.append(stroke_width)
+            self._stroke_ids[key] = stroke_id
+        return stroke_id
+
+    @staticmethod
+    def _color_string(color) -> str:
+        return f"rgb({int(color[0]*255)},{int(color[1]*255)},{int(color[2]*255)})"
+
+    # --- writing ----------------------------------------------------------
+
+    def iter_svg(self, chunk_size: int = 64 * 1024) -> Iterator[str]:
+        """Yield the SVG document in chunks of roughly ``chunk_size`` characters"""
+        parts = [
+            f'<svg baseProfile="full" height="{self.height}" version="1.1" width="{self.width}" '
+            'xmlns="http://www.w3.org/2000/svg" xmlns:ev="http://www.w3.org/2001/xml-events" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink"><defs />'
+        ]
+        pending = len(parts[0])
+
+        kinds = self._kinds[:]
+        refs = self._refs[:]
+        for kind, ref in zip(kinds.tolist(), refs.tolist()):
+            if kind == PATH:
+                markup = self._path_markup(ref)
+            elif kind == CIRCLE:
+                markup = self._circle_markup(self._records[ref])
+            else:
+                markup = self._rect_markup(self._records[ref])
+
+            if markup:
+                parts.append(markup)
+                pending += len(markup)
+                if pending >= chunk_size:
+                    yield ''.join(parts)
+                    parts, pending = [], 0
+
+        parts.append('</svg>')
+        yield ''.join(parts)
+
+    def write(self, target, chunk_size: int = 64 * 1024):
+        """Stream the SVG into a text file, binary file or socket"""
+        if hasattr(target, 'sendall'):
+            for chunk in self.iter_svg(chunk_size):
+                target.sendall(chunk.encode('utf-8'))
+        elif isinstance(target, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(target, 'mode', ''):
+            for chunk in self.iter_svg(chunk_size):
+                target.write(chunk.encode('utf-8'))
+        else:
+            for chunk in self.iter_svg(chunk_size):
+                target.write(chunk)
+
+    def _path_markup(self, path_index: int) -> str:
+        n = int(self._path_lengths[path_index])
+        if n < 2:
+            return ''
+
+        coords = self._path_coords(path_index)
+        fmt = self._path_formats[path_index]
+
+        # Only the coordinates that are printed: the start point plus whole cubic triplets
+        used = 1 + 3 * ((n - 1) // 3) if n >= 4 else n
+        if fmt == _FORMAT_MIXED:
+            numbers = [f"{v}" for point in self._path_scalars[path_index][:used] for v in point]
+        elif fmt == _FORMAT_INT:
+            numbers = list(map(str, coords[:used].astype(np.int64).ravel().tolist()))
+        else:
+            numbers = list(map(repr, coords[:used].ravel().tolist()))
+        xy = [f"{x},{y}" for x, y in zip(numbers[0::2], numbers[1::2])]
+
+        if n >= 4:
+            body = ''.join([f" C {xy[i]} {xy[i + 1]} {xy[i + 2]}" for i in range(1, used, 3)])
+        else:
+            body = ''.join([f" L {point}" for point in xy[1:]])
+
+        fill = bool(self._path_fill[path_index])
+        color = self._color_strings[self._path_color_ids[path_index]]
+        stroke_width = self._strokes[self._path_stroke_ids[path_index]]
+
+        return (f'<path d="M {xy[0]}{body}{" Z" if fill else ""}" '
+                f'fill="{color if fill else "none"}" '
+                f'stroke="{color if stroke_width > 0 else "none"}" '
+                f'stroke-width="{stroke_width}" />')
+
+    def _circle_markup(self, circle: CircleElement) -> str:
+        color = self._color_string(circle.color)
+        cx, cy = circle.center
+        return (f'<circle cx="{cx}" cy="{cy}" fill="{color if circle.fill else "none"}" r="{circle.radius}" '
+                f'stroke="{color if circle.stroke_width > 0 else "none"}" '
+                f'stroke-width="{circle.stroke_width}" />')
+
+    def _rect_markup(self, rect: RectElement) -> str:
+        color = self._color_string(rect.color)
+        return (f'<rect fill="{color if rect.fill else "none"}" height="{rect.height}" '
+                f'stroke="{color if rect.stroke_width > 0 else "none"}" stroke-width="{rect.stroke_width}" '
+                f'width="{rect.width}" x="{rect.x}" y="{rect.y}" />')
+
     def build(self) -> svgwrite.Drawing:
+        """svgwrite document of the current elements, for callers that need one"""
         dwg = svgwrite.Drawing(size=(self.width, self.height))
-        
+
         for element in self.elements:
+            color_str = self._color_string(element.color)
+            common = dict(
+                fill=color_str if element.fill else "none",
+                stroke=color_str if element.stroke_width > 0 else "none",
+                stroke_width=element.stroke_width
+            )
             if isinstance(element, PathElement):
-                self._add_path_to_svg(dwg, element)
+                markup = self._path_markup(element._index)
+                if markup:
+                    dwg.add(dwg.path(d=markup.split('"', 2)[1], **common))
             elif isinstance(element, CircleElement):
-                self._add_circle_to_svg(dwg, element)
+                dwg.add(dwg.circle(center=element.center, r=element.radius, **common))
             elif isinstance(element, RectElement):
-                self._add_rect_to_svg(dwg, element)
-        
+                dwg.add(dwg.rect(insert=(element.x, element.y), size=(element.width, element.height), **common))
+
         return dwg
-    
-    def _add_path_to_svg(self, dwg: svgwrite.Drawing, path: PathElement):
-        if len(path.points) < 2:
-            return
-        
-        # Convert to SVG path format
-        path_data = f"M {path.points[0][0]},{path.points[0][1]}"
-        
-        # Add bezier curves for smooth paths
-        if len(path.points) >= 4:
-            for i in range(1, len(path.points) - 2, 3):
-                if i + 2 < len(path.points):
-                    cp1 = path.points[i]
-                    cp2 = path.points[i + 1]
-                    end = path.points[i + 2]
-                    path_data += f" C {cp1[0]},{cp1[1]} {cp2[0]},{cp2[1]} {end[0]},{end[1]}"
-        else:
-            # Simple line segments
-            for point in path.points[1:]:
-                path_data += f" L {point[0]},{point[1]}"
-        
-        if path.fill:
-            path_data += " Z"
-        
-        color_str = f"rgb({int(path.color[0]*255)},{int(path.color[1]*255)},{int(path.color[2]*255)})"
-        
-        svg_path = dwg.path(
-            d=path_data,
-            fill=color_str if path.fill else "none",
-            stroke=color_str if path.stroke_width > 0 else "none",
-            stroke_width=path.stroke_width
-        )
-        dwg.add(svg_path)
-    
-    def _add_circle_to_svg(self, dwg: svgwrite.Drawing, circle: CircleElement):
-        color_str = f"rgb({int(circle.color[0]*255)},{int(circle.color[1]*255)},{int(circle.color[2]*255)})"
-        
-        svg_circle = dwg.circle(
-            center=circle.center,
-            r=circle.radius,
-            fill=color_str if circle.fill else "none",
-            stroke=color_str if circle.stroke_width > 0 else "none",
-            stroke_width=circle.stroke_width
-        )
-        dwg.add(svg_circle)
-    
-    def _add_rect_to_svg(self, dwg: svgwrite.Drawing, rect: RectElement):
-        color_str = f"rgb({int(rect.color[0]*255)},{int(rect.color[1]*255)},{int(rect.color[2]*255)})"
-        
-        svg_rect = dwg.rect(
-            insert=(rect.x, rect.y),
-            size=(rect.width, rect.height),
-            fill=color_str if rect.fill else "none",
-            stroke=color_str if rect.stroke_width > 0 else "none",
-            stroke_width=rect.stroke_width
-        )
-        dwg.add(svg_rect)
-    
+
     def save(self, filename: str):
-        dwg = self.build()
-        dwg.saveas(filename)
-    
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(_XML_DECLARATION)
+            self.write(f)
+
     def get_svg_string(self) -> str:
-        dwg = self.build()
-        return dwg.tostring()
\ No newline at end of file
+        return ''.join(self.iter_svg())
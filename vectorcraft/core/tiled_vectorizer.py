@@ -0,0 +1,251 @@
+import re
+import os
+import time
+import itertools
+import multiprocessing
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Any, Optional
+
+import numpy as np
+
+from ..strategies.real_vtracer import RealVTracerStrategy, RawSVGResult
+from ..utils.image_context import ImageContext
+from .engine import _default_workers
+from .scheduler import StageScheduler, _fork_blocker
+
+
+# One VTracer path: d, fill and translate offset
+_PATH_RE = re.compile(
+    r'<path d="([^"]*)" fill="([^"]*)" transform="translate\(([-\d.]+),([-\d.]+)\)"\s*/>'
+)
+_NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?')
+
+
+@dataclass
+class Tile:
+    """A tile window plus the core region it owns for seam deduplication"""
+    x: int
+    y: int
+    width: int
+    height: int
+    core: Tuple[int, int, int, int]  # (x0, y0, x1, y1), half-open, image coordinates
+
+
+def plan_tiles(width: int, height: int, tile_size: int = 1024, overlap: int = 32) -> List[Tile]:
+    """Split an image into overlapping tiles whose cores partition the image"""
+    tiles = []
+    for core_y0 in range(0, height, tile_size):
+        core_y1 = min(core_y0 + tile_size, height)
+        for core_x0 in range(0, width, tile_size):
+            core_x1 = min(core_x0 + tile_size, width)
+
+            x0 = max(0, core_x0 - overlap)
+            y0 = max(0, core_y0 - overlap)
+            x1 = min(width, core_x1 + overlap)
+            y1 = min(height, core_y1 + overlap)
+
+            tiles.append(Tile(x0, y0, x1 - x0, y1 - y0, (core_x0, core_y0, core_x1, core_y1)))
+    return tiles
+
+
+# A traced tile: the SVG plus the (x, y) scale from its coordinates to the tile's
+TileTrace = Tuple[str, Tuple[float, float]]
+
+
+def _vectorize_tile(pixels: np.ndarray, params: Dict[str, Any]) -> str:
+    """Worker entry point: trace one tile with already-resolved VTracer parameters"""
+    return RealVTracerStrategy().convert_pixels(pixels, params)
+
+
+def _preview_tile(pixels: np.ndarray, params: Dict[str, Any], max_dimension: int) -> TileTrace:
+    """Cheap trace of a downsampled tile, with the scale back to tile coordinates"""
+    context = ImageContext.ensure(pixels)
+    small = context.resized(max_dimension)
+    quick_params = dict(params)
+    quick_params['max_iterations'] = min(params['max_iterations'], 4)
+
+    svg = RealVTracerStrategy().convert_pixels(small, quick_params)
+    return svg, (context.width / small.width, context.height / small.height)
+
+
+def _scale_path(d: str, scale_x: float, scale_y: float) -> str:
+    """Scale path data whose numbers are all x,y pairs, as VTracer emits them"""
+    scales = itertools.cycle((scale_x, scale_y))
+    return _NUMBER_RE.sub(
+        lambda match: f"{float(match.group()) * next(scales):.2f}".rstrip('0').rstrip('.'), d
+    )
+
+
+def _path_bbox(d: str) -> Optional[Tuple[float, float, float, float]]:
+    """Bounding box of a path's coordinates (control points included)"""
+    numbers = _NUMBER_RE.findall(d)
+    if len(numbers) < 2:
+        return None
+    coords = np.array(numbers[:len(numbers) // 2 * 2], dtype=np.float64).reshape(-1, 2)
+    x0, y0 = coords.min(axis=0)
+    x1, y1 = coords.max(axis=0)
+    return x0, y0, x1, y1
+
+
+def stitch_tile_svgs(tile_svgs: List[tuple], width: int, height: int) -> str:
+    """Merge per-tile VTracer SVGs into one document.
+
+    Entries are ``(svg, tile)`` or ``(svg, tile, (scale_x, scale_y))`` for
+    tiles traced at reduced size. Every path is moved into image coordinates. A path is kept only by the
+    tile whose core contains its bounding-box center, so shapes traced twice
+    inside an overlap band are emitted once; shapes crossing a seam keep one
+    clipped piece per side, and the overlap makes those pieces meet without
+    cracks. Paths are painted largest first, matching VTracer's stacked mode.
+    """
+    kept = []
+    for entry in tile_svgs:
+        svg, tile = entry[:2]
+        scale_x, scale_y = entry[2] if len(entry) > 2 else (1.0, 1.0)
+        order = (tile.y, tile.x)  # Deterministic tie-break, independent of completion order
+        core_x0, core_y0, core_x1, core_y1 = tile.core
+
+        for index, match in enumerate(_PATH_RE.finditer(svg)):
+            d, fill, tx, ty = match.groups()
+            if (scale_x, scale_y) != (1.0, 1.0):
+                d = _scale_path(d, scale_x, scale_y)
+            bbox = _path_bbox(d)
+            if bbox is None:
+                continue
+
+            offset_x = float(tx) * scale_x + tile.x
+            offset_y = float(ty) * scale_y + tile.y
+            x0, y0, x1, y1 = bbox
+            center_x = offset_x + (x0 + x1) / 2
+            center_y = offset_y + (y0 + y1) / 2
+
+            if not (core_x0 <= center_x < core_x1 and core_y0 <= center_y < core_y1):
+                continue  # Owned by a neighbouring tile
+
+            area = (x1 - x0) * (y1 - y0)
+            kept.append((-area, order, index, d, fill, offset_x, offset_y))
+
+    kept.sort(key=lambda item: item[:3])
+
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<!-- Generator: visioncortex VTracer (tiled) -->\n',
+        f'<svg version="1.1" xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">\n'
+    ]
+    for _, _, _, d, fill, offset_x, offset_y in kept:
+        parts.append(
+            f'<path d="{d}" fill="{fill}" transform="translate({offset_x:g},{offset_y:g})"/>\n'
+        )
+    parts.append('</svg>\n')
+    return ''.join(parts)
+
+
+class TiledVectorizer:
+    """Vectorize very large images tile by tile in a process pool.
+
+    With a scheduler the tiles share its deadline. When full-resolution
+    tiles are not expected to fit, every tile is traced from a downsampled
+    preview instead; tiles still running at the deadline are killed with the
+    pool and replaced by previews, so the stitched SVG always covers the image.
+    """
+
+    preview_dimension = RealVTracerStrategy.preview_dimension
+
+    def __init__(self, tile_size: int = 1024, overlap: int = 32, max_workers: Optional[int] = None):
+        self.tile_size = tile_size
+        self.overlap = overlap
+        # Every engine worker may be tiling at once, so each gets its share of the CPUs
+        self.max_workers = max_workers or max(1, min(8, (os.cpu_count() or 1) // max(1, _default_workers())))
+
+    def vectorize(self, image, params: Dict[str, Any],
+                  scheduler: Optional[StageScheduler] = None) -> RawSVGResult:
+        """Trace ``image`` (ndarray or ImageContext) with resolved VTracer ``params``"""
+        context = ImageContext.ensure(image)
+        pixels = context.uint8
+        h, w = context.shape[:2]
+
+        tiles = plan_tiles(w, h, self.tile_size, self.overlap)
+        print(f"🧩 Tiled vectorization: {len(tiles)} tiles of {self.tile_size}px "
+              f"(overlap {self.overlap}px) on {self.max_workers} workers")
+
+        windows = [pixels[tile.y:tile.y + tile.height, tile.x:tile.x + tile.width] for tile in tiles]
+        # Wall-clock cost is driven by the waves of tiles each worker runs in turn
+        workers = min(self.max_workers, len(tiles))
+        wall_pixels = -(-len(tiles) // workers) * max(tile.width * tile.height for tile in tiles)
+
+        if scheduler is not None and not scheduler.fits('vtracer', pixels=wall_pixels):
+            start = time.monotonic()
+            traces = [_preview_tile(window, params, self.preview_dimension) for window in windows]
+            scheduler.record('vtracer', 'degraded', time.monotonic() - start, pixels=wall_pixels,
+                             note='over budget, preview tiles')
+        else:
+            traces = self._trace_tiles(windows, params, workers, wall_pixels, scheduler)
+
+        svg = stitch_tile_svgs([(svg, tile, scale) for (svg, scale), tile in zip(traces, tiles)], w, h)
+        return RawSVGResult(svg, w, h)
+
+    def _trace_tiles(self, windows: List[np.ndarray], params: Dict[str, Any], workers: int,
+                     wall_pixels: int, scheduler: Optional[StageScheduler]) -> List[TileTrace]:
+        """Full-resolution traces, with previews standing in for tiles that missed the deadline"""
+        # Budget kept back for tracing previews of any tiles cut off at the deadline
+        reserve = 0.0
+        if scheduler is not None:
+            reserve = scheduler.estimate('vtracer_preview', pixels=len(windows) * self.preview_dimension ** 2)
+
+        start = time.monotonic()
+        blocker = _fork_blocker()
+        if blocker is None:
+            traced = self._trace_in_pool(windows, params, workers, scheduler, reserve)
+            note = f"{len(windows)} tiles, pool of {workers}"
+        else:
+            if scheduler is not None:
+                print(f"⚠️  Tiles run in-process without a hard deadline ({blocker})")
+            traced = self._trace_in_process(windows, params, scheduler, reserve)
+            note = f"soft deadline: {blocker}"
+
+        late = [index for index, svg in enumerate(traced) if svg is None]
+        traces = [
+            _preview_tile(window, params, self.preview_dimension) if svg is None else (svg, (1.0, 1.0))
+            for window, svg in zip(windows, traced)
+        ]
+
+        if scheduler is not None:
+            seconds = time.monotonic() - start
+            if late:
+                scheduler.record('vtracer', 'timed_out', seconds, pixels=wall_pixels,
+                                 note=f"{len(late)} of {len(windows)} tiles replaced by previews")
+            else:
+                scheduler.record('vtracer', 'ran', seconds, pixels=wall_pixels, note=note)
+        return traces
+
+    @staticmethod
+    def _trace_in_pool(windows: List[np.ndarray], params: Dict[str, Any], workers: int,
+                       scheduler: Optional[StageScheduler], reserve: float) -> List[Optional[str]]:
+        """Trace tiles in forked workers; tiles unfinished at the deadline come back as None"""
+        pool = multiprocessing.get_context('fork').Pool(workers)
+        try:
+            jobs = [pool.apply_async(_vectorize_tile, (window, params)) for window in windows]
+            traced = []
+            for job in jobs:
+                timeout = None if scheduler is None else max(0.0, scheduler.remaining - reserve)
+                try:
+                    traced.append(job.get(timeout))
+                except multiprocessing.TimeoutError:
+                    traced.append(None)
+            return traced
+        finally:
+            # Kills workers still tracing late tiles
+            pool.terminate()
+            pool.join()
+
+    @staticmethod
+    def _trace_in_process(windows: List[np.ndarray], params: Dict[str, Any],
+                          scheduler: Optional[StageScheduler], reserve: float) -> List[Optional[str]]:
+        """Trace tiles one by one, skipping those not expected to fit what is left of the budget"""
+        traced = []
+        for window in windows:
+            h, w = window.shape[:2]
+            if scheduler is not None and not scheduler.fits('vtracer', reserve=reserve, pixels=h * w):
+                traced.append(None)
+            else:
+                traced.append(_vectorize_tile(window, params))
+        return traced
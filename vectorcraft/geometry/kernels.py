@@ -0,0 +1,276 @@
+import math
+import numpy as np
+from typing import List, Optional, Sequence, Tuple, Union
+
+PointsLike = Union[np.ndarray, Sequence[Tuple[float, float]]]
+
+
+# --- conversion -----------------------------------------------------------
+
+def as_points(points: PointsLike) -> np.ndarray:
+    """N x 2 float64 array from a list of tuples or an OpenCV (N, 1, 2) contour.
+
+    Kept in float64 so smoothed and interpolated coordinates reach the SVG as
+    the plain Python floats the per-point code produced, not float32 artifacts.
+    """
+    arr = np.asarray(points, dtype=np.float64)
+    if arr.size == 0:
+        return arr.reshape(0, 2)
+    return arr.reshape(-1, 2)
+
+
+def to_tuples(points: np.ndarray) -> List[Tuple[float, float]]:
+    """List of (x, y) float tuples, the format SVGBuilder paths use"""
+    return [(x, y) for x, y in np.asarray(points, dtype=np.float64).tolist()]
+
+
+# --- distances and lengths ------------------------------------------------
+
+def perpendicular_distances(points: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Distance of every point to the infinite line through start and end.
+
+    A degenerate line (start == end) yields zeros, as the original helpers did.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    dx, dy = float(end[0] - start[0]), float(end[1] - start[1])
+    den = math.hypot(dx, dy)
+    if den == 0:
+        return np.zeros(len(points))
+    cross = dy * points[:, 0] - dx * points[:, 1] + float(end[0]) * float(start[1]) - float(end[1]) * float(start[0])
+    return np.abs(cross) / den
+
+
+def segment_lengths(points: np.ndarray) -> np.ndarray:
+    """Length of each of the N-1 segments of an open polyline"""
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) < 2:
+        return np.zeros(0)
+    return np.hypot(*np.diff(points, axis=0).T)
+
+
+def arc_length(points: np.ndarray, closed: bool = False) -> float:
+    """Total length of the polyline, optionally including the closing segment"""
+    points = np.asarray(points, dtype=np.float64)
+    total = float(segment_lengths(points).sum())
+    if closed and len(points) > 1:
+        total += float(np.hypot(*(points[0] - points[-1])))
+    return total
+
+
+def cumulative_arc_length(points: np.ndarray) -> np.ndarray:
+    """Arc length from the first point to every point (first entry is 0)"""
+    return np.concatenate(([0.0], np.cumsum(segment_lengths(points))))
+
+
+# --- simplification -------------------------------------------------------
+
+def douglas_peucker_mask(points: np.ndarray, epsilon: float) -> np.ndarray:
+    """Boolean mask of the points Douglas-Peucker keeps.
+
+    Iterative, with each span's distances computed in one vectorized pass.
+    Splits happen at the first farthest point and only when its distance is
+    strictly greater than ``epsilon``, so the result matches the recursive
+    implementation point for point.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    if n <= 2:
+        return keep
+
+    xs, ys = points[:, 0], points[:, 1]
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        x1, y1, x2, y2 = xs[first], ys[first], xs[last], ys[last]
+        dx, dy = x2 - x1, y2 - y1
+        den = math.hypot(dx, dy)
+        if den == 0:
+            continue  # Degenerate baseline: every distance is 0, nothing exceeds epsilon
+        # Compare |cross| against epsilon * den to skip the division
+        cross = np.abs(dy * xs[first + 1:last] - dx * ys[first + 1:last] + (x2 * y1 - y2 * x1))
+        index = int(cross.argmax())
+        if cross[index] > epsilon * den:
+            split = first + 1 + index
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+def douglas_peucker(points: PointsLike, epsilon: float) -> np.ndarray:
+    """Simplify a polyline with Douglas-Peucker, returning an N x 2 float64 array"""
+    points = as_points(points)
+    if len(points) <= 2:
+        return points
+    return points[douglas_peucker_mask(points, epsilon)]
+
+
+# --- corners and splice points --------------------------------------------
+
+def turn_angles(points: np.ndarray) -> np.ndarray:
+    """Signed turning angle in [-pi, pi] at each interior point (length N-2).
+
+    Entry k is the angle between segments (k, k+1) and (k+1, k+2). Zero-length
+    segments have direction 0, matching the scalar helper they replace.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) < 3:
+        return np.zeros(0)
+    deltas = np.diff(points, axis=0)
+    headings = np.arctan2(deltas[:, 1], deltas[:, 0])
+    diff = np.diff(headings)
+    return (diff + np.pi) % (2 * np.pi) - np.pi
+
+
+def find_splice_points(points: PointsLike, corner_threshold: float) -> np.ndarray:
+    """Indices i in [2, N-3] whose turning angle exceeds ``corner_threshold`` degrees"""
+    points = as_points(points)
+    n = len(points)
+    if n < 5:
+        return np.zeros(0, dtype=np.intp)
+    angles = np.abs(turn_angles(points))  # angles[k] belongs to point k + 1
+    candidates = np.arange(2, n - 2)
+    return candidates[angles[candidates - 1] > math.radians(corner_threshold)]
+
+
+def find_splice_points_windowed(points: PointsLike, corner_threshold: float) -> np.ndarray:
+    """Corner detection on the mean absolute turning angle over a sliding window.
+
+    The window spans points [i - h, i + h) with h = min(5, N // 4) // 2, and
+    candidates are i in [w, N - w) with w = min(5, N // 4).
+    """
+    points = as_points(points)
+    n = len(points)
+    if n < 5:
+        return np.zeros(0, dtype=np.intp)
+
+    window = min(5, n // 4)
+    half = window // 2
+    if half == 0:
+        return np.zeros(0, dtype=np.intp)
+
+    # abs_angle[j] for point j, 0 at the endpoints (never inside a window)
+    abs_angle = np.zeros(n)
+    abs_angle[1:-1] = np.abs(turn_angles(points))
+    csum = np.concatenate(([0.0], np.cumsum(abs_angle)))
+
+    candidates = np.arange(window, n - window)
+    mean_curvature = (csum[candidates + half] - csum[candidates - half]) / (2 * half)
+    return candidates[mean_curvature > math.radians(corner_threshold)]
+
+
+def split_at(points: np.ndarray, splice_points: Sequence[int]) -> List[np.ndarray]:
+    """Segments between consecutive splice points; each shares its end point with the next"""
+    if len(splice_points) == 0:
+        return [points]
+
+    segments = []
+    start = 0
+    for splice in splice_points:
+        if splice > start:
+            segments.append(points[start:splice + 1])
+            start = splice
+    if start < len(points) - 1:
+        segments.append(points[start:])
+    return [segment for segment in segments if len(segment) > 1]
+
+
+def simplify_segments(points: PointsLike, splice_points: Sequence[int],
+                      epsilon: Optional[float] = None, relative_epsilon: Optional[float] = None,
+                      min_epsilon: float = 1.0) -> np.ndarray:
+    """Douglas-Peucker each segment between splice points and concatenate the results.
+
+    Either a fixed ``epsilon`` or one per segment of
+    ``max(min_epsilon, relative_epsilon * segment_length)``. Splice points
+    appear once per adjoining segment, as in the original pipelines.
+    """
+    points = as_points(points)
+    simplified = []
+    for segment in split_at(points, splice_points):
+        segment_epsilon = epsilon
+        if segment_epsilon is None:
+            segment_epsilon = max(min_epsilon, arc_length(segment) * relative_epsilon)
+        simplified.append(douglas_peucker(segment, segment_epsilon))
+    if not simplified:
+        return points[:0]
+    return np.concatenate(simplified)
+
+
+# --- smoothing and curve fitting ------------------------------------------
+
+def smooth_open(points: PointsLike) -> np.ndarray:
+    """[1, 2, 1] / 4 weighted average of interior points; endpoints are kept"""
+    points = as_points(points)
+    if len(points) < 3:
+        return points
+    smoothed = points.copy()
+    smoothed[1:-1] = (points[:-2] + 2 * points[1:-1] + points[2:]) / 4
+    return smoothed
+
+
+def smooth_closed(points: PointsLike, self_weight: float, neighbour_weight: float,
+                  passes: int) -> np.ndarray:
+    """Repeated neighbour averaging around a closed loop.
+
+    Each pass replaces every point with ``self_weight`` of itself plus
+    ``neighbour_weight`` of each neighbour, wrapping around the ends.
+    """
+    points = as_points(points)
+    for _ in range(passes):
+        points = (self_weight * points +
+                  neighbour_weight * np.roll(points, 1, axis=0) +
+                  neighbour_weight * np.roll(points, -1, axis=0))
+    return points
+
+
+def moving_average(points: PointsLike, half_window: int) -> np.ndarray:
+    """Centered moving average over 2 * half_window + 1 points.
+
+    Points closer than ``half_window`` to either end are left untouched; all
+    averages read the unsmoothed input.
+    """
+    points = as_points(points)
+    n = len(points)
+    if half_window < 1 or n < 2 * half_window + 1:
+        return points
+    width = 2 * half_window + 1
+    csum = np.concatenate((np.zeros((1, 2)), np.cumsum(points, axis=0)))
+    smoothed = points.copy()
+    smoothed[half_window:n - half_window] = (csum[width:] - csum[:-width]) / width
+    return smoothed
+
+
+def catmull_rom(points: PointsLike, samples: int = 3) -> np.ndarray:
+    """Catmull-Rom interpolation through every point.
+
+    Samples ``samples`` parameters in [0, 1] per segment, with end points
+    clamped. The first point is emitted twice, as the loop-based version did.
+    """
+    points = as_points(points)
+    n = len(points)
+    if n < 4:
+        return points
+
+    i = np.arange(n - 1)
+    p0 = points[np.maximum(0, i - 1)]
+    p1 = points[i]
+    p2 = points[np.minimum(n - 1, i + 1)]
+    p3 = points[np.minimum(n - 1, i + 2)]
+
+    t = np.linspace(0, 1, samples)[:, None, None]  # (samples, 1, 1) broadcast over segments
+    curve = 0.5 * (
+        2 * p1 +
+        (-p0 + p2) * t +
+        (2 * p0 - 5 * p1 + 4 * p2 - p3) * t * t +
+        (-p0 + 3 * p1 - 3 * p2 + p3) * t * t * t
+    )  # (samples, n - 1, 2)
+
+    # t = 0 repeats the previous segment's t = 1 except on the first segment
+    body = curve[1:].transpose(1, 0, 2).reshape(-1, 2)
+    return np.concatenate((points[:1], curve[0, :1], body))
@@ -0,0 +1,169 @@
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Axis-aligned bounding box: (min_x, min_y, max_x, max_y)
+Box = Tuple[float, float, float, float]
+
+# Boxes covering more cells than this are kept in a list every query scans,
+# so one huge box cannot make insertion or queries slow
+_MAX_CELLS_PER_BOX = 64
+
+
+def box_from_xywh(x: float, y: float, width: float, height: float) -> Box:
+    return (x, y, x + width, y + height)
+
+
+def box_around(x: float, y: float, radius: float) -> Box:
+    """Box of the square centred on (x, y) with half-side ``radius``"""
+    return (x - radius, y - radius, x + radius, y + radius)
+
+
+def boxes_intersect(a: Box, b: Box) -> bool:
+    """Whether two boxes intersect, edges included"""
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def point_box_distance(x: float, y: float, box: Box) -> float:
+    """Distance from a point to a box (0 inside it)"""
+    dx = max(box[0] - x, 0.0, x - box[2])
+    dy = max(box[1] - y, 0.0, y - box[3])
+    return math.hypot(dx, dy)
+
+
+def suggest_cell_size(boxes: Iterable[Box], minimum: float = 1.0) -> float:
+    """Grid cell size matched to typical box extent (median of the larger side)"""
+    extents = sorted(max(box[2] - box[0], box[3] - box[1]) for box in boxes)
+    if not extents:
+        return max(minimum, 32.0)
+    return max(minimum, extents[len(extents) // 2])
+
+
+class GridIndex:
+    """Uniform-grid spatial hash over bounding boxes.
+
+    Each box is registered in every grid cell it covers, so an overlap or
+    point query only looks at boxes sharing a cell with it instead of every
+    box inserted. With a cell size near the typical box size (see
+    ``suggest_cell_size`` / ``bulk_load``), filtering n boxes against each
+    other costs roughly O(n) rather than O(n^2). Queries return candidates in
+    insertion order; the exact geometric test stays with the caller.
+    """
+
+    def __init__(self, cell_size: float = 32.0):
+        self.cell_size = max(float(cell_size), 1e-6)
+        self.boxes: List[Box] = []
+        self.items: List[Any] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._large: List[int] = []
+        self._extent: Optional[List[int]] = None  # Occupied cell range: [min_i, min_j, max_i, max_j]
+
+    @classmethod
+    def bulk_load(cls, boxes: Sequence[Box], items: Optional[Sequence[Any]] = None,
+                  cell_size: Optional[float] = None) -> 'GridIndex':
+        """Index built from many boxes at once; ``items`` default to the boxes' positions"""
+        index = cls(cell_size if cell_size is not None else suggest_cell_size(boxes))
+        for position, box in enumerate(boxes):
+            index.insert(box, items[position] if items is not None else position)
+        return index
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _cell(self, value: float) -> int:
+        return int(math.floor(value / self.cell_size))
+
+    def insert(self, box: Box, item: Any = None):
+        ident = len(self.boxes)
+        self.boxes.append(box)
+        self.items.append(item)
+
+        i0, j0, i1, j1 = self._cell(box[0]), self._cell(box[1]), self._cell(box[2]), self._cell(box[3])
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > _MAX_CELLS_PER_BOX:
+            self._large.append(ident)
+            return
+
+        cells = self._cells
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                bucket = cells.get((i, j))
+                if bucket is None:
+                    cells[(i, j)] = [ident]
+                else:
+                    bucket.append(ident)
+        if self._extent is None:
+            self._extent = [i0, j0, i1, j1]
+        else:
+            extent = self._extent
+            extent[0], extent[1] = min(extent[0], i0), min(extent[1], j0)
+            extent[2], extent[3] = max(extent[2], i1), max(extent[3], j1)
+
+    def query(self, box: Box) -> List[Any]:
+        """Items whose boxes intersect ``box`` (edges included), in insertion order"""
+        boxes = self.boxes
+        found = {ident for ident in self._large if boxes_intersect(boxes[ident], box)}
+        if self._cells:
+            extent = self._extent
+            i0, j0 = max(self._cell(box[0]), extent[0]), max(self._cell(box[1]), extent[1])
+            i1, j1 = min(self._cell(box[2]), extent[2]), min(self._cell(box[3]), extent[3])
+            cells = self._cells
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    for ident in cells.get((i, j), ()):
+                        if ident not in found and boxes_intersect(boxes[ident], box):
+                            found.add(ident)
+        return [self.items[ident] for ident in sorted(found)]
+
+    def query_point(self, x: float, y: float) -> List[Any]:
+        """Items whose boxes contain the point (edges included)"""
+        return self.query((x, y, x, y))
+
+    def any(self, box: Box, predicate=None) -> bool:
+        """Whether some item whose box intersects ``box`` satisfies ``predicate`` (default: any item)"""
+        return any(predicate is None or predicate(item) for item in self.query(box))
+
+    def nearest(self, x: float, y: float, max_distance: float = math.inf) -> Optional[Any]:
+        """Item whose box is closest to the point, or None if none is within ``max_distance``
+
+        Rings of cells are searched outwards from the point's cell and the
+        search stops once no unvisited cell can hold anything closer.
+        """
+        boxes = self.boxes
+        best, best_distance = None, max_distance
+        for ident in self._large:
+            distance = point_box_distance(x, y, boxes[ident])
+            if distance < best_distance or (distance == best_distance and best is None):
+                best, best_distance = ident, distance
+
+        if self._cells:
+            ci, cj = self._cell(x), self._cell(y)
+            extent = self._extent
+            max_ring = max(ci - extent[0], extent[2] - ci, cj - extent[1], extent[3] - cj, 0)
+            seen = set()
+            for ring in range(max_ring + 1):
+                # Everything outside rings 0..ring-1 is at least (ring - 1) cells away
+                if best is not None and best_distance <= (ring - 1) * self.cell_size:
+                    break
+                if ring > 0 and (ring - 1) * self.cell_size > max_distance:
+                    break
+                for i, j in self._ring(ci, cj, ring):
+                    for ident in self._cells.get((i, j), ()):
+                        if ident in seen:
+                            continue
+                        seen.add(ident)
+                        distance = point_box_distance(x, y, boxes[ident])
+                        if distance < best_distance or (distance == best_distance and
+                                                        (best is None or ident < best)):
+                            best, best_distance = ident, distance
+        return self.items[best] if best is not None else None
+
+    @staticmethod
+    def _ring(ci: int, cj: int, ring: int):
+        if ring == 0:
+            yield ci, cj
+            return
+        for i in range(ci - ring, ci + ring + 1):
+            yield i, cj - ring
+            yield i, cj + ring
+        for j in range(cj - ring + 1, cj + ring):
+            yield ci - ring, j
+            yield ci + ring, j
@@ -1,8 +1,11 @@
 import numpy as np
 import cv2
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Union
 from dataclasses import dataclass
 
+from ..utils.image_context import ImageContext
+from ..geometry.spatial_index import GridIndex, box_around, box_from_xywh, suggest_cell_size
+
 @dataclass
 class Circle:
     center: Tuple[float, float]
@@ -31,9 +34,9 @@ class PrimitiveDetector:
         self.line_threshold = 30
         self.rect_min_area = 100
         
-    def detect_circles(self, image: np.ndarray, edge_map: np.ndarray) -> List[Circle]:
+    def detect_circles(self, image: Union[np.ndarray, ImageContext], edge_map: np.ndarray) -> List[Circle]:
         """Enhanced circle detection with multiple methods"""
-        gray = cv2.cvtColor((image * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY) if len(image.shape) == 3 else (image * 255).astype(np.uint8)
+        gray = ImageContext.ensure(image).gray
         
         circles_combined = []
         
@@ -45,9 +48,9 @@ class PrimitiveDetector:
         )
         
         if circles is not None:
-            circles = np.round(circles[0, :]).astype("int")
-            for (x, y, r) in circles:
-                confidence = self._calculate_circle_confidence_enhanced(edge_map, (x, y), r)
+            circles = np.round(circles.reshape(-1, 3)).astype("int")
+            confidences = self._circle_confidences(edge_map, circles[:, :2], circles[:, 2])
+            for (x, y, r), confidence in zip(circles, confidences.tolist()):
                 if confidence > 0.2:  # Lower threshold for subtle shapes
                     circles_combined.append(Circle((float(x), float(y)), float(r), confidence))
         
@@ -74,24 +77,31 @@ class PrimitiveDetector:
     
     def _calculate_circle_confidence_enhanced(self, edge_map: np.ndarray, center: Tuple[int, int], radius: int) -> float:
         """Enhanced circle confidence calculation"""
-        x, y = center
+        return float(self._circle_confidences(edge_map, np.array([center]), np.array([radius]))[0])
+    
+    def _circle_confidences(self, edge_map: np.ndarray, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        """Enhanced confidence of many circles at once
+        
+        Every circle is sampled at 32 angles and at radii within 2px of its own;
+        an angle counts as a hit if any of its samples lands on an edge pixel.
+        All samples are read from the edge map in a single gather.
+        """
+        centers = np.asarray(centers).reshape(-1, 2)
+        if len(centers) == 0:
+            return np.zeros(0)
         
-        # Sample more points around the circle
         angles = np.linspace(0, 2*np.pi, 32)  # More sample points
-        edge_hits = 0
+        sample_radii = np.asarray(radii).reshape(-1, 1, 1) + np.arange(-2, 3)  # (circles, 1, offsets)
+        # int() of the float position truncates toward zero, as the per-point loop did
+        px = (centers[:, 0, None, None] + sample_radii * np.cos(angles)[:, None]).astype(np.intp)
+        py = (centers[:, 1, None, None] + sample_radii * np.sin(angles)[:, None]).astype(np.intp)
         
-        for angle in angles:
-            # Sample points at multiple radii around the target radius
-            for r_offset in [-2, -1, 0, 1, 2]:
-                px = int(x + (radius + r_offset) * np.cos(angle))
-                py = int(y + (radius + r_offset) * np.sin(angle))
-                
-                if 0 <= px < edge_map.shape[1] and 0 <= py < edge_map.shape[0]:
-                    if edge_map[py, px] > 0:
-                        edge_hits += 1
-                        break  # Found edge at this angle
+        height, width = edge_map.shape[:2]
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        hits = np.zeros(px.shape, dtype=bool)
+        hits[inside] = edge_map[py[inside], px[inside]] > 0
         
-        return edge_hits / len(angles)
+        return hits.any(axis=2).sum(axis=1) / len(angles)
     
     def _filter_duplicate_circles(self, circles: List[Circle]) -> List[Circle]:
         """Filter out duplicate/overlapping circles"""
@@ -101,20 +111,21 @@ class PrimitiveDetector:
         # Sort by confidence
         circles.sort(key=lambda c: c.confidence, reverse=True)
         
+        # Centers closer than half the larger radius need boxes of half-side r/2 that meet
+        boxes = [box_around(c.center[0], c.center[1], c.radius * 0.5) for c in circles]
+        kept = GridIndex(suggest_cell_size(boxes))
         filtered = []
-        for circle in circles:
-            is_duplicate = False
-            for existing in filtered:
+        for circle, box in zip(circles, boxes):
+            def is_duplicate(existing):
                 # Check distance between centers
                 dist = np.sqrt((circle.center[0] - existing.center[0])**2 + 
                               (circle.center[1] - existing.center[1])**2)
                 # If centers are close and radii similar, it's a duplicate
-                if dist < max(circle.radius, existing.radius) * 0.5:
-                    is_duplicate = True
-                    break
+                return dist < max(circle.radius, existing.radius) * 0.5
             
-            if not is_duplicate:
+            if not kept.any(box, is_duplicate):
                 filtered.append(circle)
+                kept.insert(box, circle)
         
         return filtered
     
@@ -163,7 +174,7 @@ class PrimitiveDetector:
         """Enhanced rectangle confidence calculation with angle validation"""
         # Get the four corner points of the rectangle
         box = cv2.boxPoints(rect)
-        box = np.int0(box)
+        box = np.intp(box)
         
         # Calculate area ratio
         contour_area = cv2.contourArea(contour)
@@ -234,21 +245,22 @@ class PrimitiveDetector:
         # Sort by confidence
         rectangles.sort(key=lambda r: r.confidence, reverse=True)
         
+        # Centers closer than 0.3 of the average size need boxes of half-side 0.075 * (w + h) that meet
+        boxes = [box_around(r.x + r.width/2, r.y + r.height/2, (r.width + r.height) * 0.075) for r in rectangles]
+        kept = GridIndex(suggest_cell_size(boxes))
         filtered = []
-        for rect in rectangles:
-            is_duplicate = False
-            for existing in filtered:
+        for rect, box in zip(rectangles, boxes):
+            def is_duplicate(existing):
                 # Check overlap using center distance and size similarity
                 center_dist = np.sqrt((rect.x + rect.width/2 - existing.x - existing.width/2)**2 + 
                                     (rect.y + rect.height/2 - existing.y - existing.height/2)**2)
                 avg_size = (rect.width + rect.height + existing.width + existing.height) / 4
                 
-                if center_dist < avg_size * 0.3:  # Close centers
-                    is_duplicate = True
-                    break
+                return center_dist < avg_size * 0.3  # Close centers
             
-            if not is_duplicate:
+            if not kept.any(box, is_duplicate):
                 filtered.append(rect)
+                kept.insert(box, rect)
         
         return filtered
     
@@ -269,8 +281,8 @@ class PrimitiveDetector:
         
         detected_lines = []
         if lines is not None:
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
+            # OpenCV 4 returns (N, 1, 4) and OpenCV 5 (1, N, 4)
+            for x1, y1, x2, y2 in lines.reshape(-1, 4):
                 
                 # Calculate line length for confidence
                 length = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
@@ -280,7 +292,7 @@ class PrimitiveDetector:
         
         return detected_lines
     
-    def detect_all_primitives(self, image: np.ndarray, edge_map: np.ndarray) -> Dict[str, List[Any]]:
+    def detect_all_primitives(self, image: Union[np.ndarray, ImageContext], edge_map: np.ndarray) -> Dict[str, List[Any]]:
         """Detect all primitive types"""
         return {
             'circles': self.detect_circles(image, edge_map),
@@ -288,31 +300,43 @@ class PrimitiveDetector:
             'lines': self.detect_lines(edge_map)
         }
     
-    def _calculate_circle_confidence(self, edge_map: np.ndarray, center: Tuple[int, int], radius: int) -> float:
-        """Calculate how well detected circle matches edge pixels"""
+    def _calculate_circle_confidence(self, edge_map: np.ndarray, center: Tuple[int, int], radius: int,
+                                     edge_distance: Optional[np.ndarray] = None) -> float:
+        """Calculate how well detected circle matches edge pixels
+        
+        Pass ``edge_distance`` (see ``edge_distance_map``) when scoring several
+        circles against the same edge map.
+        """
         x, y = center
+        if edge_distance is None:
+            edge_distance = self.edge_distance_map(edge_map)
         
         # Sample points around the circle
         angles = np.linspace(0, 2*np.pi, 32)
-        edge_hits = 0
-        total_points = len(angles)
+        px = (x + radius * np.cos(angles)).astype(np.intp)
+        py = (y + radius * np.sin(angles)).astype(np.intp)
         
-        for angle in angles:
-            px = int(x + radius * np.cos(angle))
-            py = int(y + radius * np.sin(angle))
-            
-            if 0 <= px < edge_map.shape[1] and 0 <= py < edge_map.shape[0]:
-                # Check if there's an edge pixel nearby
-                if self._has_edge_nearby(edge_map, px, py, radius=3):
-                    edge_hits += 1
+        inside = (px >= 0) & (px < edge_map.shape[1]) & (py >= 0) & (py < edge_map.shape[0])
+        # Check if there's an edge pixel nearby
+        edge_hits = np.count_nonzero(edge_distance[py[inside], px[inside]] <= 3)
         
-        return edge_hits / total_points
+        return edge_hits / len(angles)
+    
+    @staticmethod
+    def edge_distance_map(edge_map: np.ndarray) -> np.ndarray:
+        """Chessboard distance from every pixel to the nearest edge pixel
+        
+        ``edge_distance_map(edge_map)[y, x] <= r`` holds exactly when the
+        (2r+1)-pixel window around (x, y) contains an edge pixel.
+        """
+        background = (np.asarray(edge_map) <= 0).astype(np.uint8)
+        return cv2.distanceTransform(background, cv2.DIST_C, 3)
     
     def _calculate_rect_confidence(self, contour: np.ndarray, rect: Tuple) -> float:
         """Calculate how well contour matches rectangle"""
         # Get the four corner points of the rectangle
         box = cv2.boxPoints(rect)
-        box = np.int0(box)
+        box = np.intp(box)
         
         # Calculate area ratio
         contour_area = cv2.contourArea(contour)
@@ -337,40 +361,39 @@ class PrimitiveDetector:
     
     def _has_edge_nearby(self, edge_map: np.ndarray, x: int, y: int, radius: int = 3) -> bool:
         """Check if there's an edge pixel within radius"""
-        for dx in range(-radius, radius + 1):
-            for dy in range(-radius, radius + 1):
-                px, py = x + dx, y + dy
-                if 0 <= px < edge_map.shape[1] and 0 <= py < edge_map.shape[0]:
-                    if edge_map[py, px] > 0:
-                        return True
-        return False
+        if x + radius < 0 or y + radius < 0:
+            return False
+        window = edge_map[max(0, y - radius):y + radius + 1, max(0, x - radius):x + radius + 1]
+        return bool(np.any(window > 0))
     
     def filter_overlapping_primitives(self, primitives: Dict[str, List[Any]], 
                                     overlap_threshold: float = 0.5) -> Dict[str, List[Any]]:
-        """Remove overlapping primitives, keeping higher confidence ones"""
+        """Remove overlapping primitives, keeping higher confidence ones
+        
+        Kept primitives go into a spatial index, so each candidate is only
+        tested against the kept ones near it.
+        """
         filtered = {key: [] for key in primitives.keys()}
         
-        # Process circles
+        # Process circles: two circles can only be within (r1 + r2) * threshold
+        # of each other if the boxes of half-side r * threshold around them meet
         circles = sorted(primitives['circles'], key=lambda c: c.confidence, reverse=True)
-        for circle in circles:
-            overlapping = False
-            for existing in filtered['circles']:
-                if self._circles_overlap(circle, existing, overlap_threshold):
-                    overlapping = True
-                    break
-            if not overlapping:
+        reach = max(overlap_threshold, 0.0)
+        boxes = [box_around(c.center[0], c.center[1], c.radius * reach) for c in circles]
+        kept = GridIndex(suggest_cell_size(boxes))
+        for circle, box in zip(circles, boxes):
+            if not kept.any(box, lambda existing: self._circles_overlap(circle, existing, overlap_threshold)):
                 filtered['circles'].append(circle)
+                kept.insert(box, circle)
         
-        # Process rectangles
+        # Process rectangles: a positive overlap ratio needs intersecting boxes
         rectangles = sorted(primitives['rectangles'], key=lambda r: r.confidence, reverse=True)
-        for rect in rectangles:
-            overlapping = False
-            for existing in filtered['rectangles']:
-                if self._rectangles_overlap(rect, existing, overlap_threshold):
-                    overlapping = True
-                    break
-            if not overlapping:
+        boxes = [box_from_xywh(r.x, r.y, r.width, r.height) for r in rectangles]
+        kept = GridIndex(suggest_cell_size(boxes))
+        for rect, box in zip(rectangles, boxes):
+            if not kept.any(box, lambda existing: self._rectangles_overlap(rect, existing, overlap_threshold)):
                 filtered['rectangles'].append(rect)
+                kept.insert(box, rect)
         
         # Lines don't typically need overlap filtering
         filtered['lines'] = primitives['lines']
@@ -3,7 +3,6 @@ import cv2
 from typing import List, Tuple, Optional, Dict
 from scipy.spatial.distance import pdist, squareform
 from sklearn.cluster import DBSCAN
-import math
 import logging
 
 # Text detection imports
@@ -20,6 +19,10 @@ except ImportError:
     EASYOCR_AVAILABLE = False
 
 from ..core.svg_builder import SVGBuilder
+from ..geometry.kernels import (
+    as_points, to_tuples, arc_length, douglas_peucker, find_splice_points_windowed,
+    simplify_segments, catmull_rom
+)
 
 class ExperimentalVTracerStrategy:
     """Experimental VTracer strategy with advanced text detection and Vector Magic features"""
@@ -296,7 +299,7 @@ class ExperimentalVTracerStrategy:
             
             for contour in contours:
                 if cv2.contourArea(contour) > self.filter_speckle:
-                    path_points = [(float(point[0][0]), float(point[0][1])) for point in contour]
+                    path_points = to_tuples(as_points(contour))
                     
                     raw_paths.append({
                         'points': path_points,
@@ -313,73 +316,22 @@ class ExperimentalVTracerStrategy:
         simplified_paths = []
         
         for path_data in raw_paths:
-            points = path_data['points']
+            points = as_points(path_data['points'])
             if len(points) < 3:
                 continue
             
             # Enhanced splice point detection
-            splice_points = self._enhanced_find_splice_points(points)
-            
-            # Create segments
-            segments = self._create_segments(points, splice_points)
+            splice_points = find_splice_points_windowed(points, self.corner_threshold)
             
-            # Adaptive simplification
-            simplified_segments = []
-            for segment in segments:
-                # Adaptive epsilon based on segment characteristics
-                segment_length = self._calculate_segment_length(segment)
-                adaptive_epsilon = max(1.0, segment_length * 0.01)
-                
-                simplified = self._douglas_peucker_segment(segment, epsilon=adaptive_epsilon)
-                simplified_segments.extend(simplified)
+            # Adaptive simplification: epsilon is 1% of each segment's length, at least 1px
+            simplified = simplify_segments(points, splice_points, relative_epsilon=0.01, min_epsilon=1.0)
             
-            if len(simplified_segments) >= 3:
-                path_data['points'] = simplified_segments
+            if len(simplified) >= 3:
+                path_data['points'] = to_tuples(simplified)
                 simplified_paths.append(path_data)
         
         return simplified_paths
     
-    def _enhanced_find_splice_points(self, points: List[Tuple[float, float]]) -> List[int]:
-        """Enhanced splice point detection with better corner detection"""
-        if len(points) < 5:
-            return []
-        
-        splice_points = []
-        
-        # Use sliding window for better corner detection
-        window_size = min(5, len(points) // 4)
-        
-        for i in range(window_size, len(points) - window_size):
-            # Calculate curvature over window
-            curvatures = []
-            for j in range(i - window_size//2, i + window_size//2):
-                if j > 0 and j < len(points) - 1:
-                    p1 = np.array(points[j-1])
-                    p2 = np.array(points[j])
-                    p3 = np.array(points[j+1])
-                    
-                    v1 = p2 - p1
-                    v2 = p3 - p2
-                    
-                    angle = self._signed_angle_difference(v1, v2)
-                    curvatures.append(abs(angle))
-            
-            if curvatures:
-                avg_curvature = np.mean(curvatures)
-                if avg_curvature > math.radians(self.corner_threshold):
-                    splice_points.append(i)
-        
-        return splice_points
-    
-    def _calculate_segment_length(self, segment: List[Tuple[float, float]]) -> float:
-        """Calculate total length of a segment"""
-        total_length = 0
-        for i in range(len(segment) - 1):
-            p1 = np.array(segment[i])
-            p2 = np.array(segment[i + 1])
-            total_length += np.linalg.norm(p2 - p1)
-        return total_length
-    
     def _gradient_aware_curve_fitting(self, simplified_paths: List[Dict], image: np.ndarray) -> List[Tuple[List[Tuple[float, float]], Tuple[float, float, float], str]]:
         """Gradient-aware curve fitting for smoother results"""
         final_paths = []
@@ -474,10 +426,11 @@ class ExperimentalVTracerStrategy:
     def _fit_adaptive_polygon(self, points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
         """Fit polygon with adaptive simplification"""
         # Adaptive epsilon based on path complexity
-        path_length = self._calculate_segment_length(points)
-        adaptive_epsilon = max(1.0, path_length * 0.005)
+        adaptive_epsilon = max(1.0, arc_length(as_points(points)) * 0.005)
         
-        return self._douglas_peucker_segment(points, adaptive_epsilon)
+        if len(points) <= 2:
+            return points
+        return to_tuples(douglas_peucker(points, adaptive_epsilon))
     
     def _add_text_to_svg(self, svg_builder: SVGBuilder, text_region: Dict):
         """Add text region to SVG (placeholder for future text handling)"""
@@ -495,109 +448,11 @@ class ExperimentalVTracerStrategy:
         # Use a semi-transparent overlay color
         svg_builder.add_path(rect_points, (200, 200, 200), fill=True, opacity=0.3)
     
-    # Copy existing methods from original VTracer
-    def _signed_angle_difference(self, v1: np.ndarray, v2: np.ndarray) -> float:
-        """Calculate signed angle difference between two vectors"""
-        v1_norm = v1 / (np.linalg.norm(v1) + 1e-8)
-        v2_norm = v2 / (np.linalg.norm(v2) + 1e-8)
-        
-        angle1 = math.atan2(v1_norm[1], v1_norm[0])
-        angle2 = math.atan2(v2_norm[1], v2_norm[0])
-        
-        diff = angle2 - angle1
-        
-        while diff > math.pi:
-            diff -= 2 * math.pi
-        while diff < -math.pi:
-            diff += 2 * math.pi
-            
-        return diff
-    
-    def _create_segments(self, points: List[Tuple[float, float]], splice_points: List[int]) -> List[List[Tuple[float, float]]]:
-        """Create segments between splice points"""
-        if not splice_points:
-            return [points]
-        
-        segments = []
-        start_idx = 0
-        
-        for splice_idx in splice_points:
-            if splice_idx > start_idx:
-                segment = points[start_idx:splice_idx + 1]
-                if len(segment) > 1:
-                    segments.append(segment)
-                start_idx = splice_idx
-        
-        if start_idx < len(points) - 1:
-            segment = points[start_idx:]
-            if len(segment) > 1:
-                segments.append(segment)
-        
-        return segments
-    
-    def _douglas_peucker_segment(self, segment: List[Tuple[float, float]], epsilon: float) -> List[Tuple[float, float]]:
-        """Douglas-Peucker simplification for a segment"""
-        if len(segment) <= 2:
-            return segment
-        
-        dmax = 0
-        index = 0
-        
-        for i in range(1, len(segment) - 1):
-            d = self._perpendicular_distance(segment[i], segment[0], segment[-1])
-            if d > dmax:
-                index = i
-                dmax = d
-        
-        if dmax > epsilon:
-            rec_results1 = self._douglas_peucker_segment(segment[:index + 1], epsilon)
-            rec_results2 = self._douglas_peucker_segment(segment[index:], epsilon)
-            
-            return rec_results1[:-1] + rec_results2
-        else:
-            return [segment[0], segment[-1]]
-    
-    def _perpendicular_distance(self, point: Tuple[float, float], 
-                               line_start: Tuple[float, float], 
-                               line_end: Tuple[float, float]) -> float:
-        """Calculate perpendicular distance from point to line"""
-        x0, y0 = point
-        x1, y1 = line_start
-        x2, y2 = line_end
-        
-        num = abs((y2 - y1) * x0 - (x2 - x1) * y0 + x2 * y1 - y2 * x1)
-        den = math.sqrt((y2 - y1)**2 + (x2 - x1)**2)
-        
-        return num / (den + 1e-8)
-    
     def _fit_spline_curve(self, points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
-        """Fit spline curve to points"""
+        """Fit spline curve to points (Catmull-Rom through every point)"""
         if len(points) < 4:
             return points
-        
-        spline_points = []
-        spline_points.append(points[0])
-        
-        for i in range(len(points) - 1):
-            p0 = np.array(points[max(0, i-1)])
-            p1 = np.array(points[i])
-            p2 = np.array(points[min(len(points)-1, i+1)])
-            p3 = np.array(points[min(len(points)-1, i+2)])
-            
-            for t in np.linspace(0, 1, 3):
-                if t == 0 and i > 0:
-                    continue
-                    
-                point = 0.5 * (
-                    2 * p1 +
-                    (-p0 + p2) * t +
-                    (2*p0 - 5*p1 + 4*p2 - p3) * t*t +
-                    (-p0 + 3*p1 - 3*p2 + p3) * t*t*t
-                )
-                
-                spline_points.append((float(point[0]), float(point[1])))
-        
-        return spline_points
+        return to_tuples(catmull_rom(points))
     
     def _filter_speckles(self, mask: np.ndarray, min_area: int) -> np.ndarray:
         """Filter out small speckles like VTracer"""
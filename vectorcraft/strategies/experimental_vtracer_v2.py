@@ -1,10 +1,10 @@
 import numpy as np
 import cv2
 from typing import List, Tuple, Optional, Dict
-import math
 import logging
 
 from ..core.svg_builder import SVGBuilder
+from ..geometry.kernels import as_points, to_tuples, arc_length, douglas_peucker
 
 class ExperimentalVTracerV2Strategy:
     """Experimental VTracer V2 - Hybrid approach using real VTracer + enhancements"""
@@ -53,10 +53,9 @@ class ExperimentalVTracerV2Strategy:
             
             # Experimental parameter optimization based on image analysis
             optimized_params = self._analyze_and_optimize_parameters(image)
-            vtracer.set_custom_parameters(optimized_params)
             
             # Use VTracer
-            result = vtracer.vectorize(image, None, None)
+            result = vtracer.vectorize(image, None, None, params=optimized_params)
             
             # Post-process the result with experimental enhancements
             if self.post_process_optimization:
@@ -167,64 +166,16 @@ class ExperimentalVTracerV2Strategy:
             return points
         
         # Apply smart Douglas-Peucker with adaptive epsilon
-        path_length = self._calculate_path_length(points)
-        adaptive_epsilon = max(0.5, path_length * 0.003)  # 0.3% of path length
+        points_array = as_points(points)
+        adaptive_epsilon = max(0.5, arc_length(points_array) * 0.003)  # 0.3% of path length
         
-        optimized = self._douglas_peucker_adaptive(points, adaptive_epsilon)
+        optimized = douglas_peucker(points_array, adaptive_epsilon)
         
         # Ensure we don't over-simplify
         if len(optimized) < len(points) * 0.3:  # Keep at least 30% of points
             return points
         
-        return optimized
-    
-    def _calculate_path_length(self, points: List[Tuple[float, float]]) -> float:
-        """Calculate total path length"""
-        total_length = 0
-        for i in range(len(points) - 1):
-            dx = points[i + 1][0] - points[i][0]
-            dy = points[i + 1][1] - points[i][1]
-            total_length += math.sqrt(dx * dx + dy * dy)
-        return total_length
-    
-    def _douglas_peucker_adaptive(self, points: List[Tuple[float, float]], epsilon: float) -> List[Tuple[float, float]]:
-        """Adaptive Douglas-Peucker algorithm"""
-        if len(points) <= 2:
-            return points
-        
-        # Find point with maximum distance from line
-        dmax = 0
-        index = 0
-        
-        for i in range(1, len(points) - 1):
-            d = self._perpendicular_distance(points[i], points[0], points[-1])
-            if d > dmax:
-                index = i
-                dmax = d
-        
-        # If max distance is greater than epsilon, recursively simplify
-        if dmax > epsilon:
-            # Recursive calls
-            rec_results1 = self._douglas_peucker_adaptive(points[:index + 1], epsilon)
-            rec_results2 = self._douglas_peucker_adaptive(points[index:], epsilon)
-            
-            # Build result
-            return rec_results1[:-1] + rec_results2
-        else:
-            return [points[0], points[-1]]
-    
-    def _perpendicular_distance(self, point: Tuple[float, float], 
-                               line_start: Tuple[float, float], 
-                               line_end: Tuple[float, float]) -> float:
-        """Calculate perpendicular distance from point to line"""
-        x0, y0 = point
-        x1, y1 = line_start
-        x2, y2 = line_end
-        
-        num = abs((y2 - y1) * x0 - (x2 - x1) * y0 + x2 * y1 - y2 * x1)
-        den = math.sqrt((y2 - y1)**2 + (x2 - x1)**2)
-        
-        return num / (den + 1e-8)
+        return to_tuples(optimized)
     
     def _custom_vectorize_fallback(self, image: np.ndarray, quantized_image: np.ndarray, edge_map: np.ndarray) -> SVGBuilder:
         """Fallback custom vectorization if VTracer unavailable"""
@@ -254,7 +205,7 @@ class ExperimentalVTracerV2Strategy:
             for contour in contours:
                 if cv2.contourArea(contour) > self.filter_speckle:
                     # Convert contour to path points
-                    path_points = [(float(point[0][0]), float(point[0][1])) for point in contour]
+                    path_points = to_tuples(as_points(contour))
                     
                     if len(path_points) >= 3:
                         # Simple optimization
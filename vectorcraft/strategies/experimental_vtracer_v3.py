@@ -3,10 +3,10 @@ import cv2
 from typing import List, Tuple, Optional, Dict
 import math
 import logging
-from sklearn.cluster import KMeans
-from collections import Counter
 
 from ..core.svg_builder import SVGBuilder
+from ..geometry.kernels import as_points, to_tuples, moving_average, smooth_closed, smooth_open
+from ..utils.palette import PaletteMapper, color_layers, extract_palettes
 
 class ExperimentalVTracerV3Strategy:
     """Experimental VTracer V3 - Focus on actual VTracer limitations"""
@@ -67,9 +67,8 @@ class ExperimentalVTracerV3Strategy:
                 'splice_threshold': 20,
                 'curve_fitting': 'spline'
             }
-            vtracer.set_custom_parameters(standard_params)
             
-            result = vtracer.vectorize(image, None, None)
+            result = vtracer.vectorize(image, None, None, params=standard_params)
             return result
             
         except Exception as e:
@@ -184,24 +183,13 @@ class ExperimentalVTracerV3Strategy:
         if len(points) < 5:
             return points
         
-        # Convert to numpy for easier manipulation
-        points_array = np.array(points)
-        
         # Apply gentle smoothing using moving average
         window_size = min(3, len(points) // 3)
         
         if window_size < 2:
             return points
         
-        smoothed = np.copy(points_array)
-        
-        for i in range(window_size, len(points) - window_size):
-            # Moving average for smoothing
-            window = points_array[i-window_size:i+window_size+1]
-            smoothed[i] = np.mean(window, axis=0)
-        
-        # Convert back to list of tuples
-        return [(float(p[0]), float(p[1])) for p in smoothed]
+        return to_tuples(moving_average(points, window_size))
     
     def _check_corner_coverage(self, corners: np.ndarray, svg_builder: SVGBuilder) -> float:
         """Check how well corners are covered by existing paths"""
@@ -288,7 +276,7 @@ class ExperimentalVTracerV3Strategy:
         for contour in contours:
             if cv2.contourArea(contour) > 3:  # Small but significant details
                 # Convert contour to global coordinates
-                global_points = [(float(point[0][0] + x), float(point[0][1] + y)) for point in contour]
+                global_points = to_tuples(as_points(contour) + (x, y))
                 
                 # Sample color for this detail
                 if len(global_points) > 0:
@@ -329,7 +317,7 @@ class ExperimentalVTracerV3Strategy:
             
             for contour in contours:
                 if cv2.contourArea(contour) > self.filter_speckle:
-                    path_points = [(float(point[0][0]), float(point[0][1])) for point in contour]
+                    path_points = to_tuples(as_points(contour))
                     if len(path_points) >= 3:
                         # Convert color from 0-255 range to 0-1 range for SVGBuilder
                         normalized_color = (color_tuple[0]/255.0, color_tuple[1]/255.0, color_tuple[2]/255.0)
@@ -338,76 +326,30 @@ class ExperimentalVTracerV3Strategy:
         return svg_builder
     
     def extract_color_palettes(self, image: np.ndarray) -> Dict[str, List[Tuple[int, int, int]]]:
-        """Extract suggested color palettes like Vector Magic"""
-        h, w = image.shape[:2]
-        
-        # Reshape image for clustering
-        if len(image.shape) == 3:
-            pixels = image.reshape(-1, 3)
-        else:
-            gray_img = image if len(image.shape) == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            pixels = np.stack([gray_img.flatten()] * 3, axis=1)
+        """Extract suggested color palettes like Vector Magic
         
+        Every suggested size and the dominant colors come from one sampled
+        5-bit color histogram (see ``vectorcraft.utils.palette``) instead of a
+        separate K-means run per size.
+        """
         palettes = {}
         
+        try:
+            sized_palettes, dominant_palette = extract_palettes(image, self.suggested_palette_counts)
+        except Exception as e:
+            logging.warning(f"Failed to extract color palettes: {e}")
+            return palettes
+        
         # Generate suggested palettes for different color counts
         for color_count in self.suggested_palette_counts:
-            try:
-                palette = self._extract_palette_with_kmeans(pixels, color_count)
-                palettes[f"{color_count}_colors"] = palette
-            except Exception as e:
-                logging.warning(f"Failed to extract {color_count}-color palette: {e}")
-                continue
+            if color_count in sized_palettes:
+                palettes[f"{color_count}_colors"] = sized_palettes[color_count]
         
         # Add dominant color palette (most frequent colors)
-        try:
-            dominant_palette = self._extract_dominant_colors(pixels)
-            palettes["dominant"] = dominant_palette
-        except Exception as e:
-            logging.warning(f"Failed to extract dominant palette: {e}")
+        palettes["dominant"] = dominant_palette
         
         return palettes
     
-    def _extract_palette_with_kmeans(self, pixels: np.ndarray, n_colors: int) -> List[Tuple[int, int, int]]:
-        """Extract palette using K-means clustering"""
-        # Sample pixels if image is too large
-        max_pixels = 10000
-        if len(pixels) > max_pixels:
-            indices = np.random.choice(len(pixels), max_pixels, replace=False)
-            pixels = pixels[indices]
-        
-        # Perform K-means clustering
-        kmeans = KMeans(n_clusters=n_colors, random_state=42, n_init=10)
-        kmeans.fit(pixels)
-        
-        # Get cluster centers as colors
-        colors = kmeans.cluster_centers_.astype(int)
-        
-        # Sort colors by frequency
-        labels = kmeans.labels_
-        label_counts = Counter(labels)
-        
-        # Sort colors by frequency (most common first)
-        sorted_colors = []
-        for label, count in label_counts.most_common():
-            color = tuple(colors[label])
-            sorted_colors.append(color)
-        
-        return sorted_colors
-    
-    def _extract_dominant_colors(self, pixels: np.ndarray, max_colors: int = 8) -> List[Tuple[int, int, int]]:
-        """Extract most dominant colors by frequency"""
-        # Convert to tuples for counting
-        color_tuples = [tuple(pixel) for pixel in pixels]
-        
-        # Count color frequencies
-        color_counts = Counter(color_tuples)
-        
-        # Get most common colors
-        dominant_colors = [color for color, count in color_counts.most_common(max_colors)]
-        
-        return dominant_colors
-    
     def create_color_separated_layers(self, image: np.ndarray, palette: List[Tuple[int, int, int]]) -> Dict[str, np.ndarray]:
         """Create separated color layers like Vector Magic"""
         h, w = image.shape[:2]
@@ -419,44 +361,17 @@ class ExperimentalVTracerV3Strategy:
         else:
             rgb_image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
         
-        # Use improved color assignment - assign every pixel to closest palette color
-        palette_array = np.array(palette)
-        pixels = rgb_image.reshape(-1, 3)
-        
-        # Calculate distances to all palette colors at once (same as preview function)
-        distances = np.sqrt(np.sum((pixels[:, np.newaxis, :] - palette_array[np.newaxis, :, :])**2, axis=2))
-        closest_indices = np.argmin(distances, axis=1)
+        # Assign every pixel to its closest palette color through the palette lookup table
+        labels = PaletteMapper(palette).map(rgb_image)
         
-        # Create layers based on closest color assignment
-        for i, color in enumerate(palette):
+        # Layers are views over the shared label map; masks and layer images are derived on access
+        for i, layer in enumerate(color_layers(labels, palette)):
+            color = layer.color
             color_name = f"color_{i}_{color[0]:02x}{color[1]:02x}{color[2]:02x}"
-            
-            # Create mask for pixels assigned to this color
-            color_mask = (closest_indices == i).reshape(h, w)
-            
-            # Create layer with only this color
-            layer = np.zeros_like(rgb_image)
-            layer[color_mask] = color
-            
-            layers[color_name] = {
-                'layer': layer,
-                'mask': color_mask,
-                'color': color,
-                'pixel_count': np.sum(color_mask)
-            }
+            layers[color_name] = layer
         
         return layers
     
-    def _create_color_mask(self, image: np.ndarray, target_color: Tuple[int, int, int], threshold: int = 30) -> np.ndarray:
-        """Create a mask for pixels close to the target color"""
-        # Calculate color distance for each pixel
-        color_diff = np.sqrt(np.sum((image - np.array(target_color))**2, axis=2))
-        
-        # Create mask for pixels within threshold
-        mask = color_diff <= threshold
-        
-        return mask
-    
     def vectorize_with_palette(self, image: np.ndarray, selected_palette: List[Tuple[int, int, int]], 
                              quantized_image: np.ndarray, edge_map: np.ndarray) -> SVGBuilder:
         """Vectorize using a specific color palette - creates smooth vectors like the preview"""
@@ -501,9 +416,8 @@ class ExperimentalVTracerV3Strategy:
                 'splice_threshold': 10,   # Better curve connections
                 'curve_fitting': 'spline'
             }
-            vtracer.set_custom_parameters(optimal_params)
             
-            result = vtracer.vectorize(quantized_image, None, None)
+            result = vtracer.vectorize(quantized_image, None, None, params=optimal_params)
             return result
             
         except Exception as e:
@@ -535,7 +449,7 @@ class ExperimentalVTracerV3Strategy:
                 if cv2.contourArea(contour) > self.filter_speckle * 2:
                     # Apply aggressive smoothing to contour points
                     smoothed_contour = self._smooth_contour(contour)
-                    path_points = [(float(point[0]), float(point[1])) for point in smoothed_contour]
+                    path_points = to_tuples(as_points(smoothed_contour))
                     
                     if len(path_points) >= 3:
                         normalized_color = (color[0]/255.0, color[1]/255.0, color[2]/255.0)
@@ -563,16 +477,10 @@ class ExperimentalVTracerV3Strategy:
         if len(contour) < 6:
             return contour.reshape(-1, 2)
         
-        # Convert to points array
-        points = contour.reshape(-1, 2).astype(np.float32)
-        
-        # Apply multiple passes of smoothing
+        # Apply multiple passes of [1, 2, 1] / 4 neighbour averaging
+        points = as_points(contour)
         for _ in range(3):
-            smoothed_points = np.copy(points)
-            for i in range(1, len(points) - 1):
-                # Average with neighbors
-                smoothed_points[i] = (points[i-1] + 2*points[i] + points[i+1]) / 4
-            points = smoothed_points
+            points = smooth_open(points)
         
         return points
     
@@ -643,7 +551,7 @@ class ExperimentalVTracerV3Strategy:
                 simplified = cv2.approxPolyDP(contour, epsilon, True)
                 
                 # Convert to list of tuples
-                points = [(float(point[0][0]), float(point[0][1])) for point in simplified]
+                points = to_tuples(as_points(simplified))
                 
                 # Step 4: Additional geometric smoothing
                 if len(points) >= 3:
@@ -657,30 +565,8 @@ class ExperimentalVTracerV3Strategy:
         if len(points) < 4:
             return points
         
-        # Convert to numpy for easier manipulation
-        points_array = np.array(points)
-        
-        # Apply multiple passes of geometric smoothing
-        for pass_num in range(3):
-            smoothed = np.copy(points_array)
-            
-            for i in range(len(points_array)):
-                # Get neighboring points (wrap around)
-                prev_idx = (i - 1) % len(points_array)
-                next_idx = (i + 1) % len(points_array)
-                
-                # Weighted average with neighbors for smooth curves
-                weight_self = 0.6
-                weight_neighbor = 0.2
-                
-                smoothed[i] = (weight_self * points_array[i] + 
-                              weight_neighbor * points_array[prev_idx] + 
-                              weight_neighbor * points_array[next_idx])
-            
-            points_array = smoothed
-        
-        # Convert back to list of tuples
-        return [(float(p[0]), float(p[1])) for p in points_array]
+        # Three passes of weighted neighbour averaging around the closed shape
+        return to_tuples(smooth_closed(points, self_weight=0.6, neighbour_weight=0.2, passes=3))
     
     def _create_high_res_quantized_image(self, image: np.ndarray, selected_palette: List[Tuple[int, int, int]], upscale_factor: int) -> np.ndarray:
         """Create a high-resolution version of the quantized image for smoother VTracer input"""
@@ -721,10 +607,9 @@ class ExperimentalVTracerV3Strategy:
             }
             
             print(f"🎨 Using VTracer with params: {optimal_params}")
-            vtracer.set_custom_parameters(optimal_params)
             
             # Process with VTracer
-            result = vtracer.vectorize(high_res_image, None, None)
+            result = vtracer.vectorize(high_res_image, None, None, params=optimal_params)
             
             if result and hasattr(result, 'get_svg_string'):
                 # Scale down the coordinates to match original image size
@@ -795,9 +680,8 @@ class ExperimentalVTracerV3Strategy:
             }
             
             print(f"🎨 Using simple VTracer with params: {simple_params}")
-            vtracer.set_custom_parameters(simple_params)
             
-            result = vtracer.vectorize(quantized_image, None, None)
+            result = vtracer.vectorize(quantized_image, None, None, params=simple_params)
             print(f"🎨 VTracer result type: {type(result)}")
             
             return result
@@ -925,7 +809,7 @@ class ExperimentalVTracerV3Strategy:
                 simplified = cv2.approxPolyDP(contour, epsilon, True)
                 
                 # Convert to list of tuples
-                points = [(float(point[0][0]), float(point[0][1])) for point in simplified]
+                points = to_tuples(as_points(simplified))
                 
                 # Step 6: Ultra-geometric smoothing
                 if len(points) >= 3:
@@ -939,27 +823,8 @@ class ExperimentalVTracerV3Strategy:
         if len(points) < 4:
             return points
         
-        points_array = np.array(points)
-        
-        # Apply many more passes of smoothing with stronger weights
-        for pass_num in range(5):  # More passes
-            smoothed = np.copy(points_array)
-            
-            for i in range(len(points_array)):
-                prev_idx = (i - 1) % len(points_array)
-                next_idx = (i + 1) % len(points_array)
-                
-                # Stronger neighbor influence for smoother curves
-                weight_self = 0.4      # Lower self weight
-                weight_neighbor = 0.3  # Higher neighbor weight
-                
-                smoothed[i] = (weight_self * points_array[i] + 
-                              weight_neighbor * points_array[prev_idx] + 
-                              weight_neighbor * points_array[next_idx])
-            
-            points_array = smoothed
-        
-        return [(float(p[0]), float(p[1])) for p in points_array]
+        # More passes with stronger neighbour influence for smoother curves
+        return to_tuples(smooth_closed(points, self_weight=0.4, neighbour_weight=0.3, passes=5))
     
     def _create_full_resolution_quantized_image(self, image: np.ndarray, selected_palette: List[Tuple[int, int, int]]) -> np.ndarray:
         """Create a full resolution quantized image (like preview but full size)"""
@@ -974,23 +839,8 @@ class ExperimentalVTracerV3Strategy:
         # NO RESIZING! Use full resolution
         print(f"🎨 Processing FULL RESOLUTION image: {rgb_image.shape}")
         
-        # Convert palette to numpy array for vectorized operations
-        palette_array = np.array(selected_palette)
-        
-        # Reshape image for vectorized distance calculation
-        pixels = rgb_image.reshape(-1, 3)
-        
-        # Calculate distances to all palette colors at once (same logic as preview)
-        distances = np.sqrt(np.sum((pixels[:, np.newaxis, :] - palette_array[np.newaxis, :, :])**2, axis=2))
-        
-        # Find closest color for each pixel
-        closest_indices = np.argmin(distances, axis=1)
-        
-        # Map pixels to closest palette colors
-        quantized_pixels = palette_array[closest_indices]
-        
-        # Reshape back to image
-        quantized_image = quantized_pixels.reshape(h, w, 3)
+        # Map pixels to closest palette colors through the palette lookup table, in chunks
+        quantized_image = PaletteMapper(selected_palette).quantize(rgb_image)
         
         print(f"🎨 Full resolution quantization complete: {quantized_image.shape}")
         return quantized_image.astype(np.uint8)
@@ -1017,13 +867,12 @@ class ExperimentalVTracerV3Strategy:
             }
             
             print(f"🎨 Using VTracer on quantized image with params: {optimal_params}")
-            vtracer.set_custom_parameters(optimal_params)
             
             # Convert quantized image to proper format (0-1 range for VTracer)
             quantized_normalized = quantized_image.astype(np.float32) / 255.0
             
             # Use VTracer's existing vectorize method - it handles file conversion internally
-            result = vtracer.vectorize(quantized_normalized, None, None)
+            result = vtracer.vectorize(quantized_normalized, None, None, params=optimal_params)
             
             if result and hasattr(result, 'get_svg_string'):
                 svg_content = result.get_svg_string()
@@ -1068,15 +917,12 @@ class ExperimentalVTracerV3Strategy:
         else:
             rgb_image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
         
-        # Create preview image
-        preview_image = np.zeros_like(rgb_image)
-        
-        # For each color in the palette, find matching pixels and set them
-        for color in selected_palette:
-            color_mask = self._create_color_mask(rgb_image, color, threshold=40)
-            preview_image[color_mask] = color
+        # Pixels within the threshold of their closest palette color take that color, the rest stay black
+        labels = PaletteMapper(selected_palette).map(rgb_image, max_distance=40)
+        colors = np.zeros((PaletteMapper.NO_MATCH + 1, 3), dtype=np.uint8)
+        colors[:len(selected_palette)] = selected_palette
         
-        return preview_image
+        return colors[labels]
     
     def create_quantized_preview(self, image: np.ndarray, selected_palette: List[Tuple[int, int, int]]) -> np.ndarray:
         """Create a fast quantized preview that shows exactly what will be vectorized"""
@@ -1096,22 +942,7 @@ class ExperimentalVTracerV3Strategy:
             rgb_image = cv2.resize(rgb_image, (new_w, new_h), interpolation=cv2.INTER_AREA)
             h, w = new_h, new_w
         
-        # Convert palette to numpy array for vectorized operations
-        palette_array = np.array(selected_palette)
-        
-        # Reshape image for vectorized distance calculation
-        pixels = rgb_image.reshape(-1, 3)
-        
-        # Calculate distances to all palette colors at once
-        distances = np.sqrt(np.sum((pixels[:, np.newaxis, :] - palette_array[np.newaxis, :, :])**2, axis=2))
-        
-        # Find closest color for each pixel
-        closest_indices = np.argmin(distances, axis=1)
-        
-        # Map pixels to closest palette colors
-        quantized_pixels = palette_array[closest_indices]
-        
-        # Reshape back to image
-        quantized_image = quantized_pixels.reshape(h, w, 3)
+        # Map pixels to closest palette colors through the palette lookup table
+        quantized_image = PaletteMapper(selected_palette).quantize(rgb_image)
         
         return quantized_image.astype(np.uint8)
\ No newline at end of file
@@ -1,11 +1,16 @@
 import numpy as np
-import cv2
 import tempfile
 import os
-from typing import Dict, Any
+import io
+import re
+import json
+from typing import Dict, Any, Union, Optional
 from PIL import Image
 
 from ..core.svg_builder import SVGBuilder
+from ..core.scheduler import StageScheduler, DeadlineExceeded
+from ..utils.image_context import ImageContext
+from ..utils.vtracer_pool import get_vtracer_pool
 
 class RawSVGResult:
     """Container for raw SVG content from VTracer"""
@@ -33,28 +38,42 @@ class RawSVGResult:
         with open(filename, 'w') as f:
             f.write(self.svg_content)
 
+# Tuned per-class presets, applied by _get_adaptive_parameters and get_config_for_image_type,
+# unless VECTORCRAFT_VTRACER_PRESETS names another file
+DEFAULT_PRESETS_PATH = os.path.join(os.path.dirname(__file__), 'vtracer_presets.json')
+
+
 class RealVTracerStrategy:
     """Use the actual VTracer library for perfect vectorization"""
     
+    # Longer side of the quick trace kept as the fallback when the full trace may miss its deadline
+    preview_dimension = 256
+    
     def __init__(self):
+        self._presets: Optional[Dict[str, Dict[str, Any]]] = None
         try:
             import vtracer
             self.vtracer = vtracer
             self.available = True
             self.return_raw_svg = True  # Flag to return raw VTracer SVG
-            self.custom_params = None  # Store custom VTracer parameters
         except ImportError:
             self.vtracer = None
-            self.available = False
-            print("VTracer not available - install with: pip install vtracer")
-    
-    def set_custom_parameters(self, params: dict):
-        """Set custom VTracer parameters"""
-        self.custom_params = params
-        print(f"🎛️ Custom VTracer parameters set: {params}")
+            # Without the package, trace with the vtracer binary through the bounded pool
+            self.available = get_vtracer_pool() is not None
+            self.return_raw_svg = True
+            if not self.available:
+                print("VTracer not available - install with: pip install vtracer")
     
-    def vectorize(self, image: np.ndarray, quantized_image: np.ndarray = None, edge_map: np.ndarray = None) -> SVGBuilder:
-        """Use real VTracer for vectorization"""
+    def vectorize(self, image: Union[np.ndarray, ImageContext], quantized_image: np.ndarray = None,
+                  edge_map: np.ndarray = None, params: Dict[str, Any] = None,
+                  scheduler: Optional[StageScheduler] = None, image_type: Optional[str] = None) -> SVGBuilder:
+        """Use real VTracer for vectorization
+        
+        ``params`` are per-call custom VTracer parameters (e.g. from the web
+        interface); when omitted they are derived from the image and the tuned
+        preset of its ``image_type`` (``ContentClassification.image_type``).
+        With a ``scheduler`` the trace is bounded by its deadline.
+        """
         
         print(f"🔍 RealVTracerStrategy.vectorize called with image shape: {image.shape}")
         
@@ -62,84 +81,181 @@ class RealVTracerStrategy:
             print("❌ VTracer not available!")
             raise Exception("VTracer not available")
         
-        h, w = image.shape[:2]
-        
-        # Use the ORIGINAL image file directly to avoid any preprocessing artifacts
-        # VTracer web interface gets better results because it uses original file
-        original_input_path = '/Users/ankish/Downloads/Frame 53 (2).png'
-        
-        # If original file doesn't exist, fallback to conversion
-        if not os.path.exists(original_input_path):
-            print("⚠️ Original file not found, using converted image")
-            # Convert image to the format VTracer expects
-            if len(image.shape) == 3 and image.shape[2] == 4:
-                # RGBA image
-                pil_image = Image.fromarray((image * 255).astype(np.uint8), mode='RGBA')
-            elif len(image.shape) == 3:
-                # RGB image
-                pil_image = Image.fromarray((image * 255).astype(np.uint8), mode='RGB')
-            else:
-                # Grayscale
-                pil_image = Image.fromarray((image * 255).astype(np.uint8), mode='L')
-                pil_image = pil_image.convert('RGB')
-            
-            # Create temporary files
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_input:
-                pil_image.save(tmp_input.name, 'PNG')
-                tmp_input_path = tmp_input.name
+        context = ImageContext.ensure(image)
+        h, w = context.shape[:2]
+        
+        # Analyze image to optimize parameters
+        params = self._get_adaptive_parameters(context, params, image_type)
+        
+        print(f"🚀 Calling VTracer with ADAPTIVE settings: precision={params['color_precision']}, iterations={params['max_iterations']}...")
+        if scheduler is None:
+            svg_str = self.convert_pixels(context, params)
+        else:
+            svg_str = self.convert_within_deadline(context, params, scheduler)
+        
+        print(f"✅ VTracer generated SVG length: {len(svg_str)} characters")
+        
+        # Return raw SVG if flag is set, otherwise parse into SVGBuilder
+        if self.return_raw_svg:
+            print("🎯 Returning RAW VTracer SVG (high quality)")
+            raw_result = RawSVGResult(svg_str, w, h)
+            print(f"📊 Raw SVG elements: {raw_result.element_count}")
+            return raw_result
+        else:
+            # Parse the SVG and create SVGBuilder
+            svg_builder = self._parse_vtracer_svg(svg_str, w, h)
+            print(f"📊 Parsed SVG elements: {len(svg_builder.elements)}")
+            return svg_builder
+    
+    def convert_pixels(self, image: Union[np.ndarray, ImageContext], params: Dict[str, Any]) -> str:
+        """Run VTracer on pixels with fully resolved parameters and return the SVG string"""
+        if self.vtracer is None:
+            # The binary has no max_iterations option; the other parameters map to its flags
+            return get_vtracer_pool().convert(ImageContext.ensure(image).uint8, params)
+        
+        pil_image = self._to_pil_image(image)
+        
+        if hasattr(self.vtracer, 'convert_raw_image_to_svg'):
+            try:
+                return self._convert_in_memory(pil_image, params)
+            except Exception as e:
+                print(f"⚠️ In-memory VTracer conversion failed: {e}, falling back to temp files")
+        
+        return self._convert_via_files(pil_image, params)
+    
+    def convert_within_deadline(self, image: Union[np.ndarray, ImageContext], params: Dict[str, Any],
+                                scheduler: StageScheduler) -> str:
+        """Run VTracer under the scheduler's deadline and return the best SVG available.
+        
+        When the full trace is not expected to fit, a quick trace of a
+        downsampled copy runs first so there is something to return; the full
+        trace then runs in a subprocess that is killed at the deadline.
+        """
+        context = ImageContext.ensure(image)
+        preview = None
+        
+        if not scheduler.fits('vtracer'):
+            preview = self._scheduled_preview(context, params, scheduler)
+        
+        try:
+            return scheduler.run_cancellable('vtracer', self.convert_pixels, context, params)
+        except DeadlineExceeded:
+            print("⏱️ VTracer hit the deadline, returning the quick trace")
+            if preview is None:
+                preview = self._scheduled_preview(context, params, scheduler)
+            return preview
+    
+    def _scheduled_preview(self, context: ImageContext, params: Dict[str, Any],
+                           scheduler: StageScheduler) -> str:
+        small = context.resized(self.preview_dimension)
+        h, w = small.shape[:2]
+        return scheduler.run('vtracer_preview', self.convert_preview, context, params, pixels=h * w)
+    
+    def vectorize_preview(self, image: Union[np.ndarray, ImageContext],
+                          params: Dict[str, Any] = None) -> RawSVGResult:
+        """Coarse trace for progressive mode: downsampled, low color precision, few iterations"""
+        if not self.available:
+            raise Exception("VTracer not available")
+        
+        context = ImageContext.ensure(image)
+        h, w = context.shape[:2]
+        params = self._get_adaptive_parameters(context.resized(self.preview_dimension), params)
+        params['color_precision'] = min(params['color_precision'], 4)
+        
+        return RawSVGResult(self.convert_preview(context, params), w, h)
+    
+    def convert_preview(self, image: Union[np.ndarray, ImageContext], params: Dict[str, Any]) -> str:
+        """Cheap trace of a downsampled copy, scaled back to the full image size"""
+        context = ImageContext.ensure(image)
+        h, w = context.shape[:2]
+        small = context.resized(self.preview_dimension)
+        
+        quick_params = dict(params)
+        quick_params['max_iterations'] = min(params['max_iterations'], 4)
+        svg_str = self.convert_pixels(small, quick_params)
+        
+        sh, sw = small.shape[:2]
+        if (sh, sw) == (h, w):
+            return svg_str
+        return self._rescale_svg(svg_str, sw, sh, w, h)
+    
+    @staticmethod
+    def _rescale_svg(svg_str: str, width: int, height: int, target_width: int, target_height: int) -> str:
+        """Present a ``width`` x ``height`` SVG at the target size through a viewBox"""
+        return re.sub(
+            r'width="[^"]*" height="[^"]*"',
+            f'width="{target_width}" height="{target_height}" viewBox="0 0 {width} {height}"',
+            svg_str, count=1
+        )
+    
+    def _to_pil_image(self, image: Union[np.ndarray, ImageContext]) -> Image.Image:
+        """Wrap the uint8 pixels in the PIL image VTracer consumes"""
+        image = ImageContext.ensure(image).uint8
+        
+        if len(image.shape) == 3 and image.shape[2] == 4:
+            # RGBA image
+            return Image.fromarray(image, mode='RGBA')
+        elif len(image.shape) == 3:
+            # RGB image
+            return Image.fromarray(image, mode='RGB')
         else:
-            print("✅ Using original Frame 53.png file directly")
-            tmp_input_path = original_input_path
+            # Grayscale
+            return Image.fromarray(image, mode='L').convert('RGB')
+    
+    def _vtracer_kwargs(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Keyword arguments shared by every VTracer entry point"""
+        return {
+            'colormode': params['colormode'],
+            'hierarchical': params['hierarchical'],
+            'mode': params['mode'],
+            'filter_speckle': params['filter_speckle'],
+            'color_precision': params['color_precision'],
+            'layer_difference': params['layer_difference'],
+            'corner_threshold': params['corner_threshold'],
+            'length_threshold': params['length_threshold'],
+            'max_iterations': params['max_iterations'],
+            'splice_threshold': params['splice_threshold']
+        }
+    
+    def _convert_in_memory(self, pil_image: Image.Image, params: Dict[str, Any]) -> str:
+        """Hand the pixels to VTracer in memory and get the SVG string back.
+        
+        The pixels travel as an uncompressed (stored-block) PNG: BMP would drop
+        the alpha channel, and convert_pixels_to_svg needs a Python tuple per
+        pixel, which costs more than the trace itself on large images.
+        """
+        buffer = io.BytesIO()
+        pil_image.save(buffer, format='PNG', compress_level=0)
+        return self.vtracer.convert_raw_image_to_svg(
+            buffer.getvalue(), img_format='png', **self._vtracer_kwargs(params)
+        )
+    
+    def _convert_via_files(self, pil_image: Image.Image, params: Dict[str, Any]) -> str:
+        """Fallback for VTracer builds without the in-memory entry point"""
+        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_input:
+            pil_image.save(tmp_input.name, 'PNG')
+            tmp_input_path = tmp_input.name
         
         with tempfile.NamedTemporaryFile(suffix='.svg', delete=False) as tmp_output:
             tmp_output_path = tmp_output.name
         
         try:
-            # Analyze image to optimize parameters
-            params = self._get_adaptive_parameters(image)
-            
-            print(f"🚀 Calling VTracer with ADAPTIVE settings: precision={params['color_precision']}, iterations={params['max_iterations']}...")
-            # Adaptive settings based on image characteristics
-            svg_str = self.vtracer.convert_image_to_svg_py(
+            self.vtracer.convert_image_to_svg_py(
                 tmp_input_path,
                 tmp_output_path,        # Output path required
-                colormode=params['colormode'],
-                hierarchical=params['hierarchical'],
-                mode=params['mode'],
-                filter_speckle=params['filter_speckle'],
-                color_precision=params['color_precision'],
-                layer_difference=params['layer_difference'],
-                corner_threshold=params['corner_threshold'],
-                length_threshold=params['length_threshold'],
-                max_iterations=params['max_iterations'],
-                splice_threshold=params['splice_threshold']
+                **self._vtracer_kwargs(params)
             )
             
             # Read the SVG from output file
             with open(tmp_output_path, 'r') as f:
-                svg_str = f.read()
-            
-            print(f"✅ VTracer generated SVG length: {len(svg_str)} characters")
-            
-            # Return raw SVG if flag is set, otherwise parse into SVGBuilder
-            if self.return_raw_svg:
-                print("🎯 Returning RAW VTracer SVG (high quality)")
-                raw_result = RawSVGResult(svg_str, w, h)
-                print(f"📊 Raw SVG elements: {raw_result.element_count}")
-                return raw_result
-            else:
-                # Parse the SVG and create SVGBuilder
-                svg_builder = self._parse_vtracer_svg(svg_str, w, h)
-                print(f"📊 Parsed SVG elements: {len(svg_builder.elements)}")
-                return svg_builder
-            
+                return f.read()
         finally:
             # Clean up temporary files
-            try:
-                os.unlink(tmp_input_path)
-                os.unlink(tmp_output_path)
-            except:
-                pass
+            for path in (tmp_input_path, tmp_output_path):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
     
     def _parse_vtracer_svg(self, svg_str: str, width: int, height: int) -> SVGBuilder:
         """Parse VTracer SVG output into our SVGBuilder format"""
@@ -197,11 +313,13 @@ class RealVTracerStrategy:
         
         return svg_builder
     
-    def _get_adaptive_parameters(self, image: np.ndarray) -> Dict[str, Any]:
-        """Analyze image and return optimal VTracer parameters"""
+    def _get_adaptive_parameters(self, image: Union[np.ndarray, ImageContext],
+                                 custom_params: Dict[str, Any] = None,
+                                 image_type: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze image and return optimal VTracer parameters, with the tuned preset of ``image_type`` on top"""
         
-        # If custom parameters are set, use them directly
-        if self.custom_params:
+        # If custom parameters are given, use them directly
+        if custom_params:
             print("🎛️ Using CUSTOM VTracer parameters from web interface")
             
             # Map curve fitting mode to VTracer parameters
@@ -211,37 +329,28 @@ class RealVTracerStrategy:
                 'spline': {'mode': 'spline', 'hierarchical': 'stacked'}
             }
             
-            curve_mode = curve_mode_map.get(self.custom_params.get('curve_fitting', 'spline'))
+            curve_mode = curve_mode_map.get(custom_params.get('curve_fitting', 'spline'))
             
             return {
                 'colormode': 'color',
                 'hierarchical': curve_mode['hierarchical'],
                 'mode': curve_mode['mode'],
-                'filter_speckle': self.custom_params['filter_speckle'],
-                'color_precision': self.custom_params['color_precision'],
-                'layer_difference': self.custom_params['layer_difference'],
-                'corner_threshold': self.custom_params['corner_threshold'],
-                'length_threshold': self.custom_params['length_threshold'],
+                'filter_speckle': custom_params['filter_speckle'],
+                'color_precision': custom_params['color_precision'],
+                'layer_difference': custom_params['layer_difference'],
+                'corner_threshold': custom_params['corner_threshold'],
+                'length_threshold': custom_params['length_threshold'],
                 'max_iterations': 20,  # Keep high for quality
-                'splice_threshold': self.custom_params['splice_threshold']
+                'splice_threshold': custom_params['splice_threshold']
             }
         
         # Fall back to adaptive analysis
-        h, w = image.shape[:2]
-        
-        # Convert to PIL for analysis
-        if len(image.shape) == 3 and image.shape[2] == 4:
-            pil_image = Image.fromarray((image * 255).astype(np.uint8), mode='RGBA')
-        else:
-            pil_image = Image.fromarray((image * 255).astype(np.uint8), mode='RGB')
-        
-        # Analyze image characteristics
-        img_array = np.array(pil_image.convert('RGB'))
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+        context = ImageContext.ensure(image)
+        gray = context.gray
         
         # Calculate metrics
-        unique_colors = len(np.unique(img_array.reshape(-1, img_array.shape[-1]), axis=0))
-        edge_density = np.sum(cv2.Canny(gray, 50, 150) > 0) / gray.size
+        unique_colors = len(context.unique_colors)
+        edge_density = np.sum(context.canny > 0) / gray.size
         brightness = np.mean(gray)
         contrast = np.std(gray)
         
@@ -287,6 +396,15 @@ class RealVTracerStrategy:
             }
         
         print(f"🔍 Image analysis: colors={unique_colors}, edges={edge_density:.4f}, brightness={brightness:.1f}")
+        
+        # Tuned presets (python -m vectorcraft tune) override the adaptive choice for the image's class
+        tuned = self._load_presets().get(image_type) if image_type else None
+        if tuned:
+            tuned = dict(tuned)
+            if 'color_mode' in tuned:
+                tuned['colormode'] = tuned.pop('color_mode')
+            params.update(tuned)
+            print(f"🎛️ Applying tuned {image_type} preset: {tuned}")
         return params
     
     def _parse_svg_path(self, d: str) -> list:
@@ -400,4 +518,23 @@ class RealVTracerStrategy:
             }
         }
         
-        return configs.get(image_type, configs['logo'])
\ No newline at end of file
+        config = configs.get(image_type, configs['logo'])
+        
+        # Tuned presets (python -m vectorcraft tune) override the built-in values
+        tuned = self._load_presets().get(image_type)
+        return dict(config, **tuned) if tuned else config
+    
+    def _load_presets(self) -> Dict[str, Dict[str, Any]]:
+        """Presets from VECTORCRAFT_VTRACER_PRESETS or vtracer_presets.json next to this module, read once"""
+        if self._presets is None:
+            path = os.environ.get('VECTORCRAFT_VTRACER_PRESETS', DEFAULT_PRESETS_PATH)
+            self._presets = {}
+            if os.path.exists(path):
+                try:
+                    with open(path) as f:
+                        presets = json.load(f).get('presets', {})
+                    self._presets = {name: config for name, config in presets.items() if isinstance(config, dict)}
+                    print(f"🎛️ Loaded VTracer presets for {', '.join(self._presets)} from {path}")
+                except (OSError, ValueError, AttributeError) as e:
+                    print(f"⚠️ Ignoring VTracer presets file {path}: {e}")
+        return self._presets
\ No newline at end of file
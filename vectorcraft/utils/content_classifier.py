@@ -0,0 +1,227 @@
+import numpy as np
+import cv2
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Union
+
+from .image_context import ImageContext
+from .image_processor import ImageMetadata
+from .performance import CacheManager
+
+THUMBNAIL_SIZE = 256
+
+# Image types keying the tuned VTracer presets (RealVTracerStrategy._get_adaptive_parameters)
+IMAGE_TYPES = ('logo', 'photo', 'line_art')
+
+
+@dataclass
+class ContentFeatures:
+    """Compact description of an image, measured on its thumbnail.
+
+    Densities and gradient magnitudes are rescaled to full-resolution units
+    (``scale`` is thumbnail side / image side), so the probabilities can be
+    compared with the ones ``ImageProcessor.analyze_content`` computes.
+    """
+    scale: float
+    has_transparency: bool       # Judged from the sample, so a single translucent pixel may be missed
+    color_count: int             # Distinct colors in a nearest-neighbour sample of the image
+    color_ratio: float           # color_count / sampled pixels
+    saturation: float            # Fraction of pixels that are not grey
+    edge_density: float
+    gradient_entropy: float      # Normalized entropy of gradient orientations (0 flat/axis-aligned, 1 isotropic)
+    text_likeness: float
+    line_score: float
+    smooth_gradient: float       # Fraction of pixels with gradual intensity change
+
+    def to_vector(self) -> np.ndarray:
+        return np.array([self.color_ratio, self.saturation, self.edge_density, self.gradient_entropy,
+                         self.text_likeness, self.line_score, self.smooth_gradient], dtype=np.float32)
+
+
+@dataclass
+class ContentClassification:
+    """Content type, VTracer preset and an ``ImageMetadata`` estimate for one image"""
+    content_type: str            # 'text', 'geometric', 'gradient' or 'mixed', as HybridVectorizer._classify_content
+    image_type: str              # One of IMAGE_TYPES; selects the tuned VTracer preset
+    features: ContentFeatures
+    metadata: ImageMetadata
+    seconds: float = 0.0
+
+    @property
+    def geometric_probability(self) -> float:
+        return self.metadata.geometric_probability
+
+    @property
+    def text_probability(self) -> float:
+        return self.metadata.text_probability
+
+    @property
+    def gradient_probability(self) -> float:
+        return self.metadata.gradient_probability
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'content_type': self.content_type,
+            'image_type': self.image_type,
+            'features': {name: round(float(value), 4) for name, value in asdict(self.features).items()},
+            'seconds': round(self.seconds, 4),
+        }
+
+
+class ContentClassifier:
+    """Thumbnail-based content classifier for strategy and preset selection.
+
+    ``ImageProcessor.analyze_content`` runs Canny, HoughLines, Sobel and
+    ``np.unique`` over every pixel. This classifier runs the same heuristics
+    on a ``thumbnail_size`` thumbnail (a few milliseconds at any image size),
+    rescaling densities and thresholds so the probabilities stay comparable,
+    and adds a VTracer preset choice. Classifications are cached by image
+    content hash.
+    """
+
+    def __init__(self, thumbnail_size: int = THUMBNAIL_SIZE, cache: Optional[CacheManager] = None):
+        self.thumbnail_size = thumbnail_size
+        self.cache = cache if cache is not None else CacheManager(max_size=512, max_bytes=8 * 1024 * 1024)
+
+    def classify(self, image: Union[np.ndarray, ImageContext]) -> ContentClassification:
+        context = ImageContext.ensure(image)
+        key = self.cache.get_cache_key(context, 'classify', {'size': self.thumbnail_size})
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        start = cv2.getTickCount()
+        features = self.features(context)
+        metadata = self._metadata(context, features)
+        classification = ContentClassification(
+            content_type=self._content_type(metadata),
+            image_type=self._image_type(features),
+            features=features,
+            metadata=metadata,
+            seconds=(cv2.getTickCount() - start) / cv2.getTickFrequency()
+        )
+        self.cache.put(key, classification)
+        return classification
+
+    def features(self, image: Union[np.ndarray, ImageContext]) -> ContentFeatures:
+        context = ImageContext.ensure(image)
+        h, w = context.shape[:2]
+        step = max(1, int(np.ceil(max(h, w) / self.thumbnail_size)))
+        gray = self._thumbnail(context, step)
+        scale = gray.shape[1] / w
+
+        # Colors from a strided sample: resampling would blend in colors the image does not have
+        strided = context.uint8[::step, ::step]
+        sample = strided[..., :3].reshape(-1, 3).astype(np.int32)
+        packed = (sample[:, 0] << 16) | (sample[:, 1] << 8) | sample[:, 2]
+        color_count = len(np.unique(packed))
+        spread = sample.max(axis=1) - sample.min(axis=1)
+        saturation = float(np.mean(spread > 24))
+
+        edges = cv2.Canny(gray, 50, 150)
+        edge_fraction = np.count_nonzero(edges) / edges.size
+
+        grad_x = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
+        grad_y = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
+        # A ramp is 1/scale times steeper per thumbnail pixel than per image pixel
+        magnitude = np.sqrt(grad_x**2 + grad_y**2) * scale
+        smooth_gradient = float(np.mean((magnitude > 10) & (magnitude < 50)))
+
+        return ContentFeatures(
+            scale=scale,
+            has_transparency=bool(context.has_alpha and np.any(strided[..., 3] < 255)),
+            color_count=color_count,
+            color_ratio=color_count / len(packed),
+            saturation=saturation,
+            edge_density=edge_fraction * scale,  # Edge pixels per image pixel fall with the side length
+            gradient_entropy=self._orientation_entropy(grad_x, grad_y, magnitude),
+            text_likeness=self._text_likeness(edges, scale),
+            line_score=self._line_score(edges, scale),
+            smooth_gradient=smooth_gradient
+        )
+
+    def _thumbnail(self, context: ImageContext, step: int) -> np.ndarray:
+        """Grey thumbnail whose longer side is at most ``thumbnail_size``"""
+        h, w = context.shape[:2]
+        if step == 1:
+            return context.gray
+        # Area-averaging a large image costs more than every feature together, so
+        # stride down to about twice the thumbnail size first
+        source = context.uint8[::max(1, step // 2), ::max(1, step // 2)]
+        scale = self.thumbnail_size / max(h, w)
+        thumbnail = cv2.resize(source, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        return ImageContext(thumbnail).gray
+
+    @staticmethod
+    def _orientation_entropy(grad_x: np.ndarray, grad_y: np.ndarray, magnitude: np.ndarray) -> float:
+        strong = magnitude > 5
+        if not np.any(strong):
+            return 0.0
+        angles = np.arctan2(grad_y[strong], grad_x[strong]) % np.pi
+        histogram = np.bincount((angles / np.pi * 16).astype(np.intp) % 16, weights=magnitude[strong], minlength=16)
+        p = histogram / histogram.sum()
+        p = p[p > 0]
+        return float(-(p * np.log(p)).sum() / np.log(16))
+
+    @staticmethod
+    def _text_likeness(edges: np.ndarray, scale: float) -> float:
+        """``ImageProcessor._estimate_text_probability`` with its kernels and areas scaled to the thumbnail"""
+        length = max(2, int(round(5 * scale)))
+        horizontal = cv2.morphologyEx(edges, cv2.MORPH_OPEN, np.ones((1, length), np.uint8))
+        vertical = cv2.morphologyEx(edges, cv2.MORPH_OPEN, np.ones((length, 1), np.uint8))
+        h_density = np.count_nonzero(horizontal) / edges.size * scale
+        v_density = np.count_nonzero(vertical) / edges.size * scale
+
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        area_scale = scale * scale
+        text_like_regions = 0
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if 20 * area_scale < area < 2000 * area_scale:
+                _, _, w, h = cv2.boundingRect(contour)
+                if h > 0 and 0.1 < w / h < 5.0:
+                    text_like_regions += 1
+
+        bottom_half = edges[edges.shape[0] // 2:, :]
+        bottom_density = np.count_nonzero(bottom_half) / max(1, bottom_half.size) * scale
+
+        score = (min(h_density, v_density) * 10 + text_like_regions / max(1, len(contours)) * 5 +
+                 bottom_density * 8)
+        return min(1.0, score)
+
+    @staticmethod
+    def _line_score(edges: np.ndarray, scale: float) -> float:
+        """``ImageProcessor._estimate_geometric_probability`` with the vote threshold scaled to the thumbnail"""
+        lines = cv2.HoughLines(edges, 1, np.pi / 180, threshold=max(8, int(round(30 * scale))))
+        return 0.0 if lines is None else min(1.0, len(lines) / 50.0)
+
+    def _metadata(self, context: ImageContext, features: ContentFeatures) -> ImageMetadata:
+        return ImageMetadata(
+            width=context.width, height=context.height,
+            has_transparency=features.has_transparency,
+            dominant_colors=[],
+            edge_density=features.edge_density,
+            text_probability=features.text_likeness,
+            geometric_probability=features.line_score,
+            gradient_probability=min(1.0, features.smooth_gradient * 5)
+        )
+
+    @staticmethod
+    def _content_type(metadata: ImageMetadata) -> str:
+        scores = {
+            'text': metadata.text_probability,
+            'geometric': metadata.geometric_probability,
+            'gradient': metadata.gradient_probability
+        }
+        if max(scores.values()) < 0.3:
+            return 'mixed'
+        return max(scores, key=scores.get)
+
+    @staticmethod
+    def _image_type(features: ContentFeatures) -> str:
+        # Continuous tone: many distinct colors relative to the pixels sampled
+        if features.color_count > 1024 and features.color_ratio > 0.02:
+            return 'photo'
+        # Grey-on-grey text and drawings trace best as binary line art
+        if features.saturation < 0.05 and features.text_likeness > 0.5:
+            return 'line_art'
+        return 'logo'
@@ -0,0 +1,134 @@
+import numpy as np
+import cv2
+from PIL import Image
+from functools import cached_property
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+
+class ImageContext:
+    """Per-request image state shared by every pipeline stage.
+
+    The image is decoded once; the uint8 and float views, grayscale, Canny
+    edges and any other derived array are computed on first access and
+    memoized, so stages stop re-deriving the same arrays from each other's
+    outputs. Stages accept either a plain ndarray or an ImageContext and
+    normalize with ``ImageContext.ensure``.
+    """
+
+    def __init__(self, image: np.ndarray, source_path: Optional[str] = None):
+        if image.dtype == np.uint8:
+            self._uint8 = image
+            self._float = None
+        else:
+            self._uint8 = None
+            self._float = image.astype(np.float32, copy=False)
+        self.source_path = source_path
+        self._artifacts: Dict[str, Any] = {}
+
+    @classmethod
+    def from_path(cls, path: str) -> 'ImageContext':
+        """Decode an image file once, as RGBA uint8"""
+        img = Image.open(path).convert('RGBA')
+        return cls(np.array(img), source_path=path)
+
+    @classmethod
+    def ensure(cls, image: Union[np.ndarray, 'ImageContext']) -> 'ImageContext':
+        """Return ``image`` itself if it already is a context, else wrap the array"""
+        if isinstance(image, ImageContext):
+            return image
+        return cls(image)
+
+    # --- geometry -------------------------------------------------------
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        base = self._uint8 if self._uint8 is not None else self._float
+        return base.shape
+
+    @property
+    def height(self) -> int:
+        return self.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.shape[1]
+
+    @property
+    def channels(self) -> int:
+        return self.shape[2] if len(self.shape) == 3 else 1
+
+    @property
+    def has_alpha(self) -> bool:
+        return self.channels == 4
+
+    # --- pixel views ----------------------------------------------------
+
+    @property
+    def uint8(self) -> np.ndarray:
+        """All channels as uint8 (the decoded pixels when loaded from a file)"""
+        if self._uint8 is None:
+            self._uint8 = (self._float * 255).astype(np.uint8)
+        return self._uint8
+
+    @property
+    def float32(self) -> np.ndarray:
+        """All channels as float32 in [0, 1]"""
+        if self._float is None:
+            self._float = self._uint8.astype(np.float32) / 255.0
+        return self._float
+
+    @cached_property
+    def rgb_uint8(self) -> np.ndarray:
+        """RGB channels as uint8 (a view when the source is RGB/RGBA)"""
+        if self.channels == 1:
+            return cv2.cvtColor(self.uint8, cv2.COLOR_GRAY2RGB)
+        return self.uint8[:, :, :3]
+
+    @cached_property
+    def rgb_float(self) -> np.ndarray:
+        """RGB channels as float32 in [0, 1]"""
+        if self.channels == 1:
+            return self.rgb_uint8.astype(np.float32) / 255.0
+        return self.float32[:, :, :3]
+
+    @cached_property
+    def gray(self) -> np.ndarray:
+        if self.channels == 1:
+            return self.uint8
+        return cv2.cvtColor(self.rgb_uint8, cv2.COLOR_RGB2GRAY)
+
+    @cached_property
+    def canny(self) -> np.ndarray:
+        """Canny edges at the thresholds used throughout the pipeline (50/150)"""
+        return cv2.Canny(self.gray, 50, 150)
+
+    @cached_property
+    def unique_colors(self) -> np.ndarray:
+        """Distinct RGB colors as uint8 rows, sorted like ``np.unique(..., axis=0)``"""
+        rgb = self.rgb_uint8.reshape(-1, 3)
+        # Pack to one 24-bit integer per pixel: a 1-D unique is far cheaper than a row-wise one
+        packed = np.unique((rgb[:, 0].astype(np.uint32) << 16) | (rgb[:, 1].astype(np.uint32) << 8) | rgb[:, 2])
+        return np.stack([packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF], axis=1).astype(np.uint8)
+
+    @cached_property
+    def lab(self) -> np.ndarray:
+        return cv2.cvtColor(np.ascontiguousarray(self.rgb_uint8), cv2.COLOR_RGB2LAB)
+
+    # --- other artifacts ------------------------------------------------
+
+    def memoize(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Compute an artifact once per context and return the cached value"""
+        if name not in self._artifacts:
+            self._artifacts[name] = factory()
+        return self._artifacts[name]
+
+    def resized(self, max_dimension: int) -> 'ImageContext':
+        """New context downsampled so the longer side is at most ``max_dimension``"""
+        h, w = self.shape[:2]
+        if max(h, w) <= max_dimension:
+            return self
+
+        scale = max_dimension / max(h, w)
+        new_h, new_w = int(h * scale), int(w * scale)
+        resized = cv2.resize(self.uint8, (new_w, new_h), interpolation=cv2.INTER_AREA)
+        return ImageContext(resized, source_path=self.source_path)
@@ -1,9 +1,14 @@
+import os
 import numpy as np
 import cv2
 from PIL import Image
-from typing import Tuple, Dict, Any, Optional
+from typing import Tuple, Dict, Any, Optional, Union
 from dataclasses import dataclass
 
+from .image_context import ImageContext
+from .performance import CacheManager
+from .palette import PaletteMapper
+
 @dataclass
 class ImageMetadata:
     width: int
@@ -16,18 +21,26 @@ class ImageMetadata:
     gradient_probability: float
 
 class ImageProcessor:
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, cache: Optional[CacheManager] = None):
+        # Decoded images, keyed by path, mtime and size; set to None to disable
+        self.cache = cache if cache is not None else CacheManager()
     
     def load_image(self, path: str) -> np.ndarray:
-        if path in self.cache:
-            return self.cache[path]
-        
-        img = Image.open(path).convert('RGBA')
-        img_array = np.array(img)
-        self.cache[path] = img_array
+        if self.cache is None:
+            return np.array(Image.open(path).convert('RGBA'))
+        
+        stat = os.stat(path)
+        cache_key = f"load_{path}_{stat.st_mtime_ns}_{stat.st_size}"
+        img_array = self.cache.get(cache_key)
+        if img_array is None:
+            img_array = np.array(Image.open(path).convert('RGBA'))
+            self.cache.put(cache_key, img_array)
         return img_array
     
+    def load_context(self, path: str) -> ImageContext:
+        """Decode an image once into the context shared by all stages"""
+        return ImageContext(self.load_image(path), source_path=path)
+    
     def preprocess(self, image: np.ndarray, target_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
         if target_size:
             image = cv2.resize(image, target_size, interpolation=cv2.INTER_AREA)
@@ -38,28 +51,26 @@ class ImageProcessor:
         
         return image
     
-    def analyze_content(self, image: np.ndarray) -> ImageMetadata:
-        h, w = image.shape[:2]
+    def analyze_content(self, image: Union[np.ndarray, ImageContext]) -> ImageMetadata:
+        context = ImageContext.ensure(image)
+        h, w = context.shape[:2]
         
         # Check transparency
-        has_transparency = image.shape[2] == 4 and np.any(image[:, :, 3] < 1.0)
-        
-        # Get dominant colors using simple clustering
-        rgb_image = image[:, :, :3] if image.shape[2] == 4 else image
-        pixels = rgb_image.reshape(-1, 3)
+        has_transparency = context.has_alpha and np.any(context.uint8[:, :, 3] < 255)
         
-        # Simple dominant color extraction using histogram
-        dominant_colors = self._extract_dominant_colors(pixels, n_colors=5)
+        # Simple dominant color extraction over the distinct colors
+        unique_pixels = context.unique_colors.astype(np.float32) / 255.0
+        dominant_colors = self._extract_dominant_colors(unique_pixels, n_colors=5)
         
         # Edge density analysis
-        gray = cv2.cvtColor((rgb_image * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
+        gray = context.gray
+        edges = context.canny
         edge_density = np.sum(edges > 0) / (w * h)
         
         # Content type probabilities (heuristic-based)
         text_prob = self._estimate_text_probability(gray, edges)
         geometric_prob = self._estimate_geometric_probability(edges)
-        gradient_prob = self._estimate_gradient_probability(rgb_image)
+        gradient_prob = self._estimate_gradient_probability(gray)
         
         return ImageMetadata(
             width=w, height=h,
@@ -118,10 +129,8 @@ class ImageProcessor:
         geometric_score = len(lines) / 50.0
         return min(1.0, geometric_score)
     
-    def _estimate_gradient_probability(self, image: np.ndarray) -> float:
+    def _estimate_gradient_probability(self, gray: np.ndarray) -> float:
         # Analyze color transitions to detect gradients
-        gray = cv2.cvtColor((image * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY)
-        
         # Compute gradients
         grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
         grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
@@ -135,28 +144,31 @@ class ImageProcessor:
         
         return min(1.0, gradient_score * 5)
     
-    def create_edge_map(self, image: np.ndarray, method: str = 'enhanced') -> np.ndarray:
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor((image * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY)
-        else:
-            gray = (image * 255).astype(np.uint8)
+    def create_edge_map(self, image: Union[np.ndarray, ImageContext], method: str = 'enhanced') -> np.ndarray:
+        context = ImageContext.ensure(image)
         
         if method == 'enhanced':
-            return self.enhanced_edge_detection(image)
+            return self.enhanced_edge_detection(context)
         elif method == 'canny':
-            return cv2.Canny(gray, 50, 150)
+            return context.canny
         elif method == 'sobel':
-            grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-            grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-            magnitude = np.sqrt(grad_x**2 + grad_y**2)
-            return (magnitude > 30).astype(np.uint8) * 255
+            return context.memoize('sobel_edges', lambda: self._sobel_edges(context.gray))
         else:
             raise ValueError(f"Unknown edge detection method: {method}")
     
-    def enhanced_edge_detection(self, image: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def _sobel_edges(gray: np.ndarray) -> np.ndarray:
+        grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+        grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+        magnitude = np.sqrt(grad_x**2 + grad_y**2)
+        return (magnitude > 30).astype(np.uint8) * 255
+    
+    def enhanced_edge_detection(self, image: Union[np.ndarray, ImageContext]) -> np.ndarray:
         """Enhanced edge detection for low-contrast images like Frame 53"""
-        gray = cv2.cvtColor((image * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY) if len(image.shape) == 3 else (image * 255).astype(np.uint8)
-        
+        context = ImageContext.ensure(image)
+        return context.memoize('enhanced_edges', lambda: self._enhanced_edges(context.gray))
+    
+    def _enhanced_edges(self, gray: np.ndarray) -> np.ndarray:
         # Multi-scale edge detection
         edges_multi = np.zeros_like(gray)
         
@@ -238,9 +250,8 @@ class ImageProcessor:
                 if np.any(mask):
                     centers[i-1] = np.mean(sample_pixels[mask], axis=0)
             
-            # Assign all pixels to nearest cluster center
-            distances = np.sqrt(((lab_pixels[:, np.newaxis, :] - centers[np.newaxis, :, :]) ** 2).sum(axis=2))
-            assignments = np.argmin(distances, axis=1)
+            # Assign all pixels to nearest cluster center through a LAB lookup table
+            assignments = PaletteMapper(centers).map(lab_pixels)
             
             return centers[assignments]
             
@@ -265,13 +276,13 @@ class ImageProcessor:
         # Use perceptual color quantization for better results
         return self.perceptual_color_quantization(image, n_colors)
     
-    def perceptual_color_quantization(self, image: np.ndarray, n_colors: int = 8) -> np.ndarray:
+    def perceptual_color_quantization(self, image: Union[np.ndarray, ImageContext], n_colors: int = 8) -> np.ndarray:
         """Perceptual color quantization preserving important colors"""
-        rgb_image = image[:, :, :3] if image.shape[2] == 4 else image
-        h, w, c = rgb_image.shape
+        context = ImageContext.ensure(image)
+        h, w = context.shape[:2]
         
         # Convert to LAB color space for perceptual uniformity
-        lab_image = cv2.cvtColor((rgb_image * 255).astype(np.uint8), cv2.COLOR_RGB2LAB)
+        lab_image = context.lab
         lab_pixels = lab_image.reshape(-1, 3).astype(np.float32)
         
         # Use k-means with LAB space
@@ -289,18 +300,19 @@ class ImageProcessor:
         
         return quantized_rgb.astype(np.float32) / 255.0
 
-    def adaptive_color_quantization(self, image: np.ndarray, target_similarity: float = 0.95) -> np.ndarray:
+    def adaptive_color_quantization(self, image: Union[np.ndarray, ImageContext], target_similarity: float = 0.95) -> np.ndarray:
         """Adaptive color quantization that preserves visual fidelity"""
+        context = ImageContext.ensure(image)
         best_n_colors = 8
         best_similarity = 0.0
         best_quantized = None
         
         # Try different numbers of colors
         for n_colors in range(4, 16):
-            quantized = self.perceptual_color_quantization(image, n_colors)
+            quantized = self.perceptual_color_quantization(context, n_colors)
             
             # Estimate similarity (simplified)
-            mse = np.mean((image - quantized) ** 2)
+            mse = np.mean((context.rgb_float - quantized) ** 2)
             similarity = 1.0 / (1.0 + mse * 100)
             
             if similarity > best_similarity:
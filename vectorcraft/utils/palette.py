@@ -0,0 +1,293 @@
+import numpy as np
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+Color = Tuple[int, int, int]
+
+
+@dataclass
+class ColorHistogram:
+    """Occupied bins of a quantized RGB histogram.
+
+    ``colors`` holds the mean color of the pixels that fell in each bin (not
+    the bin center), so flat-colored artwork keeps its exact colors.
+    """
+    colors: np.ndarray   # (N, 3) float64 mean RGB per occupied bin
+    counts: np.ndarray   # (N,) float64 pixel count per occupied bin
+    total_pixels: int
+
+
+def as_rgb_pixels(image: np.ndarray) -> np.ndarray:
+    """(N, 3) uint8 pixels from an RGB, RGBA or grayscale image (float images in [0, 1])"""
+    if image.dtype != np.uint8:
+        scale = 255.0 if image.size and image.max() <= 1.0 else 1.0
+        image = np.clip(np.round(image * scale), 0, 255).astype(np.uint8)
+    if image.ndim == 2:
+        return np.repeat(image.reshape(-1, 1), 3, axis=1)
+    if image.shape[-1] == 1:
+        return np.repeat(image.reshape(-1, 1), 3, axis=1)
+    return image.reshape(-1, image.shape[-1])[:, :3]
+
+
+def sample_pixels(pixels: np.ndarray, max_samples: int = 250000, seed: int = 42) -> np.ndarray:
+    """Uniform random sample (with replacement) of at most ``max_samples`` pixels"""
+    if len(pixels) <= max_samples:
+        return pixels
+    rng = np.random.default_rng(seed)
+    return pixels[rng.integers(0, len(pixels), max_samples)]
+
+
+def build_histogram(pixels: np.ndarray, bits: int = 5) -> ColorHistogram:
+    """3D color histogram with ``bits`` bits per channel, via one bincount per channel"""
+    pixels = np.asarray(pixels, dtype=np.uint8).reshape(-1, 3)
+    shift = 8 - bits
+    q = (pixels >> shift).astype(np.int64)
+    bins = (q[:, 0] << (2 * bits)) | (q[:, 1] << bits) | q[:, 2]
+
+    n_bins = 1 << (3 * bits)
+    counts = np.bincount(bins, minlength=n_bins)
+    occupied = np.flatnonzero(counts)
+    sums = np.stack([np.bincount(bins, weights=pixels[:, c], minlength=n_bins)[occupied]
+                     for c in range(3)], axis=1)
+
+    occupied_counts = counts[occupied].astype(np.float64)
+    return ColorHistogram(colors=sums / occupied_counts[:, None], counts=occupied_counts,
+                          total_pixels=len(pixels))
+
+
+def dominant_colors(histogram: ColorHistogram, max_colors: int = 8) -> List[Color]:
+    """Mean colors of the most populated histogram bins, most frequent first"""
+    order = np.argsort(-histogram.counts, kind='stable')[:max_colors]
+    return _to_colors(histogram.colors[order])
+
+
+def median_cut_palettes(histogram: ColorHistogram, sizes: Iterable[int],
+                        refine_iterations: int = 4) -> Dict[int, List[Color]]:
+    """Palettes of every requested size from one hierarchical median cut.
+
+    Boxes of histogram bins are split one at a time (always the box with the
+    largest weighted squared error, at the weighted median of its widest
+    channel), and the partition is snapshotted whenever it reaches a
+    requested size. Each snapshot is then refined with a few weighted Lloyd
+    iterations over the bins, warm-started from the box means. Colors are
+    ordered by the number of pixels they represent, most frequent first. A
+    palette can be shorter than requested when the image has fewer distinct
+    bins.
+    """
+    sizes = sorted({int(size) for size in sizes if int(size) > 0})
+    palettes: Dict[int, List[Color]] = {}
+    if not sizes or len(histogram.counts) == 0:
+        return palettes
+
+    colors, counts = histogram.colors, histogram.counts
+    boxes = [np.arange(len(counts))]
+    errors = [_box_error(colors, counts, boxes[0])]
+
+    for size in sizes:
+        while len(boxes) < size:
+            target = int(np.argmax(errors))
+            if errors[target] <= 0:
+                break  # Every remaining box is a single color
+            box = boxes.pop(target)
+            errors.pop(target)
+            for half in _split_box(colors, counts, box):
+                boxes.append(half)
+                errors.append(_box_error(colors, counts, half))
+
+        centers = np.array([np.average(colors[box], axis=0, weights=counts[box]) for box in boxes])
+        palettes[size] = _refine(colors, counts, centers, refine_iterations)
+
+    return palettes
+
+
+def extract_palettes(image: np.ndarray, sizes: Iterable[int], max_dominant: int = 8,
+                     max_samples: int = 250000, bits: int = 5) -> Tuple[Dict[int, List[Color]], List[Color]]:
+    """Palettes of every requested size plus the dominant colors, from one sampled histogram"""
+    histogram = build_histogram(sample_pixels(as_rgb_pixels(image), max_samples), bits)
+    return median_cut_palettes(histogram, sizes), dominant_colors(histogram, max_dominant)
+
+
+class PaletteMapper:
+    """Nearest-palette-color assignment through a quantized color lookup table.
+
+    The table holds, for each of the ``2**(3*bits)`` color bins, the palette
+    index nearest to every color in that bin. Bins whose colors could have
+    different nearest entries (the bin straddles a decision boundary) are
+    marked ambiguous, and only pixels falling in them get an exact distance
+    check, so labels always equal a full ``argmin`` over the palette. Pixels
+    are mapped in chunks; nothing of size pixels x palette is materialized.
+
+    Works in any 3-channel uint8 color space (RGB, OpenCV LAB, ...); the
+    palette must be given in the same space.
+    """
+
+    NO_MATCH = 255
+    _AMBIGUOUS = 255
+
+    def __init__(self, palette: Sequence[Sequence[float]], bits: int = 6):
+        self.palette = np.asarray(palette, dtype=np.float64).reshape(-1, 3)
+        if not 0 < len(self.palette) < self.NO_MATCH:
+            raise ValueError(f"Palette must have 1-{self.NO_MATCH - 1} colors, got {len(self.palette)}")
+        self.bits = bits
+        self.lut = self._build_lut()
+
+    def _build_lut(self) -> np.ndarray:
+        levels = 1 << self.bits
+        width = 256 // levels
+        offset = (width - 1) / 2.0
+        axis = np.arange(levels) * width + offset
+        centers = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+
+        # Nearest and second-nearest distance from each bin center, one palette color at a time
+        best = np.full(len(centers), np.inf)
+        second = np.full(len(centers), np.inf)
+        lut = np.zeros(len(centers), dtype=np.uint8)
+        for index, color in enumerate(self.palette):
+            distance = np.sqrt(((centers - color) ** 2).sum(axis=1))
+            closer = distance < best
+            second = np.where(closer, best, np.minimum(second, distance))
+            best = np.where(closer, distance, best)
+            lut[closer] = index
+
+        # Every color in a bin is within half a bin diagonal of its center
+        radius = offset * np.sqrt(3.0)
+        lut[second - best <= 2 * radius] = self._AMBIGUOUS
+        return lut
+
+    def map(self, image: np.ndarray, max_distance: Optional[float] = None,
+            chunk_pixels: int = 1 << 20) -> np.ndarray:
+        """uint8 label map (image shape without channels) of nearest palette indices.
+
+        With ``max_distance``, pixels farther than that from their nearest
+        palette color are labelled ``NO_MATCH``.
+        """
+        if image.dtype != np.uint8:
+            image = np.clip(np.round(image), 0, 255).astype(np.uint8)
+        pixels = image.reshape(-1, image.shape[-1])[:, :3]
+        labels = np.empty(len(pixels), dtype=np.uint8)
+
+        shift = 8 - self.bits
+        for start in range(0, len(pixels), chunk_pixels):
+            chunk = pixels[start:start + chunk_pixels]
+            q = (chunk >> shift).astype(np.int32)
+            chunk_labels = self.lut[(q[:, 0] << (2 * self.bits)) | (q[:, 1] << self.bits) | q[:, 2]]
+
+            ambiguous = np.flatnonzero(chunk_labels == self._AMBIGUOUS)
+            if len(ambiguous):
+                chunk_labels[ambiguous] = self._nearest_exact(chunk[ambiguous])
+
+            if max_distance is not None:
+                offsets = chunk.astype(np.float64) - self.palette[chunk_labels]
+                chunk_labels[(offsets ** 2).sum(axis=1) > max_distance ** 2] = self.NO_MATCH
+
+            labels[start:start + len(chunk)] = chunk_labels
+
+        return labels.reshape(image.shape[:-1])
+
+    def _nearest_exact(self, pixels: np.ndarray) -> np.ndarray:
+        """First nearest palette index by exact squared distance, as np.argmin would pick"""
+        pixels = pixels.astype(np.float64)
+        best = np.full(len(pixels), np.inf)
+        labels = np.zeros(len(pixels), dtype=np.uint8)
+        for index, color in enumerate(self.palette):
+            distance = ((pixels - color) ** 2).sum(axis=1)
+            closer = distance < best
+            best[closer] = distance[closer]
+            labels[closer] = index
+        return labels
+
+    def quantize(self, image: np.ndarray) -> np.ndarray:
+        """Image with every pixel replaced by its nearest palette color (uint8)"""
+        return self.palette.astype(np.uint8)[self.map(image)]
+
+
+class ColorLayer(Mapping):
+    """One palette color's layer, backed by the shared label map.
+
+    Behaves like the ``{'layer', 'mask', 'color', 'pixel_count'}`` dict the
+    layer API has always returned, but holds only a reference to the uint8
+    labels; the boolean mask and the colored layer image are derived on
+    access instead of being stored per color.
+    """
+
+    _KEYS = ('layer', 'mask', 'color', 'pixel_count')
+
+    def __init__(self, labels: np.ndarray, index: int, color: Tuple[int, int, int], pixel_count: int):
+        self.labels = labels
+        self.index = index
+        self.color = color
+        self.pixel_count = pixel_count
+
+    @property
+    def mask(self) -> np.ndarray:
+        return self.labels == self.index
+
+    @property
+    def layer(self) -> np.ndarray:
+        """RGB image with this color where the mask is set and black elsewhere"""
+        layer = np.zeros(self.labels.shape + (3,), dtype=np.uint8)
+        layer[self.mask] = self.color
+        return layer
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+
+def color_layers(labels: np.ndarray, palette: Sequence[Tuple[int, int, int]]) -> List[ColorLayer]:
+    """A ColorLayer per palette entry over one label map"""
+    counts = np.bincount(labels.ravel(), minlength=len(palette))
+    return [ColorLayer(labels, index, color, int(counts[index])) for index, color in enumerate(palette)]
+
+
+def _box_error(colors: np.ndarray, counts: np.ndarray, box: np.ndarray) -> float:
+    """Weighted sum of squared distances of a box's bins to its mean"""
+    if len(box) < 2:
+        return 0.0
+    weights = counts[box]
+    mean = np.average(colors[box], axis=0, weights=weights)
+    return float(np.sum(weights * np.sum((colors[box] - mean) ** 2, axis=1)))
+
+
+def _split_box(colors: np.ndarray, counts: np.ndarray, box: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Split at the weighted median of the channel with the largest spread"""
+    box_colors = colors[box]
+    channel = int(np.argmax(box_colors.max(axis=0) - box_colors.min(axis=0)))
+    order = box[np.argsort(box_colors[:, channel], kind='stable')]
+
+    cumulative = np.cumsum(counts[order])
+    cut = int(np.searchsorted(cumulative, cumulative[-1] / 2.0))
+    cut = min(max(cut + 1, 1), len(order) - 1)  # Both halves non-empty
+    return order[:cut], order[cut:]
+
+
+def _refine(colors: np.ndarray, counts: np.ndarray, centers: np.ndarray,
+            iterations: int) -> List[Color]:
+    """Weighted Lloyd iterations over histogram bins, then order by population"""
+    for _ in range(iterations):
+        labels = _nearest(colors, centers)
+        weights = np.bincount(labels, weights=counts, minlength=len(centers))
+        populated = weights > 0
+        for channel in range(3):
+            sums = np.bincount(labels, weights=counts * colors[:, channel], minlength=len(centers))
+            centers[populated, channel] = sums[populated] / weights[populated]
+
+    weights = np.bincount(_nearest(colors, centers), weights=counts, minlength=len(centers))
+    order = np.argsort(-weights, kind='stable')
+    return _to_colors(centers[order][weights[order] > 0])
+
+
+def _nearest(colors: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    return ((colors[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+
+
+def _to_colors(colors: np.ndarray) -> List[Color]:
+    return [(r, g, b) for r, g, b in np.clip(np.round(colors), 0, 255).astype(int).tolist()]
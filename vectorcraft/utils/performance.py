@@ -1,16 +1,33 @@
+import os
+import sys
 import time
+import hashlib
 import functools
 import numpy as np
-from typing import Callable, Any, Dict
+from collections import OrderedDict
+from typing import Callable, Any, Dict, Optional, Tuple, Union
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from .image_context import ImageContext
+from .tracing import LatencyHistogram, tracer
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 class PerformanceProfiler:
-    """Performance profiling utilities for optimization"""
+    """Performance profiling utilities for optimization
+    
+    Timings go into bounded per-function histograms, so a long-running
+    worker keeps constant memory, and every profiled call is also a span
+    of the current request's trace (see ``tracing.tracer``).
+    """
     
     def __init__(self):
-        self.timings = {}
-        self.call_counts = {}
+        self.timings: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
     
     def profile(self, func_name: str = None):
         """Decorator to profile function execution time"""
@@ -19,18 +36,15 @@ class PerformanceProfiler:
             
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
-                start_time = time.time()
-                result = func(*args, **kwargs)
-                end_time = time.time()
+                start_time = time.perf_counter()
+                with tracer.span(name):
+                    result = func(*args, **kwargs)
+                execution_time = time.perf_counter() - start_time
                 
-                execution_time = end_time - start_time
-                
-                if name not in self.timings:
-                    self.timings[name] = []
-                    self.call_counts[name] = 0
-                
-                self.timings[name].append(execution_time)
-                self.call_counts[name] += 1
+                with self._lock:
+                    if name not in self.timings:
+                        self.timings[name] = LatencyHistogram()
+                    self.timings[name].record(execution_time)
                 
                 return result
             return wrapper
@@ -39,13 +53,18 @@ class PerformanceProfiler:
     def get_stats(self) -> Dict[str, Dict[str, float]]:
         """Get profiling statistics"""
         stats = {}
-        for func_name, times in self.timings.items():
+        with self._lock:
+            summaries = {name: histogram.summary() for name, histogram in self.timings.items()}
+        for func_name, summary in summaries.items():
             stats[func_name] = {
-                'total_time': sum(times),
-                'avg_time': sum(times) / len(times),
-                'min_time': min(times),
-                'max_time': max(times),
-                'call_count': self.call_counts[func_name]
+                'total_time': summary['total'],
+                'avg_time': summary['mean'],
+                'min_time': summary['min'],
+                'max_time': summary['max'],
+                'p50_time': summary['p50'],
+                'p95_time': summary['p95'],
+                'p99_time': summary['p99'],
+                'call_count': summary['count']
             }
         return stats
     
@@ -53,38 +72,39 @@ class PerformanceProfiler:
         """Print profiling statistics"""
         stats = self.get_stats()
         print("\n=== Performance Profile ===")
-        print(f"{'Function':<40} {'Calls':<8} {'Total(s)':<10} {'Avg(s)':<10} {'Min(s)':<10} {'Max(s)':<10}")
+        print(f"{'Function':<40} {'Calls':<8} {'Total(s)':<10} {'Avg(s)':<10} {'p95(s)':<10} {'Max(s)':<10}")
         print("-" * 90)
         
         # Sort by total time
         sorted_stats = sorted(stats.items(), key=lambda x: x[1]['total_time'], reverse=True)
         
         for func_name, data in sorted_stats:
-            print(f"{func_name:<40} {data['call_count']:<8} {data['total_time']:<10.4f} {data['avg_time']:<10.4f} {data['min_time']:<10.4f} {data['max_time']:<10.4f}")
+            print(f"{func_name:<40} {data['call_count']:<8} {data['total_time']:<10.4f} {data['avg_time']:<10.4f} {data['p95_time']:<10.4f} {data['max_time']:<10.4f}")
+
+# Process-wide profiler, shared so decorated methods and instances report into one place
+default_profiler = PerformanceProfiler()
 
 class OptimizedImageProcessor:
     """Optimized version of image processing operations"""
     
     @staticmethod
-    def parallel_edge_detection(image: np.ndarray, methods: list = ['canny', 'sobel']) -> Dict[str, np.ndarray]:
+    def parallel_edge_detection(image, methods: list = ['canny', 'sobel']) -> Dict[str, np.ndarray]:
         """Run multiple edge detection methods in parallel"""
-        def detect_edges(method, img):
+        from .image_processor import ImageProcessor
+        
+        context = ImageContext.ensure(image)
+        context.gray  # Shared input of every method; compute once before fanning out
+        
+        def detect_edges(method, ctx):
             if method == 'canny':
-                import cv2
-                gray = cv2.cvtColor((img * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY) if len(img.shape) == 3 else (img * 255).astype(np.uint8)
-                return cv2.Canny(gray, 50, 150)
+                return ctx.canny
             elif method == 'sobel':
-                import cv2
-                gray = cv2.cvtColor((img * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY) if len(img.shape) == 3 else (img * 255).astype(np.uint8)
-                grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-                grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-                magnitude = np.sqrt(grad_x**2 + grad_y**2)
-                return (magnitude > 30).astype(np.uint8) * 255
+                return ctx.memoize('sobel_edges', lambda: ImageProcessor._sobel_edges(ctx.gray))
             return None
         
         results = {}
         with ThreadPoolExecutor(max_workers=len(methods)) as executor:
-            futures = {executor.submit(detect_edges, method, image): method for method in methods}
+            futures = {executor.submit(detect_edges, method, context): method for method in methods}
             
             for future in as_completed(futures):
                 method = futures[future]
@@ -184,38 +204,121 @@ class AdaptiveOptimizer:
             # High precision
             return base_params
 
+def content_hash(array: np.ndarray) -> str:
+    """Hex digest of an array's shape, dtype and pixel bytes.
+
+    Uses xxhash when it is installed and blake2b otherwise; either way every
+    byte is hashed, so equal-sum images no longer share a key.
+    """
+    array = np.ascontiguousarray(array)
+    hasher = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    hasher.update(f"{array.shape}{array.dtype.str}".encode())
+    hasher.update(memoryview(array).cast('B'))
+    return hasher.hexdigest()
+
+
+def _sizeof(value: Any) -> int:
+    """Approximate bytes held by a cached value, counting arrays by nbytes"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_sizeof(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
 class CacheManager:
-    """Intelligent caching for repeated operations"""
+    """Byte-budgeted LRU cache for decoded images and derived arrays.
+
+    Entries are evicted least-recently-used first until both the entry
+    count and the total ``nbytes`` fit; a value larger than the whole budget
+    is not cached at all. The byte budget defaults to
+    ``VECTORCRAFT_CACHE_MB`` (256 MB).
+    """
     
-    def __init__(self, max_size: int = 100):
-        self.cache = {}
-        self.access_count = {}
+    def __init__(self, max_size: int = 100, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('VECTORCRAFT_CACHE_MB', 256)) * 1024 * 1024)
         self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, Tuple[Any, int]]' = OrderedDict()
+        self._lock = threading.Lock()
     
-    def get_cache_key(self, image: np.ndarray, operation: str, params: dict = None) -> str:
-        """Generate cache key for image and operation"""
-        # Simple hash based on image properties and operation
-        img_hash = hash((image.shape, image.dtype, np.sum(image)))
+    def get_cache_key(self, image: Union[np.ndarray, ImageContext], operation: str, params: dict = None) -> str:
+        """Generate cache key for image and operation
+        
+        A context hashes its pixels once and memoizes the digest, so repeated
+        lookups for the same request are free.
+        """
+        if isinstance(image, ImageContext):
+            context = image
+            img_hash = context.memoize('content_hash', lambda: content_hash(context.uint8))
+        else:
+            img_hash = content_hash(image)
         param_hash = hash(str(sorted(params.items()))) if params else 0
         return f"{operation}_{img_hash}_{param_hash}"
     
     def get(self, key: str):
-        """Get cached result"""
-        if key in self.cache:
-            self.access_count[key] = self.access_count.get(key, 0) + 1
-            return self.cache[key]
-        return None
+        """Get cached result, marking it most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
     
     def put(self, key: str, value: Any):
-        """Cache result with LRU eviction"""
-        if len(self.cache) >= self.max_size:
-            # Remove least recently used item
-            lru_key = min(self.access_count.keys(), key=self.access_count.get)
-            del self.cache[lru_key]
-            del self.access_count[lru_key]
-        
-        self.cache[key] = value
-        self.access_count[key] = 1
+        """Cache result, evicting least recently used entries to stay within budget"""
+        nbytes = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes or self.max_size <= 0:
+                return
+            
+            while self._entries and (len(self._entries) >= self.max_size or
+                                     self.current_bytes + nbytes > self.max_bytes):
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+            
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+    
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __contains__(self, key: str):
+        return key in self._entries
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_size,
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'hasher': 'xxhash' if xxhash is not None else 'blake2b'
+            }
 
 class ParallelProcessor:
     """Parallel processing utilities for CPU optimization"""
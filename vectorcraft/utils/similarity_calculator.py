@@ -1,97 +1,118 @@
 import numpy as np
 import cv2
-from typing import Tuple
-from skimage.metrics import structural_similarity as ssim
-import base64
-from io import BytesIO
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from PIL import Image
-import math
+
+from .svg_rasterizer import rasterize_svg
+
+# Weights of the comprehensive score, emphasizing perceptual similarity
+METRIC_WEIGHTS = {
+    'mse': 0.15,        # Reduced MSE weight - not perceptually accurate
+    'ssim': 0.45,       # Increased SSIM - best perceptual metric
+    'color': 0.20,      # Color accuracy important for logos
+    'edge': 0.15,       # Edge preservation crucial for text
+    'histogram': 0.05   # Reduced histogram weight
+}
+
+# SSIM as skimage computes it by default: 7x7 uniform window, sample covariance, data range 1
+_SSIM_WINDOW = 7
+_SSIM_COV_NORM = _SSIM_WINDOW ** 2 / (_SSIM_WINDOW ** 2 - 1)
+_SSIM_C1 = (0.01 * 1.0) ** 2
+_SSIM_C2 = (0.03 * 1.0) ** 2
+
+
+@dataclass
+class ComparisonTarget:
+    """Target image and its metric intermediates at one comparison size"""
+    image: np.ndarray        # BGR float32 in [0, 1]
+    gray: np.ndarray         # float32
+    gray_mean: np.ndarray    # 7x7 window mean of gray
+    gray_sq_mean: np.ndarray # 7x7 window mean of gray^2
+    edges: np.ndarray        # Canny edges, bool
+    mean_color: np.ndarray   # per-channel mean
+    histograms: np.ndarray   # (3, 256) normalized per-channel histograms
+
 
 class SimilarityCalculator:
-    """Advanced similarity calculation for vector-raster comparison"""
+    """Advanced similarity calculation for vector-raster comparison
+    
+    All five metrics are computed in one pass from shared intermediates:
+    the target's gray image, window statistics, edges and histograms are
+    prepared once (``prepare_target``) and reused for every candidate, and
+    each candidate is converted to gray and windowed once. The ``preview``
+    tier compares at 128x128 for cheap ranking; ``full`` is 512x512.
+    """
+    
+    TIERS = {'full': (512, 512), 'preview': (128, 128)}
     
     def __init__(self):
-        self.target_size = (512, 512)  # Standard size for comparison
+        self.target_size = self.TIERS['full']  # Standard size for comparison
         
-    def calculate_comprehensive_similarity(self, svg_content: str, target_image_path: str) -> float:
+    def calculate_comprehensive_similarity(self, svg_content: str, target_image_path: str,
+                                           tier: str = 'full') -> float:
         """Calculate comprehensive similarity between SVG and target image"""
-        
-        # Load target image
-        target_image = self._load_and_normalize_image(target_image_path)
-        
-        # Render SVG to image (simplified approach)
-        svg_image = self._render_svg_to_image(svg_content, target_image.shape[:2])
-        
-        if svg_image is None:
-            return 0.0
-        
-        # Resize both to standard size for comparison
-        target_resized = cv2.resize(target_image, self.target_size)
-        svg_resized = cv2.resize(svg_image, self.target_size)
-        
-        # Calculate multiple similarity metrics
-        mse_sim = self._calculate_mse_similarity(target_resized, svg_resized)
-        ssim_sim = self._calculate_ssim_similarity(target_resized, svg_resized)
-        color_sim = self._calculate_color_similarity(target_resized, svg_resized)
-        edge_sim = self._calculate_edge_similarity(target_resized, svg_resized)
-        histogram_sim = self._calculate_histogram_similarity(target_resized, svg_resized)
-        
-        # Enhanced weighted combination emphasizing perceptual similarity
-        comprehensive_similarity = (
-            0.15 * mse_sim +        # Reduced MSE weight - not perceptually accurate
-            0.45 * ssim_sim +       # Increased SSIM - best perceptual metric
-            0.20 * color_sim +      # Color accuracy important for logos
-            0.15 * edge_sim +       # Edge preservation crucial for text
-            0.05 * histogram_sim    # Reduced histogram weight
+        target = self.prepare_target(target_image_path, tier)
+        return self.calculate_metrics(svg_content, target)['comprehensive']
+    
+    def score_candidates(self, svg_contents: Sequence[str], target_image: Union[str, np.ndarray],
+                         tier: str = 'preview') -> List[Dict[str, float]]:
+        """Score many candidate SVGs against one target, preparing the target once
+        
+        Returns one metrics dict per candidate (see ``calculate_metrics``), in
+        input order; a candidate that fails to render scores 0.
+        """
+        target = self.prepare_target(target_image, tier)
+        return [self.calculate_metrics(svg_content, target) for svg_content in svg_contents]
+    
+    def prepare_target(self, target_image: Union[str, np.ndarray], tier: str = 'full') -> ComparisonTarget:
+        """Load (if needed), resize and precompute the target's metric intermediates
+        
+        ``target_image`` is a path or a BGR float image in [0, 1].
+        """
+        if isinstance(target_image, str):
+            target_image = self._load_and_normalize_image(target_image)
+        image = cv2.resize(target_image, self._tier_size(tier))
+        
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return ComparisonTarget(
+            image=image,
+            gray=gray,
+            gray_mean=self._window_mean(gray),
+            gray_sq_mean=self._window_mean(gray * gray),
+            edges=self._edges(gray),
+            mean_color=image.mean(axis=(0, 1)),
+            histograms=self._histograms(image)
         )
-        
-        return min(1.0, max(0.0, comprehensive_similarity))
     
-    def _parse_fill_color(self, fill_str: str) -> Tuple[float, float, float]:
-        """Parse SVG fill color to RGB tuple"""
-        if 'rgb(' in fill_str:
-            # Extract RGB values
-            import re
-            rgb_match = re.search(r'rgb\(([^)]+)\)', fill_str)
-            if rgb_match:
-                rgb_values = [float(x.strip()) for x in rgb_match.group(1).split(',')]
-                if len(rgb_values) >= 3:
-                    return (rgb_values[0]/255.0, rgb_values[1]/255.0, rgb_values[2]/255.0)
-        
-        # Default to black
-        return (0.0, 0.0, 0.0)
+    def calculate_metrics(self, svg_content: str, target: ComparisonTarget) -> Dict[str, float]:
+        """All metrics of one SVG against a prepared target, plus the weighted 'comprehensive' score"""
+        height, width = target.image.shape[:2]
+        rendered = self._render_svg_to_image(svg_content, (width, height))
+        if rendered is None:
+            return dict({name: 0.0 for name in METRIC_WEIGHTS}, comprehensive=0.0)
+        return self.compare_images(target, rendered)
     
-    def _render_path_simplified(self, image: np.ndarray, d_attr: str, color: Tuple[float, float, float], 
-                               scale_x: float, scale_y: float):
-        """Simplified path rendering - extract key points and fill bounding box"""
-        import re
-        
-        # Extract coordinate pairs from path
-        coords = re.findall(r'[-+]?\d*\.?\d+', d_attr)
-        if len(coords) < 4:
-            return
-        
-        try:
-            # Convert to float coordinates
-            points = []
-            for i in range(0, len(coords)-1, 2):
-                x = float(coords[i]) * scale_x
-                y = float(coords[i+1]) * scale_y
-                points.append((int(x), int(y)))
-            
-            if len(points) >= 2:
-                # Get bounding box of path
-                xs = [p[0] for p in points]
-                ys = [p[1] for p in points]
-                min_x, max_x = max(0, min(xs)), min(image.shape[1]-1, max(xs))
-                min_y, max_y = max(0, min(ys)), min(image.shape[0]-1, max(ys))
-                
-                # Fill bounding box with color (simplified rendering)
-                if max_x > min_x and max_y > min_y:
-                    image[min_y:max_y+1, min_x:max_x+1] = color
-                    
-        except (ValueError, IndexError):
-            pass  # Skip invalid paths
+    def compare_images(self, target: ComparisonTarget, rendered: np.ndarray) -> Dict[str, float]:
+        """Fused metrics kernel for a BGR float image already at the target's size"""
+        gray = cv2.cvtColor(rendered, cv2.COLOR_BGR2GRAY)
+        
+        metrics = {
+            'mse': 1.0 / (1.0 + float(np.mean((target.image - rendered) ** 2)) * 10.0),
+            'ssim': (self._ssim(target, gray) + 1.0) / 2.0,  # Normalize to [0,1]
+            'color': 1.0 / (1.0 + float(np.linalg.norm(target.mean_color - rendered.mean(axis=(0, 1)))) * 5.0),
+            'edge': float(self._edge_overlap(target.edges, self._edges(gray))),
+            'histogram': self._histogram_correlation(target.histograms, self._histograms(rendered))
+        }
+        
+        comprehensive = sum(METRIC_WEIGHTS[name] * value for name, value in metrics.items())
+        metrics['comprehensive'] = float(min(1.0, max(0.0, comprehensive)))
+        return metrics
+    
+    def _tier_size(self, tier: str) -> Tuple[int, int]:
+        if tier not in self.TIERS:
+            raise ValueError(f"Unknown similarity tier '{tier}', expected one of {sorted(self.TIERS)}")
+        return self.TIERS[tier] if tier != 'full' else self.target_size
     
     def _load_and_normalize_image(self, image_path: str) -> np.ndarray:
         """Load and normalize image to [0,1] range"""
@@ -104,240 +125,58 @@ class SimilarityCalculator:
         
         return image.astype(np.float32) / 255.0
     
-    def _render_svg_to_image(self, svg_content: str, target_shape: Tuple[int, int]) -> np.ndarray:
-        """Render SVG to image array using proper SVG rendering"""
-        
+    def _render_svg_to_image(self, svg_content: str, size: Tuple[int, int]) -> Optional[np.ndarray]:
+        """Render SVG to a BGR float image of ``size`` (width, height) with the built-in rasterizer"""
         try:
-            # Set Cairo library path for macOS Homebrew
-            import os
-            os.environ['DYLD_LIBRARY_PATH'] = '/opt/homebrew/lib:' + os.environ.get('DYLD_LIBRARY_PATH', '')
-            
-            # First try professional SVG rendering with cairosvg
-            import cairosvg
-            from PIL import Image
-            import io
-            
-            height, width = target_shape[:2]
-            
-            # Render SVG to PNG bytes
-            png_bytes = cairosvg.svg2png(
-                bytestring=svg_content.encode('utf-8'),
-                output_width=width,
-                output_height=height
-            )
-            
-            # Convert to numpy array
-            pil_image = Image.open(io.BytesIO(png_bytes)).convert('RGB')
-            image = np.array(pil_image).astype(np.float32) / 255.0
-            
-            print(f"✅ Professional SVG rendering successful: {image.shape}")
-            return image
-            
-        except ImportError:
-            print("⚠️ cairosvg not available, falling back to simplified rendering")
-            # Fallback to simplified rendering
-            height, width = target_shape[:2]
-            image = np.ones((height, width, 3), dtype=np.float32)  # White background
-            image = self._parse_svg_elements(svg_content, image)
-            return image
-            
+            rendered = rasterize_svg(svg_content, size)
         except Exception as e:
-            print(f"❌ Professional SVG rendering failed: {e}")
-            print("⚠️ Falling back to simplified rendering")
-            # Fallback to simplified rendering
-            height, width = target_shape[:2]
-            image = np.ones((height, width, 3), dtype=np.float32)  # White background
-            image = self._parse_svg_elements(svg_content, image)
-            return image
-    
-    def _parse_svg_elements(self, svg_content: str, image: np.ndarray) -> np.ndarray:
-        """Parse and render SVG elements with improved path support"""
-        import re
-        
-        height, width = image.shape[:2]
+            print(f"❌ SVG rasterization failed: {e}")
+            return None
         
-        # Extract viewBox or width/height
-        viewbox_match = re.search(r'viewBox="([^"]*)"', svg_content)
-        width_match = re.search(r'width="([^"]*)"', svg_content)
-        height_match = re.search(r'height="([^"]*)"', svg_content)
-        
-        try:
-            svg_width = float(width_match.group(1)) if width_match else width
-            svg_height = float(height_match.group(1)) if height_match else height
-        except:
-            svg_width, svg_height = width, height
-        
-        scale_x = width / svg_width if svg_width > 0 else 1.0
-        scale_y = height / svg_height if svg_height > 0 else 1.0
-        
-        # Parse paths (most important for VTracer output)
-        path_pattern = r'<path[^>]*d="([^"]*)"[^>]*fill="([^"]*)"[^>]*/?>'
-        
-        for match in re.finditer(path_pattern, svg_content):
-            d_attr = match.group(1)
-            fill_color = match.group(2)
-            
-            # Convert fill color
-            color = self._parse_fill_color(fill_color)
-            if color is not None:
-                # Parse path and render (simplified)
-                self._render_path_simplified(image, d_attr, color, scale_x, scale_y)
-        
-        # Parse rectangles
-        rect_pattern = r'<rect[^>]*fill="([^"]*)"[^>]*x="([^"]*)"[^>]*y="([^"]*)"[^>]*width="([^"]*)"[^>]*height="([^"]*)"[^>]*/?>'
-        
-        for match in re.finditer(rect_pattern, svg_content):
-            color_str, x_str, y_str, w_str, h_str = match.groups()
-            
-            try:
-                # Parse color
-                color_values = [float(c) / 255.0 for c in color_str.split(',')]
-                if len(color_values) == 3:
-                    color = color_values
-                else:
-                    color = [0.8, 0.2, 0.0]  # Default red
-                
-                # Parse dimensions and scale
-                x = int(float(x_str) * scale_x)
-                y = int(float(y_str) * scale_y)
-                w = int(float(w_str) * scale_x)
-                h = int(float(h_str) * scale_y)
-                
-                # Clamp to image bounds
-                x = max(0, min(width - 1, x))
-                y = max(0, min(height - 1, y))
-                w = min(width - x, w)
-                h = min(height - y, h)
-                
-                # Draw rectangle
-                if w > 0 and h > 0:
-                    image[y:y+h, x:x+w] = color
-                    
-            except Exception as e:
-                print(f"Error parsing rectangle: {e}")
-                continue
-        
-        # Parse paths (simplified)
-        path_pattern = r'<path[^>]*fill="rgb\(([^)]*)\)"[^>]*d="([^"]*)"[^>]*/?>'
-        
-        for match in re.finditer(path_pattern, svg_content):
-            color_str, path_data = match.groups()
-            
-            try:
-                # Parse color
-                color_values = [float(c) / 255.0 for c in color_str.split(',')]
-                if len(color_values) == 3:
-                    color = color_values
-                else:
-                    color = [0.1, 0.1, 0.1]  # Default dark
-                
-                # Parse path data (very simplified)
-                points = self._parse_path_data(path_data, scale_x, scale_y)
-                
-                if len(points) >= 3:
-                    # Convert to contour format
-                    contour = np.array([[int(p[0]), int(p[1])] for p in points], dtype=np.int32)
-                    
-                    # Fill polygon
-                    cv2.fillPoly(image, [contour], color)
-                    
-            except Exception as e:
-                print(f"Error parsing path: {e}")
-                continue
-        
-        return image
+        # Targets are loaded with OpenCV, so compare in BGR
+        return cv2.cvtColor(rendered, cv2.COLOR_RGB2BGR)
     
-    def _parse_path_data(self, path_data: str, scale_x: float, scale_y: float) -> list:
-        """Parse SVG path data (very simplified)"""
-        import re
-        
-        points = []
-        
-        # Find move and line commands
-        commands = re.findall(r'[ML]\s*([\d.,\s]+)', path_data)
-        
-        for cmd in commands:
-            coords = re.findall(r'[\d.]+', cmd)
-            for i in range(0, len(coords) - 1, 2):
-                try:
-                    x = float(coords[i]) * scale_x
-                    y = float(coords[i + 1]) * scale_y
-                    points.append((x, y))
-                except (ValueError, IndexError):
-                    continue
-        
-        return points
+    @staticmethod
+    def _window_mean(image: np.ndarray) -> np.ndarray:
+        return cv2.blur(image, (_SSIM_WINDOW, _SSIM_WINDOW), borderType=cv2.BORDER_REFLECT)
     
-    def _calculate_mse_similarity(self, target: np.ndarray, rendered: np.ndarray) -> float:
-        """Calculate MSE-based similarity"""
-        mse = np.mean((target - rendered) ** 2)
-        return 1.0 / (1.0 + mse * 10.0)  # Convert to similarity score
+    def _ssim(self, target: ComparisonTarget, gray: np.ndarray) -> float:
+        """Mean SSIM of the gray images, reusing the target's window statistics"""
+        ux, uy = target.gray_mean, self._window_mean(gray)
+        vx = _SSIM_COV_NORM * (target.gray_sq_mean - ux * ux)
+        vy = _SSIM_COV_NORM * (self._window_mean(gray * gray) - uy * uy)
+        vxy = _SSIM_COV_NORM * (self._window_mean(target.gray * gray) - ux * uy)
+        
+        ssim_map = ((2 * ux * uy + _SSIM_C1) * (2 * vxy + _SSIM_C2) /
+                    ((ux * ux + uy * uy + _SSIM_C1) * (vx + vy + _SSIM_C2)))
+        pad = (_SSIM_WINDOW - 1) // 2
+        return float(ssim_map[pad:-pad, pad:-pad].mean(dtype=np.float64))
     
-    def _calculate_ssim_similarity(self, target: np.ndarray, rendered: np.ndarray) -> float:
-        """Calculate SSIM similarity"""
-        try:
-            # Convert to grayscale
-            target_gray = cv2.cvtColor(target, cv2.COLOR_BGR2GRAY)
-            rendered_gray = cv2.cvtColor(rendered, cv2.COLOR_BGR2GRAY)
-            
-            # Calculate SSIM
-            ssim_score = ssim(target_gray, rendered_gray, data_range=1.0)
-            return (ssim_score + 1.0) / 2.0  # Normalize to [0,1]
-            
-        except Exception:
-            # Fallback to simple correlation
-            target_flat = target.flatten()
-            rendered_flat = rendered.flatten()
-            correlation = np.corrcoef(target_flat, rendered_flat)[0, 1]
-            return max(0.0, correlation) if not np.isnan(correlation) else 0.0
+    @staticmethod
+    def _edges(gray: np.ndarray) -> np.ndarray:
+        return cv2.Canny((gray * 255).astype(np.uint8), 50, 150) > 0
     
-    def _calculate_color_similarity(self, target: np.ndarray, rendered: np.ndarray) -> float:
-        """Calculate color distribution similarity"""
-        # Calculate mean colors
-        target_mean = np.mean(target, axis=(0, 1))
-        rendered_mean = np.mean(rendered, axis=(0, 1))
-        
-        # Calculate color distance
-        color_distance = np.linalg.norm(target_mean - rendered_mean)
-        return 1.0 / (1.0 + color_distance * 5.0)
+    @staticmethod
+    def _edge_overlap(target_edges: np.ndarray, rendered_edges: np.ndarray) -> float:
+        """Intersection over union of the edge maps"""
+        union = np.count_nonzero(target_edges | rendered_edges)
+        if union == 0:
+            return 1.0 if not target_edges.any() else 0.0
+        return np.count_nonzero(target_edges & rendered_edges) / union
     
-    def _calculate_edge_similarity(self, target: np.ndarray, rendered: np.ndarray) -> float:
-        """Calculate edge structure similarity"""
-        # Convert to grayscale
-        target_gray = cv2.cvtColor(target, cv2.COLOR_BGR2GRAY)
-        rendered_gray = cv2.cvtColor(rendered, cv2.COLOR_BGR2GRAY)
-        
-        # Detect edges
-        target_edges = cv2.Canny((target_gray * 255).astype(np.uint8), 50, 150)
-        rendered_edges = cv2.Canny((rendered_gray * 255).astype(np.uint8), 50, 150)
-        
-        # Calculate edge overlap
-        edge_intersection = np.logical_and(target_edges, rendered_edges)
-        edge_union = np.logical_or(target_edges, rendered_edges)
-        
-        if np.sum(edge_union) == 0:
-            return 1.0 if np.sum(target_edges) == 0 else 0.0
-        
-        return np.sum(edge_intersection) / np.sum(edge_union)
+    @staticmethod
+    def _histograms(image: np.ndarray) -> np.ndarray:
+        """Normalized 256-bin histogram per channel over [0, 1)"""
+        histograms = np.stack([cv2.calcHist([image], [channel], None, [256], [0, 1]).ravel()
+                               for channel in range(3)])
+        return histograms / (histograms.sum(axis=1, keepdims=True) + 1e-8)
     
-    def _calculate_histogram_similarity(self, target: np.ndarray, rendered: np.ndarray) -> float:
-        """Calculate histogram similarity"""
-        # Calculate histograms for each channel
-        similarity_scores = []
-        
-        for channel in range(3):
-            target_hist = cv2.calcHist([target], [channel], None, [256], [0, 1])
-            rendered_hist = cv2.calcHist([rendered], [channel], None, [256], [0, 1])
-            
-            # Normalize histograms
-            target_hist = target_hist / (np.sum(target_hist) + 1e-8)
-            rendered_hist = rendered_hist / (np.sum(rendered_hist) + 1e-8)
-            
-            # Calculate correlation
-            correlation = cv2.compareHist(target_hist, rendered_hist, cv2.HISTCMP_CORREL)
-            similarity_scores.append(max(0.0, correlation))
-        
-        return np.mean(similarity_scores)
+    @staticmethod
+    def _histogram_correlation(target_histograms: np.ndarray, rendered_histograms: np.ndarray) -> float:
+        """Mean over channels of the (non-negative) histogram correlation"""
+        scores = [max(0.0, cv2.compareHist(t, r, cv2.HISTCMP_CORREL))
+                  for t, r in zip(target_histograms, rendered_histograms)]
+        return float(np.mean(scores))
     
     def estimate_heuristic_similarity(self, svg_content: str, svg_elements: int, svg_size: int, 
                                     target_characteristics: dict) -> float:
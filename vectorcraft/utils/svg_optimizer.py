@@ -0,0 +1,498 @@
+import os
+import re
+import gzip
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+_TAG_RE = re.compile(r'<(/?)([A-Za-z][\w:.-]*)((?:\s+[\w:.-]+\s*=\s*"[^"]*")*)\s*(/?)>')
+_ATTR_RE = re.compile(r'([\w:.-]+)\s*=\s*"([^"]*)"')
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+_XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*\?>\s*')
+_PATH_COMMAND_RE = re.compile(r'([MmLlHhVvCcSsQqTtAaZz])([^A-Za-z]*(?:[eE][-+]?\d[^A-Za-z]*)*)')
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_TRANSLATE_RE = re.compile(r'^\s*translate\(\s*([-+\d.eE]+)(?:[\s,]+([-+\d.eE]+))?\s*\)\s*$')
+_RGB_RE = re.compile(r'^rgb\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)$')
+
+# Coordinate decimals kept when the request does not say
+DEFAULT_PRECISION = int(os.environ.get('VECTORCRAFT_SVG_PRECISION', 2))
+
+# Attribute values that equal the SVG defaults, dropped from top-level shapes
+_DEFAULT_ATTRIBUTES = {
+    'stroke': ('none',),
+    'fill-rule': ('nonzero',),
+    'fill-opacity': ('1',),
+    'stroke-opacity': ('1',),
+    'opacity': ('1',),
+    'transform': ('translate(0,0)', 'translate(0 0)', 'translate(0, 0)'),
+}
+
+# Root attributes with no effect on rendering
+_ROOT_REDUNDANT = ('baseProfile', 'version', 'xmlns:ev')
+
+_NUMERIC_ATTRIBUTES = ('x', 'y', 'width', 'height', 'cx', 'cy', 'r', 'rx', 'ry', 'x1', 'y1', 'x2', 'y2')
+
+_ARITY = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2}
+
+# Paths merged into one <path> at most; bounds the pairwise overlap checks
+_MAX_MERGE_RUN = 100
+
+# Segments in absolute coordinates: ('M', [x, y]), ('L', [x, y]), ('C', [x1, y1, x2, y2, x, y]),
+# ('Q', [x1, y1, x, y]) or ('Z', [])
+Segment = Tuple[str, List[float]]
+
+
+@dataclass
+class SVGOptimizationStats:
+    """Before/after sizes of one optimized document"""
+    original_bytes: int = 0
+    optimized_bytes: int = 0
+    paths_in: int = 0
+    paths_out: int = 0
+    skipped_paths: int = 0  # Paths left as-is (arcs, unsupported transforms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'original_bytes': self.original_bytes,
+            'optimized_bytes': self.optimized_bytes,
+            'ratio': round(self.optimized_bytes / self.original_bytes, 4) if self.original_bytes else 1.0,
+            'paths_in': self.paths_in,
+            'paths_out': self.paths_out,
+            'skipped_paths': self.skipped_paths,
+        }
+
+
+def parse_path(d: str, offset: Tuple[float, float] = (0.0, 0.0)) -> Optional[List[Segment]]:
+    """Absolute M/L/C/Q/Z segments of a path, or None if it uses arcs or is malformed"""
+    ox, oy = offset
+    segments: List[Segment] = []
+    x = y = start_x = start_y = 0.0
+    last_control = None  # Reflection source for S/T
+    chunks = _PATH_COMMAND_RE.findall(d)
+    if not chunks or _PATH_COMMAND_RE.sub('', d).strip(' ,\t\r\n'):
+        return None  # Text outside any command
+
+    for command, arguments in chunks:
+        kind = command.upper()
+        if kind == 'A':
+            return None  # Arcs do not survive the translate-and-merge rewrite; leave the path alone
+        if kind == 'Z':
+            segments.append(('Z', []))
+            x, y = start_x, start_y
+            last_control = None
+            continue
+        try:
+            args = list(map(float, _NUMBER_RE.findall(arguments)))
+        except ValueError:
+            return None
+        arity = _ARITY[kind]
+        if not args or len(args) % arity:
+            return None
+        relative = command.islower()
+
+        for i in range(0, len(args), arity):
+            bx, by = (x, y) if relative else (0.0, 0.0)
+            if kind == 'M' and i == 0:
+                x, y = bx + args[0], by + args[1]
+                start_x, start_y = x, y
+                segments.append(('M', [x + ox, y + oy]))
+                last_control = None
+            elif kind in 'MLHV':  # Extra pairs after a moveto are linetos
+                if kind in 'ML':
+                    x, y = bx + args[i], by + args[i + 1]
+                elif kind == 'H':
+                    x = bx + args[i]
+                else:
+                    y = by + args[i]
+                segments.append(('L', [x + ox, y + oy]))
+                last_control = None
+            elif kind in 'CS':
+                if kind == 'C':
+                    x1, y1 = bx + args[i], by + args[i + 1]
+                    j = i + 2
+                else:
+                    x1, y1 = (2 * x - last_control[0], 2 * y - last_control[1]) \
+                        if last_control and last_control[2] == 'C' else (x, y)
+                    j = i
+                x2, y2 = bx + args[j], by + args[j + 1]
+                x, y = bx + args[j + 2], by + args[j + 3]
+                segments.append(('C', [x1 + ox, y1 + oy, x2 + ox, y2 + oy, x + ox, y + oy]))
+                last_control = (x2, y2, 'C')
+            else:  # Q, T
+                if kind == 'Q':
+                    x1, y1 = bx + args[i], by + args[i + 1]
+                    x, y = bx + args[i + 2], by + args[i + 3]
+                else:
+                    x1, y1 = (2 * x - last_control[0], 2 * y - last_control[1]) \
+                        if last_control and last_control[2] == 'Q' else (x, y)
+                    x, y = bx + args[i], by + args[i + 1]
+                segments.append(('Q', [x1 + ox, y1 + oy, x + ox, y + oy]))
+                last_control = (x1, y1, 'Q')
+    return segments
+
+
+def _bounds(segments: List[Segment]) -> Tuple[float, float, float, float]:
+    """Bounding box of the segment points; curves lie inside their control polygon"""
+    xs = [v for _, values in segments for v in values[0::2]]
+    ys = [v for _, values in segments for v in values[1::2]]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _overlaps(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class PathEncoder:
+    """Serializes absolute segments as the shortest relative/absolute shorthand ``d`` string.
+
+    Coordinates are rounded in absolute space before relative offsets are
+    taken, so rounding errors do not accumulate along a path.
+    """
+
+    def __init__(self, precision: int = 2):
+        self.precision = precision
+        self.scale = 10 ** precision
+        self._numbers: Dict[int, str] = {}  # Formatted numbers; offsets repeat heavily within a document
+
+    def quantize(self, value: float) -> int:
+        return int(round(value * self.scale))
+
+    def number(self, units: int) -> str:
+        """Fixed-point integer to the shortest SVG number string"""
+        text = self._numbers.get(units)
+        if text is None:
+            if len(self._numbers) > 65536:
+                self._numbers.clear()  # encode() holds a reference, so clear rather than rebind
+            text = self._numbers[units] = self._format(units)
+        return text
+
+    def _format(self, units: int) -> str:
+        if units == 0:
+            return '0'
+        sign = '-' if units < 0 else ''
+        whole, frac = divmod(abs(units), self.scale)
+        if not frac:
+            return f"{sign}{whole}"
+        frac_str = f"{frac:0{self.precision}d}".rstrip('0')
+        return f"{sign}{whole if whole else ''}.{frac_str}"
+
+    @staticmethod
+    def join(numbers: List[str], previous: str = '') -> str:
+        """Concatenate numbers with the fewest separators"""
+        out = []
+        for number in numbers:
+            if previous and not (number[0] == '-' or (number[0] == '.' and '.' in previous)):
+                out.append(' ')
+            out.append(number)
+            previous = number
+        return ''.join(out)
+
+    def encode(self, segments: List[Segment]) -> str:
+        scale = self.scale
+        number = self.number
+        cache = self._numbers
+        join = self.join
+        parts: List[str] = []
+        last_command = ''
+        last_number = ''
+        x = y = start_x = start_y = 0
+        prev_c2 = None  # Second control point of the previous cubic, for S
+
+        for kind, values in segments:
+            if kind == 'Z':
+                parts.append('z')
+                last_command, last_number = 'z', ''
+                x, y = start_x, start_y
+                prev_c2 = None
+                continue
+
+            units = [int(round(v * scale)) for v in values]
+            ex, ey = units[-2], units[-1]
+
+            if kind == 'M':
+                candidates = (('m', (ex - x, ey - y)), ('M', (ex, ey)))
+                start_x, start_y = ex, ey
+            elif kind == 'C' and self._is_line(x, y, units):
+                kind = 'L'
+
+            if kind == 'L':
+                dx, dy = ex - x, ey - y
+                if dx == 0:
+                    candidates = (('v', (dy,)), ('V', (ey,)))
+                elif dy == 0:
+                    candidates = (('h', (dx,)), ('H', (ex,)))
+                else:
+                    candidates = (('l', (dx, dy)), ('L', (ex, ey)))
+            elif kind == 'C':
+                x1, y1, x2, y2 = units[0], units[1], units[2], units[3]
+                if prev_c2 is not None and x1 == 2 * x - prev_c2[0] and y1 == 2 * y - prev_c2[1]:
+                    candidates = (('s', (x2 - x, y2 - y, ex - x, ey - y)), ('S', (x2, y2, ex, ey)))
+                else:
+                    candidates = (('c', (x1 - x, y1 - y, x2 - x, y2 - y, ex - x, ey - y)),
+                                  ('C', (x1, y1, x2, y2, ex, ey)))
+            elif kind == 'Q':
+                x1, y1 = units[0], units[1]
+                candidates = (('q', (x1 - x, y1 - y, ex - x, ey - y)), ('Q', (x1, y1, ex, ey)))
+
+            # Relative or absolute, whichever prints shorter (separators differ by a character at most)
+            (command, offsets), (abs_command, abs_offsets) = candidates
+            numbers = [cache[u] if u in cache else number(u) for u in offsets]
+            abs_numbers = [cache[u] if u in cache else number(u) for u in abs_offsets]
+            if sum(map(len, abs_numbers)) < sum(map(len, numbers)):
+                command, numbers = abs_command, abs_numbers
+
+            if command == last_command and command not in 'mM':
+                parts.append(join(numbers, last_number))  # Repeated command letters may be omitted
+            else:
+                parts.append(command + join(numbers))
+            last_command = 'l' if command == 'm' else 'L' if command == 'M' else command
+            last_number = numbers[-1]
+            prev_c2 = (units[2], units[3]) if kind == 'C' else None
+            x, y = ex, ey
+
+        return ''.join(parts)
+
+    @staticmethod
+    def _is_line(sx: int, sy: int, units: List[int]) -> bool:
+        """Whether a cubic's control points lie on its chord, making it a straight segment"""
+        dx, dy = units[4] - sx, units[5] - sy
+        length_sq = dx * dx + dy * dy
+        for px, py in ((units[0], units[1]), (units[2], units[3])):
+            if length_sq == 0:
+                if px != sx or py != sy:
+                    return False
+                continue
+            # Distance to the chord within half a quantization step, and between the end points
+            cross = (px - sx) * dy - (py - sy) * dx
+            if cross * cross > 0.25 * length_sq:
+                return False
+            t = (px - sx) * dx + (py - sy) * dy
+            if t < 0 or t > length_sq:
+                return False
+        return True
+
+
+@dataclass
+class _Item:
+    """One chunk of the document body: a parsed shape or raw markup passed through"""
+    raw: str
+    tag: Optional[str] = None
+    attributes: Dict[str, str] = field(default_factory=dict)
+    segments: Optional[List[Segment]] = None
+
+
+class SVGOptimizer:
+    """Post-processing pass that shrinks generated SVG without visible change.
+
+    Rounds coordinates to ``precision`` decimals, rewrites path data with
+    relative and shorthand commands, turns straight cubics into lines, bakes
+    ``translate`` transforms into the coordinates, merges runs of adjacent
+    same-style paths whose bounds do not overlap (so winding and paint order
+    are unchanged), and strips comments and attributes that restate SVG
+    defaults. Markup it does not understand is passed through untouched.
+    """
+
+    def __init__(self, precision: int = 2, merge_paths: bool = True):
+        self.precision = precision
+        self.merge_paths = merge_paths
+        self.encoder = PathEncoder(precision)
+
+    def optimize(self, svg: str) -> str:
+        return self.optimize_with_stats(svg)[0]
+
+    def optimize_with_stats(self, svg: str) -> Tuple[str, SVGOptimizationStats]:
+        stats = SVGOptimizationStats(original_bytes=len(svg.encode()))
+        text = _XML_DECLARATION_RE.sub('', _COMMENT_RE.sub('', svg))
+
+        root = _TAG_RE.search(text)
+        close = text.rfind('</svg>')
+        if root is None or root.group(2) != 'svg' or close < root.end():
+            stats.optimized_bytes = stats.original_bytes
+            return svg, stats
+
+        body = text[root.end():close]
+        # Children that inherit from a group must keep their explicit attributes
+        flat = not re.search(r'<(?:g|use|symbol|style|switch|text)\b', body)
+        items = self._parse_body(body, flat, stats)
+        if self.merge_paths and flat:
+            items = self._merge(items)
+        stats.paths_out = sum(1 for item in items if item.tag == 'path')
+
+        out = [self._root_tag(root.group(3), body)]
+        for item in items:
+            out.append(self._render(item) if item.tag else item.raw)
+        out.append('</svg>')
+        optimized = ''.join(out)
+        stats.optimized_bytes = len(optimized.encode())
+        return optimized, stats
+
+    def _root_tag(self, attribute_text: str, body: str) -> str:
+        attributes = dict(_ATTR_RE.findall(attribute_text))
+        for name in _ROOT_REDUNDANT:
+            attributes.pop(name, None)
+        if 'xmlns:xlink' in attributes and 'xlink:' not in body:
+            del attributes['xmlns:xlink']
+        return '<svg' + ''.join(f' {k}="{v}"' for k, v in attributes.items()) + '>'
+
+    def _parse_body(self, body: str, flat: bool, stats: SVGOptimizationStats) -> List[_Item]:
+        items: List[_Item] = []
+        position = 0
+        for match in _TAG_RE.finditer(body):
+            closing, tag, attribute_text, self_closing = match.groups()
+            raw_before = body[position:match.start()]
+            if raw_before.strip() or (raw_before and not flat):
+                items.append(_Item(raw_before))
+            position = match.end()
+
+            if closing or not self_closing:
+                if tag == 'defs' and not closing and body[position:].lstrip().startswith('</defs>'):
+                    position = body.index('</defs>', position) + len('</defs>')  # Empty <defs>
+                    continue
+                items.append(_Item(match.group(0)))
+                continue
+
+            attributes = dict(_ATTR_RE.findall(attribute_text))
+            if tag == 'defs':
+                continue
+            if tag == 'path':
+                stats.paths_in += 1
+                segments = self._path_segments(attributes)
+                if segments is None:
+                    stats.skipped_paths += 1
+                    items.append(_Item(match.group(0)))
+                    continue
+                attributes.pop('transform', None)
+                attributes.pop('d', None)
+                items.append(_Item(match.group(0), 'path', self._clean(attributes, flat), segments))
+            elif tag in ('rect', 'circle', 'ellipse', 'line'):
+                for name in _NUMERIC_ATTRIBUTES:
+                    if name in attributes:
+                        attributes[name] = self._number(attributes[name])
+                items.append(_Item(match.group(0), tag, self._clean(attributes, flat)))
+            else:
+                items.append(_Item(match.group(0)))
+
+        tail = body[position:]
+        if tail.strip() or (tail and not flat):
+            items.append(_Item(tail))
+        return items
+
+    def _path_segments(self, attributes: Dict[str, str]) -> Optional[List[Segment]]:
+        offset = (0.0, 0.0)
+        transform = attributes.get('transform')
+        if transform is not None:
+            match = _TRANSLATE_RE.match(transform)
+            if match is None:
+                return None
+            offset = (float(match.group(1)), float(match.group(2) or 0.0))
+        segments = parse_path(attributes.get('d', ''), offset)
+        return segments if segments else None
+
+    def _clean(self, attributes: Dict[str, str], flat: bool) -> Dict[str, str]:
+        cleaned = {}
+        for name, value in attributes.items():
+            if name in ('fill', 'stroke'):
+                value = self._color(value)
+            if flat and value in _DEFAULT_ATTRIBUTES.get(name, ()):
+                continue
+            cleaned[name] = value
+        # Without a stroke its width is irrelevant
+        if flat and 'stroke' not in cleaned:
+            cleaned.pop('stroke-width', None)
+        return cleaned
+
+    def _color(self, value: str) -> str:
+        match = _RGB_RE.match(value)
+        if match:
+            value = '#' + ''.join(f"{min(255, int(c)):02x}" for c in match.groups())
+        if re.fullmatch(r'#[0-9A-Fa-f]{6}', value):
+            value = value.lower()
+            if value[1] == value[2] and value[3] == value[4] and value[5] == value[6]:
+                value = '#' + value[1] + value[3] + value[5]
+        return value
+
+    def _number(self, value: str) -> str:
+        try:
+            return self.encoder.number(self.encoder.quantize(float(value)))
+        except ValueError:
+            return value
+
+    def _merge(self, items: List[_Item]) -> List[_Item]:
+        """Join adjacent paths with identical style whose bounds are disjoint"""
+        merged: List[_Item] = []
+        run_bounds: List[Tuple[float, float, float, float]] = []
+        for item in items:
+            if item.tag != 'path':
+                merged.append(item)
+                run_bounds = []
+                continue
+
+            bounds = _bounds(item.segments)
+            previous = merged[-1] if merged else None
+            if (previous is not None and previous.tag == 'path' and previous.attributes == item.attributes
+                    and len(run_bounds) < _MAX_MERGE_RUN
+                    and not any(_overlaps(bounds, other) for other in run_bounds)):
+                previous.segments = previous.segments + item.segments
+                run_bounds.append(bounds)
+            else:
+                merged.append(_Item(item.raw, 'path', item.attributes, list(item.segments)))
+                run_bounds = [bounds]
+        return merged
+
+    def _render(self, item: _Item) -> str:
+        attributes = dict(item.attributes)
+        if item.tag == 'path':
+            attributes = {'d': self.encoder.encode(item.segments), **attributes}
+        return f"<{item.tag}" + ''.join(f' {k}="{v}"' for k, v in attributes.items()) + '/>'
+
+
+def write_svg(path: str, svg_content: str, precompress: bool = True) -> List[str]:
+    """Write an SVG and, with ``precompress``, its ``.svgz`` (gzip) and ``.svg.br`` siblings
+
+    The siblings let the result routes serve the file with ``Content-Encoding``
+    instead of compressing it per request. Brotli is optional; without it only
+    the gzip sibling is written. Returns the paths written.
+    """
+    data = svg_content.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    written = [path]
+    if not precompress:
+        return written
+
+    for sibling, encoded in compressed_variants(data, path).items():
+        with open(sibling, 'wb') as f:
+            f.write(encoded)
+        written.append(sibling)
+    return written
+
+
+def compressed_variants(data: bytes, path: str) -> Dict[str, bytes]:
+    """Sibling path -> compressed bytes for every encoding available here"""
+    variants = {svgz_path(path): gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[path + '.br'] = brotli.compress(data, quality=11)
+    return variants
+
+
+def svgz_path(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return root + '.svgz' if ext.lower() == '.svg' else path + '.gz'
+
+
+def precompressed_sibling(path: str, accept_encoding: str) -> Optional[Tuple[str, str]]:
+    """``(sibling path, Content-Encoding)`` of the best precompressed copy the client accepts"""
+    accepted = set()
+    for token in (accept_encoding or '').split(','):
+        encoding, _, params = token.partition(';')
+        if params.replace(' ', '').lower() not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(encoding.strip().lower())
+    for encoding, sibling in (('br', path + '.br'), ('gzip', svgz_path(path))):
+        if encoding in accepted and os.path.exists(sibling):
+            return sibling, encoding
+    return None
@@ -0,0 +1,415 @@
+import re
+import math
+import threading
+import numpy as np
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+from .performance import CacheManager, content_hash
+
+Affine = np.ndarray  # 2 x 3 matrix mapping (x, y, 1) to device pixels
+
+_IDENTITY = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+
+_COMMAND_RE = re.compile(r'([MmLlHhVvCcSsQqTtAaZz])')
+_NUMBER_RE = re.compile(r'[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?')
+_TRANSFORM_RE = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+
+_NAMED_COLORS = {
+    'black': (0, 0, 0), 'white': (255, 255, 255), 'red': (255, 0, 0), 'green': (0, 128, 0),
+    'blue': (0, 0, 255), 'yellow': (255, 255, 0), 'gray': (128, 128, 128), 'grey': (128, 128, 128),
+    'orange': (255, 165, 0), 'purple': (128, 0, 128),
+}
+
+# Control-polygon length (in pixels) per flattened Bezier sample, and the sample cap per curve
+_FLATTEN_STEP = 3.0
+_MAX_CURVE_SAMPLES = 32
+
+
+class SVGRasterizer:
+    """Scanline polygon rasterizer for the SVG we produce and compare.
+
+    Parses paths (all commands; arcs are approximated by their chord),
+    rects, circles, ellipses and polygons with their fill, fill-opacity,
+    fill-rule and transforms, flattens Beziers into polygons and fills them
+    with a vectorized nonzero/even-odd scanline pass into a NumPy buffer.
+    Coverage is sampled at pixel centers (no anti-aliasing) and strokes
+    are not drawn, which is enough for similarity scoring. Rendered images
+    are cached by SVG content hash and output size.
+    """
+
+    def __init__(self, cache: Optional[CacheManager] = None):
+        self.cache = cache if cache is not None else CacheManager(max_size=64, max_bytes=64 * 1024 * 1024)
+
+    def render(self, svg_content: str, size: Tuple[int, int],
+               background: Tuple[float, float, float] = (1.0, 1.0, 1.0)) -> np.ndarray:
+        """Render to a read-only (height, width, 3) float32 RGB image in [0, 1].
+
+        ``size`` is (width, height); the drawing is stretched to fill it.
+        """
+        width, height = int(size[0]), int(size[1])
+        svg_bytes = svg_content.encode('utf-8') if isinstance(svg_content, str) else svg_content
+        cache_key = f"svg_raster_{content_hash(np.frombuffer(svg_bytes, dtype=np.uint8))}_{width}x{height}_{background}"
+
+        image = self.cache.get(cache_key) if self.cache is not None else None
+        if image is None:
+            image = self._render(svg_bytes, width, height, background)
+            image.setflags(write=False)  # Shared through the cache
+            if self.cache is not None:
+                self.cache.put(cache_key, image)
+        return image
+
+    def _render(self, svg_bytes: bytes, width: int, height: int,
+                background: Tuple[float, float, float]) -> np.ndarray:
+        image = np.empty((height, width, 3), dtype=np.float32)
+        image[:] = background
+
+        root = ET.fromstring(svg_bytes)
+        view_x, view_y, view_w, view_h = _viewport(root, width, height)
+        device = np.array([[width / view_w, 0.0, -view_x * width / view_w],
+                           [0.0, height / view_h, -view_y * height / view_h]])
+
+        self._draw_children(root, image, device, {'fill': 'black', 'fill-opacity': '1', 'fill-rule': 'nonzero',
+                                                  'opacity': '1'})
+        return image
+
+    def _draw_children(self, parent: ET.Element, image: np.ndarray, transform: Affine, style: Dict[str, str]):
+        for element in parent:
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag in ('defs', 'title', 'desc', 'metadata', 'clipPath', 'mask', 'symbol', 'style'):
+                continue
+
+            element_style = _inherit_style(element, style)
+            element_transform = transform
+            if 'transform' in element.attrib:
+                element_transform = _compose(transform, _parse_transform(element.attrib['transform']))
+
+            if tag in ('g', 'svg', 'a'):
+                self._draw_children(element, image, element_transform, element_style)
+                continue
+
+            polygons = _element_polygons(tag, element, element_transform)
+            if polygons:
+                _fill(image, polygons, element_style)
+
+
+_rasterizer_lock = threading.Lock()
+_rasterizer: Optional[SVGRasterizer] = None
+
+
+def get_rasterizer() -> SVGRasterizer:
+    """Process-wide rasterizer, so the render cache is shared between callers"""
+    global _rasterizer
+    with _rasterizer_lock:
+        if _rasterizer is None:
+            _rasterizer = SVGRasterizer()
+        return _rasterizer
+
+
+def rasterize_svg(svg_content: str, size: Tuple[int, int],
+                  background: Tuple[float, float, float] = (1.0, 1.0, 1.0)) -> np.ndarray:
+    """Render SVG markup with the shared rasterizer (see ``SVGRasterizer.render``)"""
+    return get_rasterizer().render(svg_content, size, background)
+
+
+# --- document and style ---------------------------------------------------
+
+def _length(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    match = _NUMBER_RE.match(value.strip())
+    return float(match.group(0)) if match else None
+
+
+def _viewport(root: ET.Element, width: int, height: int) -> Tuple[float, float, float, float]:
+    view_box = root.attrib.get('viewBox')
+    if view_box:
+        values = [float(v) for v in _NUMBER_RE.findall(view_box)]
+        if len(values) == 4 and values[2] > 0 and values[3] > 0:
+            return tuple(values)
+    svg_w = _length(root.attrib.get('width')) or width
+    svg_h = _length(root.attrib.get('height')) or height
+    return 0.0, 0.0, svg_w, svg_h
+
+
+def _inherit_style(element: ET.Element, parent: Dict[str, str]) -> Dict[str, str]:
+    style = parent
+    overrides = {key: element.attrib[key] for key in ('fill', 'fill-opacity', 'fill-rule', 'opacity')
+                 if key in element.attrib}
+    if 'style' in element.attrib:
+        for declaration in element.attrib['style'].split(';'):
+            if ':' in declaration:
+                key, value = declaration.split(':', 1)
+                if key.strip() in ('fill', 'fill-opacity', 'fill-rule', 'opacity'):
+                    overrides[key.strip()] = value.strip()
+    if overrides:
+        style = dict(parent, **overrides)
+        # Group opacity multiplies down the tree
+        if 'opacity' in overrides:
+            style['opacity'] = str(float(parent.get('opacity', 1)) * float(overrides['opacity']))
+    return style
+
+
+def _parse_color(value: str) -> Optional[Tuple[float, float, float]]:
+    value = value.strip().lower()
+    if value in ('none', 'transparent') or value.startswith('url('):
+        return None
+    if value.startswith('#'):
+        hex_digits = value[1:]
+        if len(hex_digits) == 3:
+            hex_digits = ''.join(c * 2 for c in hex_digits)
+        try:
+            return tuple(int(hex_digits[i:i + 2], 16) / 255.0 for i in (0, 2, 4))
+        except ValueError:
+            return (0.0, 0.0, 0.0)
+    if value.startswith('rgb'):
+        parts = re.findall(r'[-+]?\d*\.?\d+%?', value)[:3]
+        channels = [float(p[:-1]) * 2.55 if p.endswith('%') else float(p) for p in parts]
+        if len(channels) == 3:
+            return tuple(min(255.0, max(0.0, c)) / 255.0 for c in channels)
+    rgb = _NAMED_COLORS.get(value, (0, 0, 0))
+    return tuple(c / 255.0 for c in rgb)
+
+
+# --- transforms -----------------------------------------------------------
+
+def _compose(outer: Affine, inner: Affine) -> Affine:
+    """Affine applying ``inner`` first, then ``outer``"""
+    return np.vstack([outer, [0, 0, 1]]).dot(np.vstack([inner, [0, 0, 1]]))[:2]
+
+
+def _parse_transform(value: str) -> Affine:
+    result = _IDENTITY
+    for name, args in _TRANSFORM_RE.findall(value):
+        v = [float(a) for a in _NUMBER_RE.findall(args)]
+        if name == 'matrix' and len(v) == 6:
+            matrix = np.array([[v[0], v[2], v[4]], [v[1], v[3], v[5]]])
+        elif name == 'translate' and v:
+            matrix = np.array([[1.0, 0.0, v[0]], [0.0, 1.0, v[1] if len(v) > 1 else 0.0]])
+        elif name == 'scale' and v:
+            matrix = np.array([[v[0], 0.0, 0.0], [0.0, v[1] if len(v) > 1 else v[0], 0.0]])
+        elif name == 'rotate' and v:
+            a = math.radians(v[0])
+            matrix = np.array([[math.cos(a), -math.sin(a), 0.0], [math.sin(a), math.cos(a), 0.0]])
+            if len(v) == 3:
+                matrix = _compose(_compose(np.array([[1.0, 0, v[1]], [0, 1.0, v[2]]]), matrix),
+                                  np.array([[1.0, 0, -v[1]], [0, 1.0, -v[2]]]))
+        elif name == 'skewX' and v:
+            matrix = np.array([[1.0, math.tan(math.radians(v[0])), 0.0], [0.0, 1.0, 0.0]])
+        elif name == 'skewY' and v:
+            matrix = np.array([[1.0, 0.0, 0.0], [math.tan(math.radians(v[0])), 1.0, 0.0]])
+        else:
+            continue
+        result = _compose(result, matrix)
+    return result
+
+
+def _apply(transform: Affine, points: np.ndarray) -> np.ndarray:
+    return points.dot(transform[:, :2].T) + transform[:, 2]
+
+
+# --- geometry -------------------------------------------------------------
+
+def _element_polygons(tag: str, element: ET.Element, transform: Affine) -> List[np.ndarray]:
+    attrib = element.attrib
+    if tag == 'path':
+        return _path_polygons(attrib.get('d', ''), transform)
+    if tag == 'rect':
+        x, y = _length(attrib.get('x')) or 0.0, _length(attrib.get('y')) or 0.0
+        w, h = _length(attrib.get('width')) or 0.0, _length(attrib.get('height')) or 0.0
+        if w <= 0 or h <= 0:
+            return []
+        return [_apply(transform, np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h]]))]
+    if tag in ('circle', 'ellipse'):
+        cx, cy = _length(attrib.get('cx')) or 0.0, _length(attrib.get('cy')) or 0.0
+        rx = _length(attrib.get('r') if tag == 'circle' else attrib.get('rx')) or 0.0
+        ry = rx if tag == 'circle' else (_length(attrib.get('ry')) or 0.0)
+        if rx <= 0 or ry <= 0:
+            return []
+        scale = math.sqrt(abs(np.linalg.det(transform[:, :2])))
+        samples = int(min(256, max(16, 2 * math.pi * max(rx, ry) * scale / _FLATTEN_STEP)))
+        angles = np.linspace(0, 2 * math.pi, samples, endpoint=False)
+        return [_apply(transform, np.stack([cx + rx * np.cos(angles), cy + ry * np.sin(angles)], axis=1))]
+    if tag in ('polygon', 'polyline'):
+        values = [float(v) for v in _NUMBER_RE.findall(attrib.get('points', ''))]
+        if len(values) < 6:
+            return []
+        return [_apply(transform, np.array(values[:len(values) // 2 * 2]).reshape(-1, 2))]
+    return []
+
+
+def _path_polygons(d: str, transform: Affine) -> List[np.ndarray]:
+    """Subpaths of path data as lists of cubic segments, flattened to device-space polygons"""
+    subpaths = []
+    segments: List[List[float]] = []  # each [x0, y0, x1, y1, x2, y2, x3, y3, is_curve]
+    x = y = start_x = start_y = 0.0
+    last_control = None  # reflected for S/s and T/t
+    last_command = ''
+
+    def line_to(nx, ny):
+        segments.append([x, y, x, y, nx, ny, nx, ny, 0.0])
+
+    def close_subpath():
+        nonlocal segments
+        if segments:
+            subpaths.append(segments)
+        segments = []
+
+    tokens = _COMMAND_RE.split(d)
+    for i in range(1, len(tokens), 2):
+        command = tokens[i]
+        values = [float(v) for v in _NUMBER_RE.findall(tokens[i + 1])]
+        relative = command.islower()
+        upper = command.upper()
+
+        if upper == 'Z':
+            if (x, y) != (start_x, start_y):
+                line_to(start_x, start_y)
+            x, y = start_x, start_y
+            close_subpath()
+            last_control, last_command = None, 'Z'
+            continue
+
+        arity = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7}[upper]
+        for j in range(0, len(values) - arity + 1, arity):
+            v = values[j:j + arity]
+            dx, dy = (x, y) if relative else (0.0, 0.0)
+
+            if upper == 'M' and j == 0:
+                close_subpath()
+                x, y = v[0] + dx, v[1] + dy
+                start_x, start_y = x, y
+                last_control, last_command = None, 'M'
+                continue
+
+            if upper in ('M', 'L', 'T') and not (upper == 'T' and last_command in ('Q', 'T')):
+                # Implicit lineto after M, plain lineto, or T without a preceding quadratic
+                nx, ny = v[0] + dx, v[1] + dy
+                line_to(nx, ny)
+                x, y, last_control = nx, ny, None
+            elif upper == 'H':
+                nx = v[0] + (x if relative else 0.0)
+                line_to(nx, y)
+                x, last_control = nx, None
+            elif upper == 'V':
+                ny = v[0] + (y if relative else 0.0)
+                line_to(x, ny)
+                y, last_control = ny, None
+            elif upper == 'C':
+                c1x, c1y, c2x, c2y = v[0] + dx, v[1] + dy, v[2] + dx, v[3] + dy
+                nx, ny = v[4] + dx, v[5] + dy
+                segments.append([x, y, c1x, c1y, c2x, c2y, nx, ny, 1.0])
+                x, y, last_control = nx, ny, (c2x, c2y)
+            elif upper == 'S':
+                c1x, c1y = (2 * x - last_control[0], 2 * y - last_control[1]) \
+                    if last_control is not None and last_command in ('C', 'S') else (x, y)
+                c2x, c2y = v[0] + dx, v[1] + dy
+                nx, ny = v[2] + dx, v[3] + dy
+                segments.append([x, y, c1x, c1y, c2x, c2y, nx, ny, 1.0])
+                x, y, last_control = nx, ny, (c2x, c2y)
+            elif upper in ('Q', 'T'):
+                if upper == 'Q':
+                    qx, qy = v[0] + dx, v[1] + dy
+                    nx, ny = v[2] + dx, v[3] + dy
+                else:
+                    qx, qy = 2 * x - last_control[0], 2 * y - last_control[1]
+                    nx, ny = v[0] + dx, v[1] + dy
+                # Exact degree elevation of the quadratic
+                segments.append([x, y, x + 2 / 3 * (qx - x), y + 2 / 3 * (qy - y),
+                                 nx + 2 / 3 * (qx - nx), ny + 2 / 3 * (qy - ny), nx, ny, 1.0])
+                x, y, last_control = nx, ny, (qx, qy)
+            elif upper == 'A':
+                nx, ny = v[5] + dx, v[6] + dy
+                line_to(nx, ny)  # Chord approximation
+                x, y, last_control = nx, ny, None
+            last_command = upper
+
+    close_subpath()
+    return [_flatten(np.array(subpath), transform) for subpath in subpaths]
+
+
+def _flatten(segments: np.ndarray, transform: Affine) -> np.ndarray:
+    """Device-space polygon through a subpath's segments (lines as 1 sample, curves as several)"""
+    controls = _apply(transform, segments[:, :8].reshape(-1, 2)).reshape(-1, 4, 2)
+    is_curve = segments[:, 8] > 0
+
+    control_length = np.hypot(*np.diff(controls, axis=1).transpose(2, 0, 1)).sum(axis=1)
+    samples = np.where(is_curve, np.clip(np.ceil(control_length / _FLATTEN_STEP), 1, _MAX_CURVE_SAMPLES), 1)
+    samples = samples.astype(np.intp)
+
+    owner = np.repeat(np.arange(len(controls)), samples)
+    step = np.arange(len(owner)) - np.repeat(np.cumsum(samples) - samples, samples) + 1
+    t = (step / samples[owner])[:, None]
+    p0, p1, p2, p3 = (controls[owner, k] for k in range(4))
+    mt = 1 - t
+    points = mt ** 3 * p0 + 3 * mt * mt * t * p1 + 3 * mt * t * t * p2 + t ** 3 * p3
+
+    return np.vstack([controls[:1, 0], points])
+
+
+# --- scanline fill --------------------------------------------------------
+
+def _fill(image: np.ndarray, polygons: List[np.ndarray], style: Dict[str, str]):
+    color = _parse_color(style.get('fill', 'black'))
+    if color is None:
+        return
+    alpha = float(style.get('fill-opacity', 1)) * float(style.get('opacity', 1))
+    if alpha <= 0:
+        return
+
+    height, width = image.shape[:2]
+    coverage = _coverage(polygons, height, width, style.get('fill-rule') == 'evenodd')
+    if coverage is None:
+        return
+
+    row, col, mask = coverage
+    region = image[row:row + mask.shape[0], col:col + mask.shape[1]]
+    color = np.asarray(color, dtype=np.float32)
+    if alpha < 1:
+        color = region * (1 - alpha) + color * alpha
+    np.copyto(region, color, where=mask[:, :, None])
+
+
+def _coverage(polygons: List[np.ndarray], height: int, width: int,
+              even_odd: bool) -> Optional[Tuple[int, int, np.ndarray]]:
+    """Pixel-center coverage of the polygons as (top row, left column, boolean mask).
+
+    Every edge deposits its winding direction at the first pixel center to
+    its right on each scanline it crosses; a running sum along each row then
+    gives the winding number at every pixel center.
+    """
+    starts = np.vstack([p for p in polygons if len(p) >= 3]) if any(len(p) >= 3 for p in polygons) else None
+    if starts is None:
+        return None
+    ends = np.vstack([np.roll(p, -1, axis=0) for p in polygons if len(p) >= 3])
+
+    x0, y0, x1, y1 = starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]
+    sloped = y0 != y1
+    x0, y0, x1, y1 = x0[sloped], y0[sloped], x1[sloped], y1[sloped]
+    direction = np.where(y1 > y0, 1.0, -1.0)
+
+    # Scanline centers r + 0.5 in [min(y), max(y))
+    first_row = np.clip(np.ceil(np.minimum(y0, y1) - 0.5), 0, height).astype(np.intp)
+    end_row = np.clip(np.ceil(np.maximum(y0, y1) - 0.5), 0, height).astype(np.intp)
+    counts = np.maximum(end_row - first_row, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return None
+
+    edge = np.repeat(np.arange(len(counts)), counts)
+    rows = first_row[edge] + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    slope = (x1 - x0) / (y1 - y0)
+    xs = x0[edge] + (rows + 0.5 - y0[edge]) * slope[edge]
+    cols = np.clip(np.ceil(xs - 0.5), 0, width).astype(np.intp)
+
+    top, bottom = int(rows.min()), int(rows.max()) + 1
+    left, right = int(cols.min()), int(cols.max())
+    if right <= left:
+        return None
+
+    span = right - left + 1
+    delta = np.bincount((rows - top) * span + (cols - left), weights=direction[edge],
+                        minlength=(bottom - top) * span).reshape(bottom - top, span)
+    winding = np.cumsum(delta, axis=1)[:, :-1]
+    mask = (winding.astype(np.int64) % 2 != 0) if even_odd else (winding != 0)
+    return top, left, mask
@@ -0,0 +1,282 @@
+import os
+import json
+import atexit
+import math
+import time
+import uuid
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+
+class LatencyHistogram:
+    """Bounded log-bucketed latency histogram (HDR-style).
+
+    Values are counted in buckets whose width grows geometrically, so any
+    percentile is reported within ``precision`` of the true value while the
+    memory stays bounded by the number of buckets between ``lowest`` and
+    ``highest`` (~1,000 for the defaults), however many values are recorded.
+    """
+
+    def __init__(self, lowest: float = 1e-6, highest: float = 3600.0, precision: float = 0.01):
+        self.lowest = lowest
+        self.highest = highest
+        self._log_base = math.log1p(2 * precision)
+        self._max_bucket = self._bucket(highest)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def _bucket(self, value: float) -> int:
+        return int(math.log(max(value, self.lowest) / self.lowest) / self._log_base)
+
+    def _value(self, bucket: int) -> float:
+        """Midpoint of a bucket"""
+        return self.lowest * math.exp((bucket + 0.5) * self._log_base)
+
+    def record(self, value: float):
+        bucket = min(self._bucket(value), self._max_bucket)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        """Value at or below which ``p`` percent of the recorded values fall"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(max(self._value(bucket), self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'total': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else 0.0,
+            'min': round(self.min, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'p50': round(self.percentile(50), 6),
+            'p95': round(self.percentile(95), 6),
+            'p99': round(self.percentile(99), 6),
+        }
+
+
+class Span:
+    """One timed operation inside a trace; children are the operations it spans"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent', 'attributes', 'children',
+                 'start', 'duration', 'detached', '_token')
+
+    def __init__(self, name: str, trace_id: str, parent: Optional['Span'] = None,
+                 attributes: Optional[Dict[str, Any]] = None, detached: bool = False):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.attributes = attributes or {}
+        self.children: List[Any] = []
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.detached = detached if parent is None else parent.detached
+        self._token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'start': round(self.start, 6),
+            'duration': None if self.duration is None else round(self.duration, 6),
+            'attributes': self.attributes,
+            'children': [child if isinstance(child, dict) else child.to_dict() for child in self.children],
+        }
+
+
+class _NullSpan:
+    """Stand-in returned while tracing is disabled; entering and exiting it costs nothing"""
+
+    trace_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _SpanContext:
+    def __init__(self, tracer: 'Tracer', span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.span._token = self.tracer._current.set(self.span)
+        self.span.start = time.time()
+        self._started = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.duration = time.perf_counter() - self._started
+        if exc_type is not None:
+            self.span.attributes.setdefault('error', f"{exc_type.__name__}: {exc}")
+        self.tracer._current.reset(self.span._token)
+        self.tracer._finish(self.span)
+        return False
+
+
+class Tracer:
+    """Per-request span tracer with per-span-name latency histograms.
+
+    ``trace()`` opens the root span of a request and ``span()`` nests a child
+    under whatever span is current in the calling context. Finished traces are
+    kept in a bounded ring for export and every span duration is folded into
+    the histogram of its name, so p50/p95/p99 per stage are available without
+    keeping individual timings. Disabled via ``VECTORCRAFT_TRACING=0``; ``span``
+    and ``trace`` then return a shared no-op span.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, max_traces: int = 200, max_spans_per_trace: int = 500):
+        if enabled is None:
+            enabled = os.environ.get('VECTORCRAFT_TRACING', '1').lower() not in ('0', 'false', 'no', 'off')
+        self.enabled = enabled
+        self.max_spans_per_trace = max_spans_per_trace
+        self._current: ContextVar[Optional[Span]] = ContextVar('vectorcraft_span', default=None)
+        self._traces: deque = deque(maxlen=max_traces)
+        self._span_counts: Dict[str, int] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[Span]:
+        return self._current.get() if self.enabled else None
+
+    def current_trace_id(self) -> Optional[str]:
+        span = self.current()
+        return span.trace_id if span is not None else None
+
+    def forget_current(self):
+        """Drop the current span in this context, e.g. one inherited by a forked worker"""
+        self._current.set(None)
+
+    def trace(self, name: str, trace_id: Optional[str] = None, detached: bool = False, **attributes):
+        """Open the root span of a new trace.
+
+        A ``detached`` trace is not stored or counted here: it is recorded in
+        another process (e.g. an engine worker) and shipped back with ``to_dict``
+        so the caller can ``adopt`` it into its own trace.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        span = Span(name, trace_id or uuid.uuid4().hex, None, attributes, detached)
+        return _SpanContext(self, span)
+
+    def span(self, name: str, **attributes):
+        """Open a child of the current span (histogram-only when no trace is active)"""
+        if not self.enabled:
+            return _NULL_SPAN
+        parent = self._current.get()
+        if parent is None:
+            return _SpanContext(self, Span(name, '', None, attributes))
+        span = Span(name, parent.trace_id, parent, attributes)
+        if self._admit(parent.trace_id):
+            parent.children.append(span)
+        return _SpanContext(self, span)
+
+    def adopt(self, exported: Optional[Dict[str, Any]]):
+        """Attach a span tree exported by another process under the current span"""
+        if not self.enabled or not exported:
+            return
+        parent = self._current.get()
+        if parent is not None and self._admit(parent.trace_id):
+            parent.children.append(exported)
+        if parent is None or not parent.detached:
+            self._record_tree(exported)
+
+    def histograms(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+
+    def traces(self, limit: Optional[int] = None, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent traces first"""
+        with self._lock:
+            traces = list(reversed(self._traces))
+        if trace_id is not None:
+            traces = [trace for trace in traces if trace['trace_id'] == trace_id]
+        return traces[:limit] if limit is not None else traces
+
+    def export(self, limit: Optional[int] = None, trace_id: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'histograms': self.histograms(),
+            'traces': self.traces(limit, trace_id),
+        }
+
+    def dump(self, path: str, limit: Optional[int] = None):
+        """Write ``export()`` to a JSON file"""
+        with open(path, 'w') as f:
+            json.dump(self.export(limit), f, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._traces.clear()
+            self._span_counts.clear()
+            self._histograms.clear()
+
+    def _admit(self, trace_id: str) -> bool:
+        """Cap the spans kept per trace so a runaway loop cannot grow one without bound"""
+        with self._lock:
+            count = self._span_counts.get(trace_id, 0)
+            if count >= self.max_spans_per_trace:
+                return False
+            self._span_counts[trace_id] = count + 1
+            return True
+
+    def _record(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def _record_tree(self, exported: Dict[str, Any]):
+        if exported.get('duration') is not None:
+            self._record(exported['name'], exported['duration'])
+        for child in exported.get('children', []):
+            self._record_tree(child)
+
+    def _finish(self, span: Span):
+        if not span.detached:
+            self._record(span.name, span.duration)
+        if span.parent is None and span.trace_id and not span.detached:
+            trace = span.to_dict()
+            trace['trace_id'] = span.trace_id
+            with self._lock:
+                self._traces.append(trace)
+                self._span_counts.pop(span.trace_id, None)
+        elif span.parent is None and span.detached:
+            with self._lock:
+                self._span_counts.pop(span.trace_id, None)
+
+
+# Process-wide tracer used by the pipeline, the engine and the web routes
+tracer = Tracer()
+
+# Optional JSON dump of everything traced, written when the process exits
+if os.environ.get('VECTORCRAFT_TRACE_DUMP'):
+    atexit.register(tracer.dump, os.environ['VECTORCRAFT_TRACE_DUMP'])
@@ -0,0 +1,209 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+
+class VTracerTimeout(TimeoutError):
+    """A trace ran past its per-job time limit; the binary was killed"""
+
+
+class VTracerPoolFull(RuntimeError):
+    """The pool's queue is at capacity"""
+
+
+class VTracerWorkerError(RuntimeError):
+    """The binary failed on a job"""
+
+
+# RealVTracerStrategy parameter -> vtracer command-line flag (the CLI has no max_iterations)
+_BINARY_FLAGS = {
+    'colormode': '--colormode',
+    'color_mode': '--colormode',
+    'hierarchical': '--hierarchical',
+    'mode': '--mode',
+    'filter_speckle': '--filter_speckle',
+    'color_precision': '--color_precision',
+    'layer_difference': '--gradient_step',
+    'corner_threshold': '--corner_threshold',
+    'length_threshold': '--segment_length',
+    'segment_length': '--segment_length',
+    'splice_threshold': '--splice_threshold',
+    'path_precision': '--path_precision',
+}
+
+
+def find_vtracer_binary() -> Optional[str]:
+    """The bundled ``vtracer_binary`` if it is executable here, else a ``vtracer`` on PATH"""
+    bundled = Path(__file__).parent.parent.parent / "vtracer_binary"
+    if bundled.exists() and os.access(bundled, os.X_OK):
+        try:
+            subprocess.run([str(bundled), '--version'], capture_output=True, timeout=5)
+            return str(bundled)
+        except (OSError, subprocess.TimeoutExpired):
+            pass  # Built for another platform
+
+    return shutil.which('vtracer')
+
+
+def binary_arguments(params: Dict[str, Any]) -> List[str]:
+    """Command-line flags for the vtracer binary from VTracer keyword parameters"""
+    arguments = []
+    for name, value in params.items():
+        flag = _BINARY_FLAGS.get(name)
+        if flag is None or value is None or flag in arguments:
+            continue
+        if flag == '--colormode' and value == 'binary':
+            value = 'bw'
+        elif flag == '--segment_length':
+            value = min(10.0, max(3.5, float(value)))  # The CLI rejects lengths outside [3.5, 10]
+        arguments.extend([flag, str(value)])
+    return arguments
+
+
+def trace_with_binary(binary_path: str, pixels: np.ndarray, params: Dict[str, Any], scratch: str,
+                      timeout: Optional[float] = None) -> str:
+    """Trace pixels with one run of the binary, using fixed file names in ``scratch``"""
+    input_path = os.path.join(scratch, 'input.png')
+    output_path = os.path.join(scratch, 'output.svg')
+    Image.fromarray(pixels).save(input_path, format='PNG', compress_level=0)
+
+    command = [binary_path, '--input', input_path, '--output', output_path] + binary_arguments(params)
+    completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    if completed.returncode != 0:
+        raise VTracerWorkerError(f"vtracer exited with code {completed.returncode}: {completed.stderr.strip()}")
+    with open(output_path, 'r') as f:
+        return f.read()
+
+
+def _scratch_root() -> Optional[str]:
+    """tmpfs when there is one, so the input PNG and output SVG never reach disk"""
+    return '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+
+
+class VTracerWorkerPool:
+    """Bounded, concurrent runs of the vtracer binary.
+
+    Without the Python ``vtracer`` package every trace is a run of the
+    command-line binary. At most ``workers`` runs are in flight at once and
+    at most ``queue_size`` more wait behind them; further submissions are
+    rejected instead of piling up. Each run gets its own scratch directory
+    on tmpfs for the input PNG and output SVG, and ``subprocess.run`` kills
+    a binary that outlives its job's timeout. Runs are started with
+    ``subprocess`` rather than ``multiprocessing``, so they are safe from
+    threaded servers and from daemonic processes alike.
+    """
+
+    def __init__(self, binary_path: str, workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 job_timeout: Optional[float] = 60.0):
+        if workers is None:
+            workers = int(os.environ.get('VECTORCRAFT_VTRACER_WORKERS', min(4, os.cpu_count() or 1)))
+        self.binary_path = binary_path
+        self.workers = max(1, workers)
+        self.queue_size = queue_size if queue_size is not None else 4 * self.workers
+        self.job_timeout = job_timeout
+        self.scratch_root = _scratch_root()
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pending = 0
+        self._closed = False
+
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'timeouts': 0, 'rejected': 0}
+
+    def start(self):
+        """Create the runner threads (otherwise done on first submit)"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("vtracer worker pool is shut down")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='vtracer')
+
+    def shutdown(self):
+        """Cancel queued jobs and wait for running ones to finish"""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, pixels: np.ndarray, params: Dict[str, Any], timeout: Optional[float] = None) -> Future:
+        """Queue a trace and return a future for its SVG string.
+
+        Raises ``VTracerPoolFull`` instead of blocking when ``queue_size`` jobs are already waiting.
+        """
+        timeout = timeout if timeout is not None else self.job_timeout
+        pixels = np.ascontiguousarray(pixels)
+        self.start()
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise VTracerPoolFull(f"{self.queue_size} vtracer jobs already queued")
+        self._count('submitted')
+        try:
+            future = self._executor.submit(self._run, pixels, dict(params), timeout)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._stats_lock:
+            self._pending += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def convert(self, pixels: np.ndarray, params: Dict[str, Any], timeout: Optional[float] = None) -> str:
+        """Trace pixels and wait for the SVG"""
+        return self.submit(pixels, params, timeout).result()
+
+    def health(self) -> Dict[str, Any]:
+        return {**self.stats, 'workers': self.workers, 'pending': self._pending}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _release(self, _future: Future):
+        with self._stats_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _run(self, pixels: np.ndarray, params: Dict[str, Any], timeout: Optional[float]) -> str:
+        scratch = tempfile.mkdtemp(prefix='vtracer-', dir=self.scratch_root)
+        try:
+            svg = trace_with_binary(self.binary_path, pixels, params, scratch, timeout)
+        except subprocess.TimeoutExpired:
+            self._count('timeouts')
+            raise VTracerTimeout(f"vtracer did not finish within {timeout}s")
+        except BaseException:
+            self._count('failed')
+            raise
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        self._count('completed')
+        return svg
+
+
+_pool: Optional[VTracerWorkerPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_vtracer_pool() -> Optional[VTracerWorkerPool]:
+    """Process-wide pool for the vtracer binary, or None when there is no usable binary.
+
+    A forked child gets a pool of its own; the parent's runner threads do not survive the fork.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool_pid != os.getpid():
+            binary_path = find_vtracer_binary()
+            _pool = VTracerWorkerPool(binary_path) if binary_path else None
+            _pool_pid = os.getpid()
+        return _pool
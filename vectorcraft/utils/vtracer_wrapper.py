@@ -3,12 +3,17 @@ VTracer wrapper that provides fallback mechanisms for vtracer access.
 This ensures vtracer functionality even if the Python package isn't installed.
 """
 
+import io
 import os
 import subprocess
 import tempfile
-from pathlib import Path
 from typing import Optional
 
+import numpy as np
+from PIL import Image
+
+from .vtracer_pool import find_vtracer_binary, get_vtracer_pool
+
 class VTracerWrapper:
     """Wrapper for VTracer that can use either Python package or local binary"""
     
@@ -28,26 +33,13 @@ class VTracerWrapper:
         except ImportError:
             pass
         
-        # Try local binary as fallback
-        current_dir = Path(__file__).parent.parent.parent
-        binary_path = current_dir / "vtracer_binary"
-        
-        if binary_path.exists() and os.access(binary_path, os.X_OK):
-            self.binary_path = str(binary_path)
-            print(f"✅ Using local vtracer binary: {self.binary_path}")
+        # Try the local binary, then a system one, as fallback
+        binary_path = find_vtracer_binary()
+        if binary_path:
+            self.binary_path = binary_path
+            print(f"✅ Using vtracer binary: {self.binary_path}")
             return
         
-        # Try system vtracer
-        try:
-            result = subprocess.run(['vtracer', '--version'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                self.binary_path = 'vtracer'
-                print("✅ Using system vtracer binary")
-                return
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-        
         print("⚠️  VTracer not available - some features may be limited")
     
     def is_available(self) -> bool:
@@ -112,6 +104,26 @@ class VTracerWrapper:
             print(f"Binary vtracer conversion error: {e}")
             return None
     
+    def convert_pixels(self, pixels: np.ndarray, **kwargs) -> Optional[str]:
+        """Convert decoded pixels to SVG; the binary runs in the shared worker pool"""
+        if self.python_vtracer:
+            buffer = io.BytesIO()
+            Image.fromarray(pixels).save(buffer, format='PNG', compress_level=0)
+            try:
+                return self.python_vtracer.convert_raw_image_to_svg(buffer.getvalue(), img_format='png', **kwargs)
+            except Exception as e:
+                print(f"Python vtracer conversion failed: {e}")
+                return None
+        
+        pool = get_vtracer_pool() if self.binary_path else None
+        if pool is None:
+            return None
+        try:
+            return pool.convert(pixels, kwargs)
+        except Exception as e:
+            print(f"Binary vtracer conversion error: {e}")
+            return None
+    
     def convert(self, image_path: str, **kwargs) -> Optional[str]:
         """Convert image to SVG using best available method"""
         # Try Python package first
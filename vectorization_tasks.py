@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
-from celery import Celery, Task
+from celery import Celery, Task, chord, group
 from celery.signals import task_prerun, task_postrun, task_failure
 from celery.exceptions import WorkerLostError, SoftTimeLimitExceeded, Retry
 
@@ -19,6 +19,7 @@ from celery_config import celery_app
 from database import db
 from services.vectorization_service import vectorization_service
 from services.file_service import file_service
+from services.batch_service import plan_batch, batch_concurrency, batch_progress
 from services.monitoring.system_logger import system_logger
 
 logger = logging.getLogger(__name__)
@@ -104,7 +105,7 @@ def vectorize_image(self, user_id: int, file_path: str, filename: str,
                    strategy: str = 'vtracer_high_fidelity', target_time: float = 60.0,
                    vectorization_params: Dict[str, Any] = None, 
                    use_palette: bool = False, selected_palette: List[List[int]] = None,
-                   task_metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+                   task_metadata: Dict[str, Any] = None, progressive: bool = False) -> Dict[str, Any]:
     """
     Async task for vectorizing images
     
@@ -118,6 +119,7 @@ def vectorize_image(self, user_id: int, file_path: str, filename: str,
         use_palette: Whether to use custom palette
         selected_palette: Custom color palette
         task_metadata: Additional task metadata
+        progressive: Publish a coarse preview SVG in the task meta before the final result
         
     Returns:
         Dict containing vectorization result
@@ -155,6 +157,15 @@ def vectorize_image(self, user_id: int, file_path: str, filename: str,
             meta={'status': 'Initializing vectorization...', 'progress': 10}
         )
         
+        def publish_preview(preview):
+            # Polled through /api/async/status while the refined pass runs
+            self.update_state(
+                state='PROCESSING',
+                meta={'status': 'Preview ready, refining...', 'progress': 50,
+                      'stage': preview.metadata['progressive']['stage'],
+                      'svg_content': preview.svg_builder.get_svg_string()}
+            )
+        
         # Perform vectorization using the service
         success, result = vectorization_service.vectorize_image(
             user_id=user_id,
@@ -164,7 +175,9 @@ def vectorize_image(self, user_id: int, file_path: str, filename: str,
             target_time=target_time,
             vectorization_params=vectorization_params,
             use_palette=use_palette,
-            selected_palette=selected_palette
+            selected_palette=selected_palette,
+            progressive=progressive,
+            on_progress=publish_preview if progressive else None
         )
         
         if not success:
@@ -237,6 +250,11 @@ def batch_vectorize(self, user_id: int, file_paths: List[str], filenames: List[s
     """
     Async task for batch vectorization of multiple images
     
+    The batch is fanned out as one ``vectorize_batch_file`` subtask per distinct
+    image (uploads with identical pixels are vectorized once) and this task is
+    replaced by a chord whose callback collects the results under its task ID.
+    Subtasks publish aggregated progress on that ID as they finish.
+    
     Args:
         user_id: User ID
         file_paths: List of file paths
@@ -251,12 +269,8 @@ def batch_vectorize(self, user_id: int, file_paths: List[str], filenames: List[s
     task_id = self.request.id
     
     try:
-        if len(file_paths) != len(filenames):
-            raise ValueError("file_paths and filenames must have the same length")
-        
+        items = plan_batch(file_paths, filenames)
         total_files = len(file_paths)
-        results = []
-        failed_files = []
         
         # Log batch start
         system_logger.info('batch_vectorization', 
@@ -265,85 +279,40 @@ def batch_vectorize(self, user_id: int, file_paths: List[str], filenames: List[s
                           user_email=db.get_user_by_id(user_id).get('email') if user_id else None,
                           details={
                               'total_files': total_files,
+                              'distinct_files': len(items),
                               'strategy': strategy,
                               'user_id': user_id
                           })
         
-        # Process each file
-        for i, (file_path, filename) in enumerate(zip(file_paths, filenames)):
-            try:
-                # Update progress
-                progress = int((i / total_files) * 100)
-                self.update_state(
-                    state='PROCESSING',
-                    meta={
-                        'status': f'Processing file {i+1}/{total_files}: {filename}',
-                        'progress': progress,
-                        'current_file': filename,
-                        'completed_files': i,
-                        'total_files': total_files
-                    }
-                )
-                
-                # Vectorize individual file
-                success, result = vectorization_service.vectorize_image(
-                    user_id=user_id,
-                    file_path=file_path,
-                    filename=filename,
-                    strategy=strategy,
-                    target_time=target_time,
-                    vectorization_params=vectorization_params
-                )
-                
-                if success:
-                    results.append({
-                        'filename': filename,
-                        'status': 'success',
-                        'result': result
-                    })
-                else:
-                    failed_files.append({
-                        'filename': filename,
-                        'error': result.get('error', 'Unknown error')
-                    })
-                
-            except Exception as e:
-                logger.error(f"Failed to process file {filename}: {e}")
-                failed_files.append({
-                    'filename': filename,
-                    'error': str(e)
-                })
-            
-            # Clean up temporary file
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                logger.warning(f"Failed to cleanup temporary file {file_path}: {e}")
-        
-        # Compile final results
-        batch_result = {
-            'task_id': task_id,
-            'total_files': total_files,
-            'successful_files': len(results),
-            'failed_files': len(failed_files),
-            'results': results,
-            'failures': failed_files,
-            'completed_at': datetime.utcnow().isoformat()
-        }
+        # Duplicates reuse the result of their first occurrence; their uploads are not needed
+        for item in items:
+            for duplicate_path, _ in item.duplicates:
+                try:
+                    if os.path.exists(duplicate_path):
+                        os.remove(duplicate_path)
+                except Exception as e:
+                    logger.warning(f"Failed to cleanup temporary file {duplicate_path}: {e}")
         
-        # Log completion
-        system_logger.info('batch_vectorization', 
-                          f'Batch vectorization task {task_id} completed',
-                          task_id=task_id,
-                          user_email=db.get_user_by_id(user_id).get('email') if user_id else None,
-                          details={
-                              'total_files': total_files,
-                              'successful_files': len(results),
-                              'failed_files': len(failed_files)
-                          })
+        self.update_state(
+            state='PROCESSING',
+            meta={
+                'status': f'Queued {len(items)} distinct files of {total_files}',
+                'progress': 0,
+                'completed_files': 0,
+                'total_files': total_files,
+                'distinct_files': len(items)
+            }
+        )
         
-        return batch_result
+        header = group(
+            vectorize_batch_file.s(user_id, item.file_path, item.filename, strategy, target_time,
+                                   vectorization_params, batch_id=task_id, distinct_files=len(items))
+            for item in items
+        )
+        callback = collect_batch_results.s(
+            batch_id=task_id, user_id=user_id, total_files=total_files,
+            duplicates=[[filename for _, filename in item.duplicates] for item in items]
+        )
         
     except Exception as e:
         logger.error(f"Batch vectorization task {task_id} failed: {e}")
@@ -363,6 +332,133 @@ def batch_vectorize(self, user_id: int, file_paths: List[str], filenames: List[s
         )
         
         raise
+    
+    # Raises Ignore; the chord callback completes this task ID
+    return self.replace(chord(header, callback))
+
+
+# A batch file waits at most BATCH_SLOT_WAIT seconds for a slot under the user's cap
+BATCH_SLOT_RETRY_DELAY = 5
+BATCH_SLOT_MAX_RETRIES = int(os.getenv('BATCH_SLOT_WAIT', 3600)) // BATCH_SLOT_RETRY_DELAY
+
+
+@celery_app.task(bind=True, name='vectorization_tasks.vectorize_batch_file', max_retries=BATCH_SLOT_MAX_RETRIES)
+def vectorize_batch_file(self, user_id: int, file_path: str, filename: str,
+                         strategy: str, target_time: float, vectorization_params: Dict[str, Any],
+                         batch_id: str, distinct_files: int) -> Dict[str, Any]:
+    """
+    Vectorize one file of a batch
+    
+    Waits for a free slot under the user's batch concurrency cap, so a large
+    batch cannot occupy every worker; a file still waiting after
+    ``BATCH_SLOT_WAIT`` seconds is marked failed. Failures are returned rather
+    than raised, so one bad file does not cancel the batch's chord.
+    """
+    slot_id = self.request.id
+    if not batch_concurrency.acquire(user_id, slot_id):
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=BATCH_SLOT_RETRY_DELAY)
+        
+        logger.warning(f"Gave up waiting for a batch slot for {filename} (user {user_id})")
+        entry = {'filename': filename, 'status': 'failed', 'error': 'Timed out waiting for a free batch slot'}
+        _remove_batch_file(file_path)
+    else:
+        try:
+            success, result = vectorization_service.vectorize_image(
+                user_id=user_id,
+                file_path=file_path,
+                filename=filename,
+                strategy=strategy,
+                target_time=target_time,
+                vectorization_params=vectorization_params
+            )
+            
+            if success:
+                entry = {'filename': filename, 'status': 'success', 'result': result}
+            else:
+                entry = {'filename': filename, 'status': 'failed', 'error': result.get('error', 'Unknown error')}
+            
+        except Exception as e:
+            logger.error(f"Failed to process file {filename}: {e}")
+            entry = {'filename': filename, 'status': 'failed', 'error': str(e)}
+        
+        finally:
+            batch_concurrency.release(user_id, slot_id)
+            _remove_batch_file(file_path)
+    
+    # Aggregated progress, polled through the batch's task ID
+    completed = batch_progress.increment(batch_id)
+    self.update_state(
+        task_id=batch_id,
+        state='PROCESSING',
+        meta={
+            'status': f'Processed {completed}/{distinct_files}: {filename}',
+            'progress': int(completed / distinct_files * 100),
+            'current_file': filename,
+            'completed_files': completed,
+            'distinct_files': distinct_files
+        }
+    )
+    
+    return entry
+
+
+def _remove_batch_file(file_path: str):
+    """Clean up a batch file's temporary upload"""
+    try:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    except Exception as e:
+        logger.warning(f"Failed to cleanup temporary file {file_path}: {e}")
+
+
+@celery_app.task(bind=True, base=VectorizationTask, name='vectorization_tasks.collect_batch_results')
+def collect_batch_results(self, entries: List[Dict[str, Any]], batch_id: str, user_id: int,
+                          total_files: int, duplicates: List[List[str]]) -> Dict[str, Any]:
+    """
+    Chord callback of ``batch_vectorize``: expand duplicates and compile the batch result
+    """
+    results = []
+    failed_files = []
+    
+    # Group results arrive in submission order, aligned with ``duplicates``
+    for entry, duplicate_names in zip(entries, duplicates):
+        for i, filename in enumerate([entry['filename']] + duplicate_names):
+            if entry['status'] != 'success':
+                failed_files.append({'filename': filename, 'error': entry['error']})
+                continue
+            item = {'filename': filename, 'status': 'success', 'result': entry['result']}
+            if i > 0:
+                item['duplicate_of'] = entry['filename']
+            results.append(item)
+    
+    batch_progress.clear(batch_id)
+    
+    # Compile final results
+    batch_result = {
+        'task_id': batch_id,
+        'total_files': total_files,
+        'distinct_files': len(entries),
+        'successful_files': len(results),
+        'failed_files': len(failed_files),
+        'results': results,
+        'failures': failed_files,
+        'completed_at': datetime.utcnow().isoformat()
+    }
+    
+    # Log completion
+    system_logger.info('batch_vectorization', 
+                      f'Batch vectorization task {batch_id} completed',
+                      task_id=batch_id,
+                      user_email=db.get_user_by_id(user_id).get('email') if user_id else None,
+                      details={
+                          'total_files': total_files,
+                          'distinct_files': len(entries),
+                          'successful_files': len(results),
+                          'failed_files': len(failed_files)
+                      })
+    
+    return batch_result
 
 
 @celery_app.task(bind=True, base=VectorizationTask, name='vectorization_tasks.extract_palettes')